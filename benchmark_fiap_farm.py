@@ -0,0 +1,1463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FIAP Farm - Benchmarks de Desempenho
+FarmTech Solutions
+
+Mede o desempenho dos caminhos de cálculo do sistema com dados sintéticos.
+
+Uso:
+    python benchmark_fiap_farm.py insumos-lote [--tamanhos 10000 1000000 10000000]
+    python benchmark_fiap_farm.py insumos-escalar --tamanhos 100000 1000000
+    python benchmark_fiap_farm.py crud --tamanhos 10000 1000000
+    python benchmark_fiap_farm.py memoria-plantio --tamanhos 1000000
+    python benchmark_fiap_farm.py exportacao --tamanhos 10000 1000000
+    python benchmark_fiap_farm.py binario --tamanhos 1000000 10000000
+    python benchmark_fiap_farm.py diario --tamanhos 100000
+    python benchmark_fiap_farm.py sqlite --tamanhos 100000 1000000
+    python benchmark_fiap_farm.py resumo --tamanhos 10000 1000000
+    python benchmark_fiap_farm.py paginacao --tamanhos 100000 1000000
+    python benchmark_fiap_farm.py estatisticas --tamanhos 100000 10000000
+    python benchmark_fiap_farm.py estatisticas-paralelo --tamanhos 100000000
+    python benchmark_fiap_farm.py geometria --tamanhos 1000 50000
+    python benchmark_fiap_farm.py espacial --tamanhos 10000 1000000
+    python benchmark_fiap_farm.py catalogo --tamanhos 1000 100000
+    python benchmark_fiap_farm.py clima --tamanhos 5000
+    python benchmark_fiap_farm.py series --tamanhos 100000 1000000
+    python benchmark_fiap_farm.py alertas --tamanhos 1000000 10000000
+    python benchmark_fiap_farm.py api --tamanhos 20000
+    python benchmark_fiap_farm.py cenarios --tamanhos 1000000 10000000
+    python benchmark_fiap_farm.py otimizacao --tamanhos 10000 100000 1000000
+
+Suíte de regressão (resultados em JSON, comparados com benchmark_base.json):
+    python benchmark_fiap_farm.py suite [--tamanhos 1000 100000 10000000] [--casos area crud-obter] [--execucoes 3]
+    python benchmark_fiap_farm.py suite --tamanhos 1000 100000 --gravar-base
+    python benchmark_fiap_farm.py comparar benchmark_resultados.json [--base benchmark_base.json]
+
+Inicialização dos pontos de entrada (-X importtime e tempo até o resultado):
+    python benchmark_fiap_farm.py inicializacao [--repeticoes 10] [--orcamento]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from fiap_farm import (CalculadoraArea, CalculadoraInsumos, FazendaData, FiapFarmSystem, GerenciadorDados,
+                       NIVEIS_QUANTIDADE, np)
+from fiap_farm_alertas import MotorAlertas, VARIAVEIS
+from fiap_farm_api import percentil, teste_carga
+from fiap_farm_catalogo import CatalogoMonitorado, carregar_catalogo
+from fiap_farm_cenarios import GradeCenarios, resumir_cenarios
+from fiap_farm_otimizacao import otimizar_insumos
+from fiap_farm_consulta import codificar_cursor
+from fiap_farm_clima import ClienteClima, ServidorClimaSimulado
+from fiap_farm_estatisticas import AcumuladorEstatistico, calcular_paralelo
+from fiap_farm_series import SerieFazenda
+from fiap_farm_geometria import area_geometria, carregar_geojson, medir_geojson
+from fiap_farm_http import ClienteHTTP
+from fiap_farm_armazenamento import ArmazemPlantioColunar, recalcular_agregados
+from fiap_farm_binario import abrir_binario, exportar_binario
+from fiap_farm_exportacao import exportar_dados, MODOS_EXPORTACAO
+from fiap_farm_persistencia import DiarioEscrita, gerenciador_sqlite
+from r_simulator import RSimulator
+
+# Acima deste tamanho o laço escalar é medido em uma amostra e extrapolado
+LIMITE_ESCALAR = 1_000_000
+
+
+def gerar_hectares(n, semente=42):
+    """Gera n áreas sintéticas (0,1 a 500 ha) e seus níveis de dose"""
+    rng = random.Random(semente)
+    hectares = [rng.uniform(0.1, 500.0) for _ in range(n)]
+    quantidades = [rng.choice(NIVEIS_QUANTIDADE) for _ in range(n)]
+    return hectares, quantidades
+
+
+def _cronometrar(funcao, *args):
+    """Executa a função e retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def bench_insumos_lote(tamanhos):
+    """Compara os cálculos escalares de insumos com a API em lote"""
+    calc = CalculadoraInsumos()
+
+    def escalar(hectares, quantidades):
+        for h, q in zip(hectares, quantidades):
+            calc.calcular_corretivos(h, "solo", q)
+            calc.calcular_fertilizantes(h, q)
+            calc.calcular_defensivos(h, q)
+
+    print(f"\n{'linhas':>12} {'escalar (s)':>14} {'lote (s)':>10} {'ganho':>8}")
+    print("-" * 48)
+    for n in tamanhos:
+        hectares, quantidades = gerar_hectares(n)
+        if np is not None:
+            # Entrada colunar: vetor de hectares e códigos de nível (0/1/2)
+            colunas = (np.asarray(hectares), np.fromiter(map(NIVEIS_QUANTIDADE.index, quantidades), np.int8, n))
+        else:
+            colunas = (hectares, quantidades)
+        _, tempo_lote = _cronometrar(calc.calcular_todos_lote, *colunas)
+
+        amostra = min(n, LIMITE_ESCALAR)
+        _, tempo_escalar = _cronometrar(escalar, hectares[:amostra], quantidades[:amostra])
+        tempo_escalar *= n / amostra
+        marca = "*" if amostra < n else " "
+
+        print(f"{n:>12,} {tempo_escalar:>13.3f}{marca} {tempo_lote:>10.3f} {tempo_escalar / tempo_lote:>7.1f}x")
+
+    print("\n* tempo escalar extrapolado a partir de uma amostra de "
+          f"{LIMITE_ESCALAR:,} linhas")
+
+
+def _corretivos_por_tabela(tabela, hectares, quantidade):
+    """Cálculo escalar percorrendo a tabela a cada chamada (forma anterior ao plano)"""
+    resultado = {}
+    for corretivo, dados in tabela.items():
+        if quantidade == "minima":
+            valor = dados["min"]
+        elif quantidade == "maxima":
+            valor = dados["max"]
+        else:
+            valor = (dados["min"] + dados["max"]) / 2
+        resultado[corretivo] = valor * hectares
+    return resultado
+
+
+def bench_insumos_escalar(tamanhos):
+    """Compara o cálculo escalar pela tabela com o plano de doses compilado"""
+    calc = CalculadoraInsumos()
+    calc.definir_dose("corretivos", "calcario", 2.0, 3.5, cultura="cana")
+    print(f"\n{'chamadas':>12} {'estratégia':>14} {'chamadas/s':>14} {'confere':>8}")
+    print("-" * 52)
+    for n in tamanhos:
+        hectares, quantidades = gerar_hectares(n)
+        pares = list(zip(hectares, quantidades))
+        referencia, t_tabela = _cronometrar(
+            lambda: [_corretivos_por_tabela(calc.corretivos, h, q) for h, q in pares])
+        compilado, t_plano = _cronometrar(
+            lambda: [calc.calcular_corretivos(h, "solo", q) for h, q in pares])
+        _, t_cultura = _cronometrar(
+            lambda: [calc.calcular_corretivos(h, "solo", q, cultura="cana") for h, q in pares])
+        print(f"{n:>12,} {'tabela':>14} {n / t_tabela:>14,.0f} {'':>8}")
+        print(f"{n:>12,} {'plano':>14} {n / t_plano:>14,.0f} {'sim' if compilado == referencia else 'NÃO':>8}")
+        print(f"{n:>12,} {'plano (cana)':>14} {n / t_cultura:>14,.0f} {'':>8}")
+
+
+def gerar_plantio(n, semente=42):
+    """Gera n registros de plantio sintéticos (quadrados e retângulos)"""
+    rng = random.Random(semente)
+    for _ in range(n):
+        if rng.random() < 0.5:
+            lado = rng.uniform(10.0, 2000.0)
+            area_m2 = lado ** 2
+            yield {"tipo": "quadrado", "lado": lado, "area_m2": area_m2, "area_ha": area_m2 / 10000}
+        else:
+            largura, altura = rng.uniform(10.0, 2000.0), rng.uniform(10.0, 2000.0)
+            area_m2 = largura * altura
+            yield {"tipo": "retangulo", "largura": largura, "altura": altura,
+                   "area_m2": area_m2, "area_ha": area_m2 / 10000}
+
+
+def bench_crud(tamanhos, operacoes=100_000):
+    """Mede inserção e get/update/delete por id no GerenciadorDados"""
+    print(f"\n{'registros':>12} {'inserir/s':>12} {'obter/s':>12} {'atualizar/s':>12} {'deletar/s':>12}")
+    print("-" * 64)
+    for n in tamanhos:
+        gerenciador = GerenciadorDados()
+        registros = list(gerar_plantio(n))
+        _, t_inserir = _cronometrar(lambda: [gerenciador.adicionar_plantio(r) for r in registros])
+
+        rng = random.Random(7)
+        ids = rng.sample(range(1, n + 1), min(operacoes, n))
+        novo = {"tipo": "quadrado", "lado": 1.0, "area_m2": 1.0, "area_ha": 0.0001}
+        _, t_obter = _cronometrar(lambda: [gerenciador.obter_plantio(i) for i in ids])
+        _, t_atualizar = _cronometrar(lambda: [gerenciador.atualizar_plantio_por_id(i, dict(novo)) for i in ids])
+        _, t_deletar = _cronometrar(lambda: [gerenciador.deletar_plantio_por_id(i) for i in ids])
+
+        k = len(ids)
+        print(f"{n:>12,} {n / t_inserir:>12,.0f} {k / t_obter:>12,.0f} "
+              f"{k / t_atualizar:>12,.0f} {k / t_deletar:>12,.0f}")
+
+
+def bench_memoria_plantio(tamanhos):
+    """Compara a memória do armazém de dicionários com o armazém colunar"""
+    backends = {
+        "dicionarios": lambda: None,
+        "colunar": ArmazemPlantioColunar,
+    }
+    print(f"\n{'registros':>12} {'backend':>12} {'MiB':>10} {'bytes/reg':>10} {'estimado':>10}")
+    print("-" * 58)
+    for n in tamanhos:
+        medidos = {}
+        for nome, fabrica in backends.items():
+            gc.collect()
+            tracemalloc.start()
+            gerenciador = GerenciadorDados(armazem_plantio=fabrica())
+            for registro in gerar_plantio(n):
+                gerenciador.adicionar_plantio(registro)
+            usado, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            medidos[nome] = usado
+            print(f"{n:>12,} {nome:>12} {usado / 2**20:>10.1f} {usado / n:>10.1f} "
+                  f"{gerenciador.plantio.bytes_por_registro():>10.1f}")
+            del gerenciador
+        print(f"{'':>12} {'redução':>12} {medidos['dicionarios'] / medidos['colunar']:>9.1f}x")
+
+
+def _pico_memoria(funcao, *args):
+    """Executa a função e retorna (segundos, pico de memória alocada em bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico
+
+
+def bench_exportacao(tamanhos):
+    """Compara o json.dump da coleção inteira com a exportação incremental"""
+    fazendas = {"Barra Grande": {"localizacao": "Itirapuã (SP)", "cultura": "Cana-de-Açúcar", "tipo": "cana"}}
+
+    def json_dump(caminho, gerenciador):
+        dados = {"fazendas": fazendas, "plantio": gerenciador.listar_plantio(), "insumos": []}
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+
+    def incremental(modo):
+        return lambda caminho, gerenciador: exportar_dados(
+            caminho, fazendas, gerenciador.iterar_plantio(), gerenciador.iterar_insumos(), modo)
+
+    estrategias = {"json.dump": json_dump}
+    estrategias.update({modo: incremental(modo) for modo in MODOS_EXPORTACAO})
+
+    print(f"\n{'registros':>12} {'estratégia':>12} {'segundos':>10} {'pico MiB':>10} {'arquivo MiB':>12}")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "export.json")
+        for n in tamanhos:
+            gerenciador = GerenciadorDados()
+            for registro in gerar_plantio(n):
+                gerenciador.adicionar_plantio(registro)
+            for nome, estrategia in estrategias.items():
+                # O tracemalloc deixa as alocações mais lentas: o tempo é medido à parte
+                _, segundos = _cronometrar(estrategia, caminho, gerenciador)
+                _, pico = _pico_memoria(estrategia, caminho, gerenciador)
+                print(f"{n:>12,} {nome:>12} {segundos:>10.2f} {pico / 2**20:>10.2f} "
+                      f"{os.path.getsize(caminho) / 2**20:>12.1f}")
+
+
+def bench_binario(tamanhos, insumos_por_plantio=0.1):
+    """Compara a exportação NDJSON com a binária colunar, na escrita e na leitura
+
+    Plantio no armazém colunar e insumos "completo" (10% do plantio). Na
+    leitura: o NDJSON é interpretado linha a linha (até LIMITE_ESCALAR
+    registros) e o binário é aberto com mmap e somado coluna a coluna.
+    """
+    fazendas = {"Barra Grande": {"localizacao": "Itirapuã (SP)", "cultura": "Cana-de-Açúcar", "tipo": "cana"}}
+    calc = CalculadoraInsumos()
+    print(f"\n{'registros':>12} {'formato':>8} {'escrita (s)':>12} {'arquivo MiB':>12} {'leitura (s)':>12} "
+          f"{'abrir (ms)':>11} {'varredura (s)':>14} {'GB/s':>6}")
+    print("-" * 96)
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n in tamanhos:
+            gerenciador = GerenciadorDados(armazem_plantio=ArmazemPlantioColunar())
+            gerenciador.adicionar_plantio_lote(gerar_plantio(n))
+            hectares, quantidades = gerar_hectares(int(n * insumos_por_plantio))
+            for h, quantidade in zip(hectares, quantidades):
+                gerenciador.adicionar_insumos({
+                    "tipo": "completo", "hectares": h, "quantidade": quantidade,
+                    "corretivos": calc.calcular_corretivos(h, "solo", quantidade),
+                    "fertilizantes": calc.calcular_fertilizantes(h, quantidade),
+                    "defensivos": calc.calcular_defensivos(h, quantidade)})
+            total = n + len(hectares)
+            del hectares, quantidades
+
+            caminho = os.path.join(diretorio, "export.ndjson")
+            _, t_escrita = _cronometrar(lambda: exportar_dados(
+                caminho, fazendas, gerenciador.iterar_plantio(), gerenciador.iterar_insumos(), "ndjson"))
+            tamanho = os.path.getsize(caminho)
+            t_leitura = "-"
+            if total <= LIMITE_ESCALAR:
+                def ler_ndjson():
+                    with open(caminho, encoding="utf-8") as arquivo:
+                        return sum(json.loads(linha)["dados"].get("area_ha", 0.0) for linha in arquivo)
+                _, segundos = _cronometrar(ler_ndjson)
+                t_leitura = f"{segundos:.2f}"
+            os.remove(caminho)
+            print(f"{total:>12,} {'ndjson':>8} {t_escrita:>12.2f} {tamanho / 2**20:>12.1f} {t_leitura:>12} "
+                  f"{'-':>11} {'-':>14} {'-':>6}")
+
+            caminho = os.path.join(diretorio, "export.bin")
+            _, t_escrita = _cronometrar(lambda: exportar_binario(
+                caminho, fazendas, gerenciador.plantio, gerenciador.iterar_insumos()))
+            del gerenciador
+            arquivo, t_abrir = _cronometrar(abrir_binario, caminho)
+            colunas = [arquivo.coluna(secao, nome) for secao in ("plantio", "insumos")
+                       for nome in arquivo.colunas(secao) if nome not in ("id", "tipo", "quantidade")]
+            lidos = sum(len(coluna) * 8 for coluna in colunas)
+
+            def varrer():
+                if np is not None:
+                    return [float(np.nansum(coluna)) for coluna in colunas]
+                return [math.fsum(valor for valor in coluna if valor == valor) for coluna in colunas]
+            _, t_varredura = _cronometrar(varrer)
+            del colunas
+            arquivo.fechar()
+            print(f"{total:>12,} {'binário':>8} {t_escrita:>12.2f} {os.path.getsize(caminho) / 2**20:>12.1f} "
+                  f"{'-':>12} {t_abrir * 1000:>11.2f} {t_varredura:>14.3f} {lidos / t_varredura / 1e9:>6.2f}")
+            os.remove(caminho)
+
+
+def bench_diario(tamanhos, grupos=(1, 32, 1024)):
+    """Mede inclusões por segundo com o diário ativo e o tempo de recuperação"""
+    print(f"\n{'registros':>12} {'grupo fsync':>12} {'inserir/s':>12} {'recuperar (s)':>14}")
+    print("-" * 54)
+    for n in tamanhos:
+        for grupo in grupos:
+            with tempfile.TemporaryDirectory() as diretorio:
+                gerenciador = GerenciadorDados()
+                diario = DiarioEscrita(diretorio, tamanho_grupo=grupo, intervalo_sync=float("inf"))
+                diario.abrir(gerenciador)
+                registros = list(gerar_plantio(n))
+                _, segundos = _cronometrar(lambda: [gerenciador.adicionar_plantio(r) for r in registros])
+                diario.fechar()
+
+                recuperado = DiarioEscrita(diretorio)
+                _, recuperar = _cronometrar(recuperado.abrir, GerenciadorDados())
+                recuperado.fechar()
+                print(f"{n:>12,} {grupo:>12,} {n / segundos:>12,.0f} {recuperar:>14.2f}")
+
+
+def bench_sqlite(tamanhos):
+    """Mede inclusão em lote, consultas por id e o resumo (GROUP BY) no SQLite"""
+    print(f"\n{'registros':>12} {'lote/s':>12} {'obter/s':>12} {'resumo (s)':>12} {'bytes/reg':>10}")
+    print("-" * 62)
+    for n in tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            gerenciador = gerenciador_sqlite(os.path.join(diretorio, "fiap_farm.db"))
+            _, t_lote = _cronometrar(gerenciador.adicionar_plantio_lote, gerar_plantio(n))
+
+            ids = random.Random(7).sample(range(1, n + 1), min(n, 10_000))
+            _, t_obter = _cronometrar(lambda: [gerenciador.obter_plantio(i) for i in ids])
+            _, t_resumo = _cronometrar(gerenciador.resumo_plantio)
+
+            print(f"{n:>12,} {n / t_lote:>12,.0f} {len(ids) / t_obter:>12,.0f} {t_resumo:>12.3f} "
+                  f"{gerenciador.plantio.bytes_por_registro():>10.1f}")
+            gerenciador.plantio.conexao.close()
+    verificar_reinicio_sqlite()
+
+
+def verificar_reinicio_sqlite(reinicios: int = 3) -> None:
+    """Reabre o sistema com FIAP_FARM_SQLITE e FIAP_FARM_DADOS juntos e confere os registros"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        banco = os.path.join(diretorio, "fiap_farm.db")
+        for reinicio in range(reinicios):
+            with contextlib.redirect_stdout(io.StringIO()):
+                sistema = FiapFarmSystem(diretorio_dados=diretorio, gerenciador=gerenciador_sqlite(banco))
+            try:
+                if len(sistema.gerenciador.plantio) != reinicio * 10:
+                    raise AssertionError(f"reinício {reinicio}: {len(sistema.gerenciador.plantio)} registros")
+                sistema.gerenciador.adicionar_plantio_lote(gerar_plantio(10, semente=reinicio))
+            finally:
+                sistema.encerrar()
+                sistema.gerenciador.plantio.conexao.close()
+    print(f"\nReinício com SQLite e diário: {reinicios} aberturas, registros conferem")
+
+
+def bench_resumo(tamanhos):
+    """Compara o resumo por agregados corridos com o recálculo completo
+
+    Antes de medir, aplica inclusões, atualizações e remoções aleatórias e
+    confere que os agregados corridos batem com o recálculo.
+    """
+    print(f"\n{'registros':>12} {'corrido (µs)':>14} {'recálculo (s)':>14} {'confere':>8}")
+    print("-" * 52)
+    for n in tamanhos:
+        gerenciador = GerenciadorDados()
+        ids = gerenciador.adicionar_plantio_lote(gerar_plantio(n))
+        rng = random.Random(11)
+        for id_registro in rng.sample(ids, n // 10):
+            gerenciador.deletar_plantio_por_id(id_registro)
+        for id_registro, novo in zip(rng.sample([r["id"] for r in gerenciador.iterar_plantio()], n // 10),
+                                     gerar_plantio(n // 10, semente=5)):
+            gerenciador.atualizar_plantio_por_id(id_registro, novo)
+
+        _, t_corrido = _cronometrar(gerenciador.resumo_plantio)
+        _, t_recalculo = _cronometrar(lambda: recalcular_agregados(gerenciador.plantio).por("tipo"))
+        print(f"{n:>12,} {t_corrido * 1e6:>14.1f} {t_recalculo:>14.3f} "
+              f"{'sim' if gerenciador.verificar_agregados() else 'NÃO':>8}")
+
+
+def bench_paginacao(tamanhos, limite=50):
+    """Compara a paginação por cursor com a paginação por deslocamento (offset)
+
+    Para cada armazém: a primeira e a última página por id com cursor, a
+    última página por offset (islice da coleção, como listar + fatiar), uma
+    página na ordem por hectares com filtro de faixa e a leitura de todas as
+    páginas em sequência.
+    """
+    armazens = {
+        "dicionarios": lambda diretorio: GerenciadorDados(),
+        "colunar": lambda diretorio: GerenciadorDados(armazem_plantio=ArmazemPlantioColunar()),
+        "sqlite": lambda diretorio: gerenciador_sqlite(os.path.join(diretorio, "fiap_farm.db")),
+    }
+    print(f"\n{'registros':>12} {'armazém':>12} {'1ª pág (µs)':>12} {'última cursor (µs)':>19} "
+          f"{'última offset (ms)':>19} {'hectares (ms)':>14} {'todas (reg/s)':>14}")
+    print("-" * 110)
+    for n in tamanhos:
+        for nome, fabrica in armazens.items():
+            with tempfile.TemporaryDirectory() as diretorio:
+                gerenciador = fabrica(diretorio)
+                gerenciador.adicionar_plantio_lote(gerar_plantio(n))
+                # Cursor da penúltima página (o cursor é a chave do último registro entregue)
+                penultimo = gerenciador.pagina_plantio(1, ordem="-id").registros[0]["id"] - limite
+                cursor = codificar_cursor("id", (penultimo,))
+
+                _, t_primeira = _cronometrar(gerenciador.pagina_plantio, limite)
+                pagina, t_cursor = _cronometrar(gerenciador.pagina_plantio, limite, cursor)
+                offset, t_offset = _cronometrar(
+                    lambda: list(islice(gerenciador.iterar_plantio(), n - limite, n)))
+                assert [r["id"] for r in pagina.registros] == [r["id"] for r in offset]
+                _, t_hectares = _cronometrar(
+                    lambda: gerenciador.pagina_plantio(limite, ordem="-hectares", hectares_min=10.0,
+                                                       hectares_max=100.0))
+
+                def todas():
+                    total, cursor = 0, None
+                    while True:
+                        pagina = gerenciador.pagina_plantio(1000, cursor)
+                        total += len(pagina.registros)
+                        if pagina.proximo is None:
+                            return total
+                        cursor = pagina.proximo
+
+                total, t_todas = _cronometrar(todas)
+                assert total == n
+                print(f"{n:>12,} {nome:>12} {t_primeira * 1e6:>12.0f} {t_cursor * 1e6:>19.0f} "
+                      f"{t_offset * 1000:>19.1f} {t_hectares * 1000:>14.1f} {total / t_todas:>14,.0f}")
+                if nome == "sqlite":
+                    gerenciador.plantio.conexao.close()
+
+
+def bench_estatisticas(tamanhos):
+    """Compara o módulo statistics (lista materializada) com o acumulador em fluxo
+
+    Os valores vêm de um gerador; a estratégia "statistics" precisa montar a
+    lista antes (e é pulada acima de LIMITE_ESCALAR).
+    """
+    def gerar(n):
+        rng = random.Random(3)
+        return (rng.gauss(1300.0, 100.0) for _ in range(n))
+
+    def lista_statistics(n):
+        dados = list(gerar(n))
+        return (statistics.mean(dados), statistics.stdev(dados), statistics.variance(dados),
+                statistics.median(dados), min(dados), max(dados))
+
+    def acumulador(modo):
+        return lambda n: AcumuladorEstatistico(mediana=modo).atualizar(gerar(n)).resultado()
+
+    estrategias = {"statistics": lista_statistics, "exata": acumulador("exata"),
+                   "aproximada": acumulador("aproximada"), "sem mediana": acumulador(None)}
+
+    print(f"\n{'valores':>12} {'estratégia':>12} {'segundos':>10} {'pico MiB':>10}")
+    print("-" * 48)
+    for n in tamanhos:
+        for nome, estrategia in estrategias.items():
+            if nome == "statistics" and n > LIMITE_ESCALAR:
+                print(f"{n:>12,} {nome:>12} {'-':>10} {'-':>10}")
+                continue
+            _, segundos = _cronometrar(estrategia, n)
+            _, pico = _pico_memoria(estrategia, n)
+            print(f"{n:>12,} {nome:>12} {segundos:>10.2f} {pico / 2**20:>10.2f}")
+
+
+def bench_estatisticas_paralelo(tamanhos, processos=(1, 2, 4, 8), mediana="aproximada"):
+    """Mede a escala do cálculo em partes com 1 a 8 processos
+
+    Confere que média, variância, mínimo e máximo batem com o caminho serial
+    dentro da tolerância de ponto flutuante.
+    """
+    print(f"(núcleos disponíveis: {os.cpu_count()})")
+    print(f"\n{'valores':>12} {'processos':>10} {'segundos':>10} {'aceleração':>11} {'confere':>8}")
+    print("-" * 56)
+    for n in tamanhos:
+        if np is not None:
+            valores = np.random.default_rng(3).normal(1300.0, 100.0, n)
+        else:
+            rng = random.Random(3)
+            valores = array("d", (rng.gauss(1300.0, 100.0) for _ in range(n)))
+        serial, t_serial = _cronometrar(lambda: AcumuladorEstatistico(mediana=mediana).atualizar(valores))
+        print(f"{n:>12,} {'serial':>10} {t_serial:>10.2f} {1.0:>10.1f}x {'':>8}")
+        for quantidade in processos:
+            paralelo, segundos = _cronometrar(calcular_paralelo, valores, mediana, quantidade)
+            confere = (paralelo.n == serial.n and paralelo.minimo == serial.minimo
+                       and paralelo.maximo == serial.maximo
+                       and math.isclose(paralelo.media, serial.media, rel_tol=1e-12)
+                       and math.isclose(paralelo.variancia, serial.variancia, rel_tol=1e-9))
+            print(f"{n:>12,} {quantidade:>10} {segundos:>10.2f} {t_serial / segundos:>10.1f}x "
+                  f"{'sim' if confere else 'NÃO':>8}")
+        del valores
+
+
+def bench_cenarios(tamanhos, processos=(1, 2, 4, 8)):
+    """Mede a varredura de cenários (4 fazendas do catálogo x 3 níveis x 3 preços x áreas)
+
+    Para cada número de processos: só o resumo por grupo e o resumo com as
+    linhas CSV de todos os cenários (escritas em os.devnull). Confere que o
+    resumo é o mesmo da varredura com um processo.
+    """
+    catalogo = carregar_catalogo(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                              "catalogo_agronomico.json"))
+    fazendas = FazendaData(catalogo).fazendas
+    calc = CalculadoraInsumos(catalogo=catalogo)
+    print(f"(núcleos disponíveis: {os.cpu_count()})")
+    print(f"\n{'cenários':>12} {'processos':>10} {'resumo (s)':>11} {'csv (s)':>9} {'cenários/s':>12} {'confere':>8}")
+    print("-" * 68)
+    for n in tamanhos:
+        grupos = len(fazendas) * len(NIVEIS_QUANTIDADE) * 3
+        hectares, _ = gerar_hectares(max(1, n // grupos))
+        grade = GradeCenarios(hectares, fazendas, calc=calc)
+        referencia = None
+        for quantidade in processos:
+            resumo, t_resumo = _cronometrar(lambda: resumir_cenarios(grade, processos=quantidade))
+            with open(os.devnull, "w") as saida:
+                _, t_csv = _cronometrar(lambda: resumir_cenarios(grade, saida, "csv", processos=quantidade))
+            referencia = referencia or resumo
+            print(f"{len(grade):>12,} {quantidade:>10} {t_resumo:>11.2f} {t_csv:>9.2f} "
+                  f"{len(grade) / t_csv:>12,.0f} {'sim' if resumo == referencia else 'NÃO':>8}")
+        del grade, hectares
+
+
+def bench_otimizacao(tamanhos):
+    """Mede a otimização de doses com talhões das 4 culturas do catálogo
+
+    Três casos por tamanho: sem limites (tudo no teto), orçamento no meio
+    do caminho entre o plano mínimo e o máximo, e o mesmo orçamento com
+    prioridades por talhão e estoque de fósforo e potássio em 75% do
+    necessário. Confere que custo e estoques ficam dentro dos limites.
+    """
+    catalogo = carregar_catalogo(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                              "catalogo_agronomico.json"))
+    calc = CalculadoraInsumos(catalogo=catalogo)
+    print(f"\n{'talhões':>12} {'caso':>22} {'segundos':>10} {'custo (R$ mi)':>14} {'cobertura':>10} {'confere':>8}")
+    print("-" * 82)
+    for n in tamanhos:
+        hectares, _ = gerar_hectares(n)
+        rng = random.Random(7)
+        culturas = [rng.choice(("cana", "laranja", "soja", "cafe")) for _ in range(n)]
+        prioridades = [rng.uniform(0.5, 2.0) for _ in range(n)]
+        livre, segundos = _cronometrar(lambda: otimizar_insumos(hectares, culturas=culturas, calc=calc))
+        orcamento = (livre.custo_minimo + livre.custo_total) / 2
+        estoques = {insumo: livre.quantidades[insumo] * 0.75 for insumo in ("fosforo", "potassio")}
+        casos = [
+            ("sem limites", livre, segundos, None, {}),
+            ("orçamento", *_cronometrar(lambda: otimizar_insumos(hectares, orcamento, culturas=culturas, calc=calc)),
+             orcamento, {}),
+            ("orçamento + estoques", *_cronometrar(lambda: otimizar_insumos(
+                hectares, orcamento, estoques, culturas=culturas, prioridades=prioridades, calc=calc)),
+             orcamento, estoques),
+        ]
+        for nome, plano, segundos, limite, limites_estoque in casos:
+            confere = ((limite is None or plano.custo_total <= limite * (1 + 1e-9))
+                       and all(plano.quantidades[insumo] <= estoque * (1 + 1e-9)
+                               for insumo, estoque in limites_estoque.items()))
+            print(f"{n:>12,} {nome:>22} {segundos:>10.3f} {plano.custo_total / 1e6:>14,.2f} "
+                  f"{plano.cobertura:>10.3f} {'sim' if confere else 'NÃO':>8}")
+
+
+def gerar_geojson(caminho, n, vertices=200, semente=42):
+    """Grava n talhões poligonais sintéticos (lon/lat) em um GeoJSON"""
+    rng = random.Random(semente)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write('{"type":"FeatureCollection","features":[')
+        for i in range(n):
+            lon, lat = rng.uniform(-48.0, -47.0), rng.uniform(-22.0, -21.0)
+            raio = rng.uniform(0.001, 0.01)
+            anel = [[lon + raio * math.cos(2 * math.pi * k / vertices) * rng.uniform(0.8, 1.0),
+                     lat + raio * math.sin(2 * math.pi * k / vertices) * rng.uniform(0.8, 1.0)]
+                    for k in range(vertices)]
+            anel.append(anel[0])
+            feicao = {"type": "Feature", "properties": {"talhao": i},
+                      "geometry": {"type": "Polygon", "coordinates": [anel]}}
+            arquivo.write(("," if i else "") + json.dumps(feicao))
+        arquivo.write("]}")
+
+
+def bench_geometria(tamanhos, vertices=200):
+    """Mede talhões de um GeoJSON: leitura, cálculo feição a feição e vetorizado"""
+    print(f"\n{'talhões':>12} {'leitura (s)':>12} {'por feição (s)':>15} {'vetorizado (s)':>15} {'total (s)':>10}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "talhoes.geojson")
+        for n in tamanhos:
+            gerar_geojson(caminho, n, vertices)
+            feicoes, t_leitura = _cronometrar(carregar_geojson, caminho)
+            _, t_individual = _cronometrar(lambda: [area_geometria(f["geometry"]) for f in feicoes])
+            _, t_vetorizado = _cronometrar(lambda: CalculadoraArea.calcular_feicoes(feicoes))
+            _, t_total = _cronometrar(medir_geojson, caminho)
+            print(f"{n:>12,} {t_leitura:>12.2f} {t_individual:>15.2f} {t_vetorizado:>15.2f} {t_total:>10.2f}")
+
+
+def bench_espacial(tamanhos, consultas=10_000):
+    """Mede o índice espacial: carga em lote, consultas e CRUD sincronizado
+
+    Os talhões ficam espalhados em um quadrado com área total 2x a soma das
+    áreas, então cada ponto cai em poucos talhões.
+    """
+    print(f"\n{'talhões':>12} {'carga (s)':>10} {'ponto (µs)':>11} {'região 1 km (µs)':>17} "
+          f"{'vizinho (µs)':>13} {'inserir (µs)':>13} {'remover (µs)':>13}")
+    print("-" * 97)
+    for n in tamanhos:
+        rng = random.Random(9)
+        gerenciador = GerenciadorDados()
+        registros = list(gerar_plantio(n))
+        lado = math.sqrt(2 * sum(r["area_m2"] for r in registros))
+        for registro in registros:
+            registro["origem"] = [rng.uniform(0, lado), rng.uniform(0, lado)]
+        gerenciador.adicionar_plantio_lote(registros)
+        del registros
+        _, t_carga = _cronometrar(lambda: gerenciador.indice_espacial)
+        indice = gerenciador.indice_espacial
+
+        pontos = [(rng.uniform(0, lado), rng.uniform(0, lado)) for _ in range(consultas)]
+        _, t_ponto = _cronometrar(lambda: [indice.consultar_ponto(x, y) for x, y in pontos])
+        _, t_regiao = _cronometrar(lambda: [indice.consultar_caixa(x, y, x + 1000, y + 1000) for x, y in pontos])
+        _, t_vizinho = _cronometrar(lambda: [indice.mais_proximos(x, y, 1) for x, y in pontos])
+
+        novos = [dict(r, origem=[x, y]) for r, (x, y) in zip(gerar_plantio(consultas, semente=3), pontos)]
+        ids, t_inserir = _cronometrar(lambda: [gerenciador.adicionar_plantio(r) for r in novos])
+        _, t_remover = _cronometrar(lambda: [gerenciador.deletar_plantio_por_id(i) for i in ids])
+        print(f"{n:>12,} {t_carga:>10.2f} {t_ponto / consultas * 1e6:>11.1f} {t_regiao / consultas * 1e6:>17.1f} "
+              f"{t_vizinho / consultas * 1e6:>13.1f} {t_inserir / consultas * 1e6:>13.1f} "
+              f"{t_remover / consultas * 1e6:>13.1f}")
+
+
+def gerar_catalogo(caminho, fazendas, culturas=50, produtos=200, semente=42):
+    """Grava um catálogo sintético com muitas fazendas, culturas e produtos"""
+    rng = random.Random(semente)
+
+    def faixa():
+        minimo = round(rng.uniform(1, 200), 1)
+        return {"min": minimo, "max": round(minimo * rng.uniform(1, 2), 1), "unidade": "kg/ha"}
+
+    insumos = {
+        "corretivos": {f"corretivo_{i}": faixa() for i in range(produtos // 4)},
+        "fertilizantes": {f"fertilizante_{i}": faixa() for i in range(produtos - produtos // 4)},
+        "defensivos": {"pulverizacoes": {"min": 4, "max": 8}, "calda": {"min": 150, "max": 250}},
+    }
+    nomes = list(insumos["fertilizantes"])
+    dados = {
+        "insumos": insumos,
+        "culturas": {f"cultura_{c}": {"nome": f"Cultura {c}", "insumos": {"fertilizantes": {
+            nome: faixa() for nome in rng.sample(nomes, 20)}}} for c in range(culturas)},
+        "fazendas": {f"Fazenda {i}": {"localizacao": f"Município {i % 5000}", "tipo": f"cultura_{i % culturas}"}
+                     for i in range(fazendas)},
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo)
+    return dados
+
+
+def bench_catalogo(tamanhos, consultas=200_000):
+    """Mede carga, consultas O(1) e recarga (por mtime) do catálogo agronômico"""
+    print(f"\n{'fazendas':>12} {'carga (s)':>10} {'fazenda (ns)':>13} {'faixa (ns)':>11} "
+          f"{'recarga (s)':>12} {'dose (µs)':>10}")
+    print("-" * 74)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "catalogo.json")
+        for n in tamanhos:
+            dados = gerar_catalogo(caminho, n)
+            catalogo, t_carga = _cronometrar(CatalogoMonitorado, caminho, 3600.0)
+            atual = catalogo.atual
+            rng = random.Random(1)
+            nomes = [f"Fazenda {rng.randrange(n)}" for _ in range(consultas)]
+            culturas = [atual.fazenda(nome)["tipo"] for nome in nomes]
+            produtos = [rng.choice(("fertilizante_3", "corretivo_7", "fertilizante_120")) for _ in range(consultas)]
+            _, t_fazenda = _cronometrar(lambda: [atual.fazenda(nome) for nome in nomes])
+            _, t_faixa = _cronometrar(lambda: [atual.faixa(p, c) for p, c in zip(produtos, culturas)])
+
+            calc = CalculadoraInsumos(catalogo=catalogo)
+            dados["fazendas"]["Fazenda nova"] = {"tipo": "cultura_0"}
+            temporario = caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo)
+            os.replace(temporario, caminho)
+            _, t_recarga = _cronometrar(catalogo.verificar)
+            assert catalogo.atual.fazenda("Fazenda nova") is not None
+            amostra = list(zip(range(consultas // 10), culturas))
+            _, t_dose = _cronometrar(lambda: [calc.calcular_fertilizantes(10.0, "media", c) for _, c in amostra])
+            print(f"{n:>12,} {t_carga:>10.3f} {t_fazenda / consultas * 1e9:>13.0f} "
+                  f"{t_faixa / consultas * 1e9:>11.0f} {t_recarga:>12.3f} {t_dose / len(amostra) * 1e6:>10.1f}")
+
+
+def bench_clima(tamanhos, latencia=0.05, amostra=100, conexoes=100):
+    """Atualiza o clima de n fazendas no servidor simulado (latência de 50 ms)
+
+    Compara uma requisição por vez (como o script R, medido em uma amostra e
+    extrapolado) com o cliente assíncrono; a segunda passada vem do cache e
+    a terceira repete cada coordenada 4 vezes sem cache (coalescência).
+    """
+    async def medir(n):
+        rng = random.Random(5)
+        fazendas = {f"Fazenda {i}": {"lat": rng.uniform(-33.0, -3.0), "lon": rng.uniform(-60.0, -35.0)}
+                    for i in range(n)}
+        async with ServidorClimaSimulado(latencia=latencia) as servidor:
+            opcoes = {"url": servidor.url, "requisicoes_por_segundo": None, "conexoes": conexoes}
+            async with ClienteClima(**opcoes) as cliente:
+                inicio = time.perf_counter()
+                for dados in list(fazendas.values())[:amostra]:
+                    await cliente.obter(dados["lat"], dados["lon"])
+                t_sequencial = (time.perf_counter() - inicio) / amostra * n
+            async with ClienteClima(**opcoes) as cliente:
+                inicio = time.perf_counter()
+                resultado = await cliente.atualizar_fazendas(fazendas)
+                t_async = time.perf_counter() - inicio
+                assert not any("erro" in dados for dados in resultado.values())
+                inicio = time.perf_counter()
+                await cliente.atualizar_fazendas(fazendas)
+                t_cache = time.perf_counter() - inicio
+                requisicoes = cliente.estatisticas["requisicoes"]
+            async with ClienteClima(**opcoes) as cliente:
+                repetidas = [(d["lat"], d["lon"]) for d in fazendas.values()] * 4
+                inicio = time.perf_counter()
+                await cliente.obter_varios(repetidas)
+                t_coalescidas = time.perf_counter() - inicio
+                coalescidas = cliente.estatisticas["coalescidas"]
+        return t_sequencial, t_async, requisicoes, t_cache, t_coalescidas, coalescidas
+
+    print(f"\n{'fazendas':>10} {'sequencial (s)':>15} {'async (s)':>10} {'req/s':>8} "
+          f"{'cache (s)':>10} {'4x repetidas (s)':>17} {'coalescidas':>12}")
+    print("-" * 88)
+    for n in tamanhos:
+        t_seq, t_async, requisicoes, t_cache, t_coal, coalescidas = asyncio.run(medir(n))
+        print(f"{n:>10,} {t_seq:>15.1f} {t_async:>10.2f} {requisicoes / t_async:>8,.0f} "
+              f"{t_cache:>10.3f} {t_coal:>17.2f} {coalescidas:>12,}")
+
+
+def bench_series(tamanhos, consultas=10_000):
+    """Mede a série temporal: gravação, janelas, agregados de período e reabertura
+
+    n amostras a cada 5 minutos de uma fazenda; compara a janela de 7 dias mantida
+    incrementalmente com o recálculo sobre as colunas.
+    """
+    print(f"\n{'amostras':>12} {'gravação/s':>12} {'janela (µs)':>12} {'recálculo 7d (µs)':>18} "
+          f"{'ano (ms)':>9} {'reabrir (s)':>12} {'bytes/amostra':>14}")
+    print("-" * 97)
+    for n in tamanhos:
+        rng = random.Random(3)
+        with tempfile.TemporaryDirectory() as diretorio:
+            serie = SerieFazenda(os.path.join(diretorio, "fazenda"))
+            inicio_serie = 1_500_000_000
+            amostras = [{"temperatura": 22 + 8 * math.sin(i / 288 * 2 * math.pi) + rng.gauss(0, 2),
+                         "umidade": rng.uniform(40, 90), "chuva": rng.choice((0.0, 0.0, 0.0, rng.uniform(0, 5)))}
+                        for i in range(n)]
+            inicio = time.perf_counter()
+            for i, dados in enumerate(amostras):
+                serie.adicionar(inicio_serie + i * 300, dados)
+            serie.sincronizar()
+            t_gravacao = time.perf_counter() - inicio
+            del amostras
+            fim = serie.ultimo_instante
+
+            _, t_janela = _cronometrar(lambda: [serie.janela("7d") for _ in range(consultas)])
+            repeticoes = max(1, consultas // 100)
+            _, t_recalculo = _cronometrar(lambda: [serie.agregados(fim - 7 * 86400 + 1, fim)
+                                                   for _ in range(repeticoes)])
+            _, t_ano = _cronometrar(serie.agregados, fim - 365 * 86400, fim)
+            serie.fechar()
+            serie, t_reabrir = _cronometrar(SerieFazenda, os.path.join(diretorio, "fazenda"))
+            assert len(serie) == n
+            tamanho = sum(os.path.getsize(os.path.join(diretorio, "fazenda", nome))
+                          for nome in os.listdir(os.path.join(diretorio, "fazenda")))
+            serie.fechar()
+        print(f"{n:>12,} {n / t_gravacao:>12,.0f} {t_janela / consultas * 1e6:>12.2f} "
+              f"{t_recalculo / repeticoes * 1e6:>18.1f} {t_ano * 1e3:>9.2f} {t_reabrir:>12.3f} "
+              f"{tamanho / n:>14.1f}")
+
+
+def bench_alertas(tamanhos, fazendas=5000, amostra=20_000):
+    """Avalia as regras de alerta em lote (leituras de 5.000 fazendas)
+
+    Compara a avaliação leitura a leitura (medida em uma amostra e
+    extrapolada) com a avaliação vetorizada sobre colunas.
+    """
+    nomes = [f"Fazenda {i}" for i in range(fazendas)]
+    motor = MotorAlertas(fazenda_data={nome: ("cana", "laranja", "soja")[i % 3] for i, nome in enumerate(nomes)})
+    print(f"\n{'leituras':>12} {'escalar (s)':>12} {'lote (s)':>10} {'leituras/s':>14} {'alertas':>12} {'ganho':>8}")
+    print("-" * 74)
+    for n in tamanhos:
+        if np is not None:
+            rng = np.random.default_rng(7)
+            colunas = {
+                "fazenda": rng.integers(0, fazendas, n, dtype=np.int32),
+                "temperatura": rng.normal(24, 6, n).astype(np.float32),
+                "umidade": rng.uniform(20, 100, n).astype(np.float32),
+                "vento": rng.gamma(2.0, 5.0, n).astype(np.float32),
+                "chuva": np.where(rng.random(n) < 0.2, rng.exponential(2.0, n), 0.0).astype(np.float32),
+            }
+        else:
+            rng = random.Random(7)
+            colunas = {"fazenda": array("i", (rng.randrange(fazendas) for _ in range(n))),
+                       "temperatura": array("f", (rng.gauss(24, 6) for _ in range(n))),
+                       "umidade": array("f", (rng.uniform(20, 100) for _ in range(n))),
+                       "vento": array("f", (rng.gammavariate(2.0, 5.0) for _ in range(n))),
+                       "chuva": array("f", (rng.expovariate(0.5) if rng.random() < 0.2 else 0.0 for _ in range(n)))}
+
+        m = min(n, amostra)
+        leituras = [(nomes[colunas["fazenda"][i]], {v: float(colunas[v][i]) for v in VARIAVEIS}) for i in range(m)]
+        _, t_amostra = _cronometrar(lambda: [motor.avaliar_leitura(nome, dados) for nome, dados in leituras])
+        t_escalar = t_amostra / m * n
+        motor.avaliar({v: c[:10] for v, c in colunas.items()}, nomes)  # compila os limites por fazenda
+        alertas, t_lote = _cronometrar(motor.avaliar, colunas, nomes)
+        print(f"{n:>12,} {t_escalar:>12.2f} {t_lote:>10.3f} {n / t_lote:>14,.0f} {len(alertas):>12,} "
+              f"{t_escalar / t_lote:>7.1f}x")
+
+
+def bench_api(tamanhos, concorrencia=64, lote=1000, registros_listagem=100_000):
+    """Teste de carga da API com o servidor em outro processo (keep-alive)
+
+    n requisições por cenário em `concorrencia` conexões; o cálculo em lote
+    envia `lote` talhões por requisição (n / lote requisições). Ao final,
+    mede a listagem em streaming (NDJSON) de `registros_listagem` registros.
+    """
+    cenarios = [
+        ("GET /fazendas", "GET", "/fazendas", None, 1),
+        ("GET /resumo", "GET", "/resumo", None, 1),
+        ("POST /calculo/area", "POST", "/calculo/area", {"tipo": "retangulo", "largura": 120, "altura": 80}, 1),
+        ("POST /calculo/insumos", "POST", "/calculo/insumos", {"hectares": 12.5, "cultura": "cana"}, 1),
+        (f"insumos em lote [{lote}]", "POST", "/calculo/insumos",
+         [{"hectares": 0.5 + i % 500, "quantidade": NIVEIS_QUANTIDADE[i % 3]} for i in range(lote)], lote),
+    ]
+    # Servidor limpo: sem persistência nem catálogo do ambiente
+    ambiente = {nome: valor for nome, valor in os.environ.items() if not nome.startswith("FIAP_FARM_")}
+    processo = subprocess.Popen([sys.executable, "fiap_farm_api.py", "--porta", "0"], stdout=subprocess.PIPE,
+                                text=True, env=ambiente, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        linha = processo.stdout.readline()
+        while linha and not linha.startswith("API FIAP Farm em "):
+            linha = processo.stdout.readline()
+        if not linha:
+            raise RuntimeError("o servidor da API não iniciou")
+        url = linha.split()[-1]
+
+        print(f"\n{'cenário':>28} {'requisições':>12} {'req/s':>8} {'itens/s':>10} {'p50 (ms)':>9} "
+              f"{'p99 (ms)':>9} {'erros':>6}")
+        print("-" * 88)
+        for n in tamanhos:
+            for nome, metodo, caminho, corpo, itens in cenarios:
+                requisicoes = max(1, n // itens)
+                r = asyncio.run(teste_carga(url + caminho, requisicoes, concorrencia, metodo, corpo))
+                print(f"{nome:>28} {r['requisicoes']:>12,} {r['por_segundo']:>8,.0f} "
+                      f"{r['por_segundo'] * itens:>10,.0f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['erros']:>6,}")
+
+        async def listar():
+            async with ClienteHTTP() as cliente:
+                for inicio in range(0, registros_listagem, 10_000):
+                    registros = list(gerar_plantio(min(10_000, registros_listagem - inicio), semente=inicio))
+                    await cliente.requisitar("POST", url + "/plantio", json.dumps(registros).encode())
+                comeco = time.perf_counter()
+                resposta = await cliente.get(url + "/plantio", {"formato": "ndjson"})
+                return resposta, time.perf_counter() - comeco
+
+        resposta, segundos = asyncio.run(listar())
+        linhas = resposta.corpo.count(b"\n")
+        print(f"\nlistagem NDJSON: {linhas:,} registros ({len(resposta.corpo) / 2**20:.1f} MiB) em {segundos:.2f} s "
+              f"({linhas / segundos:,.0f} registros/s)")
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+# --- Suíte de regressão: casos fixos, resultados em JSON e comparação com a base ---
+
+ESCALAS_SUITE = (1_000, 100_000, 10_000_000)
+
+# Resultados de referência versionados com o código (ver `suite --gravar-base`)
+BASE_SUITE = "benchmark_base.json"
+
+# Piora relativa (vazão, latência p50 ou pico de memória) tratada como regressão
+LIMIAR_REGRESSAO = 0.15
+
+# Diferenças abaixo destas são ruído e não reprovam a comparação, qualquer que
+# seja a piora relativa: pico de memória, tempo do lote e latência p50
+TOLERANCIA_MEMORIA = 64 * 1024
+RUIDO_SEGUNDOS = 0.002
+RUIDO_LATENCIA_MS = 0.005
+
+# Com menos amostras de latência o p50 não reprova a comparação
+MINIMO_AMOSTRAS_P50 = 100
+
+# Chamadas usadas nos percentis de latência, cronometradas em grupos de
+# ~GRUPO_LATENCIA segundos (uma chamada de microssegundos sozinha mede o
+# relógio); as passadas pela amostra se repetem até somar TEMPO_LATENCIA
+# segundos (no mínimo PASSES_LATENCIA) e os percentis são os da melhor
+AMOSTRA_LATENCIA = 10_000
+GRUPO_LATENCIA = 50e-6
+PASSES_LATENCIA, TEMPO_LATENCIA = 3, 0.25
+
+# Operações de CRUD por repetição (ids sorteados entre os n registros)
+OPERACOES_CRUD = 100_000
+
+# Cada caso repete até somar TEMPO_MINIMO segundos (entre REPETICOES_MIN e REPETICOES_MAX vezes)
+REPETICOES_MIN, REPETICOES_MAX, TEMPO_MINIMO = 3, 200, 1.0
+
+# Execuções completas da suíte, cada uma em um processo novo (a disposição da
+# memória e o hash aleatório mudam de um processo para outro); cada caso e
+# escala fica com a melhor, para que um processo ou fase lenta não vire regressão
+EXECUCOES_SUITE = 3
+
+
+class Medicao(NamedTuple):
+    """Um caso da suíte já preparado para uma escala
+
+    `lote()` processa `itens` itens (vazão e pico de memória). Com `chamada`,
+    as latências vêm de grupos de chamadas `chamada(*argumentos[i])`
+    (tempo do grupo / chamadas); sem ela, cada execução do lote é uma
+    amostra de latência.
+    """
+    lote: Callable[[], Any]
+    itens: int
+    chamada: Optional[Callable] = None
+    argumentos: Sequence[tuple] = ()
+    armazem: Optional[str] = None
+
+
+class CasoSuite(NamedTuple):
+    """`preparar(n)` monta os dados; casos destrutivos são preparados a cada execução"""
+    preparar: Callable[[int], Medicao]
+    destrutivo: bool = False
+
+
+def _gerenciador_suite(n):
+    """GerenciadorDados com n registros de plantio (colunar acima de LIMITE_ESCALAR)"""
+    if n > LIMITE_ESCALAR:
+        gerenciador, armazem = GerenciadorDados(armazem_plantio=ArmazemPlantioColunar()), "colunar"
+    else:
+        gerenciador, armazem = GerenciadorDados(), "dicionarios"
+    gerenciador.adicionar_plantio_lote(gerar_plantio(n))
+    return gerenciador, armazem
+
+
+def _ids_crud(n):
+    return [(i,) for i in random.Random(7).sample(range(1, n + 1), min(n, OPERACOES_CRUD))]
+
+
+def _suite_area(n):
+    rng = random.Random(42)
+    lados = array("d", (rng.uniform(10.0, 2000.0) for _ in range(n // 2)))
+    larguras = array("d", (rng.uniform(10.0, 2000.0) for _ in range(n - n // 2)))
+    alturas = array("d", (rng.uniform(10.0, 2000.0) for _ in range(n - n // 2)))
+    calc = CalculadoraArea()
+
+    def lote():
+        quadrado, retangulo = calc.calcular_quadrado, calc.calcular_retangulo
+        for lado in lados:
+            quadrado(lado)
+        for largura, altura in zip(larguras, alturas):
+            retangulo(largura, altura)
+
+    return Medicao(lote, n, calc.calcular_retangulo, list(zip(larguras, alturas))[:AMOSTRA_LATENCIA])
+
+
+def _suite_insumos(n):
+    # Laço escalar: acima de LIMITE_ESCALAR mede uma amostra (a vazão não depende de n)
+    hectares, quantidades = gerar_hectares(min(n, LIMITE_ESCALAR))
+    calc = CalculadoraInsumos()
+
+    def todos(h, q):
+        calc.calcular_corretivos(h, "solo", q)
+        calc.calcular_fertilizantes(h, q)
+        calc.calcular_defensivos(h, q)
+
+    pares = list(zip(hectares, quantidades))
+    return Medicao(lambda: [todos(h, q) for h, q in pares], len(pares), todos, pares[:AMOSTRA_LATENCIA])
+
+
+def _suite_insumos_lote(n):
+    hectares, quantidades = gerar_hectares(n)
+    if np is not None:
+        colunas = (np.asarray(hectares), np.fromiter(map(NIVEIS_QUANTIDADE.index, quantidades), np.int8, n))
+    else:
+        colunas = (hectares, quantidades)
+    del hectares, quantidades
+    calc = CalculadoraInsumos()
+    return Medicao(lambda: calc.calcular_todos_lote(*colunas), n)
+
+
+def _suite_crud_inserir(n):
+    gerenciador, armazem = _gerenciador_suite(max(0, n - OPERACOES_CRUD))
+    novos = [(registro,) for registro in gerar_plantio(min(n, OPERACOES_CRUD), semente=9)]
+    adicionar = gerenciador.adicionar_plantio
+    return Medicao(lambda: [adicionar(*r) for r in novos], len(novos), adicionar, novos[:AMOSTRA_LATENCIA], armazem)
+
+
+def _suite_crud_obter(n):
+    gerenciador, armazem = _gerenciador_suite(n)
+    ids, obter = _ids_crud(n), gerenciador.obter_plantio
+    return Medicao(lambda: [obter(*i) for i in ids], len(ids), obter, ids[:AMOSTRA_LATENCIA], armazem)
+
+
+def _suite_crud_atualizar(n):
+    gerenciador, armazem = _gerenciador_suite(n)
+    novo = {"tipo": "quadrado", "lado": 1.0, "area_m2": 1.0, "area_ha": 0.0001}
+    ids = _ids_crud(n)
+
+    def atualizar(id_registro):
+        gerenciador.atualizar_plantio_por_id(id_registro, dict(novo))
+
+    return Medicao(lambda: [atualizar(*i) for i in ids], len(ids), atualizar, ids[:AMOSTRA_LATENCIA], armazem)
+
+
+def _suite_crud_deletar(n):
+    gerenciador, armazem = _gerenciador_suite(n)
+    ids, deletar = _ids_crud(n), gerenciador.deletar_plantio_por_id
+    return Medicao(lambda: [deletar(*i) for i in ids], len(ids), deletar, ids[:AMOSTRA_LATENCIA], armazem)
+
+
+def _suite_resumo(n, chamadas=1000):
+    gerenciador, armazem = _gerenciador_suite(n)
+    sistema = FiapFarmSystem(gerenciador=gerenciador)
+
+    def resumo():
+        with contextlib.redirect_stdout(io.StringIO()):
+            sistema.gerar_resumo_geral()
+
+    return Medicao(lambda: [resumo() for _ in range(chamadas)], chamadas, resumo, [()] * chamadas, armazem)
+
+
+def _suite_exportacao(modo):
+    def preparar(n):
+        gerenciador, armazem = _gerenciador_suite(n)
+        caminho = os.path.join(tempfile.gettempdir(), f"fiap_farm_suite_{os.getpid()}.json")
+
+        def lote():
+            try:
+                exportar_dados(caminho, FazendaData().fazendas, gerenciador.iterar_plantio(),
+                               gerenciador.iterar_insumos(), modo)
+            finally:
+                # Arquivos de 10M registros têm GiB: nada fica no disco entre execuções
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+
+        return Medicao(lote, n, armazem=armazem)
+    return preparar
+
+
+def _suite_estatisticas(mediana):
+    def preparar(n):
+        rng = random.Random(3)
+        valores = array("d", (rng.gauss(1300.0, 100.0) for _ in range(n)))
+        simulador = RSimulator()
+        return Medicao(lambda: simulador.calcular_estatisticas(valores, mediana=mediana), n)
+    return preparar
+
+
+CASOS_SUITE = {
+    "area": CasoSuite(_suite_area),
+    "insumos": CasoSuite(_suite_insumos),
+    "insumos-lote": CasoSuite(_suite_insumos_lote),
+    "crud-inserir": CasoSuite(_suite_crud_inserir, destrutivo=True),
+    "crud-obter": CasoSuite(_suite_crud_obter),
+    "crud-atualizar": CasoSuite(_suite_crud_atualizar),
+    "crud-deletar": CasoSuite(_suite_crud_deletar, destrutivo=True),
+    "resumo": CasoSuite(_suite_resumo),
+    "exportacao": CasoSuite(_suite_exportacao("indentado")),
+    "exportacao-ndjson": CasoSuite(_suite_exportacao("ndjson")),
+    "estatisticas": CasoSuite(_suite_estatisticas("exata")),
+    "estatisticas-aproximada": CasoSuite(_suite_estatisticas("aproximada")),
+}
+
+
+def medir_caso(caso, n):
+    """Mede um caso em uma escala: vazão, latências p50/p90/p99 e pico de memória"""
+    medicao = caso.preparar(n)
+
+    def preparada():
+        # Casos destrutivos (inclusões, remoções) partem sempre do mesmo estado
+        return caso.preparar(n) if caso.destrutivo else medicao
+
+    tempos, total = [], 0.0
+    while len(tempos) < REPETICOES_MIN or (total < TEMPO_MINIMO and len(tempos) < REPETICOES_MAX):
+        atual = preparada() if tempos else medicao
+        gc.collect()
+        _, segundos = _cronometrar(atual.lote)
+        tempos.append(segundos)
+        total += segundos
+
+    grupo = 1
+    if medicao.chamada is not None:
+        por_chamada = min(tempos) / medicao.itens
+        grupo = min(max(1, int(GRUPO_LATENCIA / por_chamada)) if por_chamada else 1,
+                    max(1, len(medicao.argumentos) // MINIMO_AMOSTRAS_P50))
+        relogio, passes, medido = time.perf_counter, [], 0.0
+        while len(passes) < PASSES_LATENCIA or (medido < TEMPO_LATENCIA and len(passes) < REPETICOES_MAX):
+            atual = preparada()
+            latencias = []
+            # Como no timeit, o coletor de ciclos fica desligado durante a passada
+            gc.collect()
+            gc.disable()
+            try:
+                for inicio in range(0, len(atual.argumentos) - grupo + 1, grupo):
+                    trecho, chamada = atual.argumentos[inicio:inicio + grupo], atual.chamada
+                    comeco = relogio()
+                    for argumentos in trecho:
+                        chamada(*argumentos)
+                    latencias.append((relogio() - comeco) / grupo)
+            finally:
+                gc.enable()
+            medido += sum(latencias) * grupo
+            passes.append(sorted(latencias))
+    else:
+        passes = [sorted(tempos)]
+        grupo = None
+
+    # O tracemalloc deixa as alocações mais lentas: a memória é medida em uma execução à parte
+    atual = preparada()
+    _, pico = _pico_memoria(atual.lote)
+    return {
+        "n": n,
+        "armazem": medicao.armazem,
+        "itens": medicao.itens,
+        "repeticoes": len(tempos),
+        # Vazão pela melhor repetição (como o timeit): a mais estável em máquina compartilhada
+        "segundos": min(tempos),
+        "itens_por_s": medicao.itens / min(tempos),
+        "latencia_ms": {f"p{p}": min(percentil(latencias, p) for latencias in passes) * 1000
+                        for p in (50, 90, 99)},
+        "amostras_latencia": len(passes[0]),
+        "chamadas_por_amostra": grupo,
+        "pico_mib": pico / 2**20,
+    }
+
+
+def ambiente_suite():
+    """Máquina e versões: resultados só são comparáveis no mesmo ambiente"""
+    return {
+        "python": platform.python_version(),
+        "implementacao": platform.python_implementation(),
+        "plataforma": platform.platform(),
+        "processador": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__ if np is not None else None,
+    }
+
+
+def _melhor_medicao(medicoes):
+    """Combina execuções de um caso: maior vazão e menores latências e pico"""
+    melhor = dict(max(medicoes, key=lambda r: r["itens_por_s"]))
+    melhor["latencia_ms"] = {p: min(r["latencia_ms"][p] for r in medicoes) for p in melhor["latencia_ms"]}
+    melhor["pico_mib"] = min(r["pico_mib"] for r in medicoes)
+    melhor["execucoes"] = len(medicoes)
+    return melhor
+
+
+def executar_suite(tamanhos=ESCALAS_SUITE, casos=None, execucoes=EXECUCOES_SUITE):
+    """Executa os casos da suíte (todos, por padrão) em cada escala
+
+    Com execucoes > 1, cada execução roda em um processo novo e cada caso e
+    escala guarda a melhor medição (_melhor_medicao).
+    """
+    resultados = {"versao": 1, "data": datetime.now().isoformat(timespec="seconds"),
+                  "ambiente": ambiente_suite(), "casos": {}}
+    if execucoes > 1:
+        medicoes = {}
+        with tempfile.TemporaryDirectory() as diretorio:
+            for execucao in range(1, execucoes + 1):
+                print(f"\nExecução {execucao} de {execucoes}", flush=True)
+                saida = os.path.join(diretorio, f"execucao_{execucao}.json")
+                comando = [sys.executable, os.path.abspath(__file__), "suite", "--execucoes", "1",
+                           "--saida", saida, "--sem-comparar", "--tamanhos", *map(str, tamanhos)]
+                if casos:
+                    comando += ["--casos", *casos]
+                subprocess.run(comando, check=True)
+                for nome, escalas in _carregar_resultados(saida)["casos"].items():
+                    for n, r in escalas.items():
+                        medicoes.setdefault(nome, {}).setdefault(n, []).append(r)
+        for nome, escalas in medicoes.items():
+            resultados["casos"][nome] = {n: _melhor_medicao(lista) for n, lista in escalas.items()}
+        return resultados
+
+    print(f"\n{'caso':>24} {'n':>12} {'itens/s':>14} {'p50 (ms)':>10} {'p90 (ms)':>10} "
+          f"{'p99 (ms)':>10} {'pico MiB':>10}")
+    print("-" * 96)
+    for nome in casos or CASOS_SUITE:
+        for n in tamanhos:
+            r = medir_caso(CASOS_SUITE[nome], n)
+            resultados["casos"].setdefault(nome, {})[str(n)] = r
+            latencia = r["latencia_ms"]
+            print(f"{nome:>24} {n:>12,} {r['itens_por_s']:>14,.0f} {latencia['p50']:>10.4f} "
+                  f"{latencia['p90']:>10.4f} {latencia['p99']:>10.4f} {r['pico_mib']:>10.2f}", flush=True)
+    return resultados
+
+
+def comparar_resultados(atual, base, limiar=LIMIAR_REGRESSAO):
+    """Compara dois resultados da suíte e retorna as regressões encontradas
+
+    Uma regressão é uma queda de vazão, ou um aumento da latência p50 ou do
+    pico de memória, acima de `limiar` (fração) em um caso e escala
+    presentes nos dois, e acima do ruído absoluto (RUIDO_SEGUNDOS no tempo
+    do lote, RUIDO_LATENCIA_MS no p50, TOLERANCIA_MEMORIA no pico). O p50 só
+    conta nos casos com chamadas individuais e MINIMO_AMOSTRAS_P50 amostras
+    (nos casos em lote ele é a mediana das repetições, já coberta pela
+    vazão), e o p90/p99 aparece na tabela, mas é ruidoso demais para
+    reprovar sozinho. Casos e escalas ausentes da base aparecem como "sem
+    base" e não são comparados.
+    """
+    if atual.get("ambiente") != base.get("ambiente"):
+        print("Aviso: resultados de ambientes diferentes; as diferenças podem não ser do código")
+    regressoes = []
+    sem_base = 0
+    print(f"\n{'caso':>24} {'n':>12} {'itens/s':>10} {'p50':>9} {'p99':>9} {'pico':>9}")
+    print("-" * 78)
+    for nome, escalas in atual["casos"].items():
+        for n, r in escalas.items():
+            referencia = base.get("casos", {}).get(nome, {}).get(n)
+            if referencia is None:
+                sem_base += 1
+                print(f"{nome:>24} {int(n):>12,} {'sem base':>10}")
+                continue
+            vazao = r["itens_por_s"] / referencia["itens_por_s"] - 1
+            p50 = r["latencia_ms"]["p50"] / referencia["latencia_ms"]["p50"] - 1
+            p99 = r["latencia_ms"]["p99"] / referencia["latencia_ms"]["p99"] - 1
+            memoria = 0.0
+            if abs(r["pico_mib"] - referencia["pico_mib"]) * 2**20 > TOLERANCIA_MEMORIA:
+                memoria = r["pico_mib"] / referencia["pico_mib"] - 1
+            if (min(r["amostras_latencia"], referencia["amostras_latencia"]) < MINIMO_AMOSTRAS_P50
+                    or r.get("chamadas_por_amostra") is None):
+                p50 = 0.0
+            if abs(r["segundos"] - referencia["segundos"]) < RUIDO_SEGUNDOS:
+                vazao = 0.0
+            if abs(r["latencia_ms"]["p50"] - referencia["latencia_ms"]["p50"]) < RUIDO_LATENCIA_MS:
+                p50 = 0.0
+            piores = [motivo for motivo, piora in (("vazão", -vazao), ("p50", p50), ("memória", memoria))
+                      if piora > limiar]
+            if piores:
+                regressoes.append((nome, int(n), piores))
+            print(f"{nome:>24} {int(n):>12,} {vazao:>+10.1%} {p50:>+9.1%} {p99:>+9.1%} {memoria:>+9.1%}"
+                  f"{'  REGRESSÃO: ' + ', '.join(piores) if piores else ''}")
+    if sem_base:
+        print(f"\n{sem_base} caso(s) sem base, não comparado(s); grave a escala com --gravar-base")
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {limiar:.0%}")
+    else:
+        print(f"\nNenhuma regressão acima de {limiar:.0%}")
+    return regressoes
+
+
+def _carregar_resultados(caminho):
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def _gravar_resultados(caminho, resultados):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+
+
+def _main_suite(argumentos):
+    """suite: executa, grava o JSON e compara com a base (código de saída 1 se houver regressão)"""
+    parser = argparse.ArgumentParser(prog="benchmark_fiap_farm.py suite",
+                                     description="Suíte de regressão de desempenho do FIAP Farm")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(ESCALAS_SUITE))
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS_SUITE), default=None)
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--base", default=BASE_SUITE)
+    parser.add_argument("--limiar", type=float, default=LIMIAR_REGRESSAO)
+    parser.add_argument("--execucoes", type=int, default=EXECUCOES_SUITE,
+                        help="execuções da suíte; cada caso fica com a melhor")
+    parser.add_argument("--gravar-base", action="store_true", help="grava os resultados como a nova base")
+    parser.add_argument("--sem-comparar", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    resultados = executar_suite(args.tamanhos, args.casos, args.execucoes)
+    _gravar_resultados(args.saida, resultados)
+    print(f"\nResultados gravados em {args.saida}")
+    if args.sem_comparar:
+        return 0
+    if args.gravar_base:
+        _gravar_resultados(args.base, resultados)
+        print(f"Base atualizada em {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        print(f"Sem base para comparar ({args.base}); use --gravar-base")
+        return 0
+    return 1 if comparar_resultados(resultados, _carregar_resultados(args.base), args.limiar) else 0
+
+
+def _main_comparar(argumentos):
+    """comparar: compara um JSON de resultados com a base"""
+    parser = argparse.ArgumentParser(prog="benchmark_fiap_farm.py comparar",
+                                     description="Compara resultados da suíte com a base")
+    parser.add_argument("resultados", nargs="?", default="benchmark_resultados.json")
+    parser.add_argument("--base", default=BASE_SUITE)
+    parser.add_argument("--limiar", type=float, default=LIMIAR_REGRESSAO)
+    args = parser.parse_args(argumentos)
+    regressoes = comparar_resultados(_carregar_resultados(args.resultados), _carregar_resultados(args.base),
+                                     args.limiar)
+    return 1 if regressoes else 0
+
+
+# --- Inicialização dos pontos de entrada (python -X importtime e tempo até o resultado) ---
+
+# Módulos de entrada medidos com -X importtime
+MODULOS_ENTRADA = ("fiap_farm", "r_simulator", "demo_r_functions", "fiap_farm_lote", "fiap_farm_api")
+
+# Comandos medidos do início do processo até o fim da saída: (nome, argumentos, entrada)
+COMANDOS_ENTRADA = (
+    ("menu (sair)", ["fiap_farm.py"], "0\n"),
+    ("menu -m (sair)", ["-m", "fiap_farm"], "0\n"),
+    ("lote (1 talhão)", ["fiap_farm.py", "batch", "--in", "-", "--out", "-", "--formato", "ndjson"],
+     '{"tipo": "retangulo", "largura": 100, "altura": 50}\n'),
+    ("teste R", ["demo_r_functions.py", "--teste"], ""),
+    ("demonstração R", ["demo_r_functions.py", "--sem-pausa"], ""),
+)
+
+# Orçamentos em ms: importação (cumulativa, -X importtime) e tempo de parede
+# acima do `python -c pass`; `inicializacao --orcamento` sai com código 1 se estourar.
+# O lote usa os cálculos vetorizados e por isso inclui a importação do NumPy.
+ORCAMENTO_IMPORTACAO_MS = {"fiap_farm": 80, "r_simulator": 80, "demo_r_functions": 80, "fiap_farm_lote": 100,
+                           "fiap_farm_api": 200}
+ORCAMENTO_EXECUCAO_MS = {"menu (sair)": 150, "menu -m (sair)": 100, "lote (1 talhão)": 300, "teste R": 150, "demonstração R": 200}
+
+
+def _ambiente_limpo():
+    """Ambiente sem as variáveis FIAP_FARM_* (persistência, catálogo, métricas)"""
+    return {nome: valor for nome, valor in os.environ.items() if not nome.startswith("FIAP_FARM_")}
+
+
+def tempo_importacao(modulo, diretorio):
+    """Tempo cumulativo (s) de `import modulo` segundo python -X importtime"""
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"], cwd=diretorio,
+                           env=_ambiente_limpo(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                           text=True, check=True).stderr
+    for linha in saida.splitlines():
+        campos = linha.split("|")
+        if len(campos) == 3 and campos[2].strip() == modulo:
+            return int(campos[1]) / 1e6
+    raise RuntimeError(f"{modulo} não aparece na saída do -X importtime")
+
+
+def tempo_execucao(argumentos, entrada, diretorio):
+    """Tempo de parede (s) de um processo Python, do início ao fim da saída"""
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, *argumentos], cwd=diretorio, env=_ambiente_limpo(), input=entrada,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True, check=True)
+    return time.perf_counter() - inicio
+
+
+def bench_inicializacao(repeticoes=10, orcamento=False):
+    """Mede a importação dos módulos de entrada e o tempo até o resultado dos comandos
+
+    Cada medida é a mediana de `repeticoes` processos novos. Com
+    `orcamento`, retorna os itens acima de ORCAMENTO_IMPORTACAO_MS e
+    ORCAMENTO_EXECUCAO_MS.
+    """
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    estourados = []
+
+    def verificar(nome, ms, limites):
+        limite = limites.get(nome)
+        acima = orcamento and limite is not None and ms > limite
+        if acima:
+            estourados.append(nome)
+        return f"{limite:>10}" + ("  ESTOUROU" if acima else "") if limite is not None else f"{'-':>10}"
+
+    print(f"\n{'importação':>20} {'mediana (ms)':>14} {'mínimo (ms)':>12} {'orçamento':>10}")
+    print("-" * 60)
+    for modulo in MODULOS_ENTRADA:
+        tempos = [tempo_importacao(modulo, diretorio) * 1000 for _ in range(repeticoes)]
+        mediana = statistics.median(tempos)
+        print(f"{modulo:>20} {mediana:>14.1f} {min(tempos):>12.1f} "
+              f"{verificar(modulo, mediana, ORCAMENTO_IMPORTACAO_MS)}")
+
+    base = statistics.median(tempo_execucao(["-c", "pass"], "", diretorio) for _ in range(repeticoes)) * 1000
+    print(f"\n{'comando':>20} {'mediana (ms)':>14} {'acima do python (ms)':>21} {'orçamento':>10}")
+    print("-" * 69)
+    print(f"{'python -c pass':>20} {base:>14.1f} {'-':>21} {'-':>10}")
+    for nome, argumentos, entrada in COMANDOS_ENTRADA:
+        mediana = statistics.median(tempo_execucao(argumentos, entrada, diretorio) for _ in range(repeticoes)) * 1000
+        print(f"{nome:>20} {mediana:>14.1f} {mediana - base:>21.1f} "
+              f"{verificar(nome, mediana - base, ORCAMENTO_EXECUCAO_MS)}")
+    if orcamento:
+        print(f"\n{len(estourados)} item(ns) acima do orçamento" if estourados else "\nDentro do orçamento")
+    return estourados
+
+
+def _main_inicializacao(argumentos):
+    """inicializacao: tempos de inicialização (código de saída 1 com --orcamento estourado)"""
+    parser = argparse.ArgumentParser(prog="benchmark_fiap_farm.py inicializacao",
+                                     description="Tempo de inicialização dos pontos de entrada")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--orcamento", action="store_true", help="falha se algum tempo passar do orçamento")
+    args = parser.parse_args(argumentos)
+    return 1 if bench_inicializacao(args.repeticoes, args.orcamento) else 0
+
+
+BENCHMARKS = {
+    "insumos-lote": bench_insumos_lote,
+    "insumos-escalar": bench_insumos_escalar,
+    "crud": bench_crud,
+    "memoria-plantio": bench_memoria_plantio,
+    "exportacao": bench_exportacao,
+    "binario": bench_binario,
+    "diario": bench_diario,
+    "sqlite": bench_sqlite,
+    "resumo": bench_resumo,
+    "paginacao": bench_paginacao,
+    "estatisticas": bench_estatisticas,
+    "estatisticas-paralelo": bench_estatisticas_paralelo,
+    "geometria": bench_geometria,
+    "espacial": bench_espacial,
+    "catalogo": bench_catalogo,
+    "clima": bench_clima,
+    "series": bench_series,
+    "alertas": bench_alertas,
+    "api": bench_api,
+    "cenarios": bench_cenarios,
+    "otimizacao": bench_otimizacao,
+}
+
+
+def main():
+    """Função principal"""
+    if sys.argv[1:2] == ["suite"]:
+        sys.exit(_main_suite(sys.argv[2:]))
+    if sys.argv[1:2] == ["comparar"]:
+        sys.exit(_main_comparar(sys.argv[2:]))
+    if sys.argv[1:2] == ["inicializacao"]:
+        sys.exit(_main_inicializacao(sys.argv[2:]))
+    parser = argparse.ArgumentParser(description="Benchmarks do FIAP Farm")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args.tamanhos)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,16 @@ Script de demonstração automática das funcionalidades R implementadas em Pyth
 from r_simulator import RSimulator
 import time
 
-def executar_demonstracao():
+# Pausa entre as demonstrações, em segundos (--sem-pausa / --no-pause: nenhuma)
+PAUSA_DEMONSTRACAO = 3
+
+def _aguardar(pausa):
+    """Pausa entre demonstrações (nada com pausa 0)"""
+    if pausa > 0:
+        print(f"\n⏳ Aguarde {pausa:g} segundos para próxima demonstração...")
+        time.sleep(pausa)
+
+def executar_demonstracao(pausa=PAUSA_DEMONSTRACAO):
     """Executa demonstração completa das funcionalidades R"""
     simulator = RSimulator()
     
@@ -26,40 +35,35 @@ def executar_demonstracao():
     print("-" * 50)
     simulator.gerar_relatorio_estatistico()
     
-    print("\n⏳ Aguarde 3 segundos para próxima demonstração...")
-    time.sleep(3)
+    _aguardar(pausa)
     
     # Demonstração 2: Análise Específica de Produção
     print("\n" + "📊 DEMONSTRAÇÃO 2: ANÁLISE DE PRODUÇÃO")
     print("-" * 50)
     simulator.gerar_relatorio_estatistico("producao")
     
-    print("\n⏳ Aguarde 3 segundos para próxima demonstração...")
-    time.sleep(3)
+    _aguardar(pausa)
     
     # Demonstração 3: Análise de Temperaturas
     print("\n" + "🌡️ DEMONSTRAÇÃO 3: ANÁLISE DE TEMPERATURAS")
     print("-" * 50)
     simulator.gerar_relatorio_estatistico("temperaturas")
     
-    print("\n⏳ Aguarde 3 segundos para próxima demonstração...")
-    time.sleep(3)
+    _aguardar(pausa)
     
     # Demonstração 4: Relatório Meteorológico São Paulo
     print("\n" + "🌤️ DEMONSTRAÇÃO 4: DADOS METEOROLÓGICOS - SÃO PAULO")
     print("-" * 50)
     simulator.gerar_relatorio_meteorologico("São Paulo")
     
-    print("\n⏳ Aguarde 3 segundos para próxima demonstração...")
-    time.sleep(3)
+    _aguardar(pausa)
     
     # Demonstração 5: Relatório Meteorológico Rio de Janeiro
     print("\n" + "🏖️ DEMONSTRAÇÃO 5: DADOS METEOROLÓGICOS - RIO DE JANEIRO")
     print("-" * 50)
     simulator.gerar_relatorio_meteorologico("Rio de Janeiro")
     
-    print("\n⏳ Aguarde 3 segundos para próxima demonstração...")
-    time.sleep(3)
+    _aguardar(pausa)
     
     # Demonstração 6: Relatório Meteorológico Brasília
     print("\n" + "🏛️ DEMONSTRAÇÃO 6: DADOS METEOROLÓGICOS - BRASÍLIA")
@@ -122,7 +126,10 @@ def executar_teste_rapido():
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--teste":
+    if "--teste" in sys.argv[1:]:
         executar_teste_rapido()
+    elif "--sem-pausa" in sys.argv[1:] or "--no-pause" in sys.argv[1:]:
+        # Execuções agendadas: a demonstração completa, sem as pausas
+        executar_demonstracao(pausa=0)
     else:
         executar_demonstracao()
\ No newline at end of file
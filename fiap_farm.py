@@ -9,13 +9,37 @@ com cálculos de área, manejo de insumos e análises.
 """
 
 import math
-import json
-from typing import List, Dict, Any
+import os
+import sys
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from fiap_farm_armazenamento import ArmazemRegistros, verificar_agregados
+from fiap_farm_catalogo import CatalogoMonitorado
+from fiap_farm_consulta import Filtro, Pagina, consultar, paginar
+from fiap_farm_exportacao import exportar_dados
+from fiap_farm_espacial import IndiceEspacial, caixa_registro
+from fiap_farm_geometria import area_geometria, area_poligono, areas_feicoes, medir_geojson
+from fiap_farm_instrumentacao import configurar_ambiente, medido
+from fiap_farm_persistencia import DiarioEscrita, gerenciador_sqlite
+
+# NumPy é opcional (importado no primeiro uso); sem ele os cálculos em lote usam array
+from fiap_farm_opcional import np
+
+NIVEIS_QUANTIDADE = ("minima", "media", "maxima")
+
+# Registros por página nas listagens do menu
+TAMANHO_PAGINA = 20
 
 class FazendaData:
-    """Classe para armazenar dados das fazendas"""
-    def __init__(self):
-        self.fazendas = {
+    """Classe para armazenar dados das fazendas
+    
+    Com um catálogo (fiap_farm_catalogo.Catalogo ou CatalogoMonitorado), as
+    fazendas vêm da versão vigente do arquivo em vez dos dados abaixo.
+    """
+    def __init__(self, catalogo=None):
+        self.catalogo = catalogo
+        self._fazendas = {
             "Barra Grande": {
                 "localizacao": "Itirapuã (SP)",
                 "cultura": "Cana-de-Açúcar",
@@ -27,24 +51,106 @@ class FazendaData:
                 "tipo": "laranja"
             }
         }
+    
+    @property
+    def fazendas(self) -> Dict[str, Dict[str, Any]]:
+        if self.catalogo is not None:
+            return self.catalogo.atual.fazendas
+        return self._fazendas
+    
+    def tipo_cultura(self, nome_fazenda: str) -> Optional[str]:
+        """Retorna o tipo de cultura da fazenda (chave das tabelas por cultura)"""
+        fazenda = self.fazendas.get(nome_fazenda)
+        return fazenda["tipo"] if fazenda else None
 
 class CalculadoraArea:
     """Classe para cálculos de área de plantio"""
     
+    @medido
     @staticmethod
     def calcular_quadrado(lado: float) -> float:
         """Calcula área de um quadrado"""
         return lado ** 2
     
+    @medido
     @staticmethod
     def calcular_retangulo(largura: float, altura: float) -> float:
         """Calcula área de um retângulo"""
         return largura * altura
+    
+    @medido
+    @staticmethod
+    def calcular_poligono(vertices, buracos: Sequence = (), geografico: bool = False) -> float:
+        """Calcula área (m²) de um polígono irregular pela fórmula do laço
+        
+        `vertices` é o anel externo, como pares (x, y) em metros ou, com
+        geografico=True, (lon, lat) em graus; `buracos` são anéis internos.
+        Também aceita arrays NumPy Nx2.
+        """
+        return area_poligono([vertices, *buracos], geografico)
+    
+    @medido
+    @staticmethod
+    def calcular_geojson(geometria: Dict[str, Any], geografico: bool = True) -> float:
+        """Calcula área (m²) de uma geometria GeoJSON (Polygon/MultiPolygon)"""
+        return area_geometria(geometria, geografico)
+    
+    @medido
+    @staticmethod
+    def calcular_feicoes(feicoes: Sequence[Dict[str, Any]], geografico: bool = True) -> List[float]:
+        """Calcula a área (m²) de cada feição de uma FeatureCollection de uma vez"""
+        return areas_feicoes(feicoes, geografico)
+
+# Código de cada nível de dose; níveis desconhecidos são tratados como média
+CODIGOS_NIVEL = {"minima": 0, "maxima": 2}
+
+TABELAS_INSUMOS = ("corretivos", "fertilizantes", "defensivos")
+
+class PlanoDoses:
+    """Tabelas de dose de uma cultura compiladas em taxas por nível
+    
+    `taxas[grupo][nivel]` é uma tupla de (insumo, taxa por hectare) e
+    `fixas[grupo][nivel]` de valores que não dependem da área (pulverizações
+    por ano). `doses[grupo]` guarda as mesmas taxas por insumo, na forma
+    (minima, media, maxima) usada pelos cálculos em lote.
+    """
+    
+    __slots__ = ("doses", "fixas_por_insumo", "taxas", "fixas")
+    
+    def __init__(self, corretivos: Dict[str, Dict], fertilizantes: Dict[str, Dict], defensivos: Dict[str, Dict]):
+        por_nivel = CalculadoraInsumos._doses_por_nivel
+        pulv = por_nivel(defensivos["pulverizacoes"])
+        calda = por_nivel(defensivos["calda"])
+        self.doses = {
+            "corretivos": {nome: por_nivel(dados) for nome, dados in corretivos.items()},
+            "fertilizantes": {nome: por_nivel(dados) for nome, dados in fertilizantes.items()},
+            "defensivos": {"calda_total_litros": tuple(c * p for c, p in zip(calda, pulv))},
+        }
+        self.fixas_por_insumo = {"defensivos": {"pulverizacoes_ano": pulv}}
+        self.taxas = {
+            grupo: tuple(tuple((nome, doses[nivel]) for nome, doses in itens.items()) for nivel in range(3))
+            for grupo, itens in self.doses.items()
+        }
+        self.fixas = {
+            grupo: tuple(tuple((nome, doses[nivel]) for nome, doses in itens.items()) for nivel in range(3))
+            for grupo, itens in self.fixas_por_insumo.items()
+        }
 
 class CalculadoraInsumos:
-    """Classe para cálculos de manejo de insumos"""
+    """Classe para cálculos de manejo de insumos
     
-    def __init__(self):
+    As tabelas de dose são compiladas uma vez por cultura em um PlanoDoses
+    (taxa por hectare de cada nível), usado pelos cálculos escalares e em
+    lote. `culturas` sobrepõe entradas das tabelas por cultura (o "tipo" de
+    FazendaData, ex.: {"cana": {"fertilizantes": {"fosforo": {...}}}}).
+    Trocar uma tabela ou `culturas` invalida os planos; depois de alterar
+    uma tabela por dentro, chame invalidar_plano() (ou use definir_dose).
+    Com `catalogo` as tabelas vêm do catálogo agronômico (ver usar_catalogo).
+    """
+    
+    def __init__(self, culturas: Optional[Dict[str, Dict[str, Dict]]] = None, catalogo=None):
+        self._planos: Dict[Optional[str], PlanoDoses] = {}
+        
         # Dados dos insumos por hectare
         self.corretivos = {
             "calcario": {"min": 1.5, "max": 3.0, "unidade": "toneladas/ha"},
@@ -60,121 +166,509 @@ class CalculadoraInsumos:
             "pulverizacoes": {"min": 4, "max": 8, "unidade": "aplicações/ano"},
             "calda": {"min": 150, "max": 250, "unidade": "L/ha por aplicação"}
         }
+        
+        self.culturas = culturas or {}
+        if catalogo is not None:
+            self.usar_catalogo(catalogo)
     
-    def calcular_corretivos(self, hectares: float, tipo: str, quantidade: str = "media") -> Dict[str, float]:
-        """Calcula quantidade de corretivos necessários"""
-        resultado = {}
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        super().__setattr__(nome, valor)
+        if nome in TABELAS_INSUMOS or nome == "culturas":
+            self.invalidar_plano()
+    
+    def invalidar_plano(self) -> None:
+        """Descarta os planos compilados (chamado quando as tabelas mudam)
         
-        for corretivo, dados in self.corretivos.items():
-            if quantidade == "minima":
-                valor = dados["min"]
-            elif quantidade == "maxima":
-                valor = dados["max"]
-            else:  # média
-                valor = (dados["min"] + dados["max"]) / 2
-            
-            resultado[corretivo] = valor * hectares
+        Um plano que estava sendo compilado com as tabelas antigas vai para
+        o dicionário descartado, não para o novo.
+        """
+        self._planos = {}
+    
+    def plano(self, cultura: Optional[str] = None) -> PlanoDoses:
+        """Retorna o plano de doses compilado da cultura (None: tabelas gerais)"""
+        planos = self._planos
+        plano = planos.get(cultura)
+        if plano is None:
+            ajustes = self.culturas.get(cultura, {}) if cultura is not None else {}
+            tabelas = {grupo: {**getattr(self, grupo), **ajustes.get(grupo, {})} for grupo in TABELAS_INSUMOS}
+            plano = planos[cultura] = PlanoDoses(**tabelas)
+        return plano
+    
+    def usar_catalogo(self, catalogo) -> None:
+        """Passa a usar as tabelas de dose de um catálogo agronômico
         
+        Aceita um Catalogo ou um CatalogoMonitorado; com o monitorado, as
+        tabelas são trocadas a cada nova versão do arquivo. Grupos ausentes
+        do catálogo mantêm as tabelas atuais.
+        """
+        if isinstance(catalogo, CatalogoMonitorado):
+            catalogo.assinar(self._aplicar_catalogo)
+        self._aplicar_catalogo(catalogo.atual)
+    
+    def _aplicar_catalogo(self, catalogo) -> None:
+        """Troca tabelas e culturas de uma vez e descarta os planos"""
+        tabelas = {grupo: {insumo: dict(faixa) for insumo, faixa in itens.items()}
+                   for grupo, itens in catalogo.insumos.items()}
+        tabelas["culturas"] = catalogo.ajustes_culturas()
+        self.__dict__.update(tabelas)
+        self.invalidar_plano()
+    
+    def definir_dose(self, grupo: str, insumo: str, minimo: float, maximo: float,
+                     cultura: Optional[str] = None, unidade: Optional[str] = None) -> None:
+        """Define a faixa de dose de um insumo (geral ou de uma cultura)"""
+        if grupo not in TABELAS_INSUMOS:
+            raise ValueError(f"Grupo de insumos inválido: {grupo}")
+        if cultura is None:
+            tabela = getattr(self, grupo)
+        else:
+            tabela = self.culturas.setdefault(cultura, {}).setdefault(grupo, {})
+        dados = {"min": minimo, "max": maximo}
+        unidade = unidade or tabela.get(insumo, getattr(self, grupo).get(insumo, {})).get("unidade")
+        if unidade is not None:
+            dados["unidade"] = unidade
+        tabela[insumo] = dados
+        self.invalidar_plano()
+    
+    @medido
+    def calcular_corretivos(self, hectares: float, tipo: str, quantidade: str = "media",
+                            cultura: Optional[str] = None) -> Dict[str, float]:
+        """Calcula quantidade de corretivos necessários"""
+        plano = self._planos.get(cultura) or self.plano(cultura)
+        resultado = {}
+        for corretivo, taxa in plano.taxas["corretivos"][CODIGOS_NIVEL.get(quantidade, 1)]:
+            resultado[corretivo] = taxa * hectares
         return resultado
     
-    def calcular_fertilizantes(self, hectares: float, quantidade: str = "media") -> Dict[str, float]:
+    @medido
+    def calcular_fertilizantes(self, hectares: float, quantidade: str = "media",
+                               cultura: Optional[str] = None) -> Dict[str, float]:
         """Calcula quantidade de fertilizantes necessários"""
+        plano = self._planos.get(cultura) or self.plano(cultura)
         resultado = {}
-        
-        for fertilizante, dados in self.fertilizantes.items():
-            if quantidade == "minima":
-                valor = dados["min"]
-            elif quantidade == "maxima":
-                valor = dados["max"]
-            else:  # média
-                valor = (dados["min"] + dados["max"]) / 2
-            
-            resultado[fertilizante] = valor * hectares
-        
+        for fertilizante, taxa in plano.taxas["fertilizantes"][CODIGOS_NIVEL.get(quantidade, 1)]:
+            resultado[fertilizante] = taxa * hectares
         return resultado
     
-    def calcular_defensivos(self, hectares: float, quantidade: str = "media") -> Dict[str, float]:
+    @medido
+    def calcular_defensivos(self, hectares: float, quantidade: str = "media",
+                            cultura: Optional[str] = None) -> Dict[str, float]:
         """Calcula quantidade de defensivos necessários"""
+        plano = self._planos.get(cultura) or self.plano(cultura)
+        nivel = CODIGOS_NIVEL.get(quantidade, 1)
+        resultado = dict(plano.fixas["defensivos"][nivel])
+        for nome, taxa in plano.taxas["defensivos"][nivel]:
+            resultado[nome] = taxa * hectares
+        return resultado
+    
+    # ------------------------------------------------------------------
+    # Cálculos em lote (colunares)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _doses_por_nivel(dados: Dict[str, Any]) -> tuple:
+        """Retorna a dose por hectare de cada nível (minima, media, maxima)"""
+        return (dados["min"], (dados["min"] + dados["max"]) / 2, dados["max"])
+    
+    @staticmethod
+    def _vetor_hectares(hectares):
+        """Converte hectares (array NumPy, buffer ou sequência) em vetor de float64"""
+        if np is not None:
+            if isinstance(hectares, (bytes, bytearray, memoryview)):
+                return np.frombuffer(hectares, dtype=np.float64)
+            return np.asarray(hectares, dtype=np.float64)
+        if isinstance(hectares, (bytes, bytearray, memoryview)):
+            return memoryview(hectares).cast("B").cast("d")
+        return hectares if isinstance(hectares, array) and hectares.typecode == "d" else array("d", hectares)
+    
+    @staticmethod
+    def _codigos_quantidade(quantidades, n: int):
+        """Converte os níveis de dose em códigos 0/1/2 (ou None se o nível for único)
+        
+        Aceita uma string (nível único), uma sequência de strings ou uma
+        sequência de códigos inteiros. Assim como nos métodos escalares,
+        qualquer nível diferente de "minima"/"maxima" é tratado como média.
+        """
+        if isinstance(quantidades, str):
+            return None
+        if len(quantidades) != n:
+            raise ValueError("hectares e quantidades devem ter o mesmo tamanho")
+        mapa = CODIGOS_NIVEL
+        if np is not None:
+            if isinstance(quantidades, np.ndarray):
+                if quantidades.dtype.kind in "iu":
+                    return quantidades.astype(np.intp, copy=False)
+                codigos = np.ones(n, dtype=np.intp)
+                codigos[quantidades == "minima"] = 0
+                codigos[quantidades == "maxima"] = 2
+                return codigos
+            return np.fromiter(
+                (q if isinstance(q, int) else mapa.get(q, 1) for q in quantidades), dtype=np.intp, count=n
+            )
+        return array("b", (q if isinstance(q, int) else mapa.get(q, 1) for q in quantidades))
+    
+    @staticmethod
+    def _nivel_unico(quantidade: str) -> int:
+        """Converte um nível único em código, como nos métodos escalares"""
+        return CODIGOS_NIVEL.get(quantidade, 1)
+    
+    def _aplicar_doses(self, hectares, quantidades, doses: Dict[str, tuple],
+                       fixas: Dict[str, tuple] = None) -> Dict[str, Any]:
+        """Aplica a dose do nível de cada linha em uma única passada
+        
+        As colunas de `doses` são multiplicadas pelos hectares; as de `fixas`
+        (ex.: pulverizações por ano) recebem apenas o valor do nível.
+        """
+        h = self._vetor_hectares(hectares)
+        n = len(h)
+        codigos = self._codigos_quantidade(quantidades, n)
+        nivel = self._nivel_unico(quantidades) if codigos is None else None
         resultado = {}
         
-        if quantidade == "minima":
-            pulv = self.defensivos["pulverizacoes"]["min"]
-            calda = self.defensivos["calda"]["min"]
-        elif quantidade == "maxima":
-            pulv = self.defensivos["pulverizacoes"]["max"]
-            calda = self.defensivos["calda"]["max"]
-        else:  # média
-            pulv = (self.defensivos["pulverizacoes"]["min"] + self.defensivos["pulverizacoes"]["max"]) / 2
-            calda = (self.defensivos["calda"]["min"] + self.defensivos["calda"]["max"]) / 2
+        for nome, por_nivel in doses.items():
+            if codigos is None:
+                dose = por_nivel[nivel]
+                resultado[nome] = dose * h if np is not None else array("d", [dose * x for x in h])
+            elif np is not None:
+                resultado[nome] = np.asarray(por_nivel, dtype=np.float64)[codigos] * h
+            else:
+                resultado[nome] = array("d", [por_nivel[c] * x for c, x in zip(codigos, h)])
         
-        resultado["pulverizacoes_ano"] = pulv
-        resultado["calda_total_litros"] = calda * pulv * hectares
+        for nome, por_nivel in (fixas or {}).items():
+            if codigos is None:
+                resultado[nome] = np.full(n, float(por_nivel[nivel])) if np is not None else array("d", [por_nivel[nivel]]) * n
+            elif np is not None:
+                resultado[nome] = np.asarray(por_nivel, dtype=np.float64)[codigos]
+            else:
+                resultado[nome] = array("d", [por_nivel[c] for c in codigos])
         
         return resultado
+    
+    @medido
+    def calcular_corretivos_lote(self, hectares, quantidades: Union[str, Sequence] = "media",
+                                 cultura: Optional[str] = None) -> Dict[str, Any]:
+        """Calcula corretivos para muitas áreas de uma vez (colunas por corretivo)"""
+        return self._aplicar_doses(hectares, quantidades, self.plano(cultura).doses["corretivos"])
+    
+    @medido
+    def calcular_fertilizantes_lote(self, hectares, quantidades: Union[str, Sequence] = "media",
+                                    cultura: Optional[str] = None) -> Dict[str, Any]:
+        """Calcula fertilizantes para muitas áreas de uma vez (colunas por fertilizante)"""
+        return self._aplicar_doses(hectares, quantidades, self.plano(cultura).doses["fertilizantes"])
+    
+    @medido
+    def calcular_defensivos_lote(self, hectares, quantidades: Union[str, Sequence] = "media",
+                                 cultura: Optional[str] = None) -> Dict[str, Any]:
+        """Calcula defensivos para muitas áreas de uma vez
+        
+        Retorna as colunas "pulverizacoes_ano" e "calda_total_litros", com os
+        mesmos valores de calcular_defensivos linha a linha.
+        """
+        plano = self.plano(cultura)
+        return self._aplicar_doses(hectares, quantidades, plano.doses["defensivos"],
+                                   fixas=plano.fixas_por_insumo["defensivos"])
+    
+    @medido
+    def calcular_todos_lote(self, hectares, quantidades: Union[str, Sequence] = "media",
+                            cultura: Optional[str] = None) -> Dict[str, Any]:
+        """Calcula corretivos, fertilizantes e defensivos em lote"""
+        h = self._vetor_hectares(hectares)
+        resultado = self.calcular_corretivos_lote(h, quantidades, cultura)
+        resultado.update(self.calcular_fertilizantes_lote(h, quantidades, cultura))
+        resultado.update(self.calcular_defensivos_lote(h, quantidades, cultura))
+        return resultado
 
 class GerenciadorDados:
-    """Classe para gerenciar dados em vetores/listas"""
+    """Classe para gerenciar dados de plantio e insumos
+    
+    Os registros ficam em armazéns indexados por id (ver
+    fiap_farm_armazenamento.ArmazemRegistros): ids estáveis e nunca
+    reutilizados, com busca, atualização e remoção por id em O(1). Os métodos
+    por índice (posição na listagem) continuam disponíveis para o menu.
+    O plantio pode usar o ArmazemPlantioColunar, cujos registros são visões
+    que se comportam como dict.
+    """
+    
+    def __init__(self, armazem_plantio=None, armazem_insumos=None):
+        # Para grandes volumes use armazem_plantio=ArmazemPlantioColunar()
+        self.plantio = armazem_plantio if armazem_plantio is not None else ArmazemRegistros(campo_hectares="area_ha")
+        self.insumos = armazem_insumos if armazem_insumos is not None else ArmazemRegistros()
+        # Diário de operações (fiap_farm_persistencia.DiarioEscrita), se aberto
+        self.diario = None
+        # Índice espacial do plantio, montado na primeira consulta espacial
+        self._indice_espacial = None
+    
+    def _registrar(self, operacao: str, colecao: str, id_registro: int, dados: Dict[str, Any] = None) -> None:
+        """Registra a operação no diário, quando a persistência está ativa"""
+        if self.diario is not None:
+            self.diario.registrar(operacao, colecao, id_registro, dados)
+    
+    @property
+    def indice_espacial(self) -> IndiceEspacial:
+        """Índice das caixas dos registros de plantio com "bbox" ou "origem"
+        
+        Montado em lote na primeira consulta (depois da recuperação dos dados
+        salvos) e mantido em sincronia pelas operações de CRUD.
+        """
+        if self._indice_espacial is None:
+            indice = IndiceEspacial()
+            caixas = ((dados["id"], caixa_registro(dados)) for dados in self.plantio)
+            indice.carregar((id_registro, caixa) for id_registro, caixa in caixas if caixa is not None)
+            self._indice_espacial = indice
+        return self._indice_espacial
+    
+    def _indexar_plantio(self, id_registro: int, anterior: Optional[Dict[str, Any]],
+                         dados: Optional[Dict[str, Any]]) -> None:
+        """Atualiza o índice espacial, se já montado, após uma operação de CRUD"""
+        if self._indice_espacial is not None:
+            self._indice_espacial.atualizar(
+                id_registro,
+                caixa_registro(anterior) if anterior is not None else None,
+                caixa_registro(dados) if dados is not None else None,
+            )
+    
+    @property
+    def dados_plantio(self) -> Tuple[Dict[str, Any], ...]:
+        """Dados de plantio em ordem de id (tupla: inclua com adicionar_plantio)"""
+        return tuple(self.plantio)
+    
+    @property
+    def dados_insumos(self) -> Tuple[Dict[str, Any], ...]:
+        """Dados de insumos em ordem de id (tupla: inclua com adicionar_insumos)"""
+        return tuple(self.insumos)
     
-    def __init__(self):
-        self.dados_plantio: List[Dict[str, Any]] = []
-        self.dados_insumos: List[Dict[str, Any]] = []
+    @medido
+    def adicionar_plantio(self, dados: Dict[str, Any]) -> int:
+        """Adiciona dados de plantio e retorna o id atribuído"""
+        id_registro = self.plantio.inserir(dados)
+        self._registrar("+", "plantio", id_registro, dados)
+        self._indexar_plantio(id_registro, None, dados)
+        return id_registro
     
-    def adicionar_plantio(self, dados: Dict[str, Any]) -> None:
-        """Adiciona dados de plantio ao vetor"""
-        dados['id'] = len(self.dados_plantio) + 1
-        self.dados_plantio.append(dados)
+    @medido
+    def adicionar_insumos(self, dados: Dict[str, Any]) -> int:
+        """Adiciona dados de insumos e retorna o id atribuído"""
+        id_registro = self.insumos.inserir(dados)
+        self._registrar("+", "insumos", id_registro, dados)
+        return id_registro
     
-    def adicionar_insumos(self, dados: Dict[str, Any]) -> None:
-        """Adiciona dados de insumos ao vetor"""
-        dados['id'] = len(self.dados_insumos) + 1
-        self.dados_insumos.append(dados)
+    @medido
+    def adicionar_plantio_lote(self, registros: Iterable[Dict[str, Any]]) -> List[int]:
+        """Adiciona vários registros de plantio de uma vez (inserção em lote no armazém)"""
+        ids = self.plantio.inserir_lote(registros)
+        if self.diario is not None:
+            for id_registro in ids:
+                self._registrar("+", "plantio", id_registro, self.plantio.obter(id_registro))
+        if self._indice_espacial is not None:
+            for id_registro in ids:
+                self._indexar_plantio(id_registro, None, self.plantio.obter(id_registro))
+        return ids
+    
+    @medido
+    def adicionar_insumos_lote(self, registros: Iterable[Dict[str, Any]]) -> List[int]:
+        """Adiciona vários registros de insumos de uma vez (inserção em lote no armazém)"""
+        ids = self.insumos.inserir_lote(registros)
+        if self.diario is not None:
+            for id_registro in ids:
+                self._registrar("+", "insumos", id_registro, self.insumos.obter(id_registro))
+        return ids
+    
+    @medido
+    def obter_plantio(self, id_registro: int) -> Optional[Dict[str, Any]]:
+        """Retorna o registro de plantio pelo id"""
+        return self.plantio.obter(id_registro)
+    
+    @medido
+    def obter_insumos(self, id_registro: int) -> Optional[Dict[str, Any]]:
+        """Retorna o registro de insumos pelo id"""
+        return self.insumos.obter(id_registro)
+    
+    @medido
+    def atualizar_plantio_por_id(self, id_registro: int, novos_dados: Dict[str, Any]) -> bool:
+        """Atualiza dados de plantio pelo id"""
+        anterior = self.plantio.obter(id_registro) if self._indice_espacial is not None else None
+        if anterior is not None:
+            anterior = dict(anterior)  # visões colunares refletem a atualização
+        if not self.plantio.atualizar(id_registro, novos_dados):
+            return False
+        self._registrar("~", "plantio", id_registro, novos_dados)
+        self._indexar_plantio(id_registro, anterior, novos_dados)
+        return True
+    
+    @medido
+    def atualizar_insumos_por_id(self, id_registro: int, novos_dados: Dict[str, Any]) -> bool:
+        """Atualiza dados de insumos pelo id"""
+        if not self.insumos.atualizar(id_registro, novos_dados):
+            return False
+        self._registrar("~", "insumos", id_registro, novos_dados)
+        return True
+    
+    @medido
+    def deletar_plantio_por_id(self, id_registro: int) -> bool:
+        """Deleta dados de plantio pelo id"""
+        anterior = self.plantio.obter(id_registro) if self._indice_espacial is not None else None
+        if anterior is not None:
+            anterior = dict(anterior)
+        if not self.plantio.remover(id_registro):
+            return False
+        self._registrar("-", "plantio", id_registro)
+        self._indexar_plantio(id_registro, anterior, None)
+        return True
+    
+    @medido
+    def deletar_insumos_por_id(self, id_registro: int) -> bool:
+        """Deleta dados de insumos pelo id"""
+        if not self.insumos.remover(id_registro):
+            return False
+        self._registrar("-", "insumos", id_registro)
+        return True
     
     def atualizar_plantio(self, indice: int, novos_dados: Dict[str, Any]) -> bool:
         """Atualiza dados de plantio em posição específica"""
-        if 0 <= indice < len(self.dados_plantio):
-            novos_dados['id'] = self.dados_plantio[indice]['id']
-            self.dados_plantio[indice] = novos_dados
-            return True
-        return False
+        id_registro = self.plantio.id_na_posicao(indice)
+        return id_registro is not None and self.atualizar_plantio_por_id(id_registro, novos_dados)
     
     def atualizar_insumos(self, indice: int, novos_dados: Dict[str, Any]) -> bool:
         """Atualiza dados de insumos em posição específica"""
-        if 0 <= indice < len(self.dados_insumos):
-            novos_dados['id'] = self.dados_insumos[indice]['id']
-            self.dados_insumos[indice] = novos_dados
-            return True
-        return False
+        id_registro = self.insumos.id_na_posicao(indice)
+        return id_registro is not None and self.atualizar_insumos_por_id(id_registro, novos_dados)
     
     def deletar_plantio(self, indice: int) -> bool:
-        """Deleta dados de plantio"""
-        if 0 <= indice < len(self.dados_plantio):
-            del self.dados_plantio[indice]
-            return True
-        return False
+        """Deleta dados de plantio em posição específica"""
+        id_registro = self.plantio.id_na_posicao(indice)
+        return id_registro is not None and self.deletar_plantio_por_id(id_registro)
     
     def deletar_insumos(self, indice: int) -> bool:
-        """Deleta dados de insumos"""
-        if 0 <= indice < len(self.dados_insumos):
-            del self.dados_insumos[indice]
-            return True
-        return False
+        """Deleta dados de insumos em posição específica"""
+        id_registro = self.insumos.id_na_posicao(indice)
+        return id_registro is not None and self.deletar_insumos_por_id(id_registro)
+    
+    @medido
+    def buscar_plantio(self, tipo: str) -> List[Dict[str, Any]]:
+        """Retorna os registros de plantio de um tipo (índice secundário)"""
+        return [self.plantio.obter(i) for i in self.plantio.ids_por("tipo", tipo)]
+    
+    @medido
+    def buscar_insumos(self, tipo: Optional[str] = None, quantidade: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retorna os registros de insumos por tipo e/ou quantidade (índices secundários)"""
+        if tipo is None and quantidade is None:
+            return self.listar_insumos()
+        if tipo is not None and quantidade is not None:
+            por_quantidade = set(self.insumos.ids_por("quantidade", quantidade))
+            ids = [i for i in self.insumos.ids_por("tipo", tipo) if i in por_quantidade]
+        elif tipo is not None:
+            ids = self.insumos.ids_por("tipo", tipo)
+        else:
+            ids = self.insumos.ids_por("quantidade", quantidade)
+        return [self.insumos.obter(i) for i in ids]
+    
+    def plantio_no_ponto(self, x: float, y: float) -> List[Dict[str, Any]]:
+        """Registros de plantio cuja caixa contém o ponto (ex.: GPS de um sensor)"""
+        return [self.plantio.obter(i) for i in sorted(self.indice_espacial.consultar_ponto(x, y))]
+    
+    def plantio_na_regiao(self, minx: float, miny: float, maxx: float, maxy: float) -> List[Dict[str, Any]]:
+        """Registros de plantio cuja caixa cruza a região informada"""
+        return [self.plantio.obter(i) for i in sorted(self.indice_espacial.consultar_caixa(minx, miny, maxx, maxy))]
+    
+    def plantio_mais_proximo(self, x: float, y: float, k: int = 1) -> List[Dict[str, Any]]:
+        """Os k registros de plantio mais próximos do ponto (distância à caixa)"""
+        return [self.plantio.obter(i) for i, _ in self.indice_espacial.mais_proximos(x, y, k)]
+    
+    def plantio_sobrepostos(self) -> List[tuple]:
+        """Pares de ids de plantio cujas caixas se sobrepõem"""
+        return sorted(self.indice_espacial.pares_sobrepostos())
+    
+    @medido
+    def resumo_plantio(self, campo: str = "tipo") -> Dict[str, tuple]:
+        """Retorna {tipo: (registros, área total em ha)} dos dados de plantio (O(1); GROUP BY no SQLite)"""
+        return self.plantio.agregados_por(campo)
+    
+    @medido
+    def resumo_insumos(self, campo: str = "tipo") -> Dict[str, tuple]:
+        """Retorna {tipo ou quantidade: (registros, hectares totais)} dos insumos (O(1); GROUP BY no SQLite)"""
+        return self.insumos.agregados_por(campo)
     
+    def verificar_agregados(self) -> bool:
+        """Confere os agregados de plantio e insumos com um recálculo completo"""
+        return verificar_agregados(self.plantio) and verificar_agregados(self.insumos)
+    
+    def iterar_plantio(self) -> Iterator[Dict[str, Any]]:
+        """Percorre os dados de plantio sem copiar a coleção"""
+        return iter(self.plantio)
+    
+    def iterar_insumos(self) -> Iterator[Dict[str, Any]]:
+        """Percorre os dados de insumos sem copiar a coleção"""
+        return iter(self.insumos)
+    
+    def consultar_plantio(self, ordem: str = "id", cursor: Optional[str] = None,
+                          **filtros) -> Iterator[Dict[str, Any]]:
+        """Gera os registros de plantio filtrados e ordenados, a partir do cursor
+        
+        Filtros: tipo, quantidade, hectares_min e hectares_max (sobre area_ha);
+        ordens: "id", "-id", "hectares" e "-hectares" (ver fiap_farm_consulta).
+        """
+        return consultar(self.plantio, Filtro(**filtros), ordem, cursor)
+    
+    def consultar_insumos(self, ordem: str = "id", cursor: Optional[str] = None,
+                          **filtros) -> Iterator[Dict[str, Any]]:
+        """Gera os registros de insumos filtrados e ordenados, a partir do cursor"""
+        return consultar(self.insumos, Filtro(**filtros), ordem, cursor)
+    
+    @medido
+    def pagina_plantio(self, limite: int = 20, cursor: Optional[str] = None, ordem: str = "id",
+                       **filtros) -> Pagina:
+        """Uma página do plantio e o cursor da próxima (None na última)"""
+        return paginar(self.plantio, limite, cursor, ordem, Filtro(**filtros))
+    
+    @medido
+    def pagina_insumos(self, limite: int = 20, cursor: Optional[str] = None, ordem: str = "id",
+                       **filtros) -> Pagina:
+        """Uma página dos insumos e o cursor da próxima (None na última)"""
+        return paginar(self.insumos, limite, cursor, ordem, Filtro(**filtros))
+    
+    @medido
     def listar_plantio(self) -> List[Dict[str, Any]]:
-        """Lista todos os dados de plantio"""
-        return self.dados_plantio
+        """Lista todos os dados de plantio (para coleções grandes use pagina_plantio)"""
+        return list(self.plantio)
     
+    @medido
     def listar_insumos(self) -> List[Dict[str, Any]]:
-        """Lista todos os dados de insumos"""
-        return self.dados_insumos
+        """Lista todos os dados de insumos (para coleções grandes use pagina_insumos)"""
+        return list(self.insumos)
 
 class FiapFarmSystem:
     """Sistema principal FIAP Farm"""
     
-    def __init__(self):
-        self.fazenda_data = FazendaData()
+    def __init__(self, diretorio_dados: Optional[str] = None, gerenciador: Optional[GerenciadorDados] = None,
+                 catalogo: Optional[str] = None):
+        # Catálogo agronômico externo, recarregado quando o arquivo muda
+        self.catalogo = None
+        if catalogo:
+            self.catalogo = CatalogoMonitorado(catalogo)
+            self.catalogo.iniciar()
+        self.fazenda_data = FazendaData(self.catalogo)
         self.calc_area = CalculadoraArea()
-        self.calc_insumos = CalculadoraInsumos()
-        self.gerenciador = GerenciadorDados()
+        self.calc_insumos = CalculadoraInsumos(catalogo=self.catalogo)
+        self.gerenciador = gerenciador if gerenciador is not None else GerenciadorDados()
+        
+        # Persistência contínua (diário + snapshots) quando um diretório é informado;
+        # armazéns que já gravam cada operação (SQLite) não precisam do diário, e
+        # reaplicá-lo sobre registros já salvos duplicaria os ids
+        self.diario = None
+        if diretorio_dados and getattr(self.gerenciador.plantio, "duravel", False):
+            print(f"\nRegistros já persistidos no banco; diário em '{diretorio_dados}' ignorado")
+        elif diretorio_dados:
+            self.diario = DiarioEscrita(diretorio_dados)
+            reaplicadas = self.diario.abrir(self.gerenciador)
+            print(f"\nDados recuperados de '{diretorio_dados}': "
+                  f"{len(self.gerenciador.plantio)} plantio, {len(self.gerenciador.insumos)} insumos "
+                  f"({reaplicadas} operações do diário)")
+    
+    def encerrar(self) -> None:
+        """Sincroniza e fecha a persistência e para o catálogo, se ativos"""
+        if self.diario is not None:
+            self.diario.fechar()
+        if self.catalogo is not None:
+            self.catalogo.parar()
     
     def exibir_menu_principal(self) -> None:
         """Exibe o menu principal do sistema"""
@@ -245,6 +739,8 @@ class FiapFarmSystem:
             print("\n--- CÁLCULO DE ÁREA DE PLANTIO ---")
             print("1. Calcular Área Quadrada")
             print("2. Calcular Área Retangular")
+            print("3. Importar Talhões de GeoJSON")
+            print("4. Localizar Talhão por Coordenada")
             print("0. Voltar")
             
             opcao = input("\nEscolha uma opção: ")
@@ -253,6 +749,10 @@ class FiapFarmSystem:
                 self.calcular_area_quadrada()
             elif opcao == "2":
                 self.calcular_area_retangular()
+            elif opcao == "3":
+                self.importar_geojson()
+            elif opcao == "4":
+                self.localizar_talhao()
             elif opcao == "0":
                 break
             else:
@@ -317,6 +817,50 @@ class FiapFarmSystem:
         except ValueError:
             print("Entrada inválida! Digite números válidos.")
     
+    def importar_geojson(self) -> None:
+        """Mede e salva os talhões poligonais de um arquivo GeoJSON"""
+        caminho = input("\nDigite o caminho do arquivo GeoJSON: ").strip()
+        campo_nome = input("Propriedade com o nome do talhão (Enter para nenhuma): ").strip() or None
+        try:
+            registros = medir_geojson(caminho, campo_nome=campo_nome)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Erro ao ler o GeoJSON: {e}")
+            return
+        
+        if not registros:
+            print("Nenhum polígono encontrado no arquivo.")
+            return
+        
+        total_ha = sum(registro["area_ha"] for registro in registros)
+        print(f"\n--- RESULTADO ---")
+        print(f"Talhões: {len(registros)}")
+        print(f"Área total: {total_ha:.4f} hectares")
+        
+        self.gerenciador.adicionar_plantio_lote(registros)
+        print("Dados salvos com sucesso!")
+    
+    def localizar_talhao(self) -> None:
+        """Mostra os talhões que contêm uma coordenada (ou o mais próximo)"""
+        try:
+            x = float(input("\nDigite a coordenada X (ou longitude): "))
+            y = float(input("Digite a coordenada Y (ou latitude): "))
+        except ValueError:
+            print("Entrada inválida! Digite números válidos.")
+            return
+        
+        encontrados = self.gerenciador.plantio_no_ponto(x, y)
+        if not encontrados:
+            proximos = self.gerenciador.plantio_mais_proximo(x, y)
+            if not proximos:
+                print("Nenhum talhão com coordenadas registrado.")
+                return
+            print("Nenhum talhão contém o ponto. Talhão mais próximo:")
+            encontrados = proximos
+        
+        for item in encontrados:
+            nome = f" ({item['nome']})" if 'nome' in item else ""
+            print(f"ID: {item['id']} | Tipo: {item['tipo']}{nome} | Área: {item['area_ha']:.4f} ha")
+    
     def menu_insumos(self) -> None:
         """Menu para cálculo de insumos"""
         while True:
@@ -505,66 +1049,91 @@ class FiapFarmSystem:
             else:
                 print("Opção inválida!")
     
+    def _listar_paginado(self, titulo: str, mensagem_vazia: str, pagina, total: int, exibir) -> None:
+        """Exibe os registros TAMANHO_PAGINA por vez, seguindo o cursor de cada página"""
+        cursor, indice = None, 0
+        while True:
+            resultado = pagina(TAMANHO_PAGINA, cursor)
+            if indice == 0:
+                if not resultado.registros:
+                    print(f"\n{mensagem_vazia}")
+                    return
+                print(f"\n--- {titulo} ---")
+            for item in resultado.registros:
+                exibir(indice, item)
+                indice += 1
+            if resultado.proximo is None:
+                return
+            resposta = input(f"\nExibidos {indice} de {total}. Enter para a próxima página, 0 para parar: ")
+            if resposta.strip() == "0":
+                return
+            cursor = resultado.proximo
+    
     def listar_dados_plantio(self) -> None:
-        """Lista todos os dados de plantio"""
-        dados = self.gerenciador.listar_plantio()
-        if not dados:
-            print("\nNenhum dado de plantio encontrado.")
-            return
-        
-        print("\n--- DADOS DE PLANTIO ---")
-        for i, item in enumerate(dados):
-            print(f"\nÍndice: {i} | ID: {item['id']}")
-            print(f"Tipo: {item['tipo']}")
-            if item['tipo'] == 'quadrado':
-                print(f"Lado: {item['lado']} m")
-            else:
-                print(f"Largura: {item['largura']} m")
-                print(f"Altura: {item['altura']} m")
-            print(f"Área: {item['area_m2']:.2f} m² ({item['area_ha']:.4f} ha)")
-            print("-" * 30)
+        """Lista os dados de plantio, uma página por vez"""
+        self._listar_paginado("DADOS DE PLANTIO", "Nenhum dado de plantio encontrado.",
+                              self.gerenciador.pagina_plantio, len(self.gerenciador.plantio),
+                              self._exibir_plantio)
+    
+    @staticmethod
+    def _exibir_plantio(i: int, item: Dict[str, Any]) -> None:
+        print(f"\nÍndice: {i} | ID: {item['id']}")
+        print(f"Tipo: {item['tipo']}")
+        if item['tipo'] == 'quadrado':
+            print(f"Lado: {item['lado']} m")
+        elif item['tipo'] == 'poligono':
+            if 'nome' in item:
+                print(f"Nome: {item['nome']}")
+            print(f"Vértices: {item['vertices']}")
+        else:
+            print(f"Largura: {item['largura']} m")
+            print(f"Altura: {item['altura']} m")
+        print(f"Área: {item['area_m2']:.2f} m² ({item['area_ha']:.4f} ha)")
+        print("-" * 30)
     
     def listar_dados_insumos(self) -> None:
-        """Lista todos os dados de insumos"""
-        dados = self.gerenciador.listar_insumos()
-        if not dados:
-            print("\nNenhum dado de insumos encontrado.")
-            return
+        """Lista os dados de insumos, uma página por vez"""
+        self._listar_paginado("DADOS DE INSUMOS", "Nenhum dado de insumos encontrado.",
+                              self.gerenciador.pagina_insumos, len(self.gerenciador.insumos),
+                              self._exibir_insumos)
+    
+    @staticmethod
+    def _exibir_insumos(i: int, item: Dict[str, Any]) -> None:
+        print(f"\nÍndice: {i} | ID: {item['id']}")
+        print(f"Tipo: {item['tipo']}")
+        print(f"Hectares: {item['hectares']}")
+        print(f"Quantidade: {item['quantidade']}")
         
-        print("\n--- DADOS DE INSUMOS ---")
-        for i, item in enumerate(dados):
-            print(f"\nÍndice: {i} | ID: {item['id']}")
-            print(f"Tipo: {item['tipo']}")
-            print(f"Hectares: {item['hectares']}")
-            print(f"Quantidade: {item['quantidade']}")
-            
-            if item['tipo'] == 'corretivos':
-                print(f"Calcário: {item['calcario']:.2f} ton")
-                print(f"Gesso: {item['gesso']:.2f} ton")
-            elif item['tipo'] == 'fertilizantes':
-                print(f"Fósforo: {item['fosforo']:.2f} kg")
-                print(f"Potássio: {item['potassio']:.2f} kg")
-            elif item['tipo'] == 'defensivos':
-                print(f"Pulverizações: {item['pulverizacoes']:.0f}")
-                print(f"Calda: {item['calda_litros']:.2f} L")
-            
-            print("-" * 30)
+        if item['tipo'] == 'corretivos':
+            print(f"Calcário: {item['calcario']:.2f} ton")
+            print(f"Gesso: {item['gesso']:.2f} ton")
+        elif item['tipo'] == 'fertilizantes':
+            print(f"Fósforo: {item['fosforo']:.2f} kg")
+            print(f"Potássio: {item['potassio']:.2f} kg")
+        elif item['tipo'] == 'defensivos':
+            print(f"Pulverizações: {item['pulverizacoes']:.0f}")
+            print(f"Calda: {item['calda_litros']:.2f} L")
+        
+        print("-" * 30)
     
     def atualizar_dados_plantio(self) -> None:
         """Atualiza dados de plantio"""
         self.listar_dados_plantio()
-        dados = self.gerenciador.listar_plantio()
+        total = len(self.gerenciador.plantio)
         
-        if not dados:
+        if not total:
             return
         
         try:
             indice = int(input("\nDigite o índice do item a atualizar: "))
-            if indice < 0 or indice >= len(dados):
+            if indice < 0 or indice >= total:
                 print("Índice inválido!")
                 return
             
-            item_atual = dados[indice]
+            item_atual = self.gerenciador.obter_plantio(self.gerenciador.plantio.id_na_posicao(indice))
+            if item_atual['tipo'] == 'poligono':
+                print("Talhões poligonais são atualizados importando o GeoJSON novamente.")
+                return
             print(f"\nAtualizando item: {item_atual['tipo']}")
             
             if item_atual['tipo'] == 'quadrado':
@@ -603,18 +1172,18 @@ class FiapFarmSystem:
     def atualizar_dados_insumos(self) -> None:
         """Atualiza dados de insumos"""
         self.listar_dados_insumos()
-        dados = self.gerenciador.listar_insumos()
+        total = len(self.gerenciador.insumos)
         
-        if not dados:
+        if not total:
             return
         
         try:
             indice = int(input("\nDigite o índice do item a atualizar: "))
-            if indice < 0 or indice >= len(dados):
+            if indice < 0 or indice >= total:
                 print("Índice inválido!")
                 return
             
-            item_atual = dados[indice]
+            item_atual = self.gerenciador.obter_insumos(self.gerenciador.insumos.id_na_posicao(indice))
             print(f"\nAtualizando item: {item_atual['tipo']}")
             
             hectares = float(input(f"Novos hectares (atual: {item_atual['hectares']}): "))
@@ -673,14 +1242,14 @@ class FiapFarmSystem:
     def deletar_dados_plantio(self) -> None:
         """Deleta dados de plantio"""
         self.listar_dados_plantio()
-        dados = self.gerenciador.listar_plantio()
+        total = len(self.gerenciador.plantio)
         
-        if not dados:
+        if not total:
             return
         
         try:
             indice = int(input("\nDigite o índice do item a deletar: "))
-            if indice < 0 or indice >= len(dados):
+            if indice < 0 or indice >= total:
                 print("Índice inválido!")
                 return
             
@@ -699,14 +1268,14 @@ class FiapFarmSystem:
     def deletar_dados_insumos(self) -> None:
         """Deleta dados de insumos"""
         self.listar_dados_insumos()
-        dados = self.gerenciador.listar_insumos()
+        total = len(self.gerenciador.insumos)
         
-        if not dados:
+        if not total:
             return
         
         try:
             indice = int(input("\nDigite o índice do item a deletar: "))
-            if indice < 0 or indice >= len(dados):
+            if indice < 0 or indice >= total:
                 print("Índice inválido!")
                 return
             
@@ -728,6 +1297,9 @@ class FiapFarmSystem:
             print("\n--- RELATÓRIOS ---")
             print("1. Resumo Geral")
             print("2. Exportar Dados")
+            print("3. Exportar Dados (JSON compacto)")
+            print("4. Exportar Dados (NDJSON)")
+            print("5. Exportar Dados (binário colunar, para análise)")
             print("0. Voltar")
             
             opcao = input("\nEscolha uma opção: ")
@@ -736,15 +1308,23 @@ class FiapFarmSystem:
                 self.gerar_resumo_geral()
             elif opcao == "2":
                 self.exportar_dados()
+            elif opcao == "3":
+                self.exportar_dados(modo="compacto")
+            elif opcao == "4":
+                self.exportar_dados("fiap_farm_dados.ndjson", modo="ndjson")
+            elif opcao == "5":
+                self.exportar_dados("fiap_farm_dados.bin", modo="binario")
             elif opcao == "0":
                 break
             else:
                 print("Opção inválida!")
     
+    @medido
     def gerar_resumo_geral(self) -> None:
         """Gera resumo geral dos dados"""
-        plantio = self.gerenciador.listar_plantio()
-        insumos = self.gerenciador.listar_insumos()
+        # Agregados corridos mantidos pelos armazéns: O(1) no tamanho dos dados
+        plantio = self.gerenciador.resumo_plantio()
+        insumos = self.gerenciador.resumo_insumos()
         
         print("\n" + "="*50)
         print("           RESUMO GERAL - FIAP FARM")
@@ -752,55 +1332,59 @@ class FiapFarmSystem:
         
         # Resumo de plantio
         if plantio:
-            total_area_ha = sum(item['area_ha'] for item in plantio)
+            total_registros = sum(registros for registros, _ in plantio.values())
+            total_area_ha = sum(area for _, area in plantio.values())
             print(f"\nDados de Plantio:")
-            print(f"  Total de registros: {len(plantio)}")
+            print(f"  Total de registros: {total_registros}")
             print(f"  Área total: {total_area_ha:.4f} hectares")
             
-            quadrados = [item for item in plantio if item['tipo'] == 'quadrado']
-            retangulos = [item for item in plantio if item['tipo'] == 'retangulo']
+            if "quadrado" in plantio:
+                quadrados, area_quadrados = plantio["quadrado"]
+                print(f"  Áreas quadradas: {quadrados} ({area_quadrados:.4f} ha)")
             
-            if quadrados:
-                area_quadrados = sum(item['area_ha'] for item in quadrados)
-                print(f"  Áreas quadradas: {len(quadrados)} ({area_quadrados:.4f} ha)")
+            if "retangulo" in plantio:
+                retangulos, area_retangulos = plantio["retangulo"]
+                print(f"  Áreas retangulares: {retangulos} ({area_retangulos:.4f} ha)")
             
-            if retangulos:
-                area_retangulos = sum(item['area_ha'] for item in retangulos)
-                print(f"  Áreas retangulares: {len(retangulos)} ({area_retangulos:.4f} ha)")
+            if "poligono" in plantio:
+                poligonos, area_poligonos = plantio["poligono"]
+                print(f"  Áreas poligonais: {poligonos} ({area_poligonos:.4f} ha)")
         else:
             print("\nNenhum dado de plantio registrado.")
         
         # Resumo de insumos
         if insumos:
             print(f"\nDados de Insumos:")
-            print(f"  Total de registros: {len(insumos)}")
+            print(f"  Total de registros: {sum(registros for registros, _ in insumos.values())}")
             
-            tipos = {}
-            for item in insumos:
-                tipo = item['tipo']
-                if tipo not in tipos:
-                    tipos[tipo] = 0
-                tipos[tipo] += 1
-            
-            for tipo, count in tipos.items():
-                print(f"  {tipo.capitalize()}: {count} registros")
+            for tipo, (count, _) in insumos.items():
+                print(f"  {str(tipo).capitalize()}: {count} registros")
         else:
             print("\nNenhum dado de insumos registrado.")
         
         print("\n" + "="*50)
     
-    def exportar_dados(self) -> None:
-        """Exporta dados para arquivo JSON"""
-        dados_export = {
-            "fazendas": self.fazenda_data.fazendas,
-            "plantio": self.gerenciador.listar_plantio(),
-            "insumos": self.gerenciador.listar_insumos()
-        }
+    @medido
+    def exportar_dados(self, arquivo: str = "fiap_farm_dados.json", modo: str = "indentado") -> None:
+        """Exporta dados para arquivo JSON (ou NDJSON), registro a registro
         
+        modo="binario" grava o formato colunar de fiap_farm_binario.
+        """
         try:
-            with open("fiap_farm_dados.json", "w", encoding="utf-8") as arquivo:
-                json.dump(dados_export, arquivo, indent=2, ensure_ascii=False)
-            print("\nDados exportados com sucesso para 'fiap_farm_dados.json'!")
+            if modo == "binario":
+                from fiap_farm_binario import exportar_binario
+                exportar_binario(arquivo, self.fazenda_data.fazendas, self.gerenciador.plantio,
+                                 self.gerenciador.iterar_insumos())
+                print(f"\nDados exportados com sucesso para '{arquivo}'!")
+                return
+            exportar_dados(
+                arquivo,
+                self.fazenda_data.fazendas,
+                self.gerenciador.iterar_plantio(),
+                self.gerenciador.iterar_insumos(),
+                modo=modo,
+            )
+            print(f"\nDados exportados com sucesso para '{arquivo}'!")
         except Exception as e:
             print(f"\nErro ao exportar dados: {e}")
     
@@ -824,6 +1408,7 @@ class FiapFarmSystem:
             elif opcao == "5":
                 self.menu_relatorios()
             elif opcao == "0":
+                self.encerrar()
                 print("\nObrigado por usar o FIAP Farm!")
                 print("Sistema desenvolvido pela FarmTech Solutions")
                 break
@@ -832,8 +1417,33 @@ class FiapFarmSystem:
 
 def main():
     """Função principal"""
-    sistema = FiapFarmSystem()
-    sistema.executar()
+    # FIAP_FARM_METRICAS e FIAP_FARM_PERFIL: ver fiap_farm_instrumentacao
+    configurar_ambiente()
+    # `python fiap_farm.py batch --in talhoes.csv --out resultados.ndjson`
+    # processa listas de talhões sem os menus interativos
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from fiap_farm_lote import main_lote
+        sys.exit(main_lote(sys.argv[2:]))
+    # `python fiap_farm.py api --porta 8080` serve as operações por HTTP/JSON
+    if len(sys.argv) > 1 and sys.argv[1] == "api":
+        from fiap_farm_api import main_api
+        sys.exit(main_api(sys.argv[2:]))
+    # `python fiap_farm.py cenarios --hectares 1:500:0.5` varre custos por fazenda, dose e preços
+    if len(sys.argv) > 1 and sys.argv[1] == "cenarios":
+        from fiap_farm_cenarios import main_cenarios
+        sys.exit(main_cenarios(sys.argv[2:]))
+
+    # FIAP_FARM_DADOS=<diretório> ativa a persistência contínua dos dados;
+    # FIAP_FARM_SQLITE=<arquivo.db> guarda os registros em um banco SQLite;
+    # FIAP_FARM_CATALOGO=<arquivo.json|.toml> lê fazendas e doses do catálogo
+    banco = os.environ.get("FIAP_FARM_SQLITE")
+    gerenciador = gerenciador_sqlite(banco) if banco else None
+    sistema = FiapFarmSystem(diretorio_dados=os.environ.get("FIAP_FARM_DADOS"), gerenciador=gerenciador,
+                             catalogo=os.environ.get("FIAP_FARM_CATALOGO"))
+    try:
+        sistema.executar()
+    finally:
+        sistema.encerrar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Alertas Agrometeorológicos
+FarmTech Solutions
+
+Motor de regras declarativas sobre leituras meteorológicas:
+
+- cada Regra compara uma variável (temperatura, umidade, vento em km/h,
+  chuva em mm) com um limite fixo ou com um limite da cultura
+  (ex.: "temperatura_min"), resolvido pelo tipo da fazenda em FazendaData;
+- as leituras de muitas fazendas são avaliadas em lote, em colunas: cada
+  regra vira uma máscara vetorizada (NumPy) sobre o lote inteiro;
+- o resultado é um array estruturado de alertas (leitura, fazenda, regra,
+  valor, limite), convertido em registros (dicts) só quando necessário.
+
+Os limites por cultura reproduzem os de analisar_condicoes_agricolas
+(fiap_farm_weather.R); culturas sem limites próprios usam LIMITES_PADRAO
+(os do relatório do RSimulator). Leituras ausentes (NaN) não geram alertas.
+"""
+
+import operator
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+# NumPy é opcional (importado no primeiro uso); sem ele as regras são avaliadas leitura a leitura
+from fiap_farm_opcional import np
+
+VARIAVEIS = ("temperatura", "umidade", "vento", "chuva")
+
+NIVEIS = ("atencao", "critico")
+
+LIMITES_PADRAO = {
+    "temperatura_min": 15.0, "temperatura_max": 35.0,
+    "umidade_min": 40.0, "umidade_max": 80.0,
+    "vento_aplicacao": 10.0, "vento_max": 25.0,
+}
+
+LIMITES_CULTURA = {
+    "cana": {"temperatura_min": 20.0, "temperatura_max": 30.0, "umidade_min": 60.0, "umidade_max": 80.0},
+    "laranja": {"temperatura_min": 15.0, "temperatura_max": 25.0, "umidade_min": 50.0, "umidade_max": 70.0},
+}
+
+OPERADORES = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+class Regra(NamedTuple):
+    """Alerta quando `variavel <operador> limite`
+
+    `limite` é um número ou o nome de um limite da cultura (LIMITES_PADRAO).
+    """
+    nome: str
+    variavel: str
+    operador: str
+    limite: Union[float, str]
+    nivel: str
+    mensagem: str
+
+
+REGRAS_PADRAO = (
+    Regra("temperatura_baixa", "temperatura", "<", "temperatura_min", "atencao",
+          "Temperatura baixa - Risco para culturas sensíveis ao frio"),
+    Regra("temperatura_alta", "temperatura", ">", "temperatura_max", "atencao",
+          "Temperatura alta - Necessário irrigação adicional"),
+    Regra("umidade_baixa", "umidade", "<", "umidade_min", "atencao", "Umidade baixa - Considerar irrigação"),
+    Regra("umidade_alta", "umidade", ">", "umidade_max", "atencao", "Umidade alta - Monitorar fungos e pragas"),
+    Regra("vento_aplicacao", "vento", ">", "vento_aplicacao", "atencao",
+          "Vento acima de 10 km/h - Cuidado com aplicações de defensivos"),
+    Regra("vento_forte", "vento", ">", "vento_max", "critico",
+          "Vento forte - Risco para culturas altas; evite aplicações de defensivos"),
+    Regra("chuva", "chuva", ">", 0.0, "atencao", "Chuva - Evite aplicação de defensivos e fertilizantes"),
+)
+
+# Regras do relatório meteorológico do RSimulator (sem cultura): só os limites
+# gerais de temperatura, umidade e vento forte, com os textos do relatório
+REGRAS_RELATORIO = (
+    REGRAS_PADRAO[0], REGRAS_PADRAO[1], REGRAS_PADRAO[2], REGRAS_PADRAO[3],
+    Regra("vento_forte", "vento", ">", "vento_max", "atencao", "Vento forte - Risco para culturas altas"),
+)
+
+# Estrutura de cada alerta no resultado em lote
+CAMPOS_ALERTA = (("leitura", "i8"), ("fazenda", "i4"), ("regra", "i2"), ("valor", "f4"), ("limite", "f4"))
+
+
+class Alertas:
+    """Alertas de um lote: array estruturado + tabelas de regras e fazendas
+
+    `dados` tem os campos de CAMPOS_ALERTA (leitura = posição da leitura no
+    lote, fazenda e regra = índices em `fazendas` e `regras`), agrupados por
+    regra e, dentro de cada regra, em ordem de leitura.
+    """
+
+    def __init__(self, dados, regras: Sequence[Regra], fazendas: Sequence[Optional[str]]):
+        self.dados = dados
+        self.regras = regras
+        self.fazendas = fazendas
+
+    def __len__(self) -> int:
+        return len(self.dados)
+
+    def registros(self) -> Iterator[Dict[str, Any]]:
+        """Alertas como dicionários (fazenda, regra, nível, valor, limite, mensagem)"""
+        for leitura, fazenda, indice_regra, valor, limite in (self.dados.tolist() if np is not None else self.dados):
+            regra = self.regras[indice_regra]
+            yield {"leitura": leitura, "fazenda": self.fazendas[fazenda], "regra": regra.nome,
+                   "nivel": regra.nivel, "variavel": regra.variavel, "valor": valor, "limite": limite,
+                   "mensagem": regra.mensagem}
+
+    def contagem_por_regra(self) -> Dict[str, int]:
+        if np is not None:
+            contagens = np.bincount(self.dados["regra"], minlength=len(self.regras)).tolist()
+        else:
+            contagens = [0] * len(self.regras)
+            for alerta in self.dados:
+                contagens[alerta[2]] += 1
+        return {regra.nome: total for regra, total in zip(self.regras, contagens) if total}
+
+
+class MotorAlertas:
+    """Avalia regras de alerta com limites por cultura
+
+    Uso:
+        motor = MotorAlertas(fazenda_data=FazendaData())
+        alertas = motor.avaliar({"fazenda": codigos, "temperatura": temps, ...},
+                                fazendas=["Barra Grande", "Arcanjo Miguel"])
+        for alerta in alertas.registros(): ...
+
+    `limites` sobrepõe LIMITES_CULTURA (por tipo de cultura); o tipo de cada
+    fazenda vem de `fazenda_data` (FazendaData ou dict nome -> tipo).
+    """
+
+    def __init__(self, regras: Sequence[Regra] = REGRAS_PADRAO,
+                 limites: Optional[Dict[str, Dict[str, float]]] = None, fazenda_data=None):
+        for regra in regras:
+            if regra.operador not in OPERADORES:
+                raise ValueError(f"{regra.nome}: operador inválido {regra.operador}")
+            if regra.variavel not in VARIAVEIS:
+                raise ValueError(f"{regra.nome}: variável desconhecida {regra.variavel}")
+            if regra.nivel not in NIVEIS:
+                raise ValueError(f"{regra.nome}: nível inválido {regra.nivel}")
+            if isinstance(regra.limite, str) and regra.limite not in LIMITES_PADRAO:
+                raise ValueError(f"{regra.nome}: limite desconhecido {regra.limite}")
+        self.regras = tuple(regras)
+        self.limites = {**LIMITES_CULTURA, **(limites or {})}
+        self.fazenda_data = fazenda_data
+        self._compilados: Dict[tuple, list] = {}
+
+    def cultura(self, fazenda: Optional[str]) -> Optional[str]:
+        """Tipo de cultura da fazenda (None se desconhecida)"""
+        if fazenda is None or self.fazenda_data is None:
+            return None
+        if isinstance(self.fazenda_data, dict):
+            return self.fazenda_data.get(fazenda)
+        return self.fazenda_data.tipo_cultura(fazenda)
+
+    def limite(self, regra: Regra, cultura: Optional[str]) -> float:
+        """Limite da regra para a cultura"""
+        if not isinstance(regra.limite, str):
+            return float(regra.limite)
+        return float(self.limites.get(cultura, {}).get(regra.limite, LIMITES_PADRAO[regra.limite]))
+
+    def _compilar(self, fazendas: tuple) -> list:
+        """Limite de cada regra por fazenda (um número se for igual para todas)
+
+        O cache é pela cultura de cada fazenda, então uma fazenda que muda de
+        cultura (catálogo recarregado) recebe os limites novos.
+        """
+        culturas = tuple(self.cultura(fazenda) for fazenda in fazendas)
+        compilado = self._compilados.get(culturas)
+        if compilado is None:
+            compilado = []
+            for regra in self.regras:
+                limites = [self.limite(regra, cultura) for cultura in culturas]
+                if len(set(limites)) <= 1:
+                    compilado.append(limites[0] if limites else self.limite(regra, None))
+                else:
+                    compilado.append(np.asarray(limites) if np is not None else limites)
+            self._compilados[culturas] = compilado
+        return compilado
+
+    def avaliar(self, leituras: Dict[str, Sequence], fazendas: Sequence[Optional[str]] = (None,)) -> Alertas:
+        """Avalia todas as regras sobre um lote de leituras em colunas
+
+        `leituras` tem uma coluna por variável (arrays do mesmo tamanho) e,
+        opcionalmente, "fazenda" com o índice de cada leitura em `fazendas`
+        (sem ela, todas as leituras são da primeira fazenda). Regras de
+        variáveis ausentes no lote são ignoradas.
+        """
+        fazendas = tuple(fazendas)
+        limites = self._compilar(fazendas)
+        if np is None:
+            return self._avaliar_python(leituras, fazendas, limites)
+
+        colunas = {nome: np.asarray(valores) for nome, valores in leituras.items()}
+        codigos = colunas.get("fazenda")
+        partes = []
+        for indice, (regra, limite) in enumerate(zip(self.regras, limites)):
+            valores = colunas.get(regra.variavel)
+            if valores is None:
+                continue
+            if isinstance(limite, np.ndarray):
+                if codigos is None:
+                    limite = limite[0]
+                else:
+                    limite = limite[codigos]
+            mascara = OPERADORES[regra.operador](valores, limite)
+            posicoes = np.flatnonzero(mascara)
+            if not len(posicoes):
+                continue
+            parte = np.empty(len(posicoes), dtype=list(CAMPOS_ALERTA))
+            parte["leitura"] = posicoes
+            parte["fazenda"] = codigos[posicoes] if codigos is not None else 0
+            parte["regra"] = indice
+            parte["valor"] = valores[posicoes]
+            parte["limite"] = limite[posicoes] if isinstance(limite, np.ndarray) else limite
+            partes.append(parte)
+        dados = np.concatenate(partes) if partes else np.empty(0, dtype=list(CAMPOS_ALERTA))
+        return Alertas(dados, self.regras, fazendas)
+
+    def _avaliar_python(self, leituras: Dict[str, Sequence], fazendas: tuple, limites: list) -> Alertas:
+        codigos = leituras.get("fazenda")
+        dados = []
+        for indice, (regra, limite) in enumerate(zip(self.regras, limites)):
+            valores = leituras.get(regra.variavel)
+            if valores is None:
+                continue
+            comparar = OPERADORES[regra.operador]
+            for posicao, valor in enumerate(valores):
+                fazenda = codigos[posicao] if codigos is not None else 0
+                limite_leitura = limite[fazenda] if isinstance(limite, list) else limite
+                if comparar(valor, limite_leitura):
+                    dados.append((posicao, fazenda, indice, float(array("f", [valor])[0]),
+                                  float(array("f", [limite_leitura])[0])))
+        return Alertas(dados, self.regras, fazendas)
+
+    def avaliar_leitura(self, fazenda: Optional[str], dados: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Alertas de uma única leitura (dict no formato de obter_dados_meteorologicos)"""
+        cultura = self.cultura(fazenda)
+        alertas = []
+        for regra in self.regras:
+            valor = dados.get(regra.variavel)
+            if valor is None and regra.variavel == "chuva":
+                valor = dados.get("chuva_1h")
+            if valor is None:
+                continue
+            limite = self.limite(regra, cultura)
+            if OPERADORES[regra.operador](valor, limite):
+                alertas.append({"fazenda": fazenda, "regra": regra.nome, "nivel": regra.nivel,
+                                "variavel": regra.variavel, "valor": valor, "limite": limite,
+                                "mensagem": regra.mensagem})
+        return alertas
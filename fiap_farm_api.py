@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - API HTTP
+FarmTech Solutions
+
+Serviço HTTP/JSON (asyncio, somente biblioteca padrão) com as operações do
+FiapFarmSystem, para o front end web e outras integrações:
+
+    python fiap_farm.py api --porta 8080
+
+    GET    /fazendas                   fazendas do catálogo
+    POST   /calculo/area               área de um talhão ou de uma lista deles
+    POST   /calculo/insumos            insumos de um talhão ou de uma lista (em lote)
+    GET    /plantio, /insumos          página por cursor (filtros, ordem; ?formato=ndjson)
+    POST   /plantio, /insumos          cria um registro ou uma lista de registros
+    GET    /plantio/<id>, /insumos/<id>
+    PUT    /plantio/<id>, /insumos/<id>
+    DELETE /plantio/<id>, /insumos/<id>
+    GET    /resumo                     registros e hectares por tipo (agregados O(1))
+    GET    /exportar?modo=ndjson       exportação completa (modos de fiap_farm_exportacao)
+    GET    /metricas                   métricas de fiap_farm_instrumentacao (Prometheus; ?formato=json)
+
+Os cálculos aceitam um objeto ou uma lista; com ?salvar=1 os resultados
+também são gravados (plantio ou insumos), como nos menus. As conexões são
+persistentes (keep-alive) e cada requisição é atendida no laço de eventos,
+então o GerenciadorDados é usado sem travas. Listagens com ?formato=ndjson
+e exportações são enviadas em partes (Transfer-Encoding: chunked), lidas
+com os cursores por id de fiap_farm_consulta: alterações feitas durante o
+envio não interrompem a resposta.
+
+teste_carga mede vazão e latências (p50/p99) de um endpoint:
+
+    python fiap_farm_api.py carga --url http://127.0.0.1:8080/fazendas
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from fiap_farm import FiapFarmSystem, NIVEIS_QUANTIDADE
+from fiap_farm_exportacao import MODOS_EXPORTACAO, gerar_exportacao
+from fiap_farm_http import (ClienteHTTP, ErroHTTP, FIM_CHUNKED, inicio_chunked, ler_requisicao, pedaco,
+                            resposta)
+from fiap_farm_instrumentacao import REGISTRO, TIPO_PROMETHEUS, configurar_ambiente, medir
+from fiap_farm_lote import calcular_area
+from fiap_farm_persistencia import CAMPOS_HECTARES, gerenciador_sqlite
+
+TIPO_JSON = "application/json; charset=utf-8"
+
+TIPOS_EXPORTACAO = {"indentado": TIPO_JSON, "compacto": TIPO_JSON, "ndjson": "application/x-ndjson; charset=utf-8"}
+
+# Registros por parte nas listagens em streaming e tamanho das partes da exportação
+REGISTROS_POR_PARTE = 1000
+TAMANHO_PARTE = 64 * 1024
+
+# Tamanho padrão e máximo das páginas de GET /plantio e /insumos
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 10_000
+
+COLECOES = ("plantio", "insumos")
+
+# JSON não tem Infinity/NaN: valores não finitos são rejeitados na entrada e na saída
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=dict, allow_nan=False).encode
+
+
+def _float_finito(texto: str) -> float:
+    valor = float(texto)
+    if not math.isfinite(valor):
+        raise ValueError(f"número fora do intervalo: {texto}")
+    return valor
+
+
+def _constante_invalida(texto: str) -> None:
+    raise ValueError(f"valor não permitido em JSON: {texto}")
+
+
+def _ler_json(corpo: bytes) -> Any:
+    return json.loads(corpo, parse_float=_float_finito, parse_constant=_constante_invalida)
+
+
+class ErroAPI(Exception):
+    """Erro com status HTTP, enviado ao cliente como {"erro": mensagem}"""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class Streaming(NamedTuple):
+    """Resposta enviada em partes: `partes` gera o texto do corpo"""
+    tipo: str
+    partes: Iterator[str]
+
+
+def _lista(corpo: Any) -> Tuple[List[Any], bool]:
+    """Itens do corpo e se ele era uma lista (lote) ou um objeto só"""
+    if isinstance(corpo, list):
+        return corpo, True
+    return [corpo], False
+
+
+def _objeto(item: Any) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ErroAPI(400, "esperado um objeto JSON")
+    return item
+
+
+def _numero_positivo(valor: Any, campo: str) -> float:
+    """Número JSON (não booleano) finito e maior que zero; senão ValueError"""
+    try:
+        valido = not isinstance(valor, bool) and isinstance(valor, (int, float)) and 0 < float(valor) < math.inf
+    except OverflowError:
+        valido = False
+    if not valido:
+        raise ValueError(f"{campo} deve ser um número maior que zero")
+    return float(valor)
+
+
+def _texto_opcional(item: Dict[str, Any], campo: str) -> Optional[str]:
+    """Campo de texto opcional (None se vazio ou ausente); senão ValueError"""
+    valor = item.get(campo)
+    if valor in (None, ""):
+        return None
+    if not isinstance(valor, str):
+        raise ValueError(f"{campo} deve ser um texto")
+    return valor
+
+
+def _validar_registro(colecao: str, dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Confere os campos que o resumo, os filtros e a exportação usam
+
+    Plantio: tipo e area_ha (> 0); insumos: tipo, hectares (> 0) e
+    quantidade (minima, media ou maxima). Os demais campos são livres.
+    """
+    tipo = dados.get("tipo")
+    if not isinstance(tipo, str) or not tipo:
+        raise ValueError("tipo deve ser um texto não vazio")
+    campo = CAMPOS_HECTARES[colecao]
+    _numero_positivo(dados.get(campo), campo)
+    if colecao == "insumos" and dados.get("quantidade") not in NIVEIS_QUANTIDADE:
+        raise ValueError(f"quantidade inválida: {dados.get('quantidade')}")
+    return dados
+
+
+def _conferir_finitos(registro: Dict[str, Any]) -> None:
+    """Levanta ValueError se algum valor calculado não for finito (sem JSON válido)"""
+    for valor in registro.values():
+        if isinstance(valor, dict):
+            _conferir_finitos(valor)
+        elif isinstance(valor, float) and not math.isfinite(valor):
+            raise ValueError("resultado grande demais")
+
+
+def _linhas_ndjson(registros: Iterable) -> Iterator[str]:
+    """Um registro por linha, REGISTROS_POR_PARTE linhas por parte"""
+    bloco = []
+    for registro in registros:
+        bloco.append(_codificar(registro))
+        if len(bloco) == REGISTROS_POR_PARTE:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
+
+def _agrupar_partes(partes: Iterable[str]) -> Iterator[str]:
+    """Junta partes pequenas (um registro) em partes de ~TAMANHO_PARTE caracteres"""
+    bloco, tamanho = [], 0
+    for parte in partes:
+        bloco.append(parte)
+        tamanho += len(parte)
+        if tamanho >= TAMANHO_PARTE:
+            yield "".join(bloco)
+            bloco, tamanho = [], 0
+    if bloco:
+        yield "".join(bloco)
+
+
+class ServidorAPI:
+    """Servidor HTTP da API sobre um FiapFarmSystem
+
+    Uso:
+        async with ServidorAPI(FiapFarmSystem(), porta=8080) as servidor:
+            print(servidor.url)
+            await servidor.servir()
+    """
+
+    def __init__(self, sistema: FiapFarmSystem, host: str = "127.0.0.1", porta: int = 0):
+        self.sistema = sistema
+        self.host = host
+        self.porta = porta
+        self.requisicoes = 0
+        self.conexoes = 0
+        self._servidor = None
+        self._ativas: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        # recurso -> método -> handler (recursos com id terminam em "<id>")
+        self.rotas: Dict[tuple, Dict[str, Callable]] = {
+            ("fazendas",): {"GET": self.listar_fazendas},
+            ("calculo", "area"): {"POST": self.calcular_area},
+            ("calculo", "insumos"): {"POST": self.calcular_insumos},
+            ("resumo",): {"GET": self.resumo},
+            ("exportar",): {"GET": self.exportar},
+            ("metricas",): {"GET": self.metricas},
+        }
+        for colecao in COLECOES:
+            self.rotas[(colecao,)] = {"GET": self.listar, "POST": self.criar}
+            self.rotas[(colecao, "<id>")] = {"GET": self.obter, "PUT": self.atualizar, "DELETE": self.deletar}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    async def __aenter__(self) -> "ServidorAPI":
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.parar()
+
+    async def iniciar(self) -> None:
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self) -> None:
+        """Atende até a tarefa ser cancelada"""
+        await self._servidor.serve_forever()
+
+    async def parar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            # Fecha as conexões keep-alive ociosas e espera os atendimentos
+            for escritor in list(self._ativas.values()):
+                escritor.close()
+            await asyncio.gather(*self._ativas, return_exceptions=True)
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+
+    def _rotear(self, metodo: str, caminho: str) -> Tuple[Callable, Optional[int], str]:
+        """Handler, id (recursos com id) e coleção do caminho"""
+        partes = tuple(parte for parte in caminho.split("/") if parte)
+        id_registro = None
+        if len(partes) == 2 and partes[0] in COLECOES:
+            try:
+                id_registro = int(partes[1])
+            except ValueError:
+                raise ErroAPI(404, f"id inválido: {partes[1]}") from None
+            partes = (partes[0], "<id>")
+        metodos = self.rotas.get(partes)
+        if metodos is None:
+            raise ErroAPI(404, f"recurso não encontrado: {caminho}")
+        handler = metodos.get(metodo)
+        if handler is None:
+            raise ErroAPI(405, f"método {metodo} não permitido em {caminho}")
+        return handler, id_registro, partes[0]
+
+    def _executar(self, requisicao) -> Any:
+        """Chama o handler da requisição e retorna (status, dados) ou Streaming"""
+        handler, id_registro, colecao = self._rotear(requisicao.metodo, requisicao.caminho)
+        corpo = None
+        if requisicao.metodo in ("POST", "PUT"):
+            try:
+                corpo = _ler_json(requisicao.corpo)
+            except ValueError as erro:
+                raise ErroAPI(400, f"corpo JSON inválido: {erro}") from None
+        try:
+            with medir(f"ServidorAPI.{handler.__name__}"):
+                return handler(colecao=colecao, id_registro=id_registro, parametros=requisicao.parametros,
+                               corpo=corpo)
+        except (ValueError, OverflowError) as erro:
+            # Só erros de entrada viram 400; os demais são falhas do servidor (500 com traceback)
+            raise ErroAPI(400, str(erro) or type(erro).__name__) from None
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        self.conexoes += 1
+        tarefa = asyncio.current_task()
+        self._ativas[tarefa] = escritor
+        try:
+            while True:
+                try:
+                    requisicao = await ler_requisicao(leitor)
+                except (ErroHTTP, ValueError) as erro:
+                    escritor.write(resposta(400, _codificar({"erro": str(erro)}).encode(), TIPO_JSON, False))
+                    break
+                if requisicao is None:
+                    break
+                self.requisicoes += 1
+                manter = requisicao.manter_conexao
+                try:
+                    resultado = self._executar(requisicao)
+                except ErroAPI as erro:
+                    resultado = (erro.status, {"erro": str(erro)})
+                except Exception:
+                    traceback.print_exc()
+                    resultado = (500, {"erro": "erro interno"})
+                if isinstance(resultado, Streaming):
+                    await self._enviar_partes(escritor, resultado, manter)
+                else:
+                    status, dados = resultado
+                    try:
+                        corpo = _codificar(dados).encode("utf-8") if status != 204 else b""
+                    except ValueError:
+                        traceback.print_exc()
+                        status, corpo = 500, _codificar({"erro": "resultado sem representação em JSON"}).encode()
+                    escritor.write(resposta(status, corpo, TIPO_JSON, manter))
+                    await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._ativas[tarefa]
+            escritor.close()
+
+    @staticmethod
+    async def _enviar_partes(escritor: asyncio.StreamWriter, streaming: Streaming, manter: bool) -> None:
+        """Envia o corpo em partes, esperando o cliente consumir cada uma
+
+        Um erro no meio da resposta não pode mais virar status: a conexão é
+        fechada sem a parte final, e o cliente percebe o corpo incompleto.
+        """
+        escritor.write(inicio_chunked(200, streaming.tipo, manter))
+        try:
+            for parte in streaming.partes:
+                escritor.write(pedaco(parte.encode("utf-8")))
+                await escritor.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception:
+            traceback.print_exc()
+            raise ConnectionAbortedError("resposta em partes interrompida") from None
+        escritor.write(FIM_CHUNKED)
+        await escritor.drain()
+
+    # ------------------------------------------------------------------
+    # Handlers: recebem colecao, id_registro, parametros e corpo
+    # ------------------------------------------------------------------
+
+    def listar_fazendas(self, **_) -> tuple:
+        return 200, self.sistema.fazenda_data.fazendas
+
+    def calcular_area(self, parametros: Dict[str, str], corpo: Any, **_) -> tuple:
+        """Área de talhões: quadrado (lado), retangulo (largura, altura),
+        hectares ou geometria GeoJSON (Polygon/MultiPolygon em lon/lat)"""
+        itens, lote = _lista(corpo)
+        areas = []
+        for item in map(_objeto, itens):
+            if "geometria" in item:
+                geometria = item["geometria"]
+                if not isinstance(geometria, dict):
+                    raise ValueError("geometria deve ser um objeto GeoJSON")
+                try:
+                    area_m2 = self.sistema.calc_area.calcular_geojson(geometria, item.get("geografico", True))
+                except (KeyError, TypeError, IndexError, AttributeError) as erro:
+                    raise ValueError(f"geometria inválida: {erro or type(erro).__name__}") from None
+                area = {"tipo": "poligono", "area_m2": area_m2, "area_ha": area_m2 / 10000}
+                if "nome" in item:
+                    area["nome"] = item["nome"]
+            else:
+                area = calcular_area(item)
+            _conferir_finitos(area)
+            areas.append(area)
+        if parametros.get("salvar") in ("1", "true"):
+            self.sistema.gerenciador.adicionar_plantio_lote(areas)
+        return 200, areas if lote else areas[0]
+
+    def _cultura(self, item: Dict[str, Any]) -> Optional[str]:
+        """Cultura do item: "cultura" ou o tipo da "fazenda" informada"""
+        cultura = _texto_opcional(item, "cultura")
+        if cultura is not None:
+            return cultura
+        fazenda = _texto_opcional(item, "fazenda")
+        if fazenda is not None:
+            cultura = self.sistema.fazenda_data.tipo_cultura(fazenda)
+            if cultura is None:
+                raise ErroAPI(400, f"fazenda desconhecida: {fazenda}")
+            return cultura
+        return None
+
+    def calcular_insumos(self, parametros: Dict[str, str], corpo: Any, **_) -> tuple:
+        """Corretivos, fertilizantes e defensivos no formato dos registros "completo"
+
+        Cada item tem hectares, quantidade (padrão "media") e, opcionalmente,
+        cultura ou fazenda. Listas são calculadas com calcular_todos_lote,
+        uma chamada por cultura.
+        """
+        itens, lote = _lista(corpo)
+        calc = self.sistema.calc_insumos
+        por_cultura: Dict[Optional[str], List[int]] = {}
+        hectares, quantidades = [], []
+        for posicao, item in enumerate(map(_objeto, itens)):
+            valor = _numero_positivo(item.get("hectares"), "hectares")
+            quantidade = item.get("quantidade") or "media"
+            if quantidade not in NIVEIS_QUANTIDADE:
+                raise ValueError(f"quantidade inválida: {quantidade}")
+            hectares.append(valor)
+            quantidades.append(quantidade)
+            por_cultura.setdefault(self._cultura(item), []).append(posicao)
+
+        registros: List[Optional[Dict[str, Any]]] = [None] * len(itens)
+        for cultura, posicoes in por_cultura.items():
+            if len(posicoes) == 1:  # um talhão: cálculos escalares, sem o custo do lote
+                posicao = posicoes[0]
+                h, quantidade = hectares[posicao], quantidades[posicao]
+                registros[posicao] = registro = {"tipo": "completo", "hectares": h, "quantidade": quantidade}
+                if cultura is not None:
+                    registro["cultura"] = cultura
+                registro["corretivos"] = calc.calcular_corretivos(h, "solo", quantidade, cultura)
+                registro["fertilizantes"] = calc.calcular_fertilizantes(h, quantidade, cultura)
+                registro["defensivos"] = calc.calcular_defensivos(h, quantidade, cultura)
+                continue
+            plano = calc.plano(cultura)
+            grupos = {"corretivos": list(plano.doses["corretivos"]),
+                      "fertilizantes": list(plano.doses["fertilizantes"]),
+                      "defensivos": ["pulverizacoes_ano", "calda_total_litros"]}
+            colunas = calc.calcular_todos_lote([hectares[p] for p in posicoes],
+                                               [quantidades[p] for p in posicoes], cultura)
+            colunas = {nome: valores.tolist() for nome, valores in colunas.items()}
+            for linha, posicao in enumerate(posicoes):
+                registro = {"tipo": "completo", "hectares": hectares[posicao], "quantidade": quantidades[posicao]}
+                if cultura is not None:
+                    registro["cultura"] = cultura
+                for grupo, nomes in grupos.items():
+                    registro[grupo] = {nome: colunas[nome][linha] for nome in nomes}
+                registros[posicao] = registro
+        for registro in registros:
+            _conferir_finitos(registro)
+        if parametros.get("salvar") in ("1", "true"):
+            self.sistema.gerenciador.adicionar_insumos_lote(registros)
+        return 200, registros if lote else registros[0]
+
+    def listar(self, colecao: str, parametros: Dict[str, str], **_) -> Any:
+        """Página de registros ({"registros": [...], "proximo": cursor}) ou,
+        com ?formato=ndjson, todos os registros a partir do cursor em partes
+
+        Parâmetros: limite (até LIMITE_MAXIMO), cursor (o "proximo" da página
+        anterior), ordem (id, -id, hectares, -hectares), tipo, quantidade,
+        hectares_min e hectares_max (ver fiap_farm_consulta).
+        """
+        gerenciador = self.sistema.gerenciador
+        filtros = {campo: parametros[campo] for campo in ("tipo", "quantidade") if campo in parametros}
+        for campo in ("hectares_min", "hectares_max"):
+            if campo in parametros:
+                filtros[campo] = float(parametros[campo])
+        ordem, cursor = parametros.get("ordem", "id"), parametros.get("cursor") or None
+        formato = parametros.get("formato", "json")
+        if formato == "ndjson":
+            consultar = gerenciador.consultar_plantio if colecao == "plantio" else gerenciador.consultar_insumos
+            return Streaming(TIPOS_EXPORTACAO["ndjson"], _linhas_ndjson(consultar(ordem, cursor, **filtros)))
+        if formato != "json":
+            raise ErroAPI(400, f"formato inválido: {formato}")
+        limite = int(parametros.get("limite", LIMITE_PADRAO))
+        if not 1 <= limite <= LIMITE_MAXIMO:
+            raise ErroAPI(400, f"limite deve estar entre 1 e {LIMITE_MAXIMO}")
+        paginar = gerenciador.pagina_plantio if colecao == "plantio" else gerenciador.pagina_insumos
+        pagina = paginar(limite, cursor, ordem, **filtros)
+        return 200, {"registros": pagina.registros, "proximo": pagina.proximo}
+
+    def criar(self, colecao: str, corpo: Any, **_) -> tuple:
+        """Cria um registro ({"id": n}) ou uma lista deles ({"ids": [...]})
+
+        Os registros são validados (_validar_registro) antes de qualquer inclusão.
+        """
+        itens, lote = _lista(corpo)
+        registros = [_validar_registro(colecao, dict(_objeto(item))) for item in itens]
+        gerenciador = self.sistema.gerenciador
+        if colecao == "plantio":
+            ids = gerenciador.adicionar_plantio_lote(registros)
+        else:
+            ids = gerenciador.adicionar_insumos_lote(registros)
+        return 201, {"ids": ids} if lote else {"id": ids[0]}
+
+    def obter(self, colecao: str, id_registro: int, **_) -> tuple:
+        gerenciador = self.sistema.gerenciador
+        registro = gerenciador.obter_plantio(id_registro) if colecao == "plantio" else gerenciador.obter_insumos(id_registro)
+        if registro is None:
+            raise ErroAPI(404, f"{colecao} {id_registro} não encontrado")
+        return 200, registro
+
+    def atualizar(self, colecao: str, id_registro: int, corpo: Any, **_) -> tuple:
+        """Substitui o registro (mantendo o id) e retorna o registro novo"""
+        gerenciador = self.sistema.gerenciador
+        dados = _validar_registro(colecao, dict(_objeto(corpo)))
+        if colecao == "plantio":
+            atualizado = gerenciador.atualizar_plantio_por_id(id_registro, dados)
+        else:
+            atualizado = gerenciador.atualizar_insumos_por_id(id_registro, dados)
+        if not atualizado:
+            raise ErroAPI(404, f"{colecao} {id_registro} não encontrado")
+        return self.obter(colecao, id_registro)
+
+    def deletar(self, colecao: str, id_registro: int, **_) -> tuple:
+        gerenciador = self.sistema.gerenciador
+        if colecao == "plantio":
+            deletado = gerenciador.deletar_plantio_por_id(id_registro)
+        else:
+            deletado = gerenciador.deletar_insumos_por_id(id_registro)
+        if not deletado:
+            raise ErroAPI(404, f"{colecao} {id_registro} não encontrado")
+        return 204, None
+
+    def resumo(self, **_) -> tuple:
+        """Registros e hectares por tipo, como no resumo geral do menu"""
+        gerenciador = self.sistema.gerenciador
+        return 200, {
+            "plantio": {tipo: {"registros": registros, "area_ha": area}
+                        for tipo, (registros, area) in gerenciador.resumo_plantio().items()},
+            "insumos": {tipo: {"registros": registros, "hectares": hectares}
+                        for tipo, (registros, hectares) in gerenciador.resumo_insumos().items()},
+        }
+
+    def exportar(self, parametros: Dict[str, str], **_) -> Streaming:
+        """Mesmo conteúdo de exportar_dados, enviado em partes"""
+        modo = parametros.get("modo", "indentado")
+        if modo not in MODOS_EXPORTACAO:
+            raise ErroAPI(400, f"modo de exportação inválido: {modo}")
+        gerenciador = self.sistema.gerenciador
+        partes = gerar_exportacao(self.sistema.fazenda_data.fazendas, gerenciador.consultar_plantio(),
+                                  gerenciador.consultar_insumos(), modo)
+        return Streaming(TIPOS_EXPORTACAO[modo], _agrupar_partes(partes))
+
+    def metricas(self, parametros: Dict[str, str], **_) -> Any:
+        """Métricas de instrumentação (vazias se FIAP_FARM_METRICAS não estiver ativa)"""
+        if parametros.get("formato") == "json":
+            return 200, REGISTRO.como_dict()
+        return Streaming(TIPO_PROMETHEUS, iter([REGISTRO.prometheus()]))
+
+
+# ----------------------------------------------------------------------
+# Teste de carga
+# ----------------------------------------------------------------------
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil p (0-100) de uma lista ordenada, pelo posto mais próximo"""
+    if not ordenados:
+        return float("nan")
+    posicao = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[posicao]
+
+
+async def teste_carga(url: str, requisicoes: int = 10_000, concorrencia: int = 64, metodo: str = "GET",
+                      corpo: Any = None, aquecimento: int = 100) -> Dict[str, float]:
+    """Dispara `requisicoes` em `concorrencia` conexões keep-alive e mede latências
+
+    `corpo` (qualquer valor JSON) é enviado em cada requisição. Retorna
+    requisições por segundo, latências p50/p90/p99/máxima em milissegundos
+    e o número de respostas com status de erro (>= 400).
+    """
+    dados = _codificar(corpo).encode("utf-8") if corpo is not None else b""
+    cabecalhos = {"Content-Type": TIPO_JSON} if dados else None
+    latencias: List[float] = []
+    erros = 0
+    restantes = requisicoes
+
+    async with ClienteHTTP(conexoes_por_host=concorrencia, tempo_limite=30.0) as cliente:
+        await asyncio.gather(*(cliente.requisitar(metodo, url, dados, cabecalhos)
+                               for _ in range(min(aquecimento, requisicoes))))
+
+        async def trabalhador():
+            nonlocal restantes, erros
+            relogio = time.perf_counter
+            while restantes > 0:
+                restantes -= 1
+                inicio = relogio()
+                retorno = await cliente.requisitar(metodo, url, dados, cabecalhos)
+                latencias.append(relogio() - inicio)
+                if retorno.status >= 400:
+                    erros += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+        segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "requisicoes": len(latencias),
+        "segundos": segundos,
+        "por_segundo": len(latencias) / segundos if segundos else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p90_ms": percentil(latencias, 90) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": latencias[-1] * 1000 if latencias else float("nan"),
+        "erros": erros,
+    }
+
+
+async def _servir(sistema: FiapFarmSystem, host: str, porta: int) -> None:
+    async with ServidorAPI(sistema, host, porta) as servidor:
+        print(f"API FIAP Farm em {servidor.url}", flush=True)
+        await servidor.servir()
+
+
+def _main_carga(argumentos: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="fiap_farm_api.py carga", description="Teste de carga da API")
+    parser.add_argument("--url", required=True, help="endpoint (ex.: http://127.0.0.1:8080/fazendas)")
+    parser.add_argument("--metodo", default="GET")
+    parser.add_argument("--corpo", help="corpo JSON enviado em cada requisição")
+    parser.add_argument("--requisicoes", type=int, default=10_000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    args = parser.parse_args(argumentos)
+
+    corpo = json.loads(args.corpo) if args.corpo else None
+    resultado = asyncio.run(teste_carga(args.url, args.requisicoes, args.concorrencia, args.metodo.upper(), corpo))
+    print(f"{resultado['requisicoes']:,} requisições em {resultado['segundos']:.2f} s "
+          f"({resultado['por_segundo']:,.0f}/s), {resultado['erros']:,} com erro")
+    print(f"latência (ms): p50 {resultado['p50_ms']:.2f} | p90 {resultado['p90_ms']:.2f} | "
+          f"p99 {resultado['p99_ms']:.2f} | máx {resultado['max_ms']:.2f}")
+    return 1 if resultado["erros"] else 0
+
+
+def main_api(argumentos: Optional[List[str]] = None) -> int:
+    """Ponto de entrada de `python fiap_farm.py api` (e `fiap_farm_api.py carga`)"""
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    if argumentos and argumentos[0] == "carga":
+        return _main_carga(argumentos[1:])
+
+    parser = argparse.ArgumentParser(prog="fiap_farm.py api", description="API HTTP/JSON do FIAP Farm")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080, help="porta (0 escolhe uma livre)")
+    parser.add_argument("--catalogo", default=os.environ.get("FIAP_FARM_CATALOGO"),
+                        help="catálogo agronômico JSON/TOML (recarregado se mudar)")
+    args = parser.parse_args(argumentos)
+
+    # Mesmas variáveis de ambiente do modo interativo (FIAP_FARM_DADOS, FIAP_FARM_SQLITE,
+    # FIAP_FARM_METRICAS, FIAP_FARM_PERFIL)
+    configurar_ambiente()
+    banco = os.environ.get("FIAP_FARM_SQLITE")
+    sistema = FiapFarmSystem(diretorio_dados=os.environ.get("FIAP_FARM_DADOS"),
+                             gerenciador=gerenciador_sqlite(banco) if banco else None, catalogo=args.catalogo)
+    try:
+        asyncio.run(_servir(sistema, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sistema.encerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_api())
@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Armazenamento de Registros
+FarmTech Solutions
+
+Estruturas de armazenamento usadas pelo GerenciadorDados: registros indexados
+por id estável, com busca, atualização e remoção em O(1), e um armazém
+colunar compacto para grandes volumes de dados de plantio.
+"""
+
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping
+from enum import IntEnum
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class SomaExata:
+    """Soma de floats que aceita inclusões e remoções sem acumular erro
+
+    Mantém a soma como uma lista de parciais sem sobreposição (algoritmo de
+    Shewchuk, o mesmo do math.fsum); o valor é sempre o arredondamento
+    correto da soma exata, então bate com math.fsum dos valores atuais.
+    """
+
+    __slots__ = ("_parciais",)
+
+    def __init__(self):
+        self._parciais: List[float] = []
+
+    def adicionar(self, x: float) -> None:
+        parciais = self._parciais
+        i = 0
+        for y in parciais:
+            if abs(x) < abs(y):
+                x, y = y, x
+            alto = x + y
+            baixo = y - (alto - x)
+            if baixo:
+                parciais[i] = baixo
+                i += 1
+            x = alto
+        parciais[i:] = [x]
+
+    def valor(self) -> float:
+        return math.fsum(self._parciais)
+
+
+class Agregados:
+    """Agregados corridos por tipo e por quantidade: (registros, soma de hectares)
+
+    Atualizados a cada inclusão/remoção, então o resumo dos dados é O(1)
+    em relação ao número de registros.
+    """
+
+    CAMPOS = ("tipo", "quantidade")
+
+    def __init__(self):
+        self._grupos: Dict[str, Dict[Any, list]] = {campo: {} for campo in self.CAMPOS}
+
+    @staticmethod
+    def _hectares(valor: Any) -> float:
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor):
+            return float(valor)
+        return 0.0
+
+    def adicionar(self, tipo: Any, quantidade: Any, hectares: Any, sinal: int = 1) -> None:
+        """Inclui (sinal=1) ou retira (sinal=-1) um registro dos agregados"""
+        hectares = self._hectares(hectares)
+        for campo, valor in (("tipo", tipo), ("quantidade", quantidade)):
+            if campo == "quantidade" and valor is None:
+                continue
+            grupos = self._grupos[campo]
+            grupo = grupos.get(valor)
+            if grupo is None:
+                grupo = grupos[valor] = [0, SomaExata()]
+            grupo[0] += sinal
+            grupo[1].adicionar(sinal * hectares)
+            if grupo[0] == 0:
+                del grupos[valor]
+
+    def remover(self, tipo: Any, quantidade: Any, hectares: Any) -> None:
+        self.adicionar(tipo, quantidade, hectares, sinal=-1)
+
+    def por(self, campo: str) -> Dict[Any, tuple]:
+        """Retorna {valor: (registros, soma de hectares)} para o campo"""
+        if campo not in self._grupos:
+            raise KeyError(f"Campo sem agregados: {campo}")
+        return {valor: (registros, soma.valor()) for valor, (registros, soma) in self._grupos[campo].items()}
+
+
+def recalcular_agregados(armazem) -> Agregados:
+    """Recalcula os agregados de um armazém percorrendo todos os registros"""
+    agregados = Agregados()
+    for dados in armazem:
+        agregados.adicionar(dados.get("tipo"), dados.get("quantidade"), dados.get(armazem.campo_hectares))
+    return agregados
+
+
+def verificar_agregados(armazem) -> bool:
+    """Confere os agregados do armazém com um recálculo completo
+
+    Contagens devem ser iguais; somas também, a menos do arredondamento de
+    bancos que somam em ponto flutuante simples (SUM/TOTAL do SQLite).
+    """
+    recalculados = recalcular_agregados(armazem)
+    for campo in Agregados.CAMPOS:
+        atuais, esperados = armazem.agregados_por(campo), recalculados.por(campo)
+        if atuais.keys() != esperados.keys():
+            return False
+        for valor, (registros, soma) in esperados.items():
+            if atuais[valor][0] != registros or not math.isclose(atuais[valor][1], soma, rel_tol=1e-9, abs_tol=1e-9):
+                return False
+    return True
+
+
+class ArmazemRegistros:
+    """Armazena registros (dicionários) por id estável e crescente
+
+    Os ids nunca são reutilizados, mesmo após remoções. Além do índice
+    primário por id, mantém índices secundários pelos campos informados
+    (por padrão "tipo" e "quantidade"), usados nas buscas por valor.
+    `campo_hectares` é o campo somado nos agregados por tipo ("area_ha"
+    para plantio, "hectares" para insumos).
+
+    Os ids também ficam em um array ordenado (`_ids`), usado para retomar a
+    leitura a partir de um id (paginação por cursor) em O(log n). Remoções
+    deixam o id no array até a próxima compactação.
+
+    O dicionário e os índices seguem a ordem de inserção, que é a ordem de
+    id. Um inserir_com_id com id menor que o maior existente (reaplicação do
+    diário) marca o armazém como fora de ordem, e a ordem é refeita uma vez
+    na próxima leitura ordenada.
+    """
+
+    def __init__(self, campos_indexados: Iterable[str] = ("tipo", "quantidade"),
+                 campo_hectares: str = "hectares"):
+        self.campo_hectares = campo_hectares
+        self._registros: Dict[int, Dict[str, Any]] = {}
+        self._ids = array("q")
+        self._removidos = 0
+        self._fora_de_ordem = False
+        self._agregados = Agregados()
+        self._proximo_id = 1
+        # campo -> valor -> ids (dict usado como conjunto ordenado por id)
+        self._indices: Dict[str, Dict[Any, Dict[int, None]]] = {
+            campo: {} for campo in campos_indexados
+        }
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def __contains__(self, id_registro: int) -> bool:
+        return id_registro in self._registros
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Percorre os registros em ordem crescente de id"""
+        if self._fora_de_ordem:
+            self._reordenar()
+        return iter(self._registros.values())
+
+    def _reordenar(self) -> None:
+        """Refaz a ordem de id do dicionário e dos índices (O(n log n))"""
+        registros = self._registros
+        self._registros = {id_registro: registros[id_registro] for id_registro in sorted(registros)}
+        for indice in self._indices.values():
+            for valor, ids in indice.items():
+                indice[valor] = dict.fromkeys(sorted(ids))
+        self._fora_de_ordem = False
+
+    @property
+    def proximo_id(self) -> int:
+        """Id que será atribuído ao próximo registro inserido"""
+        return self._proximo_id
+
+    def _indexar(self, id_registro: int, dados: Dict[str, Any]) -> None:
+        for campo, indice in self._indices.items():
+            if campo in dados:
+                indice.setdefault(dados[campo], {})[id_registro] = None
+        self._agregados.adicionar(dados.get("tipo"), dados.get("quantidade"), dados.get(self.campo_hectares))
+
+    def _desindexar(self, id_registro: int, dados: Dict[str, Any]) -> None:
+        self._agregados.remover(dados.get("tipo"), dados.get("quantidade"), dados.get(self.campo_hectares))
+        for campo, indice in self._indices.items():
+            if campo in dados:
+                ids = indice.get(dados[campo])
+                if ids is not None:
+                    ids.pop(id_registro, None)
+                    if not ids:
+                        del indice[dados[campo]]
+
+    def inserir(self, dados: Dict[str, Any]) -> int:
+        """Insere um registro e retorna o id atribuído"""
+        id_registro = self._proximo_id
+        self._proximo_id += 1
+        dados['id'] = id_registro
+        self._registros[id_registro] = dados
+        self._ids.append(id_registro)
+        self._indexar(id_registro, dados)
+        return id_registro
+
+    def inserir_lote(self, registros: Iterable[Dict[str, Any]]) -> List[int]:
+        """Insere vários registros e retorna os ids atribuídos"""
+        return [self.inserir(dados) for dados in registros]
+
+    def inserir_com_id(self, id_registro: int, dados: Dict[str, Any]) -> None:
+        """Insere um registro com id já conhecido (recuperação de dados salvos)
+
+        Nos arquivos salvos os ids chegam em ordem crescente; um id menor (um
+        registro removido que volta na reaplicação do diário) é aceito e a
+        ordem de id é refeita na próxima leitura.
+        """
+        if id_registro in self._registros:
+            raise ValueError(f"Id já existe: {id_registro}")
+        dados['id'] = id_registro
+        self._registros[id_registro] = dados
+        if not self._ids or id_registro > self._ids[-1]:
+            self._ids.append(id_registro)
+        else:
+            self._fora_de_ordem = self._fora_de_ordem or id_registro < self._ids[-1]
+            if self._ids[bisect_left(self._ids, id_registro)] != id_registro:
+                insort(self._ids, id_registro)
+            else:
+                self._removidos -= 1  # id removido que voltou: a entrada do array é reaproveitada
+        self._indexar(id_registro, dados)
+        self._proximo_id = max(self._proximo_id, id_registro + 1)
+
+    def avancar_proximo_id(self, proximo_id: int) -> None:
+        """Garante que ids anteriores a `proximo_id` não sejam reutilizados"""
+        self._proximo_id = max(self._proximo_id, proximo_id)
+
+    def obter(self, id_registro: int) -> Optional[Dict[str, Any]]:
+        """Retorna o registro com o id informado (ou None)"""
+        return self._registros.get(id_registro)
+
+    def atualizar(self, id_registro: int, dados: Dict[str, Any]) -> bool:
+        """Substitui o registro com o id informado, mantendo o id"""
+        atual = self._registros.get(id_registro)
+        if atual is None:
+            return False
+        self._desindexar(id_registro, atual)
+        dados['id'] = id_registro
+        self._registros[id_registro] = dados
+        self._indexar(id_registro, dados)
+        return True
+
+    def remover(self, id_registro: int) -> bool:
+        """Remove o registro com o id informado"""
+        atual = self._registros.pop(id_registro, None)
+        if atual is None:
+            return False
+        self._desindexar(id_registro, atual)
+        self._removidos += 1
+        if self._removidos > len(self._ids) // 2:
+            self._ids = array("q", sorted(self._registros))
+            self._removidos = 0
+        return True
+
+    def iterar_desde(self, apos_id: int = 0, decrescente: bool = False,
+                     bloco: int = 1024) -> Iterator[Dict[str, Any]]:
+        """Percorre os registros a partir do id seguinte a `apos_id`
+
+        Em ordem crescente (ou decrescente, com apos_id=0 começando do
+        maior id). A posição é procurada de novo a cada `bloco` registros,
+        então inclusões e remoções entre os blocos não interrompem a leitura.
+        """
+        registros = self._registros
+        while True:
+            ids = self._ids
+            if decrescente:
+                fim = bisect_left(ids, apos_id) if apos_id else len(ids)
+                candidatos = ids[max(0, fim - bloco):fim][::-1]
+            else:
+                inicio = bisect_right(ids, apos_id)
+                candidatos = ids[inicio:inicio + bloco]
+            if not candidatos:
+                return
+            for id_registro in candidatos:
+                dados = registros.get(id_registro)
+                if dados is not None:
+                    yield dados
+            apos_id = candidatos[-1]
+
+    def id_na_posicao(self, posicao: int) -> Optional[int]:
+        """Retorna o id do registro na posição informada (O(posição))
+
+        Mantido para compatibilidade com a interface por índice do menu.
+        """
+        if 0 <= posicao < len(self._registros):
+            if self._fora_de_ordem:
+                self._reordenar()
+            return next(islice(self._registros, posicao, None))
+        return None
+
+    def ids_por(self, campo: str, valor: Any) -> List[int]:
+        """Retorna os ids dos registros cujo campo indexado tem o valor"""
+        if campo not in self._indices:
+            raise KeyError(f"Campo não indexado: {campo}")
+        if self._fora_de_ordem:
+            self._reordenar()
+        return list(self._indices[campo].get(valor, ()))
+
+    def contagem_por(self, campo: str) -> Dict[Any, int]:
+        """Retorna quantos registros existem para cada valor do campo indexado"""
+        if campo not in self._indices:
+            raise KeyError(f"Campo não indexado: {campo}")
+        return {valor: len(ids) for valor, ids in self._indices[campo].items()}
+
+    def agregados_por(self, campo: str = "tipo") -> Dict[Any, tuple]:
+        """Retorna {valor: (registros, soma de hectares)} dos agregados corridos"""
+        return self._agregados.por(campo)
+
+    def bytes_por_registro(self) -> float:
+        """Estima a memória ocupada por registro (dicionários, valores e índices)"""
+        if not self._registros:
+            return 0.0
+        total = sys.getsizeof(self._registros)
+        for dados in self._registros.values():
+            total += sys.getsizeof(dados) + sum(sys.getsizeof(v) for v in dados.values())
+        for indice in self._indices.values():
+            total += sys.getsizeof(indice) + sum(sys.getsizeof(ids) for ids in indice.values())
+        total += sys.getsizeof(self._ids)
+        return total / len(self._registros)
+
+
+class TipoPlantio(IntEnum):
+    """Códigos de tipo usados na coluna "tipo" do armazém colunar"""
+    QUADRADO = 0
+    RETANGULO = 1
+    OUTRO = 2  # registro guardado inteiro em `extras`
+
+
+REMOVIDO = -1
+
+# Campos guardados nas colunas, por tipo (os demais vão para `extras`)
+_CAMPOS_TIPO = {
+    TipoPlantio.QUADRADO: ("tipo", "lado", "area_m2", "area_ha"),
+    TipoPlantio.RETANGULO: ("tipo", "largura", "altura", "area_m2", "area_ha"),
+}
+
+
+class RegistroPlantio(Mapping):
+    """Visão de uma linha do ArmazemPlantioColunar que se comporta como dict
+
+    Não copia dados: cada acesso lê as colunas do armazém.
+    """
+
+    __slots__ = ("_armazem", "_id")
+
+    def __init__(self, armazem: "ArmazemPlantioColunar", id_registro: int):
+        self._armazem = armazem
+        self._id = id_registro
+
+    def __getitem__(self, chave: str) -> Any:
+        return self._armazem._valor(self._id, chave)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._armazem._chaves(self._id))
+
+    def __len__(self) -> int:
+        return len(self._armazem._chaves(self._id))
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ArmazemPlantioColunar:
+    """Armazém colunar para dados de plantio
+
+    Cada campo fica em uma coluna tipada (`array`): o tipo em um código de
+    1 byte (TipoPlantio) e as dimensões/áreas em float64. O id é implícito
+    (linha = id - 1) e remoções apenas marcam a linha como removida, então
+    get/update/delete por id continuam O(1) sem um dicionário de ids.
+    Campos fora do esquema ficam no dicionário esparso `extras`.
+
+    Oferece a mesma interface de ArmazemRegistros; os registros são
+    devolvidos como RegistroPlantio (visões que se comportam como dict).
+    """
+
+    campo_hectares = "area_ha"
+
+    def __init__(self):
+        self.tipo = array("b")
+        self.dim1 = array("d")  # lado (quadrado) ou largura (retângulo)
+        self.dim2 = array("d")  # altura (retângulo); NaN para quadrados
+        self.area_m2 = array("d")
+        self.area_ha = array("d")
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self._vivos = 0
+        self._contagem = [0] * len(TipoPlantio)
+        self._agregados = Agregados()
+
+    def __len__(self) -> int:
+        return self._vivos
+
+    def __contains__(self, id_registro: int) -> bool:
+        return 1 <= id_registro <= len(self.tipo) and self.tipo[id_registro - 1] != REMOVIDO
+
+    def __iter__(self) -> Iterator[RegistroPlantio]:
+        """Percorre os registros em ordem crescente de id"""
+        for linha, codigo in enumerate(self.tipo):
+            if codigo != REMOVIDO:
+                yield RegistroPlantio(self, linha + 1)
+
+    @property
+    def proximo_id(self) -> int:
+        """Id que será atribuído ao próximo registro inserido"""
+        return len(self.tipo) + 1
+
+    def iterar_desde(self, apos_id: int = 0, decrescente: bool = False) -> Iterator[RegistroPlantio]:
+        """Percorre os registros a partir do id seguinte a `apos_id` (linha = id - 1)
+
+        Em ordem decrescente, apos_id=0 começa do maior id.
+        """
+        if decrescente:
+            linhas = range(min(apos_id - 1 if apos_id else len(self.tipo), len(self.tipo)) - 1, -1, -1)
+        else:
+            linhas = range(max(apos_id, 0), len(self.tipo))
+        tipo = self.tipo
+        for linha in linhas:
+            if tipo[linha] != REMOVIDO:
+                yield RegistroPlantio(self, linha + 1)
+
+    @staticmethod
+    def _codificar(dados: Dict[str, Any]) -> tuple:
+        """Converte um registro em (código, dim1, dim2, area_m2, area_ha, extras)"""
+        tipo = dados.get("tipo")
+        codigo = TipoPlantio.QUADRADO if tipo == "quadrado" else (
+            TipoPlantio.RETANGULO if tipo == "retangulo" else TipoPlantio.OUTRO)
+        if codigo == TipoPlantio.OUTRO or "area_m2" not in dados or "area_ha" not in dados:
+            extras = {k: v for k, v in dados.items() if k != "id"}
+            return TipoPlantio.OUTRO, math.nan, math.nan, math.nan, math.nan, extras
+        try:
+            if codigo == TipoPlantio.QUADRADO:
+                dim1, dim2 = float(dados["lado"]), math.nan
+            else:
+                dim1, dim2 = float(dados["largura"]), float(dados["altura"])
+            area_m2, area_ha = float(dados["area_m2"]), float(dados["area_ha"])
+        except (KeyError, TypeError, ValueError):
+            extras = {k: v for k, v in dados.items() if k != "id"}
+            return TipoPlantio.OUTRO, math.nan, math.nan, math.nan, math.nan, extras
+        campos = _CAMPOS_TIPO[codigo]
+        extras = {k: v for k, v in dados.items() if k not in campos and k != "id"}
+        return codigo, dim1, dim2, area_m2, area_ha, extras
+
+    def _agregar(self, linha: int, sinal: int) -> None:
+        """Inclui ou retira a linha dos agregados corridos"""
+        extras = self.extras.get(linha + 1, {})
+        codigo = self.tipo[linha]
+        if codigo == TipoPlantio.OUTRO:
+            tipo, area_ha = extras.get("tipo"), extras.get("area_ha")
+        else:
+            tipo = "quadrado" if codigo == TipoPlantio.QUADRADO else "retangulo"
+            area_ha = self.area_ha[linha]
+        self._agregados.adicionar(tipo, extras.get("quantidade"), area_ha, sinal)
+
+    def _gravar(self, linha: int, dados: Dict[str, Any]) -> None:
+        codigo, dim1, dim2, area_m2, area_ha, extras = self._codificar(dados)
+        self.tipo[linha] = codigo
+        self.dim1[linha] = dim1
+        self.dim2[linha] = dim2
+        self.area_m2[linha] = area_m2
+        self.area_ha[linha] = area_ha
+        self._contagem[codigo] += 1
+        if extras:
+            self.extras[linha + 1] = extras
+        else:
+            self.extras.pop(linha + 1, None)
+        self._agregar(linha, 1)
+
+    def _apagar(self, linha: int) -> None:
+        self._agregar(linha, -1)
+        self._contagem[self.tipo[linha]] -= 1
+        self.tipo[linha] = REMOVIDO
+        self.extras.pop(linha + 1, None)
+
+    def _nova_linha(self) -> int:
+        self.tipo.append(REMOVIDO)
+        for coluna in (self.dim1, self.dim2, self.area_m2, self.area_ha):
+            coluna.append(math.nan)
+        return len(self.tipo) - 1
+
+    def inserir(self, dados: Dict[str, Any]) -> int:
+        """Insere um registro e retorna o id atribuído"""
+        linha = self._nova_linha()
+        self._gravar(linha, dados)
+        self._vivos += 1
+        dados['id'] = linha + 1
+        return linha + 1
+
+    def inserir_lote(self, registros: Iterable[Dict[str, Any]]) -> List[int]:
+        """Insere vários registros e retorna os ids atribuídos"""
+        return [self.inserir(dados) for dados in registros]
+
+    def inserir_com_id(self, id_registro: int, dados: Dict[str, Any]) -> None:
+        """Insere um registro com id já conhecido (recuperação de dados salvos)"""
+        if id_registro in self:
+            raise ValueError(f"Id já existe: {id_registro}")
+        self.avancar_proximo_id(id_registro + 1)
+        self._gravar(id_registro - 1, dados)
+        self._vivos += 1
+        dados['id'] = id_registro
+
+    def avancar_proximo_id(self, proximo_id: int) -> None:
+        """Garante que ids anteriores a `proximo_id` não sejam reutilizados
+
+        As linhas intermediárias entram como removidas.
+        """
+        while len(self.tipo) < proximo_id - 1:
+            self._nova_linha()
+
+    def obter(self, id_registro: int) -> Optional[RegistroPlantio]:
+        """Retorna a visão do registro com o id informado (ou None)"""
+        return RegistroPlantio(self, id_registro) if id_registro in self else None
+
+    def atualizar(self, id_registro: int, dados: Dict[str, Any]) -> bool:
+        """Substitui o registro com o id informado, mantendo o id"""
+        if id_registro not in self:
+            return False
+        self._apagar(id_registro - 1)
+        self._gravar(id_registro - 1, dados)
+        dados['id'] = id_registro
+        return True
+
+    def remover(self, id_registro: int) -> bool:
+        """Marca o registro com o id informado como removido"""
+        if id_registro not in self:
+            return False
+        self._apagar(id_registro - 1)
+        self._vivos -= 1
+        return True
+
+    def id_na_posicao(self, posicao: int) -> Optional[int]:
+        """Retorna o id do registro na posição informada (O(n))"""
+        if not 0 <= posicao < self._vivos:
+            return None
+        for linha, codigo in enumerate(self.tipo):
+            if codigo != REMOVIDO:
+                if posicao == 0:
+                    return linha + 1
+                posicao -= 1
+        return None
+
+    def ids_por(self, campo: str, valor: Any) -> List[int]:
+        """Retorna os ids dos registros cujo campo tem o valor (varredura da coluna)"""
+        if campo != "tipo":
+            return [i for i, dados in self.extras.items() if dados.get(campo) == valor]
+        if valor in ("quadrado", "retangulo"):
+            codigo = TipoPlantio.QUADRADO if valor == "quadrado" else TipoPlantio.RETANGULO
+            return [linha + 1 for linha, c in enumerate(self.tipo) if c == codigo]
+        return [i for i, dados in self.extras.items()
+                if self.tipo[i - 1] == TipoPlantio.OUTRO and dados.get("tipo") == valor]
+
+    def contagem_por(self, campo: str) -> Dict[Any, int]:
+        """Retorna quantos registros existem para cada valor do campo"""
+        contagem: Dict[Any, int] = {}
+        if campo == "tipo":
+            for nome, codigo in (("quadrado", TipoPlantio.QUADRADO), ("retangulo", TipoPlantio.RETANGULO)):
+                if self._contagem[codigo]:
+                    contagem[nome] = self._contagem[codigo]
+        for i, dados in self.extras.items():
+            if campo in dados and (campo != "tipo" or self.tipo[i - 1] == TipoPlantio.OUTRO):
+                contagem[dados[campo]] = contagem.get(dados[campo], 0) + 1
+        return contagem
+
+    def agregados_por(self, campo: str = "tipo") -> Dict[Any, tuple]:
+        """Retorna {valor: (registros, soma de area_ha)} dos agregados corridos"""
+        return self._agregados.por(campo)
+
+    def _chaves(self, id_registro: int) -> tuple:
+        codigo = self.tipo[id_registro - 1]
+        if codigo == REMOVIDO:
+            raise KeyError(id_registro)
+        extras = tuple(self.extras.get(id_registro, ()))
+        if codigo == TipoPlantio.OUTRO:
+            return extras + ("id",)
+        return _CAMPOS_TIPO[codigo] + extras + ("id",)
+
+    def _valor(self, id_registro: int, chave: str) -> Any:
+        linha = id_registro - 1
+        codigo = self.tipo[linha]
+        if codigo == REMOVIDO:
+            raise KeyError(chave)
+        if chave == "id":
+            return id_registro
+        if codigo != TipoPlantio.OUTRO:
+            if chave == "tipo":
+                return "quadrado" if codigo == TipoPlantio.QUADRADO else "retangulo"
+            if chave == "area_m2":
+                return self.area_m2[linha]
+            if chave == "area_ha":
+                return self.area_ha[linha]
+            if codigo == TipoPlantio.QUADRADO and chave == "lado":
+                return self.dim1[linha]
+            if codigo == TipoPlantio.RETANGULO and chave == "largura":
+                return self.dim1[linha]
+            if codigo == TipoPlantio.RETANGULO and chave == "altura":
+                return self.dim2[linha]
+        return self.extras.get(id_registro, {})[chave]
+
+    def bytes_por_registro(self) -> float:
+        """Memória ocupada por registro: colunas (com sobra de alocação) e extras"""
+        if not self._vivos:
+            return 0.0
+        total = sum(
+            coluna.buffer_info()[1] * coluna.itemsize
+            for coluna in (self.tipo, self.dim1, self.dim2, self.area_m2, self.area_ha)
+        )
+        total += sys.getsizeof(self.extras)
+        for dados in self.extras.values():
+            total += sys.getsizeof(dados) + sum(sys.getsizeof(v) for v in dados.values())
+        return total / self._vivos
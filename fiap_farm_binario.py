@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Exportação Binária Colunar
+FarmTech Solutions
+
+Exportação compacta para análise: cada campo vira um bloco de valores
+tipados, lido de volta sem interpretar texto. Layout (little-endian):
+
+- cabeçalho fixo de 64 bytes: assinatura b"FIAPCOL\\0", versão (u16),
+  reservado (u16), registros de plantio (u64), registros de insumos (u64),
+  início e tamanho do índice (u64, u64);
+- blocos de colunas, cada um começando em um múltiplo de 64 bytes:
+  ids em "<i8", códigos de categoria em "<i2" (-1: ausente) e valores em
+  "<f8" (NaN: ausente);
+- índice JSON (UTF-8) no fim: fazendas, categorias de cada coluna de
+  código e, por coluna, seção, nome, tipo e início do bloco.
+
+Plantio: id, tipo (código), lado, largura, altura, area_m2 e area_ha.
+Insumos: id, tipo e quantidade (códigos), hectares e uma coluna por produto
+(calcario, gesso, fosforo, potassio, pulverizacoes_ano,
+calda_total_litros...), inclusive os dos registros "completo". Campos de
+texto fora do esquema não entram; use a exportação JSON para eles.
+
+A escrita lê os registros um a um (as colunas vão para arquivos
+temporários), então a memória não cresce com o volume. ArquivoColunar
+abre o arquivo com mmap e devolve cada coluna como uma visão NumPy (ou
+memoryview) sobre o próprio mapa: abrir não lê os dados, e uma varredura
+completa lê só as colunas usadas, na velocidade da memória.
+"""
+
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List
+
+from fiap_farm_armazenamento import ArmazemPlantioColunar, REMOVIDO, TipoPlantio
+from fiap_farm_instrumentacao import medir
+
+# NumPy é opcional (importado no primeiro uso); sem ele as colunas são memoryviews
+from fiap_farm_opcional import np
+
+ASSINATURA = b"FIAPCOL\0"
+VERSAO = 1
+
+# Assinatura, versão, reservado, registros de plantio e de insumos, início e tamanho do índice
+CABECALHO = struct.Struct("<8sHHQQQQ")
+TAMANHO_CABECALHO = 64
+
+# Alinhamento do início de cada bloco de coluna
+ALINHAMENTO = 64
+
+# Valores acumulados por coluna antes de cada escrita no temporário
+TAMANHO_BLOCO = 65_536
+
+# Tipo de cada coluna no arquivo e o código equivalente do módulo array
+TIPOS = {"<i8": "q", "<i2": "h", "<f8": "d"}
+
+# Categorias iniciais das colunas de código (novos valores entram no fim)
+CATEGORIAS_INICIAIS = {
+    ("plantio", "tipo"): ["quadrado", "retangulo"],
+    ("insumos", "tipo"): ["corretivos", "fertilizantes", "defensivos", "completo"],
+    ("insumos", "quantidade"): ["minima", "media", "maxima"],
+}
+
+COLUNAS_PLANTIO = ("lado", "largura", "altura", "area_m2", "area_ha")
+
+# Campos dos insumos que não são quantidades de produto
+CAMPOS_INSUMOS = ("id", "tipo", "quantidade", "hectares")
+
+
+def _numero(valor: Any) -> float:
+    """Valor numérico do campo (NaN se ausente ou não numérico)"""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return math.nan
+
+
+class _Coluna:
+    """Coluna em escrita: valores em um array('X') despejados em um temporário"""
+
+    __slots__ = ("secao", "nome", "tipo", "valores", "arquivo", "n")
+
+    def __init__(self, secao: str, nome: str, tipo: str, diretorio: str, anteriores: int = 0):
+        self.secao, self.nome, self.tipo = secao, nome, tipo
+        self.valores = array(TIPOS[tipo])
+        self.arquivo = tempfile.TemporaryFile(dir=diretorio)
+        self.n = 0
+        # Coluna descoberta no meio da seção: linhas anteriores ficam ausentes
+        ausente = math.nan if tipo == "<f8" else -1
+        while anteriores:
+            parte = min(anteriores, TAMANHO_BLOCO)
+            self.acrescentar_varios(array(TIPOS[tipo], [ausente]) * parte)
+            anteriores -= parte
+
+    def acrescentar(self, valor) -> None:
+        self.valores.append(valor)
+        if len(self.valores) >= TAMANHO_BLOCO:
+            self.despejar()
+
+    def acrescentar_varios(self, valores) -> None:
+        """Acrescenta um array (ou buffer) inteiro de uma vez"""
+        self.despejar()
+        dados = valores.tobytes() if hasattr(valores, "tobytes") else bytes(valores)
+        if sys.byteorder != "little" and isinstance(valores, array):
+            copia = array(valores.typecode, valores)
+            copia.byteswap()
+            dados = copia.tobytes()
+        self.arquivo.write(dados)
+        self.n += len(valores)
+
+    def despejar(self) -> None:
+        if self.valores:
+            if sys.byteorder != "little":
+                self.valores.byteswap()
+            self.arquivo.write(self.valores.tobytes())
+            self.n += len(self.valores)
+            del self.valores[:]
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+class _Secao:
+    """Colunas de uma seção em escrita, com categorias e colunas criadas sob demanda"""
+
+    def __init__(self, nome: str, diretorio: str, categorias: Dict[str, Dict[str, int]]):
+        self.nome = nome
+        self.diretorio = diretorio
+        self.categorias = categorias
+        self.colunas: Dict[str, _Coluna] = {}
+        self.n = 0
+
+    def coluna(self, nome: str, tipo: str) -> _Coluna:
+        coluna = self.colunas.get(nome)
+        if coluna is None:
+            coluna = self.colunas[nome] = _Coluna(self.nome, nome, tipo, self.diretorio, self.n)
+        return coluna
+
+    def codigo(self, campo: str, valor: Any) -> int:
+        """Código da categoria do valor (novo código se ainda não visto)"""
+        if not isinstance(valor, str):
+            return -1
+        codigos = self.categorias.setdefault(campo, {})
+        codigo = codigos.get(valor)
+        if codigo is None:
+            if len(codigos) >= 32_767:
+                raise ValueError(f"Categorias demais em {self.nome}.{campo}")
+            codigo = codigos[valor] = len(codigos)
+        return codigo
+
+    def completar(self) -> None:
+        """Acrescenta ausente às colunas que não receberam valor na linha atual"""
+        self.n += 1
+        for coluna in self.colunas.values():
+            if coluna.n + len(coluna.valores) < self.n:
+                coluna.acrescentar(math.nan if coluna.tipo == "<f8" else -1)
+
+    def fechar(self) -> None:
+        for coluna in self.colunas.values():
+            coluna.despejar()
+
+
+def _categorias_iniciais(secao: str) -> Dict[str, Dict[str, int]]:
+    return {campo: {valor: codigo for codigo, valor in enumerate(valores)}
+            for (nome, campo), valores in CATEGORIAS_INICIAIS.items() if nome == secao}
+
+
+def _escrever_plantio(secao: _Secao, plantio: Iterable[Dict[str, Any]]) -> None:
+    secao.coluna("id", "<i8")
+    secao.coluna("tipo", "<i2")
+    for nome in COLUNAS_PLANTIO:
+        secao.coluna(nome, "<f8")
+    colunas = [secao.colunas[nome] for nome in COLUNAS_PLANTIO]
+    id_coluna, tipo_coluna = secao.colunas["id"], secao.colunas["tipo"]
+    for registro in plantio:
+        id_coluna.acrescentar(registro["id"])
+        tipo_coluna.acrescentar(secao.codigo("tipo", registro.get("tipo")))
+        for nome, coluna in zip(COLUNAS_PLANTIO, colunas):
+            coluna.acrescentar(_numero(registro.get(nome)))
+        secao.n += 1
+
+
+def _escrever_plantio_colunar(secao: _Secao, armazem: ArmazemPlantioColunar) -> None:
+    """Copia as colunas do armazém colunar direto, sem montar registros"""
+    tipo = np.frombuffer(armazem.tipo, dtype=np.int8)
+    vivos = np.flatnonzero(tipo != REMOVIDO)
+    codigos = tipo[vivos].astype("<i2")
+    dim1 = np.frombuffer(armazem.dim1, dtype=np.float64)[vivos]
+    dim2 = np.frombuffer(armazem.dim2, dtype=np.float64)[vivos]
+    quadrado, retangulo = codigos == TipoPlantio.QUADRADO, codigos == TipoPlantio.RETANGULO
+    colunas = {
+        "lado": np.where(quadrado, dim1, np.nan),
+        "largura": np.where(retangulo, dim1, np.nan),
+        "altura": np.where(retangulo, dim2, np.nan),
+        "area_m2": np.frombuffer(armazem.area_m2, dtype=np.float64)[vivos],
+        "area_ha": np.frombuffer(armazem.area_ha, dtype=np.float64)[vivos],
+    }
+    # Registros fora do esquema colunar (TipoPlantio.OUTRO) ficam inteiros em `extras`
+    for posicao in np.flatnonzero(codigos == TipoPlantio.OUTRO).tolist():
+        extras = armazem.extras.get(int(vivos[posicao]) + 1, {})
+        codigos[posicao] = secao.codigo("tipo", extras.get("tipo"))
+        for nome, valores in colunas.items():
+            valores[posicao] = _numero(extras.get(nome))
+    secao.coluna("id", "<i8").acrescentar_varios((vivos + 1).astype("<i8"))
+    secao.coluna("tipo", "<i2").acrescentar_varios(codigos)
+    for nome in COLUNAS_PLANTIO:
+        secao.coluna(nome, "<f8").acrescentar_varios(colunas[nome].astype("<f8", copy=False))
+    secao.n = len(vivos)
+
+
+def _escrever_insumos(secao: _Secao, insumos: Iterable[Dict[str, Any]]) -> None:
+    id_coluna = secao.coluna("id", "<i8")
+    tipo_coluna = secao.coluna("tipo", "<i2")
+    quantidade_coluna = secao.coluna("quantidade", "<i2")
+    hectares_coluna = secao.coluna("hectares", "<f8")
+    for registro in insumos:
+        id_coluna.acrescentar(registro["id"])
+        tipo_coluna.acrescentar(secao.codigo("tipo", registro.get("tipo")))
+        quantidade_coluna.acrescentar(secao.codigo("quantidade", registro.get("quantidade")))
+        hectares_coluna.acrescentar(_numero(registro.get("hectares")))
+        for campo, valor in registro.items():
+            if campo in CAMPOS_INSUMOS:
+                continue
+            # Registros "completo" guardam os produtos por grupo (corretivos, fertilizantes...)
+            produtos = valor.items() if isinstance(valor, dict) else ((campo, valor),)
+            for produto, quantidade in produtos:
+                numero = _numero(quantidade)
+                if numero == numero:
+                    coluna = secao.coluna(produto, "<f8")
+                    if coluna.n + len(coluna.valores) == secao.n:  # o primeiro valor do produto vale
+                        coluna.acrescentar(numero)
+        secao.completar()
+
+
+def exportar_binario(caminho: str, fazendas: Dict[str, Any], plantio: Iterable, insumos: Iterable) -> int:
+    """Exporta no formato binário colunar e retorna o número de bytes escritos
+
+    `plantio` e `insumos` são iteráveis de registros (como em exportar_dados);
+    um ArmazemPlantioColunar em `plantio` é copiado coluna a coluna. O
+    arquivo é gravado em um temporário e renomeado ao final.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    secoes = {nome: _Secao(nome, diretorio, _categorias_iniciais(nome)) for nome in ("plantio", "insumos")}
+    temporario = caminho + ".tmp"
+    with medir("exportacao.exportar_binario") as bloco:
+        try:
+            if isinstance(plantio, ArmazemPlantioColunar) and np is not None:
+                _escrever_plantio_colunar(secoes["plantio"], plantio)
+            else:
+                _escrever_plantio(secoes["plantio"], plantio)
+            _escrever_insumos(secoes["insumos"], insumos)
+            for secao in secoes.values():
+                secao.fechar()
+            tamanho = _montar_arquivo(temporario, fazendas, secoes)
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        finally:
+            for secao in secoes.values():
+                for coluna in secao.colunas.values():
+                    coluna.fechar()
+        bloco.bytes = tamanho
+    return tamanho
+
+
+def _montar_arquivo(caminho: str, fazendas: Dict[str, Any], secoes: Dict[str, _Secao]) -> int:
+    """Copia os temporários das colunas para o arquivo final e grava índice e cabeçalho"""
+    indice = {"fazendas": fazendas, "categorias": {}, "colunas": []}
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(bytes(TAMANHO_CABECALHO))
+        for secao in secoes.values():
+            indice["categorias"][secao.nome] = {campo: list(codigos) for campo, codigos in secao.categorias.items()}
+            for coluna in secao.colunas.values():
+                posicao = arquivo.tell()
+                arquivo.write(bytes(-posicao % ALINHAMENTO))
+                indice["colunas"].append({"secao": secao.nome, "nome": coluna.nome, "tipo": coluna.tipo,
+                                          "inicio": posicao + (-posicao % ALINHAMENTO)})
+                coluna.arquivo.seek(0)
+                shutil.copyfileobj(coluna.arquivo, arquivo, 1 << 20)
+        inicio_indice = arquivo.tell()
+        texto = json.dumps(indice, ensure_ascii=False, default=dict).encode("utf-8")
+        arquivo.write(texto)
+        tamanho = arquivo.tell()
+        arquivo.seek(0)
+        arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, 0, secoes["plantio"].n, secoes["insumos"].n,
+                                     inicio_indice, len(texto)))
+    return tamanho
+
+
+class ArquivoColunar:
+    """Leitura de uma exportação binária colunar por mmap
+
+    coluna(secao, nome) devolve uma visão sobre o mapa, sem cópia: um array
+    NumPy somente leitura ou, sem NumPy, uma memoryview de "q", "h" ou "d".
+    As visões continuam válidas enquanto existirem; fechar() libera o mapa
+    quando nenhuma estiver em uso (senão ele é liberado com a última).
+    """
+
+    def __init__(self, caminho: str):
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mapa) < TAMANHO_CABECALHO:
+            raise ValueError(f"{caminho}: arquivo binário incompleto")
+        assinatura, versao, _, n_plantio, n_insumos, inicio, tamanho = CABECALHO.unpack_from(self._mapa)
+        if assinatura != ASSINATURA:
+            raise ValueError(f"{caminho}: não é uma exportação binária do FIAP Farm")
+        if versao > VERSAO:
+            raise ValueError(f"{caminho}: versão {versao} do formato não suportada")
+        indice = json.loads(self._mapa[inicio:inicio + tamanho].decode("utf-8"))
+        self.caminho = caminho
+        self.fazendas: Dict[str, Any] = indice["fazendas"]
+        self.n = {"plantio": n_plantio, "insumos": n_insumos}
+        self._categorias: Dict[str, Dict[str, List[str]]] = indice["categorias"]
+        self._colunas = {(coluna["secao"], coluna["nome"]): coluna for coluna in indice["colunas"]}
+
+    def __enter__(self) -> "ArquivoColunar":
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        try:
+            self._mapa.close()
+        except BufferError:
+            pass  # ainda há visões em uso; o mapa é liberado junto com elas
+
+    def colunas(self, secao: str) -> List[str]:
+        """Nomes das colunas da seção, na ordem do arquivo"""
+        return [nome for nome_secao, nome in self._colunas if nome_secao == secao]
+
+    def coluna(self, secao: str, nome: str):
+        """Visão (sem cópia) dos valores de uma coluna"""
+        try:
+            coluna = self._colunas[(secao, nome)]
+        except KeyError:
+            raise KeyError(f"coluna inexistente: {secao}.{nome}") from None
+        n, inicio = self.n[secao], coluna["inicio"]
+        if np is not None:
+            return np.frombuffer(self._mapa, dtype=coluna["tipo"], count=n, offset=inicio)
+        codigo = TIPOS[coluna["tipo"]]
+        fim = inicio + n * array(codigo).itemsize
+        if sys.byteorder != "little":
+            valores = array(codigo, self._mapa[inicio:fim])
+            valores.byteswap()
+            return memoryview(valores)
+        return memoryview(self._mapa)[inicio:fim].cast(codigo)
+
+    def categorias(self, secao: str, nome: str) -> List[str]:
+        """Valor de cada código de uma coluna de categoria (posição = código)"""
+        return self._categorias.get(secao, {}).get(nome, [])
+
+    def registros(self, secao: str) -> Iterator[Dict[str, Any]]:
+        """Reconstrói os registros (só os campos do esquema binário)"""
+        nomes = self.colunas(secao)
+        colunas = [self.coluna(secao, nome) for nome in nomes]
+        categorias = {nome: self.categorias(secao, nome) for nome in nomes
+                      if self._colunas[(secao, nome)]["tipo"] == "<i2"}
+        for inicio in range(0, self.n[secao], TAMANHO_BLOCO):
+            blocos = [coluna[inicio:inicio + TAMANHO_BLOCO].tolist() for coluna in colunas]
+            for valores in zip(*blocos):
+                registro = {}
+                for nome, valor in zip(nomes, valores):
+                    if nome in categorias:
+                        if valor >= 0:
+                            registro[nome] = categorias[nome][valor]
+                    elif valor == valor:
+                        registro[nome] = valor
+                yield registro
+
+
+def abrir_binario(caminho: str) -> ArquivoColunar:
+    """Abre uma exportação binária colunar (ver ArquivoColunar)"""
+    return ArquivoColunar(caminho)
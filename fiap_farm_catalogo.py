@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Catálogo Agronômico
+FarmTech Solutions
+
+Fazendas, culturas e faixas de dose dos insumos lidas de um arquivo
+externo (JSON ou TOML) em vez de literais no código:
+
+    {
+      "insumos": {"fertilizantes": {"fosforo": {"min": 80, "max": 150, "unidade": "kg/ha"}}, ...},
+      "culturas": {"cana": {"nome": "Cana-de-Açúcar",
+                            "insumos": {"fertilizantes": {"fosforo": {"min": 100, "max": 180}}}}},
+      "fazendas": {"Barra Grande": {"localizacao": "Itirapuã (SP)", "tipo": "cana"}}
+    }
+
+- Catalogo: fotografia imutável do arquivo, com índices em dicionários
+  (fazenda, cultura, insumo e faixa por cultura/insumo em O(1));
+- CatalogoMonitorado: observa o mtime do arquivo e troca a fotografia
+  inteira por uma nova de uma vez (uma atribuição), então quem está no meio
+  de um cálculo continua com a versão que pegou. Um arquivo inválido não
+  derruba ninguém: a versão anterior continua valendo e o erro fica em
+  `ultimo_erro`. Para evitar ler um arquivo pela metade, grave uma cópia e
+  troque com os.replace.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+GRUPOS_INSUMOS = ("corretivos", "fertilizantes", "defensivos")
+
+# Insumos usados pelo cálculo de defensivos (calda total = calda x pulverizações)
+DEFENSIVOS_OBRIGATORIOS = ("pulverizacoes", "calda")
+
+
+def _faixa(dados: Any, onde: str, unidade_padrao: Optional[str] = None) -> Dict[str, Any]:
+    """Valida uma faixa de dose {"min", "max", "unidade"}"""
+    if not isinstance(dados, dict):
+        raise ValueError(f"{onde}: faixa deve ser um objeto com min e max")
+    try:
+        minimo, maximo = dados["min"], dados["max"]
+    except KeyError as erro:
+        raise ValueError(f"{onde}: faixa sem {erro.args[0]}") from None
+    for valor in (minimo, maximo):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not 0 <= valor < float("inf"):
+            raise ValueError(f"{onde}: dose inválida: {valor!r}")
+    if minimo > maximo:
+        raise ValueError(f"{onde}: min maior que max")
+    faixa = {"min": minimo, "max": maximo}
+    unidade = dados.get("unidade", unidade_padrao)
+    if unidade is not None:
+        faixa["unidade"] = unidade
+    return faixa
+
+
+def _tabelas(dados: Any, onde: str, gerais: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict[str, Dict]]:
+    """Valida as tabelas de insumos por grupo (herdando a unidade das gerais)"""
+    if not isinstance(dados, dict):
+        raise ValueError(f"{onde}: insumos deve ser um objeto por grupo")
+    tabelas = {}
+    for grupo, itens in dados.items():
+        if grupo not in GRUPOS_INSUMOS:
+            raise ValueError(f"{onde}: grupo de insumos inválido: {grupo}")
+        if not isinstance(itens, dict):
+            raise ValueError(f"{onde}.{grupo}: esperado um objeto por insumo")
+        base = (gerais or {}).get(grupo, {})
+        tabelas[grupo] = {
+            insumo: _faixa(faixa, f"{onde}.{grupo}.{insumo}", base.get(insumo, {}).get("unidade"))
+            for insumo, faixa in itens.items()
+        }
+    return tabelas
+
+
+class Catalogo:
+    """Fotografia imutável de um catálogo agronômico, indexada para consulta
+
+    `fazendas` tem o mesmo formato de FazendaData.fazendas (localizacao,
+    cultura, tipo e campos extras do arquivo); `culturas` mapeia o tipo da
+    cultura para {"nome", "insumos"} (os ajustes de dose da cultura);
+    `insumos` tem as tabelas gerais por grupo. Não altere os dicionários:
+    eles são compartilhados por todos que leram esta versão.
+    """
+
+    __slots__ = ("versao", "origem", "insumos", "culturas", "fazendas",
+                 "_grupos", "_faixas", "_fazendas_por_cultura")
+
+    def __init__(self, dados: Dict[str, Any], origem: Optional[str] = None, versao: int = 1):
+        if not isinstance(dados, dict):
+            raise ValueError("catálogo deve ser um objeto")
+        self.versao = versao
+        self.origem = origem
+        self.insumos = _tabelas(dados.get("insumos", {}), "insumos")
+        defensivos = self.insumos.get("defensivos")
+        if defensivos is not None:
+            for insumo in DEFENSIVOS_OBRIGATORIOS:
+                if insumo not in defensivos:
+                    raise ValueError(f"insumos.defensivos: falta {insumo}")
+
+        self.culturas = {}
+        for tipo, cultura in (dados.get("culturas") or {}).items():
+            if not isinstance(cultura, dict):
+                raise ValueError(f"culturas.{tipo}: esperado um objeto")
+            self.culturas[tipo] = {
+                "nome": cultura.get("nome", tipo),
+                "insumos": _tabelas(cultura.get("insumos", {}), f"culturas.{tipo}", self.insumos),
+            }
+
+        self.fazendas = {}
+        self._fazendas_por_cultura: Dict[str, List[str]] = {tipo: [] for tipo in self.culturas}
+        for nome, fazenda in (dados.get("fazendas") or {}).items():
+            if not isinstance(fazenda, dict) or "tipo" not in fazenda:
+                raise ValueError(f"fazendas.{nome}: informe ao menos o tipo da cultura")
+            tipo = fazenda["tipo"]
+            if tipo not in self.culturas:
+                raise ValueError(f"fazendas.{nome}: cultura desconhecida: {tipo}")
+            self.fazendas[nome] = {
+                "localizacao": fazenda.get("localizacao", ""),
+                "cultura": fazenda.get("cultura", self.culturas[tipo]["nome"]),
+                **fazenda,
+            }
+            self._fazendas_por_cultura[tipo].append(nome)
+
+        # Índices: grupo de cada insumo e faixa efetiva por (cultura, insumo);
+        # a cultura None são as tabelas gerais
+        self._grupos: Dict[str, str] = {}
+        self._faixas: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+        for tipo in (None, *self.culturas):
+            for grupo, itens in self.tabelas(tipo).items():
+                for insumo, faixa in itens.items():
+                    anterior = self._grupos.setdefault(insumo, grupo)
+                    if anterior != grupo:
+                        raise ValueError(f"insumo {insumo} aparece em {anterior} e {grupo}")
+                    self._faixas[tipo, insumo] = faixa
+
+    @property
+    def atual(self) -> "Catalogo":
+        """A própria fotografia (mesma interface de CatalogoMonitorado)"""
+        return self
+
+    def fazenda(self, nome: str) -> Optional[Dict[str, Any]]:
+        """Dados de uma fazenda pelo nome (None se não existir)"""
+        return self.fazendas.get(nome)
+
+    def cultura(self, tipo: str) -> Optional[Dict[str, Any]]:
+        """Nome e ajustes de dose de uma cultura pelo tipo"""
+        return self.culturas.get(tipo)
+
+    def fazendas_da_cultura(self, tipo: str) -> List[str]:
+        """Nomes das fazendas de uma cultura"""
+        return list(self._fazendas_por_cultura.get(tipo, ()))
+
+    def grupo_do_insumo(self, insumo: str) -> Optional[str]:
+        """Grupo (corretivos, fertilizantes, defensivos) de um insumo"""
+        return self._grupos.get(insumo)
+
+    def faixa(self, insumo: str, cultura: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Faixa de dose efetiva de um insumo para a cultura
+
+        Usa o ajuste da cultura quando houver e a tabela geral caso
+        contrário; cultura desconhecida ou None retorna a faixa geral.
+        """
+        faixa = self._faixas.get((cultura, insumo))
+        if faixa is None and cultura is not None:
+            faixa = self._faixas.get((None, insumo))
+        return faixa
+
+    def tabelas(self, cultura: Optional[str] = None) -> Dict[str, Dict[str, Dict]]:
+        """Tabelas de dose efetivas (gerais + ajustes da cultura) por grupo"""
+        ajustes = self.culturas[cultura]["insumos"] if cultura in self.culturas else {}
+        return {grupo: {**self.insumos.get(grupo, {}), **ajustes.get(grupo, {})}
+                for grupo in GRUPOS_INSUMOS if grupo in self.insumos or grupo in ajustes}
+
+    def ajustes_culturas(self) -> Dict[str, Dict[str, Dict]]:
+        """Ajustes de dose por cultura no formato de CalculadoraInsumos.culturas"""
+        return {tipo: {grupo: {insumo: dict(faixa) for insumo, faixa in itens.items()}
+                       for grupo, itens in cultura["insumos"].items()}
+                for tipo, cultura in self.culturas.items()}
+
+
+def ler_arquivo(caminho: str) -> Dict[str, Any]:
+    """Lê o conteúdo de um catálogo JSON ou TOML (pela extensão)"""
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    if caminho.endswith(".toml"):
+        # Importado só aqui: o parser de TOML pesa na inicialização de quem usa JSON
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11: TOML só com o pacote tomli instalado
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError("catálogo TOML requer Python 3.11+ ou o pacote tomli") from None
+        return tomllib.loads(conteudo.decode("utf-8"))
+    return json.loads(conteudo)
+
+
+def carregar_catalogo(caminho: str, versao: int = 1) -> Catalogo:
+    """Carrega e indexa um catálogo; levanta ValueError se for inválido"""
+    return Catalogo(ler_arquivo(caminho), origem=caminho, versao=versao)
+
+
+class CatalogoMonitorado:
+    """Catálogo recarregado quando o arquivo muda
+
+    Uso:
+        catalogo = CatalogoMonitorado("catalogo_agronomico.json")
+        catalogo.atual.fazenda("Barra Grande")
+
+    `atual` verifica o arquivo no máximo uma vez a cada `intervalo`
+    segundos; com iniciar(), uma thread faz a verificação e `atual` vira
+    uma simples leitura de atributo. Quem precisa de uma versão estável por
+    um trecho de trabalho (um bloco de um lote) guarda `atual` em uma
+    variável. Funções registradas com assinar() recebem cada nova versão.
+    """
+
+    def __init__(self, caminho: str, intervalo: float = 1.0):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.ultimo_erro: Optional[Exception] = None
+        self._trava = threading.Lock()
+        self._assinantes: List[Callable[[Catalogo], None]] = []
+        self._assinatura = self._estado_arquivo()
+        self._catalogo = carregar_catalogo(caminho)
+        self._proxima_verificacao = time.monotonic() + intervalo
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def _estado_arquivo(self) -> tuple:
+        """mtime, tamanho e inode: muda com edição no lugar ou os.replace"""
+        estado = os.stat(self.caminho)
+        return estado.st_mtime_ns, estado.st_size, estado.st_ino
+
+    @property
+    def atual(self) -> Catalogo:
+        """Versão vigente do catálogo"""
+        if self._thread is None and time.monotonic() >= self._proxima_verificacao:
+            self.verificar()
+        return self._catalogo
+
+    @property
+    def versao(self) -> int:
+        return self._catalogo.versao
+
+    def assinar(self, funcao: Callable[[Catalogo], None]) -> None:
+        """Registra uma função chamada com cada nova versão carregada"""
+        with self._trava:
+            self._assinantes.append(funcao)
+
+    def verificar(self) -> bool:
+        """Recarrega o catálogo se o arquivo mudou; retorna True se trocou"""
+        with self._trava:
+            self._proxima_verificacao = time.monotonic() + self.intervalo
+            try:
+                assinatura = self._estado_arquivo()
+            except OSError as erro:
+                self.ultimo_erro = erro
+                return False
+            if assinatura == self._assinatura:
+                return False
+            # Guarda a assinatura mesmo se falhar: o mesmo arquivo inválido
+            # não é relido a cada verificação, só depois de mudar de novo
+            self._assinatura = assinatura
+            try:
+                novo = carregar_catalogo(self.caminho, versao=self._catalogo.versao + 1)
+            except (OSError, ValueError) as erro:
+                self.ultimo_erro = erro
+                return False
+            self.ultimo_erro = None
+            self._catalogo = novo
+            assinantes = list(self._assinantes)
+        for funcao in assinantes:
+            funcao(novo)
+        return True
+
+    def iniciar(self) -> None:
+        """Verifica o arquivo em segundo plano a cada `intervalo` segundos"""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._observar, name="catalogo", daemon=True)
+        self._thread.start()
+
+    def _observar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as erro:  # um assinante com erro não para a observação
+                self.ultimo_erro = erro
+
+    def parar(self) -> None:
+        """Encerra a verificação em segundo plano"""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
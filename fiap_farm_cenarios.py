@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Varredura de Cenários de Custo
+FarmTech Solutions
+
+Custo dos insumos (calcário, gesso, fósforo, potássio, calda...) em todas
+as combinações de fazenda x nível de dose x tabela de preços x área:
+
+    python fiap_farm.py cenarios --hectares 1:500:0.5 --saida cenarios.csv
+
+- GradeCenarios: o produto cartesiano, indexado em base mista
+  (fazenda, nível, preços, hectares), com hectares variando mais rápido.
+  Um índice de 0 a len(grade) - 1 identifica um cenário, e cada trecho
+  contíguo de índices vira poucos segmentos de áreas com a mesma fazenda,
+  nível e preços, calculados de uma vez;
+- varrer_cenarios: divide os índices em partes calculadas em um
+  ProcessPoolExecutor e entrega as partes em ordem, à medida que ficam
+  prontas (no máximo 2 por processo em trânsito, memória limitada);
+- resumir_cenarios: combina as partes em um resumo por grupo (fazenda,
+  nível, preços) com quantidades, custos por insumo, custo total, custo
+  por hectare e os custos mínimo e máximo entre as áreas.
+
+As doses por hectare vêm de CalculadoraInsumos.plano (as mesmas dos
+cálculos escalares e em lote), então o custo de cada insumo é dose x
+preço x hectares. Os preços são por unidade da tabela de doses (R$ por
+tonelada, kg ou litro de calda); os de PRECOS_REFERENCIA são ilustrativos.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from fiap_farm import CalculadoraInsumos, FazendaData, NIVEIS_QUANTIDADE, CODIGOS_NIVEL
+from fiap_farm_catalogo import carregar_catalogo
+
+# NumPy é opcional (importado no primeiro uso); sem ele as partes são calculadas em Python
+from fiap_farm_opcional import np
+
+# Preço por unidade da tabela de doses (R$/t, R$/kg, R$/L de calda); valores ilustrativos
+PRECOS_REFERENCIA = {
+    "calcario": 180.0,
+    "gesso": 140.0,
+    "fosforo": 7.5,
+    "potassio": 5.8,
+    "nitrogenio": 6.2,
+    "calda_total_litros": 0.35,
+}
+
+CENARIOS_PRECO = {
+    "baixa": {insumo: round(preco * 0.85, 4) for insumo, preco in PRECOS_REFERENCIA.items()},
+    "referencia": dict(PRECOS_REFERENCIA),
+    "alta": {insumo: round(preco * 1.25, 4) for insumo, preco in PRECOS_REFERENCIA.items()},
+}
+
+# Grupos de dose com custo por hectare (as pulverizações por ano não têm preço próprio)
+GRUPOS_CUSTO = ("corretivos", "fertilizantes", "defensivos")
+
+# Cenários por parte enviada a cada processo
+TAMANHO_PARTE = 262_144
+
+FORMATOS_SAIDA = ("csv", "ndjson")
+
+# Casas decimais das áreas geradas pelas faixas inicio:fim:passo
+CASAS_FAIXA = 9
+
+
+class ParteCenarios(NamedTuple):
+    """Resultado dos cenários inicio..fim-1
+
+    `grupos` leva, por índice de grupo, (cenários, soma, mínimo e máximo dos
+    hectares); `texto` traz as linhas CSV/NDJSON dos cenários, se pedidas.
+    """
+    inicio: int
+    fim: int
+    grupos: Dict[int, tuple]
+    texto: Optional[str]
+
+
+class GradeCenarios:
+    """Produto cartesiano fazendas x níveis x preços x hectares
+
+    `fazendas` tem o formato de FazendaData.fazendas (o "tipo" escolhe as
+    doses da cultura) e `precos` mapeia o nome de cada cenário de preço aos
+    preços por insumo; insumos ausentes usam PRECOS_REFERENCIA.
+    """
+
+    def __init__(self, hectares: Sequence[float], fazendas: Optional[Dict[str, Dict[str, Any]]] = None,
+                 niveis: Sequence[str] = NIVEIS_QUANTIDADE,
+                 precos: Optional[Dict[str, Dict[str, float]]] = None,
+                 calc: Optional[CalculadoraInsumos] = None):
+        fazendas = FazendaData().fazendas if fazendas is None else fazendas
+        precos = CENARIOS_PRECO if precos is None else precos
+        calc = calc or CalculadoraInsumos()
+        for nivel in niveis:
+            if nivel not in NIVEIS_QUANTIDADE:
+                raise ValueError(f"Nível de dose inválido: {nivel}")
+        if not fazendas or not niveis or not precos:
+            raise ValueError("A grade precisa de ao menos uma fazenda, um nível e uma tabela de preços")
+
+        if np is not None:
+            self.hectares = np.asarray(hectares, dtype=np.float64)
+            validas = len(self.hectares) and bool(np.isfinite(self.hectares).all() and self.hectares.min() >= 0)
+        else:
+            self.hectares = hectares if isinstance(hectares, array) and hectares.typecode == "d" else array("d", hectares)
+            validas = all(0 <= x < float("inf") for x in self.hectares)
+        if not len(self.hectares):
+            raise ValueError("A grade precisa de ao menos uma área")
+        if not validas:
+            raise ValueError("As áreas devem ser números finitos e não negativos")
+        self.fazendas = tuple(fazendas)
+        self.culturas = tuple(dados.get("tipo") for dados in fazendas.values())
+        self.niveis = tuple(niveis)
+        self.nomes_precos = tuple(precos)
+
+        # Doses por hectare de cada (fazenda, nível), nas colunas da união dos insumos
+        planos = [calc.plano(cultura) for cultura in self.culturas]
+        insumos = {}
+        for plano in planos:
+            for grupo in GRUPOS_CUSTO:
+                insumos.update(dict.fromkeys(plano.doses[grupo]))
+        self.insumos = tuple(insumos)
+        tabelas_precos = [self._precos(nome, {**PRECOS_REFERENCIA, **tabela}) for nome, tabela in precos.items()]
+
+        self.doses = []
+        self.custos_ha = []
+        for plano in planos:
+            por_insumo = {insumo: por_nivel for grupo in GRUPOS_CUSTO
+                          for insumo, por_nivel in plano.doses[grupo].items()}
+            for nivel in self.niveis:
+                codigo = CODIGOS_NIVEL.get(nivel, 1)
+                doses = tuple(por_insumo[insumo][codigo] if insumo in por_insumo else 0.0
+                              for insumo in self.insumos)
+                for tabela in tabelas_precos:
+                    custos = tuple(dose * preco for dose, preco in zip(doses, tabela))
+                    self.doses.append(doses)
+                    self.custos_ha.append(custos + (sum(custos),))
+
+    def _precos(self, nome: str, tabela: Dict[str, float]) -> Tuple[float, ...]:
+        """Preços do cenário na ordem dos insumos da grade"""
+        faltando = [insumo for insumo in self.insumos if insumo not in tabela]
+        if faltando:
+            raise ValueError(f"Cenário de preço {nome}: sem preço para {', '.join(faltando)}")
+        precos = tuple(tabela[insumo] for insumo in self.insumos)
+        for insumo, preco in zip(self.insumos, precos):
+            if isinstance(preco, bool) or not isinstance(preco, (int, float)) or not 0 <= preco < float("inf"):
+                raise ValueError(f"Cenário de preço {nome}: preço inválido para {insumo}: {preco!r}")
+        return precos
+
+    @property
+    def bases(self) -> Tuple[int, int, int, int]:
+        """Base de cada dígito do índice: (fazendas, níveis, preços, hectares)"""
+        return len(self.fazendas), len(self.niveis), len(self.nomes_precos), len(self.hectares)
+
+    @property
+    def grupos(self) -> int:
+        return len(self.fazendas) * len(self.niveis) * len(self.nomes_precos)
+
+    def __len__(self) -> int:
+        return self.grupos * len(self.hectares)
+
+    def digitos(self, indice_grupo: int) -> Tuple[int, int, int]:
+        """Posições (fazenda, nível, preços) de um grupo"""
+        resto, p = divmod(indice_grupo, len(self.nomes_precos))
+        f, n = divmod(resto, len(self.niveis))
+        return f, n, p
+
+    def grupo(self, indice_grupo: int) -> Tuple[str, str, str]:
+        """(fazenda, nível, preços) de um grupo"""
+        f, n, p = self.digitos(indice_grupo)
+        return self.fazendas[f], self.niveis[n], self.nomes_precos[p]
+
+    def cenario(self, indice: int) -> Dict[str, Any]:
+        """Fazenda, nível, preços, área e custos do cenário de índice `indice`"""
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de cenário fora da grade")
+        g, j = divmod(indice, len(self.hectares))
+        fazenda, nivel, precos = self.grupo(g)
+        hectares = float(self.hectares[j])
+        custos = self.custos_ha[g]
+        return {
+            "fazenda": fazenda, "nivel": nivel, "precos": precos, "hectares": hectares,
+            "custos": {insumo: custo * hectares for insumo, custo in zip(self.insumos, custos)},
+            "custo_total": custos[-1] * hectares,
+        }
+
+    def segmentos(self, inicio: int, fim: int) -> Iterator[Tuple[int, int, int]]:
+        """Divide os índices inicio..fim-1 em (grupo, primeira área, última área + 1)"""
+        tamanho = len(self.hectares)
+        while inicio < fim:
+            g, j = divmod(inicio, tamanho)
+            k = min(tamanho, j + fim - inicio)
+            yield g, j, k
+            inicio += k - j
+
+    def cabecalho(self, formato: str) -> str:
+        """Primeira linha do arquivo de cenários ("" no NDJSON)"""
+        if formato == "csv":
+            colunas = ["fazenda", "nivel", "precos", "hectares"] + [f"custo_{insumo}" for insumo in self.insumos]
+            return ",".join(colunas + ["custo_total"]) + "\n"
+        return ""
+
+    def _moldes(self, formato: str) -> List[str]:
+        """Modelo de linha de cada grupo, com um %r para a área e %.2f por custo"""
+        moldes = []
+        for g in range(self.grupos):
+            fazenda, nivel, precos = self.grupo(g)
+            if formato == "csv":
+                campos = [_campo_csv(fazenda), nivel, _campo_csv(precos), "%r"] + ["%.2f"] * (len(self.insumos) + 1)
+                moldes.append(",".join(campos))
+            else:
+                custos = ",".join(f"{json.dumps(insumo)}:%.2f" for insumo in self.insumos)
+                moldes.append(f'{{"fazenda":{json.dumps(fazenda, ensure_ascii=False)},"nivel":"{nivel}",'
+                              f'"precos":{json.dumps(precos, ensure_ascii=False)},"hectares":%r,'
+                              f'"custos":{{{custos}}},"custo_total":%.2f}}')
+        return moldes
+
+    def calcular_parte(self, inicio: int, fim: int, formato: Optional[str] = None,
+                       moldes: Optional[List[str]] = None) -> ParteCenarios:
+        """Calcula os cenários inicio..fim-1 (executado nos processos)"""
+        if formato is not None and moldes is None:
+            moldes = self._moldes(formato)
+        grupos = {}
+        linhas = []
+        for g, j, k in self.segmentos(inicio, fim):
+            h = self.hectares[j:k]
+            if np is not None:
+                grupos[g] = (k - j, float(h.sum()), float(h.min()), float(h.max()))
+            else:
+                grupos[g] = (k - j, math.fsum(h), min(h), max(h))
+            if moldes is not None:
+                if np is not None:
+                    colunas = [h.tolist()] + [(h * custo).tolist() for custo in self.custos_ha[g]]
+                else:
+                    colunas = [h] + [[x * custo for x in h] for custo in self.custos_ha[g]]
+                molde = moldes[g]
+                linhas.extend(molde % valores for valores in zip(*colunas))
+        texto = "\n".join(linhas) + "\n" if linhas else None
+        return ParteCenarios(inicio, fim, grupos, texto)
+
+    def registro_grupo(self, indice_grupo: int, estatisticas: tuple) -> Dict[str, Any]:
+        """Resumo de um grupo a partir de (cenários, soma, mínimo e máximo dos hectares)"""
+        n, soma, minimo, maximo = estatisticas
+        f, n_nivel, p = self.digitos(indice_grupo)
+        doses = self.doses[indice_grupo]
+        custos = self.custos_ha[indice_grupo]
+        return {
+            "fazenda": self.fazendas[f],
+            "cultura": self.culturas[f],
+            "nivel": self.niveis[n_nivel],
+            "precos": self.nomes_precos[p],
+            "cenarios": n,
+            "hectares": round(soma, 4),
+            "quantidades": {insumo: round(dose * soma, 4) for insumo, dose in zip(self.insumos, doses)},
+            "custos": {insumo: round(custo * soma, 2) for insumo, custo in zip(self.insumos, custos)},
+            "custo_total": round(custos[-1] * soma, 2),
+            "custo_por_ha": round(custos[-1], 4),
+            "custo_min": round(custos[-1] * minimo, 2),
+            "custo_max": round(custos[-1] * maximo, 2),
+        }
+
+
+def _campo_csv(texto: str) -> str:
+    """Campo CSV, entre aspas se tiver vírgula, aspas ou quebra de linha"""
+    if any(caractere in texto for caractere in ',"\n\r'):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+
+# Grade e moldes de linha de cada processo, recebidos uma vez no initializer
+_GRADE_PROCESSO: Optional[GradeCenarios] = None
+_MOLDES_PROCESSO: Optional[List[str]] = None
+
+
+def _iniciar_processo(grade: GradeCenarios, formato: Optional[str]) -> None:
+    global _GRADE_PROCESSO, _MOLDES_PROCESSO
+    _GRADE_PROCESSO = grade
+    _MOLDES_PROCESSO = grade._moldes(formato) if formato is not None else None
+
+
+def _calcular_parte_processo(inicio: int, fim: int, formato: Optional[str]) -> ParteCenarios:
+    return _GRADE_PROCESSO.calcular_parte(inicio, fim, formato, _MOLDES_PROCESSO)
+
+
+def varrer_cenarios(grade: GradeCenarios, formato: Optional[str] = None, processos: Optional[int] = None,
+                    tamanho_parte: int = TAMANHO_PARTE) -> Iterator[ParteCenarios]:
+    """Gera as partes da grade em ordem, calculadas em um ProcessPoolExecutor
+
+    A grade vai uma vez para cada processo; cada tarefa leva só (inicio,
+    fim). Com `formato` ("csv" ou "ndjson") as partes trazem também as
+    linhas de cada cenário. Com processos=1 tudo roda no processo atual.
+    """
+    if formato is not None and formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS_SAIDA)})")
+    if tamanho_parte < 1:
+        raise ValueError("O tamanho da parte deve ser maior que zero")
+    total = len(grade)
+    limites = ((inicio, min(inicio + tamanho_parte, total)) for inicio in range(0, total, tamanho_parte))
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        moldes = grade._moldes(formato) if formato is not None else None
+        for inicio, fim in limites:
+            yield grade.calcular_parte(inicio, fim, formato, moldes)
+        return
+
+    # Importado só aqui: concurrent.futures pesa na inicialização dos scripts
+    from concurrent.futures import ProcessPoolExecutor
+
+    pendentes = deque()
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(grade, formato)) as executor:
+        for inicio, fim in limites:
+            pendentes.append(executor.submit(_calcular_parte_processo, inicio, fim, formato))
+            if len(pendentes) >= 2 * processos:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+def combinar_grupos(destino: Dict[int, tuple], grupos: Dict[int, tuple]) -> None:
+    """Soma as estatísticas de área de uma parte às acumuladas por grupo"""
+    for g, (n, soma, minimo, maximo) in grupos.items():
+        anterior = destino.get(g)
+        if anterior is None:
+            destino[g] = (n, soma, minimo, maximo)
+        else:
+            destino[g] = (anterior[0] + n, anterior[1] + soma, min(anterior[2], minimo), max(anterior[3], maximo))
+
+
+def resumir_cenarios(grade: GradeCenarios, saida: Optional[TextIO] = None, formato: Optional[str] = None,
+                     processos: Optional[int] = None,
+                     tamanho_parte: int = TAMANHO_PARTE) -> List[Dict[str, Any]]:
+    """Varre a grade e retorna o resumo de cada grupo (fazenda, nível, preços)
+
+    Com `saida` as linhas de cada cenário são escritas no arquivo à medida
+    que as partes chegam (formato "csv", o padrão, ou "ndjson").
+    """
+    if saida is not None:
+        formato = formato or "csv"
+        saida.write(grade.cabecalho(formato))
+    else:
+        formato = None
+    acumulado: Dict[int, tuple] = {}
+    for parte in varrer_cenarios(grade, formato, processos, tamanho_parte):
+        combinar_grupos(acumulado, parte.grupos)
+        if parte.texto is not None:
+            saida.write(parte.texto)
+    return [grade.registro_grupo(g, acumulado[g]) for g in sorted(acumulado)]
+
+
+def ler_hectares(especificacao: Sequence[str]) -> Any:
+    """Áreas da linha de comando: valores soltos e faixas inicio:fim:passo (fim incluído)"""
+    hectares = array("d")
+    for texto in especificacao:
+        if ":" not in texto:
+            hectares.append(float(texto))
+            continue
+        partes = texto.split(":")
+        if len(partes) != 3:
+            raise ValueError(f"faixa inválida: {texto} (use inicio:fim:passo)")
+        inicio, fim, passo = (float(parte) for parte in partes)
+        if not passo > 0 or fim < inicio:
+            raise ValueError(f"faixa inválida: {texto}")
+        quantidade = int(math.floor((fim - inicio) / passo + 1e-9)) + 1
+        # Arredondado para não levar o erro de inicio + passo * i (0.060000000000000005) à saída
+        if np is not None:
+            faixa = np.round(inicio + passo * np.arange(quantidade, dtype=np.float64), CASAS_FAIXA)
+            hectares.frombytes(faixa.tobytes())
+        else:
+            hectares.extend(round(inicio + passo * i, CASAS_FAIXA) for i in range(quantidade))
+    return hectares
+
+
+def _formato(caminho: str, formato: Optional[str]) -> str:
+    if formato:
+        return formato
+    return "ndjson" if caminho.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def main_cenarios(argumentos: Optional[List[str]] = None) -> int:
+    """Ponto de entrada de `python fiap_farm.py cenarios`"""
+    parser = argparse.ArgumentParser(prog="fiap_farm.py cenarios",
+                                     description="Custo dos insumos por fazenda, nível de dose, preços e área")
+    parser.add_argument("--hectares", nargs="+", required=True,
+                        help="áreas em hectares: valores e/ou faixas inicio:fim:passo")
+    parser.add_argument("--fazendas", nargs="+", help="fazendas da grade (padrão: todas)")
+    parser.add_argument("--niveis", nargs="+", choices=NIVEIS_QUANTIDADE, default=list(NIVEIS_QUANTIDADE))
+    parser.add_argument("--precos", help="JSON com {cenário: {insumo: preço}} (padrão: baixa, referencia, alta)")
+    parser.add_argument("--catalogo", help="catálogo agronômico JSON/TOML (fazendas e doses)")
+    parser.add_argument("--saida", help="arquivo CSV/NDJSON com cada cenário, ou - para stdout")
+    parser.add_argument("--formato", choices=FORMATOS_SAIDA, help="formato da saída (padrão: pela extensão)")
+    parser.add_argument("--resumo", default="-", help="arquivo NDJSON do resumo por grupo (padrão: stdout)")
+    parser.add_argument("--processos", type=int, help="processos do pool (padrão: núcleos disponíveis)")
+    parser.add_argument("--tamanho-parte", type=int, default=TAMANHO_PARTE)
+    args = parser.parse_args(argumentos)
+
+    try:
+        hectares = ler_hectares(args.hectares)
+    except ValueError as erro:
+        parser.error(f"--hectares: {erro}")
+    catalogo = None
+    if args.catalogo:
+        try:
+            catalogo = carregar_catalogo(args.catalogo)
+        except (OSError, ValueError) as erro:
+            parser.error(f"catálogo inválido {args.catalogo}: {erro}")
+    fazendas = FazendaData(catalogo).fazendas
+    if args.fazendas:
+        desconhecidas = [nome for nome in args.fazendas if nome not in fazendas]
+        if desconhecidas:
+            parser.error(f"fazendas desconhecidas: {', '.join(desconhecidas)}")
+        fazendas = {nome: fazendas[nome] for nome in args.fazendas}
+    precos = None
+    if args.precos:
+        try:
+            with open(args.precos, encoding="utf-8") as arquivo:
+                precos = json.load(arquivo)
+        except (OSError, ValueError) as erro:
+            parser.error(f"preços inválidos {args.precos}: {erro}")
+    try:
+        grade = GradeCenarios(hectares, fazendas, args.niveis, precos, CalculadoraInsumos(catalogo=catalogo))
+    except (ValueError, TypeError, AttributeError) as erro:
+        parser.error(str(erro))
+
+    saida = formato = None
+    if args.saida:
+        formato = _formato(args.saida, args.formato)
+        saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", buffering=1 << 20)
+    inicio = time.perf_counter()
+    try:
+        resumo = resumir_cenarios(grade, saida, formato, args.processos, args.tamanho_parte)
+    finally:
+        if saida is not None and saida is not sys.stdout:
+            saida.close()
+    segundos = time.perf_counter() - inicio
+
+    destino = sys.stdout if args.resumo == "-" else open(args.resumo, "w", encoding="utf-8")
+    try:
+        for registro in resumo:
+            destino.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+    print(f"{len(grade):,} cenários em {segundos:.2f} s ({len(grade) / segundos if segundos else 0:,.0f} cenários/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cenarios())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Coleta Meteorológica Assíncrona
+FarmTech Solutions
+
+Cliente da API de clima atual do OpenWeatherMap (/data/2.5/weather) para
+muitas fazendas de uma vez:
+
+- requisições concorrentes com asyncio sobre conexões persistentes
+  (fiap_farm_http.ClienteHTTP);
+- cache por local com validade (TTL): coordenadas arredondadas para
+  `casas` decimais (2 casas ~ 1 km) são o mesmo local;
+- coalescência: pedidos simultâneos do mesmo local aguardam uma única
+  requisição;
+- limite de taxa (balde de fichas) para respeitar a cota da API;
+- ServidorClimaSimulado: servidor local com respostas no formato da API,
+  usado nos benchmarks e para rodar sem chave.
+
+Os dados são devolvidos no mesmo formato de
+RSimulator.obter_dados_meteorologicos. Uso pela linha de comando:
+
+    python fiap_farm_clima.py --catalogo catalogo_agronomico.json --simulado
+    OPENWEATHER_API_KEY=<chave> python fiap_farm_clima.py --catalogo catalogo_agronomico.json
+
+Com --series <diretório> cada coleta é acrescentada ao histórico das
+fazendas (fiap_farm_series) e a saída inclui os agregados das últimas 24 h.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fiap_farm_http import ClienteHTTP, ler_requisicao, resposta_json, ErroHTTP
+
+URL_OPENWEATHER = "https://api.openweathermap.org/data/2.5/weather"
+CAMINHO_API = "/data/2.5/weather"
+
+
+class ErroClima(Exception):
+    """Falha ao obter os dados meteorológicos de um local"""
+
+
+class LimitadorTaxa:
+    """Balde de fichas: no máximo `por_segundo` liberações por segundo
+
+    Permite rajadas de até `rajada` liberações seguidas; os pedidos que
+    excedem a taxa esperam na ordem de chegada.
+    """
+
+    def __init__(self, por_segundo: float, rajada: Optional[int] = None,
+                 relogio: Callable[[], float] = time.monotonic):
+        if por_segundo <= 0:
+            raise ValueError("por_segundo deve ser maior que zero")
+        self.por_segundo = por_segundo
+        self.rajada = rajada or max(1, int(por_segundo))
+        self._relogio = relogio
+        self._fichas = float(self.rajada)
+        self._ultimo = relogio()
+        self._trava: Optional[asyncio.Lock] = None
+
+    def _repor(self) -> None:
+        agora = self._relogio()
+        self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) * self.por_segundo)
+        self._ultimo = agora
+
+    async def aguardar(self) -> None:
+        """Espera até haver uma ficha e a consome"""
+        if self._trava is None:
+            self._trava = asyncio.Lock()
+        async with self._trava:
+            self._repor()
+            while self._fichas < 1:
+                await asyncio.sleep((1 - self._fichas) / self.por_segundo)
+                self._repor()
+            self._fichas -= 1
+
+
+def normalizar(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte a resposta da API no formato de RSimulator.obter_dados_meteorologicos"""
+    principal = dados.get("main", {})
+    condicoes = dados.get("weather") or [{}]
+    visibilidade = dados.get("visibility")
+    return {
+        "temperatura": principal.get("temp"),
+        "umidade": principal.get("humidity"),
+        "pressao": principal.get("pressure"),
+        "vento": round(dados.get("wind", {}).get("speed", 0.0) * 3.6, 1),  # m/s -> km/h
+        "condicao": condicoes[0].get("description", "").capitalize(),
+        "visibilidade": round(visibilidade / 1000, 1) if visibilidade is not None else None,
+        "uv_index": None,  # não faz parte de /weather
+        "chuva_1h": dados.get("rain", {}).get("1h", 0.0),
+    }
+
+
+class ClienteClima:
+    """Cliente assíncrono de clima com cache, coalescência e limite de taxa
+
+    Uso:
+        async with ClienteClima(chave_api=chave) as cliente:
+            dados = await cliente.atualizar_fazendas(catalogo.fazendas)
+
+    `estatisticas` conta requisições feitas, acertos de cache, pedidos
+    coalescidos e erros.
+    """
+
+    def __init__(self, url: str = URL_OPENWEATHER, chave_api: str = "demo", ttl: float = 600.0,
+                 requisicoes_por_segundo: Optional[float] = 50.0, conexoes: int = 20, casas: int = 2,
+                 tempo_limite: float = 10.0, relogio: Callable[[], float] = time.monotonic):
+        self.url = url
+        self.chave_api = chave_api
+        self.ttl = ttl
+        self.casas = casas
+        self._relogio = relogio
+        self._http = ClienteHTTP(conexoes_por_host=conexoes, tempo_limite=tempo_limite)
+        self._limitador = LimitadorTaxa(requisicoes_por_segundo, relogio=relogio) if requisicoes_por_segundo else None
+        self._cache: Dict[Tuple[float, float], Tuple[float, Dict[str, Any]]] = {}
+        self._em_andamento: Dict[Tuple[float, float], asyncio.Future] = {}
+        self.estatisticas = {"requisicoes": 0, "cache": 0, "coalescidas": 0, "erros": 0}
+
+    async def __aenter__(self) -> "ClienteClima":
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.fechar()
+
+    def chave(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Local do cache: coordenadas arredondadas"""
+        return round(lat, self.casas), round(lon, self.casas)
+
+    async def obter(self, lat: float, lon: float) -> Dict[str, Any]:
+        """Clima atual de um local (do cache, se ainda válido)"""
+        local = self.chave(lat, lon)
+        guardado = self._cache.get(local)
+        if guardado is not None and guardado[0] > self._relogio():
+            self.estatisticas["cache"] += 1
+            return guardado[1]
+        tarefa = self._em_andamento.get(local)
+        if tarefa is None:
+            tarefa = self._em_andamento[local] = asyncio.ensure_future(self._buscar(local))
+        else:
+            self.estatisticas["coalescidas"] += 1
+        # shield: cancelar um dos interessados não cancela a requisição dos outros
+        return await asyncio.shield(tarefa)
+
+    async def _buscar(self, local: Tuple[float, float]) -> Dict[str, Any]:
+        try:
+            if self._limitador is not None:
+                await self._limitador.aguardar()
+            self.estatisticas["requisicoes"] += 1
+            try:
+                resposta = await self._http.get(self.url, {"lat": local[0], "lon": local[1],
+                                                           "appid": self.chave_api, "units": "metric",
+                                                           "lang": "pt_br"})
+            except (OSError, ErroHTTP, asyncio.TimeoutError) as erro:
+                raise ErroClima(f"erro ao conectar com a API: {erro or type(erro).__name__}") from erro
+            if resposta.status == 401:
+                raise ErroClima("API key inválida")
+            if resposta.status != 200:
+                raise ErroClima(f"erro na requisição: {resposta.status}")
+            try:
+                dados = normalizar(resposta.json())
+            except (ValueError, KeyError, TypeError, AttributeError, IndexError) as erro:
+                raise ErroClima(f"resposta inválida da API: {erro or type(erro).__name__}") from erro
+            self._cache[local] = (self._relogio() + self.ttl, dados)
+            return dados
+        except ErroClima:
+            self.estatisticas["erros"] += 1
+            raise
+        finally:
+            del self._em_andamento[local]
+
+    async def obter_varios(self, locais: Iterable[Tuple[float, float]]) -> List[Any]:
+        """Clima de vários locais em paralelo; erros vêm como exceções na lista"""
+        return await asyncio.gather(*(self.obter(lat, lon) for lat, lon in locais), return_exceptions=True)
+
+    async def atualizar_fazendas(self, fazendas: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Clima de cada fazenda com "lat" e "lon"; falhas viram {"erro": ...}"""
+        nomes = [nome for nome, dados in fazendas.items() if "lat" in dados and "lon" in dados]
+        resultados = await self.obter_varios((fazendas[nome]["lat"], fazendas[nome]["lon"]) for nome in nomes)
+        return {nome: {"erro": str(r)} if isinstance(r, BaseException) else r
+                for nome, r in zip(nomes, resultados)}
+
+    def limpar_expirados(self) -> int:
+        """Remove do cache os locais vencidos; retorna quantos saíram"""
+        agora = self._relogio()
+        vencidos = [local for local, (expira, _) in self._cache.items() if expira <= agora]
+        for local in vencidos:
+            del self._cache[local]
+        return len(vencidos)
+
+    async def fechar(self) -> None:
+        await self._http.fechar()
+
+
+def clima_fazendas(fazendas: Dict[str, Dict[str, Any]], **opcoes) -> Dict[str, Dict[str, Any]]:
+    """Versão síncrona de ClienteClima.atualizar_fazendas (para os menus)"""
+    async def executar():
+        async with ClienteClima(**opcoes) as cliente:
+            return await cliente.atualizar_fazendas(fazendas)
+    return asyncio.run(executar())
+
+
+class ServidorClimaSimulado:
+    """Servidor local que responde como /data/2.5/weather do OpenWeatherMap
+
+    Os dados são determinísticos por coordenada (mais quente perto do
+    equador). `latencia` simula o tempo de resposta da API; a chave
+    "invalida" recebe 401. Uso:
+
+        async with ServidorClimaSimulado(latencia=0.05) as servidor:
+            cliente = ClienteClima(url=servidor.url, requisicoes_por_segundo=None)
+    """
+
+    def __init__(self, latencia: float = 0.0, host: str = "127.0.0.1", porta: int = 0):
+        self.latencia = latencia
+        self.host = host
+        self.porta = porta
+        self.requisicoes = 0
+        self.conexoes = 0
+        self._servidor = None
+        self._ativas: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}{CAMINHO_API}"
+
+    async def __aenter__(self) -> "ServidorClimaSimulado":
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.parar()
+
+    async def iniciar(self) -> None:
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def parar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            # Fecha as conexões keep-alive ociosas e espera os atendimentos
+            for escritor in list(self._ativas.values()):
+                escritor.close()
+            await asyncio.gather(*self._ativas, return_exceptions=True)
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    @staticmethod
+    def dados_local(lat: float, lon: float) -> Dict[str, Any]:
+        """Resposta simulada (formato da API) para uma coordenada"""
+        variacao = math.sin(lat * 12.9898 + lon * 78.233) * 0.5 + 0.5
+        return {
+            "coord": {"lat": lat, "lon": lon},
+            "weather": [{"description": ("céu limpo", "parcialmente nublado", "chuva leve")[int(variacao * 2.999)]}],
+            "main": {"temp": round(30 - abs(lat) * 0.4 + variacao * 6 - 3, 1),
+                     "humidity": int(40 + variacao * 50), "pressure": round(1008 + variacao * 10, 1)},
+            "wind": {"speed": round(1 + variacao * 7, 1)},
+            "visibility": 10000,
+            "rain": {"1h": round(max(0.0, variacao - 0.66) * 12, 1)},
+        }
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        self.conexoes += 1
+        tarefa = asyncio.current_task()
+        self._ativas[tarefa] = escritor
+        try:
+            while True:
+                try:
+                    requisicao = await ler_requisicao(leitor)
+                except (ErroHTTP, ValueError):
+                    escritor.write(resposta_json(400, {"message": "bad request"}, manter_conexao=False))
+                    break
+                if requisicao is None:
+                    break
+                self.requisicoes += 1
+                if self.latencia:
+                    await asyncio.sleep(self.latencia)
+                parametros = requisicao.parametros
+                if requisicao.caminho != CAMINHO_API:
+                    escritor.write(resposta_json(404, {"message": "not found"}))
+                elif parametros.get("appid") == "invalida":
+                    escritor.write(resposta_json(401, {"message": "Invalid API key"}))
+                else:
+                    try:
+                        lat, lon = float(parametros["lat"]), float(parametros["lon"])
+                    except (KeyError, ValueError):
+                        escritor.write(resposta_json(400, {"message": "wrong latitude or longitude"}))
+                    else:
+                        escritor.write(resposta_json(200, self.dados_local(lat, lon), requisicao.manter_conexao))
+                await escritor.drain()
+                if not requisicao.manter_conexao:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._ativas[tarefa]
+            escritor.close()
+
+
+async def _executar_cli(fazendas: Dict[str, Dict[str, Any]], simulado: bool, opcoes: Dict[str, Any]):
+    if not simulado:
+        async with ClienteClima(**opcoes) as cliente:
+            return await cliente.atualizar_fazendas(fazendas)
+    async with ServidorClimaSimulado() as servidor:
+        async with ClienteClima(url=servidor.url, **opcoes) as cliente:
+            return await cliente.atualizar_fazendas(fazendas)
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    """Consulta o clima atual das fazendas do catálogo com coordenadas"""
+    from fiap_farm_catalogo import carregar_catalogo
+
+    parser = argparse.ArgumentParser(description="Clima atual das fazendas (OpenWeatherMap)")
+    parser.add_argument("--catalogo", default="catalogo_agronomico.json",
+                        help="catálogo com lat/lon das fazendas")
+    parser.add_argument("--simulado", action="store_true", help="usa o servidor simulado local")
+    parser.add_argument("--taxa", type=float, default=50.0, help="requisições por segundo (padrão: 50)")
+    parser.add_argument("--series", help="diretório das séries temporais onde registrar a coleta")
+    args = parser.parse_args(argumentos)
+
+    fazendas = carregar_catalogo(args.catalogo).fazendas
+    opcoes = {"chave_api": os.environ.get("OPENWEATHER_API_KEY", "demo"), "requisicoes_por_segundo": args.taxa}
+    resultado = asyncio.run(_executar_cli(fazendas, args.simulado, opcoes))
+    if args.series:
+        from fiap_farm_series import ArmazemSeries
+        armazem = ArmazemSeries(args.series)
+        armazem.registrar_clima(resultado)
+        for nome, janela in armazem.janelas_por_fazenda("24h").items():
+            resultado[nome]["ultimas_24h"] = janela
+        armazem.fechar()
+    json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 1 if any("erro" in dados for dados in resultado.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
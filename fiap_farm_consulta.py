@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Consultas Paginadas
+FarmTech Solutions
+
+Listagens filtradas e paginadas por cursor (keyset) sobre os armazéns de
+registros (ArmazemRegistros, ArmazemPlantioColunar e ArmazemSQLite):
+
+- Filtro: tipo, quantidade e faixa de hectares (o campo_hectares do
+  armazém: "area_ha" no plantio, "hectares" nos insumos);
+- ordens "id", "-id", "hectares" e "-hectares" (empates por id);
+- o cursor é a chave do último registro entregue (id, ou hectares e id),
+  codificada em um texto opaco; a próxima página continua logo depois
+  dela, então inclusões e remoções entre as páginas não repetem nem pulam
+  registros, e o custo de uma página não depende de quão longe ela está.
+
+Os resultados são geradores: nada além da página (ou do bloco em leitura)
+fica em memória. Na ordem por id a leitura parte direto do cursor; na
+ordem por hectares os armazéns em memória varrem a coleção a cada bloco
+(O(n log k)), e o SQLite usa o índice de hectares. Registros sem hectares
+numéricos ficam de fora da ordem por hectares e dos filtros de faixa.
+"""
+
+import base64
+import heapq
+import json
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+ORDENS = ("id", "-id", "hectares", "-hectares")
+
+# Registros lidos por vez nas varreduras por hectares e no SQLite
+TAMANHO_BLOCO = 1024
+
+
+class Filtro(NamedTuple):
+    """Critérios de uma consulta (None: sem restrição)"""
+    tipo: Optional[str] = None
+    quantidade: Optional[str] = None
+    hectares_min: Optional[float] = None
+    hectares_max: Optional[float] = None
+
+    def aceita(self, registro: Dict[str, Any], campo_hectares: str) -> bool:
+        if self.tipo is not None and registro.get("tipo") != self.tipo:
+            return False
+        if self.quantidade is not None and registro.get("quantidade") != self.quantidade:
+            return False
+        if self.hectares_min is not None or self.hectares_max is not None:
+            hectares = _hectares(registro, campo_hectares)
+            if hectares is None:
+                return False
+            if self.hectares_min is not None and hectares < self.hectares_min:
+                return False
+            if self.hectares_max is not None and hectares > self.hectares_max:
+                return False
+        return True
+
+
+SEM_FILTRO = Filtro()
+
+
+class Pagina(NamedTuple):
+    """Registros de uma página e o cursor da próxima (None na última)"""
+    registros: List[Dict[str, Any]]
+    proximo: Optional[str]
+
+
+def _hectares(registro: Dict[str, Any], campo_hectares: str) -> Optional[float]:
+    """Hectares numéricos do registro (None se ausentes ou NaN)"""
+    valor = registro.get(campo_hectares)
+    if isinstance(valor, (int, float)) and valor == valor:
+        return valor
+    return None
+
+
+def codificar_cursor(ordem: str, chave: tuple) -> str:
+    """Texto opaco com a ordem e a chave do último registro entregue"""
+    texto = json.dumps([ordem, *chave], separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str, ordem: str) -> tuple:
+    """Chave de um cursor; ValueError se inválido ou de outra ordem"""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ordem_cursor, *chave = json.loads(texto)
+    except (ValueError, TypeError):
+        raise ValueError("cursor inválido") from None
+    tamanho = 1 if ordem.endswith("id") else 2
+    if ordem_cursor != ordem:
+        raise ValueError(f"cursor da ordem {ordem_cursor}, não de {ordem}")
+    if len(chave) != tamanho or not all(isinstance(valor, (int, float)) for valor in chave):
+        raise ValueError("cursor inválido")
+    return tuple(chave)
+
+
+def chave_registro(registro: Dict[str, Any], ordem: str, campo_hectares: str) -> tuple:
+    """Chave de ordenação do registro na ordem informada"""
+    if ordem.endswith("id"):
+        return (registro["id"],)
+    return (_hectares(registro, campo_hectares), registro["id"])
+
+
+def consultar(armazem, filtro: Filtro = SEM_FILTRO, ordem: str = "id", cursor: Optional[str] = None,
+              bloco: int = TAMANHO_BLOCO) -> Iterator[Dict[str, Any]]:
+    """Gera os registros que passam no filtro, na ordem pedida, depois do cursor
+
+    Armazéns com um método `consultar` (SQLite) resolvem a consulta sozinhos;
+    os demais são lidos com iterar_desde.
+    """
+    if ordem not in ORDENS:
+        raise ValueError(f"Ordem inválida: {ordem} (use {', '.join(ORDENS)})")
+    chave = decodificar_cursor(cursor, ordem) if cursor else None
+    if hasattr(armazem, "consultar"):
+        return armazem.consultar(filtro, ordem, chave, bloco)
+    decrescente = ordem.startswith("-")
+    if ordem.endswith("id"):
+        registros = armazem.iterar_desde(chave[0] if chave else 0, decrescente)
+        if filtro == SEM_FILTRO:
+            return registros
+        campo = armazem.campo_hectares
+        return (registro for registro in registros if filtro.aceita(registro, campo))
+    return _por_hectares(armazem, filtro, decrescente, chave, bloco)
+
+
+def _chaves_hectares(armazem, filtro: Filtro) -> Iterator[tuple]:
+    campo = armazem.campo_hectares
+    for registro in armazem.iterar_desde():
+        hectares = _hectares(registro, campo)
+        if hectares is not None and filtro.aceita(registro, campo):
+            yield hectares, registro["id"]
+
+
+def _por_hectares(armazem, filtro: Filtro, decrescente: bool, chave: Optional[tuple],
+                  bloco: int) -> Iterator[Dict[str, Any]]:
+    """Ordem por (hectares, id): os `bloco` próximos de cada varredura, com heap"""
+    escolher = heapq.nlargest if decrescente else heapq.nsmallest
+    while True:
+        chaves = _chaves_hectares(armazem, filtro)
+        if chave is not None:
+            limite = chave
+            chaves = (k for k in chaves if (k < limite if decrescente else k > limite))
+        lote = escolher(bloco, chaves)
+        for _, id_registro in lote:
+            registro = armazem.obter(id_registro)
+            if registro is not None:
+                yield registro
+        if len(lote) < bloco:
+            return
+        chave = lote[-1]
+
+
+def paginar(armazem, limite: int = 20, cursor: Optional[str] = None, ordem: str = "id",
+            filtro: Filtro = SEM_FILTRO) -> Pagina:
+    """Uma página de até `limite` registros e o cursor da seguinte"""
+    if limite < 1:
+        raise ValueError("O limite deve ser maior que zero")
+    registros = []
+    for registro in consultar(armazem, filtro, ordem, cursor, bloco=min(limite + 1, TAMANHO_BLOCO)):
+        if len(registros) == limite:
+            ultimo = chave_registro(registros[-1], ordem, armazem.campo_hectares)
+            return Pagina(registros, codificar_cursor(ordem, ultimo))
+        registros.append(registro)
+    return Pagina(registros, None)
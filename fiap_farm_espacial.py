@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Índice Espacial de Talhões
+FarmTech Solutions
+
+Índice de caixas delimitadoras (bounding boxes) dos registros de plantio
+para responder "qual talhão contém este ponto GPS", "quais talhões cruzam
+esta região", "qual o talhão mais próximo" e "quais talhões se sobrepõem"
+sem percorrer todos os registros.
+
+As caixas ficam em R-trees empacotadas por STR (Sort-Tile-Recursive),
+construídas de uma vez na carga em lote. Inserções incrementais vão para um
+buffer pequeno; quando ele enche, vira uma nova árvore, e árvores de tamanho
+parecido são fundidas (método logarítmico), o que mantém o custo amortizado
+de inserção em O(log² n). Remoções e atualizações invalidam a entrada antiga
+por versão; quando as entradas obsoletas passam da metade, o índice é
+reconstruído.
+
+As coordenadas são as dos próprios registros: campo "bbox"
+([minx, miny, maxx, maxy], ex.: lon/lat de talhões importados de GeoJSON)
+ou "origem" ([x, y] em metros, somada ao lado/largura/altura do talhão).
+Caixas lon/lat que cruzam o antimeridiano têm maxx acima de 180 (ver
+fiap_farm_geometria.caixa_aneis); consulte-as com a longitude + 360.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# NumPy é opcional (importado no primeiro uso); sem ele as árvores são montadas em Python
+from fiap_farm_opcional import np
+
+Caixa = Tuple[float, float, float, float]
+
+# Filhos por nó das R-trees
+CAPACIDADE_NO = 16
+
+# Entradas no buffer de inserções antes de virar uma árvore
+TAMANHO_BUFFER = 256
+
+
+def caixa_registro(dados: Dict[str, Any]) -> Optional[Caixa]:
+    """Retorna a caixa (minx, miny, maxx, maxy) de um registro de plantio
+
+    Usa o campo "bbox" ou, para quadrados e retângulos, "origem" mais as
+    dimensões. Registros sem coordenadas retornam None (não são indexados).
+    """
+    bbox = dados.get("bbox")
+    if bbox is not None:
+        minx, miny, maxx, maxy = (float(v) for v in bbox)
+        return minx, miny, maxx, maxy
+    origem = dados.get("origem")
+    if origem is None:
+        return None
+    x, y = float(origem[0]), float(origem[1])
+    tipo = dados.get("tipo")
+    if tipo == "quadrado":
+        return x, y, x + dados["lado"], y + dados["lado"]
+    if tipo == "retangulo":
+        return x, y, x + dados["largura"], y + dados["altura"]
+    return x, y, x, y
+
+
+def _distancia2(caixa_minx: float, caixa_miny: float, caixa_maxx: float, caixa_maxy: float,
+                x: float, y: float) -> float:
+    """Quadrado da distância de um ponto a uma caixa (0 se estiver dentro)"""
+    dx = caixa_minx - x if x < caixa_minx else (x - caixa_maxx if x > caixa_maxx else 0.0)
+    dy = caixa_miny - y if y < caixa_miny else (y - caixa_maxy if y > caixa_maxy else 0.0)
+    return dx * dx + dy * dy
+
+
+class _ArvoreSTR:
+    """R-tree estática empacotada por STR
+
+    O nível 0 guarda as entradas (ids, versões e caixas) na ordem STR; cada
+    nível acima agrupa CAPACIDADE_NO nós consecutivos do nível de baixo, então
+    os filhos do nó i são os nós [i * M, (i + 1) * M) do nível inferior.
+    """
+
+    __slots__ = ("ids", "versoes", "niveis")
+
+    def __init__(self, ids: array, versoes: array, caixas: Tuple[array, array, array, array]):
+        self.ids, self.versoes, caixas = self._ordenar_str(ids, versoes, caixas)
+        self.niveis = [caixas]
+        while len(self.niveis[-1][0]) > CAPACIDADE_NO:
+            self.niveis.append(self._agrupar(self.niveis[-1]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _ordenar_str(ids: array, versoes: array, caixas):
+        """Ordena as entradas em faixas verticais (por x) e, dentro delas, por y"""
+        n = len(ids)
+        paginas = math.ceil(n / CAPACIDADE_NO)
+        por_faixa = math.ceil(math.sqrt(paginas)) * CAPACIDADE_NO
+        minx, miny, maxx, maxy = caixas
+        if np is not None:
+            colunas = [np.frombuffer(c, dtype=np.float64) for c in caixas]
+            cx, cy = colunas[0] + colunas[2], colunas[1] + colunas[3]
+            faixa = np.empty(n, dtype=np.intp)
+            faixa[np.argsort(cx, kind="stable")] = np.arange(n) // por_faixa
+            ordem = np.lexsort((cy, faixa))
+
+            def reordenar(valores, tipo):
+                return array(tipo, np.frombuffer(valores, dtype=np.float64 if tipo == "d" else np.int64)[ordem]
+                             .tobytes())
+            return (reordenar(ids, "q"), reordenar(versoes, "q"),
+                    tuple(reordenar(c, "d") for c in caixas))
+
+        por_x = sorted(range(n), key=lambda i: minx[i] + maxx[i])
+        ordem = []
+        for inicio in range(0, n, por_faixa):
+            ordem.extend(sorted(por_x[inicio:inicio + por_faixa], key=lambda i: miny[i] + maxy[i]))
+        return (array("q", (ids[i] for i in ordem)), array("q", (versoes[i] for i in ordem)),
+                tuple(array("d", (c[i] for i in ordem)) for c in caixas))
+
+    @staticmethod
+    def _agrupar(nivel):
+        """Caixas dos nós pais: envoltória de cada grupo de CAPACIDADE_NO nós"""
+        minx, miny, maxx, maxy = nivel
+        n = len(minx)
+        if np is not None:
+            inicios = np.arange(0, n, CAPACIDADE_NO)
+            return tuple(
+                array("d", funcao.reduceat(np.frombuffer(c, dtype=np.float64), inicios).tobytes())
+                for funcao, c in ((np.minimum, minx), (np.minimum, miny), (np.maximum, maxx), (np.maximum, maxy))
+            )
+        faixas = [range(i, min(i + CAPACIDADE_NO, n)) for i in range(0, n, CAPACIDADE_NO)]
+        return (array("d", (min(minx[i] for i in f) for f in faixas)),
+                array("d", (min(miny[i] for i in f) for f in faixas)),
+                array("d", (max(maxx[i] for i in f) for f in faixas)),
+                array("d", (max(maxy[i] for i in f) for f in faixas)))
+
+    def consultar(self, qminx: float, qminy: float, qmaxx: float, qmaxy: float) -> Iterator[int]:
+        """Posições (no nível 0) das entradas cuja caixa cruza a consulta"""
+        topo = len(self.niveis) - 1
+        minx, miny, maxx, maxy = self.niveis[topo]
+        pilha = [(topo, i) for i in range(len(minx))]
+        niveis = self.niveis
+        while pilha:
+            nivel, i = pilha.pop()
+            minx, miny, maxx, maxy = niveis[nivel]
+            if minx[i] <= qmaxx and maxx[i] >= qminx and miny[i] <= qmaxy and maxy[i] >= qminy:
+                if nivel == 0:
+                    yield i
+                else:
+                    fim = min((i + 1) * CAPACIDADE_NO, len(niveis[nivel - 1][0]))
+                    pilha.extend((nivel - 1, j) for j in range(i * CAPACIDADE_NO, fim))
+
+    def entradas(self) -> Iterator[Tuple[int, int, Caixa]]:
+        """Percorre (id, versão, caixa) de todas as entradas"""
+        minx, miny, maxx, maxy = self.niveis[0]
+        for i in range(len(self.ids)):
+            yield self.ids[i], self.versoes[i], (minx[i], miny[i], maxx[i], maxy[i])
+
+
+class IndiceEspacial:
+    """Índice de caixas por id de registro (R-trees STR + buffer)"""
+
+    def __init__(self):
+        self._arvores: List[_ArvoreSTR] = []
+        # Buffer de inserções: id -> (versão, caixa)
+        self._buffer: Dict[int, Tuple[int, Caixa]] = {}
+        # Versão atual dos ids atualizados (ids ausentes estão na versão 0)
+        self._versao: Dict[int, int] = {}
+        self._removidos: Set[int] = set()
+        self._vivos = 0
+        self._obsoletas = 0
+
+    def __len__(self) -> int:
+        return self._vivos
+
+    # ------------------------------------------------------------------
+    # Carga e atualização
+    # ------------------------------------------------------------------
+
+    def carregar(self, entradas: Iterable[Tuple[int, Caixa]]) -> None:
+        """Carga em lote de pares (id, caixa), substituindo o conteúdo atual"""
+        ids, minx, miny, maxx, maxy = array("q"), array("d"), array("d"), array("d"), array("d")
+        for id_registro, (x0, y0, x1, y1) in entradas:
+            ids.append(id_registro)
+            minx.append(x0)
+            miny.append(y0)
+            maxx.append(x1)
+            maxy.append(y1)
+        self._arvores = [_ArvoreSTR(ids, array("q", bytes(8 * len(ids))), (minx, miny, maxx, maxy))] if ids else []
+        self._buffer = {}
+        self._versao = {}
+        self._removidos = set()
+        self._vivos = len(ids)
+        self._obsoletas = 0
+
+    def _valida(self, id_registro: int, versao: int) -> bool:
+        return id_registro not in self._removidos and self._versao.get(id_registro, 0) == versao
+
+    def inserir(self, id_registro: int, caixa: Caixa) -> None:
+        """Indexa um registro novo (ou reindexa um id removido)"""
+        if id_registro in self._removidos:
+            self._removidos.discard(id_registro)
+            self._versao[id_registro] = self._versao.get(id_registro, 0) + 1
+        self._buffer[id_registro] = (self._versao.get(id_registro, 0), tuple(float(v) for v in caixa))
+        self._vivos += 1
+        if len(self._buffer) >= TAMANHO_BUFFER:
+            self._esvaziar_buffer()
+
+    def remover(self, id_registro: int) -> None:
+        """Remove do índice um registro indexado (a entrada antiga fica obsoleta)
+
+        Quem chama garante que o id está indexado (ex.: o registro removido
+        tinha caixa), o que evita procurar a entrada nas árvores.
+        """
+        if self._buffer.pop(id_registro, None) is None:
+            self._obsoletas += 1
+        self._removidos.add(id_registro)
+        self._vivos -= 1
+        self._compactar_se_preciso()
+
+    def atualizar(self, id_registro: int, anterior: Optional[Caixa], caixa: Optional[Caixa]) -> None:
+        """Troca a caixa de um registro (None: sem caixa, fora do índice)"""
+        if anterior is not None:
+            self.remover(id_registro)
+        if caixa is not None:
+            self.inserir(id_registro, caixa)
+
+    def _esvaziar_buffer(self) -> None:
+        """Transforma o buffer em árvore, fundindo árvores de tamanho até o dele"""
+        entradas = [(i, v, c) for i, (v, c) in self._buffer.items()]
+        self._buffer = {}
+        while self._arvores and len(self._arvores[-1]) <= 2 * len(entradas):
+            arvore = self._arvores.pop()
+            validas = [e for e in arvore.entradas() if self._valida(e[0], e[1])]
+            self._obsoletas -= len(arvore) - len(validas)
+            entradas.extend(validas)
+        if entradas:
+            self._arvores.append(self._construir(entradas))
+            self._arvores.sort(key=len, reverse=True)
+
+    @staticmethod
+    def _construir(entradas: List[Tuple[int, int, Caixa]]) -> _ArvoreSTR:
+        return _ArvoreSTR(array("q", (e[0] for e in entradas)), array("q", (e[1] for e in entradas)),
+                          tuple(array("d", (e[2][k] for e in entradas)) for k in range(4)))
+
+    def _compactar_se_preciso(self) -> None:
+        """Reconstrói o índice quando as entradas obsoletas passam da metade"""
+        if self._obsoletas <= max(self._vivos, TAMANHO_BUFFER):
+            return
+        vivas = list(self.entradas())
+        self.carregar(vivas)
+
+    def entradas(self) -> Iterator[Tuple[int, Caixa]]:
+        """Percorre (id, caixa) de todos os registros indexados"""
+        for arvore in self._arvores:
+            for id_registro, versao, caixa in arvore.entradas():
+                if self._valida(id_registro, versao):
+                    yield id_registro, caixa
+        for id_registro, (_, caixa) in self._buffer.items():
+            yield id_registro, caixa
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def consultar_caixa(self, minx: float, miny: float, maxx: float, maxy: float) -> List[int]:
+        """Ids dos registros cuja caixa cruza a caixa informada"""
+        resultado = []
+        for arvore in self._arvores:
+            ids, versoes = arvore.ids, arvore.versoes
+            for i in arvore.consultar(minx, miny, maxx, maxy):
+                id_registro = ids[i]
+                if self._valida(id_registro, versoes[i]):
+                    resultado.append(id_registro)
+        for id_registro, (_, (x0, y0, x1, y1)) in self._buffer.items():
+            if x0 <= maxx and x1 >= minx and y0 <= maxy and y1 >= miny:
+                resultado.append(id_registro)
+        return resultado
+
+    def consultar_ponto(self, x: float, y: float) -> List[int]:
+        """Ids dos registros cuja caixa contém o ponto"""
+        return self.consultar_caixa(x, y, x, y)
+
+    def mais_proximos(self, x: float, y: float, k: int = 1) -> List[Tuple[int, float]]:
+        """Os k registros mais próximos do ponto, como (id, distância à caixa)
+
+        Busca best-first: os nós são visitados em ordem de distância mínima,
+        então só os ramos que podem conter vizinhos mais próximos são abertos.
+        """
+        fila = []
+        for numero, arvore in enumerate(self._arvores):
+            topo = len(arvore.niveis) - 1
+            minx, miny, maxx, maxy = arvore.niveis[topo]
+            for i in range(len(minx)):
+                heapq.heappush(fila, (_distancia2(minx[i], miny[i], maxx[i], maxy[i], x, y), numero, topo, i))
+        for id_registro, (_, caixa) in self._buffer.items():
+            heapq.heappush(fila, (_distancia2(*caixa, x, y), -1, 0, id_registro))
+
+        resultado = []
+        while fila and len(resultado) < k:
+            distancia2, numero, nivel, i = heapq.heappop(fila)
+            if numero < 0:
+                resultado.append((i, math.sqrt(distancia2)))
+                continue
+            arvore = self._arvores[numero]
+            if nivel == 0:
+                id_registro = arvore.ids[i]
+                if self._valida(id_registro, arvore.versoes[i]):
+                    resultado.append((id_registro, math.sqrt(distancia2)))
+                continue
+            minx, miny, maxx, maxy = arvore.niveis[nivel - 1]
+            for j in range(i * CAPACIDADE_NO, min((i + 1) * CAPACIDADE_NO, len(minx))):
+                heapq.heappush(fila, (_distancia2(minx[j], miny[j], maxx[j], maxy[j], x, y), numero, nivel - 1, j))
+        return resultado
+
+    def pares_sobrepostos(self) -> Iterator[Tuple[int, int]]:
+        """Pares (id menor, id maior) de registros cujas caixas se cruzam"""
+        for id_registro, caixa in self.entradas():
+            for outro in self.consultar_caixa(*caixa):
+                if outro > id_registro:
+                    yield id_registro, outro
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Motor de Estatísticas em Fluxo
+FarmTech Solutions
+
+Estatísticas descritivas calculadas em uma única passada sobre qualquer
+iterável (listas, arrays, geradores), com memória constante:
+
+- AcumuladorEstatistico: n, média, variância, desvio padrão, mínimo,
+  máximo, amplitude e coeficiente de variação por atualizações de Welford;
+  acumuladores parciais podem ser combinados (fórmula de Chan).
+- DigestQuantis: resumo combinável no estilo t-digest para mediana e
+  quantis aproximados.
+- EstimadorP2: estimador P² (Jain & Chlamtac) de um único quantil com
+  cinco marcadores.
+- estatisticas_paralelas: divide séries grandes em partes calculadas em
+  processos separados e combina os resultados parciais.
+"""
+
+import math
+import os
+import statistics
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# NumPy é opcional (importado no primeiro uso); sem ele os blocos são processados em Python
+from fiap_farm_opcional import eh_ndarray, np
+
+# Valores lidos por bloco em AcumuladorEstatistico.atualizar
+TAMANHO_BLOCO = 65_536
+
+# Valores por parte enviada a cada processo em estatisticas_paralelas
+TAMANHO_PARTE = 1_000_000
+
+# Valores acumulados pelo DigestQuantis antes de cada compressão
+TAMANHO_BUFFER_DIGEST = 32_768
+
+MODOS_MEDIANA = ("exata", "aproximada", "p2", None)
+
+
+def _estender(destino: array, valores: Iterable[float]) -> None:
+    """Acrescenta valores a um array('d'), copiando arrays NumPy em bloco"""
+    if eh_ndarray(valores):
+        destino.frombytes(np.ascontiguousarray(valores, dtype=np.float64).tobytes())
+    else:
+        destino.extend(valores)
+
+
+class DigestQuantis:
+    """Resumo de distribuição no estilo t-digest (merging digest)
+
+    Guarda no máximo ~`compressao` / 2 centróides (média, peso), mais densos nas
+    caudas, usando a função de escala k1. Dois resumos podem ser combinados,
+    o que permite calcular quantis de dados divididos em partes.
+    """
+
+    def __init__(self, compressao: int = 200):
+        self.compressao = compressao
+        self._medias: List[float] = []
+        self._pesos: List[float] = []
+        self._buffer = array("d")
+        self.n = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def adicionar(self, valor: float) -> None:
+        self._buffer.append(valor)
+        if len(self._buffer) >= TAMANHO_BUFFER_DIGEST:
+            self._comprimir()
+
+    def adicionar_bloco(self, valores: Iterable[float]) -> None:
+        _estender(self._buffer, valores)
+        if len(self._buffer) >= TAMANHO_BUFFER_DIGEST:
+            self._comprimir()
+
+    def combinar(self, outro: "DigestQuantis") -> None:
+        """Incorpora os centróides de outro resumo"""
+        outro._comprimir()
+        self._comprimir()
+        self._medias.extend(outro._medias)
+        self._pesos.extend(outro._pesos)
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._comprimir(forcar=True)
+
+    def _limite(self, q: float) -> float:
+        """Próximo limite de quantil permitido para um centróide (escala k1)"""
+        k = self.compressao / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compressao / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compressao) + 1) / 2
+
+    def _comprimir(self, forcar: bool = False) -> None:
+        if not self._buffer and not forcar:
+            return
+        if self._buffer:
+            self.n += len(self._buffer)
+            self.minimo = min(self.minimo, min(self._buffer))
+            self.maximo = max(self.maximo, max(self._buffer))
+        if np is not None:
+            self._agrupar_numpy()
+            return
+        itens = sorted(
+            list(zip(self._medias, self._pesos)) + [(x, 1.0) for x in self._buffer]
+        )
+        self._buffer = array("d")
+        if not itens:
+            return
+        total = sum(peso for _, peso in itens)
+        medias: List[float] = []
+        pesos: List[float] = []
+        media_atual, peso_atual = itens[0]
+        acumulado = 0.0
+        limite = self._limite(0.0) * total
+        for media, peso in islice(itens, 1, None):
+            if acumulado + peso_atual + peso <= limite:
+                peso_atual += peso
+                media_atual += (media - media_atual) * peso / peso_atual
+            else:
+                medias.append(media_atual)
+                pesos.append(peso_atual)
+                acumulado += peso_atual
+                limite = self._limite(acumulado / total) * total
+                media_atual, peso_atual = media, peso
+        medias.append(media_atual)
+        pesos.append(peso_atual)
+        self._medias, self._pesos = medias, pesos
+
+    def _agrupar_numpy(self) -> None:
+        """Versão vetorizada da compressão: agrupa por unidade da escala k1"""
+        medias = np.concatenate((np.asarray(self._medias, dtype=np.float64),
+                                 np.frombuffer(self._buffer, dtype=np.float64)))
+        pesos = np.concatenate((np.asarray(self._pesos, dtype=np.float64),
+                                np.ones(len(self._buffer))))
+        self._buffer = array("d")
+        if not len(medias):
+            return
+        ordem = np.argsort(medias, kind="stable")
+        medias, pesos = medias[ordem], pesos[ordem]
+        acumulado = np.cumsum(pesos)
+        q = (acumulado - pesos / 2) / acumulado[-1]
+        grupo = np.floor(self.compressao / (2 * math.pi) * np.arcsin(2 * q - 1))
+        inicios = np.concatenate(([0], np.flatnonzero(np.diff(grupo)) + 1))
+        pesos_grupo = np.add.reduceat(pesos, inicios)
+        self._medias = (np.add.reduceat(medias * pesos, inicios) / pesos_grupo).tolist()
+        self._pesos = pesos_grupo.tolist()
+
+    def quantil(self, q: float) -> Optional[float]:
+        """Estima o quantil q (0 a 1)"""
+        self._comprimir()
+        if not self._medias:
+            return None
+        if len(self._medias) == 1:
+            return self._medias[0]
+        alvo = q * self.n
+        # Posição (em peso acumulado) do centro de cada centróide
+        acumulado = 0.0
+        anterior_pos, anterior_valor = 0.0, self.minimo
+        for media, peso in zip(self._medias, self._pesos):
+            centro = acumulado + peso / 2
+            if alvo < centro:
+                if centro == anterior_pos:
+                    return media
+                fracao = (alvo - anterior_pos) / (centro - anterior_pos)
+                return anterior_valor + fracao * (media - anterior_valor)
+            anterior_pos, anterior_valor = centro, media
+            acumulado += peso
+        if self.n == anterior_pos:
+            return self.maximo
+        fracao = (alvo - anterior_pos) / (self.n - anterior_pos)
+        return anterior_valor + min(fracao, 1.0) * (self.maximo - anterior_valor)
+
+
+class EstimadorP2:
+    """Estimador P² de um quantil em fluxo, com memória constante
+
+    Não pode ser combinado com outros estimadores; para dados divididos em
+    partes use DigestQuantis.
+    """
+
+    def __init__(self, p: float = 0.5):
+        self.p = p
+        self.n = 0
+        self._alturas: List[float] = []
+        self._posicoes = [1, 2, 3, 4, 5]
+        self._desejadas = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._incrementos = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def adicionar(self, valor: float) -> None:
+        self.n += 1
+        alturas = self._alturas
+        if self.n <= 5:
+            alturas.append(valor)
+            alturas.sort()
+            return
+
+        if valor < alturas[0]:
+            alturas[0] = valor
+            k = 0
+        elif valor >= alturas[4]:
+            alturas[4] = valor
+            k = 3
+        else:
+            k = next(i for i in range(4) if alturas[i] <= valor < alturas[i + 1])
+
+        posicoes = self._posicoes
+        for i in range(k + 1, 5):
+            posicoes[i] += 1
+        for i in range(5):
+            self._desejadas[i] += self._incrementos[i]
+
+        for i in (1, 2, 3):
+            d = self._desejadas[i] - posicoes[i]
+            if (d >= 1 and posicoes[i + 1] - posicoes[i] > 1) or (d <= -1 and posicoes[i - 1] - posicoes[i] < -1):
+                d = 1 if d > 0 else -1
+                nova = self._parabolica(i, d)
+                if not alturas[i - 1] < nova < alturas[i + 1]:
+                    nova = alturas[i] + d * (alturas[i + d] - alturas[i]) / (posicoes[i + d] - posicoes[i])
+                alturas[i] = nova
+                posicoes[i] += d
+
+    def _parabolica(self, i: int, d: int) -> float:
+        q, n = self._alturas, self._posicoes
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def valor(self) -> Optional[float]:
+        """Estimativa atual do quantil"""
+        if not self._alturas:
+            return None
+        if self.n <= 5:
+            ordenados = self._alturas
+            return ordenados[min(len(ordenados) - 1, int(round(self.p * (len(ordenados) - 1))))]
+        return self._alturas[2]
+
+
+class AcumuladorEstatistico:
+    """Estatísticas descritivas em uma única passada (Welford)
+
+    `mediana` define como a mediana é calculada:
+    - "exata": guarda os valores (8 bytes cada) e usa statistics.median;
+    - "aproximada": DigestQuantis, memória constante e combinável;
+    - "p2": EstimadorP2, memória constante, não combinável;
+    - None: não calcula mediana.
+    """
+
+    def __init__(self, mediana: Optional[str] = "exata"):
+        if mediana not in MODOS_MEDIANA:
+            raise ValueError(f"Modo de mediana inválido: {mediana}")
+        self.modo_mediana = mediana
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo: Any = None
+        self.maximo: Any = None
+        # Soma exata enquanto todos os valores forem int (média inteira como statistics.mean)
+        self._soma_inteira: Optional[int] = 0
+        self._valores = array("d") if mediana == "exata" else None
+        self._digest = DigestQuantis() if mediana == "aproximada" else None
+        self._p2 = EstimadorP2(0.5) if mediana == "p2" else None
+
+    def adicionar(self, valor: float) -> None:
+        """Inclui um valor (atualização de Welford)"""
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (valor - self.media)
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        if self._soma_inteira is not None:
+            self._soma_inteira = self._soma_inteira + valor if isinstance(valor, int) else None
+        if self._valores is not None:
+            self._valores.append(valor)
+        elif self._digest is not None:
+            self._digest.adicionar(valor)
+        elif self._p2 is not None:
+            self._p2.adicionar(valor)
+
+    def atualizar(self, valores: Iterable[float]) -> "AcumuladorEstatistico":
+        """Inclui todos os valores de um iterável, bloco a bloco
+
+        Cada bloco tem seus momentos calculados de uma vez e é combinado ao
+        acumulado (Welford por blocos), sem materializar o iterável inteiro.
+        """
+        if eh_ndarray(valores):
+            for inicio in range(0, len(valores), TAMANHO_BLOCO):
+                self._incluir_bloco(valores[inicio:inicio + TAMANHO_BLOCO])
+            return self
+        iterador = iter(valores)
+        while True:
+            bloco = list(islice(iterador, TAMANHO_BLOCO))
+            if not bloco:
+                return self
+            self._incluir_bloco(bloco)
+
+    def _incluir_bloco(self, bloco) -> None:
+        n = len(bloco)
+        if eh_ndarray(bloco):
+            media = float(bloco.mean())
+            m2 = float(((bloco - media) ** 2).sum())
+            minimo, maximo = bloco.min().item(), bloco.max().item()
+            self._soma_inteira = None
+        else:
+            media = math.fsum(bloco) / n
+            m2 = math.fsum((x - media) * (x - media) for x in bloco)
+            minimo, maximo = min(bloco), max(bloco)
+            if self._soma_inteira is not None:
+                self._soma_inteira = (self._soma_inteira + sum(bloco)
+                                      if all(isinstance(x, int) for x in bloco) else None)
+        self._combinar_momentos(n, media, m2, minimo, maximo)
+
+        if self._valores is not None:
+            _estender(self._valores, bloco)
+        elif self._digest is not None:
+            self._digest.adicionar_bloco(bloco)
+        elif self._p2 is not None:
+            for valor in bloco:
+                self._p2.adicionar(valor)
+
+    def _combinar_momentos(self, n: int, media: float, m2: float, minimo: Any, maximo: Any) -> None:
+        """Combina momentos parciais aos acumulados (Chan et al.)"""
+        if n == 0:
+            return
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self._m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        if self.minimo is None or minimo < self.minimo:
+            self.minimo = minimo
+        if self.maximo is None or maximo > self.maximo:
+            self.maximo = maximo
+
+    def combinar(self, outro: "AcumuladorEstatistico") -> "AcumuladorEstatistico":
+        """Incorpora um acumulador parcial (ex.: de outra parte dos dados)"""
+        if outro.modo_mediana != self.modo_mediana:
+            raise ValueError("Acumuladores com modos de mediana diferentes")
+        if self._p2 is not None and self.n and outro.n:
+            raise ValueError("O estimador P² não pode ser combinado; use mediana='aproximada'")
+        self._combinar_momentos(outro.n, outro.media, outro._m2, outro.minimo, outro.maximo)
+        if self._soma_inteira is not None:
+            self._soma_inteira = self._soma_inteira + outro._soma_inteira if outro._soma_inteira is not None else None
+        if self._valores is not None:
+            self._valores.extend(outro._valores)
+        elif self._digest is not None:
+            self._digest.combinar(outro._digest)
+        elif self._p2 is not None and outro.n:
+            self._p2 = outro._p2
+        return self
+
+    @property
+    def variancia(self) -> float:
+        """Variância amostral (n - 1)"""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0
+
+    @property
+    def desvio_padrao(self) -> float:
+        return math.sqrt(self.variancia) if self.n > 1 else 0
+
+    def quantil(self, q: float) -> Optional[float]:
+        """Quantil q (0 a 1): exato, aproximado ou None conforme o modo"""
+        if not self.n:
+            return None
+        if self._valores is not None:
+            if q == 0.5:
+                return statistics.median(self._valores)
+            ordenados = sorted(self._valores)
+            posicao = q * (len(ordenados) - 1)
+            baixo = int(posicao)
+            alto = min(baixo + 1, len(ordenados) - 1)
+            return ordenados[baixo] + (posicao - baixo) * (ordenados[alto] - ordenados[baixo])
+        if self._digest is not None:
+            return self._digest.quantil(q)
+        if self._p2 is not None and q == self._p2.p:
+            return self._p2.valor()
+        return None
+
+    def resultado(self) -> Optional[Dict[str, Any]]:
+        """Retorna as estatísticas no formato de RSimulator.calcular_estatisticas"""
+        if not self.n:
+            return None
+        desvio_padrao = self.desvio_padrao
+        mediana = self.quantil(0.5)
+        media = round(self.media, 4)
+        if self._soma_inteira is not None and self._soma_inteira % self.n == 0:
+            media = self._soma_inteira // self.n
+        return {
+            'n': self.n,
+            'media': media,
+            'desvio_padrao': round(desvio_padrao, 4),
+            'variancia': round(self.variancia, 4),
+            'mediana': round(mediana, 4) if mediana is not None else None,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'amplitude': self.maximo - self.minimo,
+            'coef_variacao': round((desvio_padrao / self.media) * 100, 2) if self.media != 0 else 0
+        }
+
+
+def _estatisticas_parte(parte, mediana: Optional[str]) -> AcumuladorEstatistico:
+    """Calcula os momentos de uma parte dos dados (executado nos processos)"""
+    if np is not None and isinstance(parte, array):
+        parte = np.frombuffer(parte, dtype=np.float64)
+    return AcumuladorEstatistico(mediana=mediana).atualizar(parte)
+
+
+def _partes(valores: Iterable[float], tamanho_parte: int) -> Iterator:
+    """Divide os valores em partes compactas para envio aos processos
+
+    Arrays NumPy e sequências são fatiados (mantendo o tipo dos valores);
+    outros iteráveis (geradores) são lidos parte a parte em array('d').
+    """
+    if isinstance(valores, (list, tuple, array)) or eh_ndarray(valores):
+        for inicio in range(0, len(valores), tamanho_parte):
+            yield valores[inicio:inicio + tamanho_parte]
+        return
+    iterador = iter(valores)
+    while True:
+        parte = array("d", islice(iterador, tamanho_parte))
+        if not parte:
+            return
+        yield parte
+
+
+def estatisticas_paralelas(series: Dict[str, Iterable[float]], mediana: Optional[str] = "aproximada",
+                           processos: Optional[int] = None,
+                           tamanho_parte: int = TAMANHO_PARTE) -> Dict[str, AcumuladorEstatistico]:
+    """Calcula as estatísticas de várias séries em um ProcessPoolExecutor
+
+    Cada série é dividida em partes de `tamanho_parte` valores; as partes de
+    todas as séries são enviadas ao mesmo pool, então séries diferentes são
+    processadas ao mesmo tempo. Os acumuladores parciais são combinados na
+    ordem das partes. No máximo 2 partes por processo ficam em trânsito, o que
+    mantém a memória limitada mesmo para geradores.
+
+    A mediana "p2" não é combinável; use "aproximada" (ou "exata", que
+    devolve todos os valores ao processo principal).
+    """
+    if mediana == "p2":
+        raise ValueError("O estimador P² não pode ser combinado; use mediana='aproximada'")
+    resultados = {nome: AcumuladorEstatistico(mediana=mediana) for nome in series}
+    # Importado só aqui: concurrent.futures pesa na inicialização dos scripts
+    from concurrent.futures import ProcessPoolExecutor
+
+    processos = processos or os.cpu_count() or 1
+    pendentes = deque()
+
+    def combinar_primeira():
+        nome, futuro = pendentes.popleft()
+        resultados[nome].combinar(futuro.result())
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for nome, valores in series.items():
+            for parte in _partes(valores, tamanho_parte):
+                pendentes.append((nome, executor.submit(_estatisticas_parte, parte, mediana)))
+                if len(pendentes) >= 2 * processos:
+                    combinar_primeira()
+        while pendentes:
+            combinar_primeira()
+    return resultados
+
+
+def calcular_paralelo(valores: Iterable[float], mediana: Optional[str] = "aproximada",
+                      processos: Optional[int] = None,
+                      tamanho_parte: int = TAMANHO_PARTE) -> AcumuladorEstatistico:
+    """Estatísticas de uma única série dividida entre processos"""
+    return estatisticas_paralelas({"valores": valores}, mediana, processos, tamanho_parte)["valores"]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Exportação de Dados
+FarmTech Solutions
+
+Exportação incremental dos dados do sistema: os registros são escritos um a
+um a partir de iteradores, então a memória usada não cresce com o volume de
+dados. Formatos suportados:
+
+- "indentado": JSON com indentação de 2 espaços (mesmo conteúdo do json.dump
+  com indent=2 usado originalmente);
+- "compacto": JSON sem indentação nem espaços;
+- "ndjson": um objeto JSON por linha, no formato
+  {"secao":"plantio","dados":{...}} (lido por carregar_dados no R).
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator
+
+from fiap_farm_instrumentacao import medir
+
+MODOS_EXPORTACAO = ("indentado", "compacto", "ndjson")
+
+# Tamanho do buffer de escrita (as escritas chegam ao disco em blocos)
+TAMANHO_BUFFER = 1 << 20
+
+
+def _como_dict(registro: Any) -> Any:
+    """Converte visões de registro (Mapping) em dict para o json"""
+    return dict(registro)
+
+
+def _codificador_indentado(codificar_indentado):
+    """Cria o codificador de registros no nível de indentação da lista
+
+    O json só usa o codificador em C quando não há indentação; como os
+    registros costumam ser planos (sem listas ou dicts aninhados), eles são
+    codificados em C com separadores que já incluem a quebra de linha e o
+    recuo, produzindo o mesmo texto do indent=2.
+    """
+    plano = json.JSONEncoder(
+        ensure_ascii=False, separators=(",\n      ", ": "), default=_como_dict
+    ).encode
+    aninhados = (dict, list, tuple, Mapping)
+
+    def codificar(registro):
+        if registro and not any(isinstance(v, aninhados) for v in registro.values()):
+            return "{\n      " + plano(registro)[1:-1] + "\n    }"
+        return codificar_indentado(registro).replace("\n", "\n    ")
+
+    return codificar
+
+
+def _partes_json(fazendas: Dict[str, Any], secoes: Dict[str, Iterable], modo: str) -> Iterator[str]:
+    """Gera o objeto {"fazendas": ..., "plantio": [...], "insumos": [...]} em partes"""
+    if modo == "compacto":
+        opcoes = {"separators": (",", ":")}
+        abre, separador, fecha, recuo = "{", ",", "}", ""
+    else:
+        opcoes = {"indent": 2}
+        abre, separador, fecha, recuo = "{\n  ", ",\n  ", "\n}", "\n  "
+    codificar = json.JSONEncoder(ensure_ascii=False, default=_como_dict, **opcoes).encode
+    codificar_registro = codificar if modo == "compacto" else _codificador_indentado(codificar)
+    dois_pontos = ":" if modo == "compacto" else ": "
+    inicio_lista, entre_itens, fim_lista = ("[", ",", "]") if modo == "compacto" else ("[\n    ", ",\n    ", "\n  ]")
+
+    yield abre
+    yield f'"fazendas"{dois_pontos}' + codificar(fazendas).replace("\n", recuo)
+    for nome, registros in secoes.items():
+        yield f'{separador}"{nome}"{dois_pontos}'
+        primeiro = True
+        for registro in registros:
+            yield inicio_lista if primeiro else entre_itens
+            yield codificar_registro(registro)
+            primeiro = False
+        yield "[]" if primeiro else fim_lista
+    yield fecha
+
+
+def _partes_ndjson(fazendas: Dict[str, Any], secoes: Dict[str, Iterable]) -> Iterator[str]:
+    """Gera uma linha por registro, começando pelas fazendas"""
+    codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_como_dict).encode
+    yield '{"secao":"fazendas","dados":' + codificar(fazendas) + "}\n"
+    for nome, registros in secoes.items():
+        prefixo = '{"secao":"' + nome + '","dados":'
+        for registro in registros:
+            yield prefixo + codificar(registro) + "}\n"
+
+
+def gerar_exportacao(fazendas: Dict[str, Any], plantio: Iterable, insumos: Iterable,
+                     modo: str = "indentado") -> Iterator[str]:
+    """Gera o texto da exportação em partes (um registro por vez)
+
+    Usado por exportar_dados e pela API, que envia as partes em streaming.
+    """
+    if modo not in MODOS_EXPORTACAO:
+        raise ValueError(f"Modo de exportação inválido: {modo}")
+    secoes = {"plantio": plantio, "insumos": insumos}
+    if modo == "ndjson":
+        return _partes_ndjson(fazendas, secoes)
+    return _partes_json(fazendas, secoes, modo)
+
+
+def exportar_dados(caminho: str, fazendas: Dict[str, Any], plantio: Iterable, insumos: Iterable,
+                   modo: str = "indentado") -> int:
+    """Exporta os dados para `caminho` e retorna o número de bytes escritos
+
+    `plantio` e `insumos` podem ser quaisquer iteráveis (inclusive geradores);
+    cada registro é serializado e escrito assim que é lido. O arquivo é
+    gravado em um temporário e renomeado ao final, então uma exportação
+    interrompida não deixa um arquivo pela metade.
+    """
+    partes = gerar_exportacao(fazendas, plantio, insumos, modo)
+    temporario = caminho + ".tmp"
+    with medir("exportacao.exportar_dados") as bloco:
+        try:
+            with open(temporario, "w", encoding="utf-8", buffering=TAMANHO_BUFFER) as arquivo:
+                escrever = arquivo.write
+                for parte in partes:
+                    escrever(parte)
+                arquivo.flush()
+                tamanho = arquivo.tell()
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        bloco.bytes = tamanho
+    return tamanho
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Geometria de Talhões
+FarmTech Solutions
+
+Área de talhões irregulares (polígonos de levantamentos GPS):
+
+- fórmula do laço (shoelace) em coordenadas planas (metros);
+- coordenadas geográficas (lon, lat em graus, como no GeoJSON) projetadas
+  na projeção cilíndrica equivalente de Lambert sobre o elipsoide WGS84,
+  que preserva áreas;
+- polígonos com buracos e multipolígonos (a orientação dos anéis não
+  importa: buracos sempre são subtraídos);
+- cálculo vetorizado com NumPy sobre todos os anéis de uma
+  FeatureCollection de uma vez.
+"""
+
+import json
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# NumPy é opcional (importado no primeiro uso); sem ele os anéis são calculados em Python
+from fiap_farm_opcional import np
+
+# Elipsoide WGS84
+SEMIEIXO_MAIOR = 6378137.0
+ACHATAMENTO = 1 / 298.257223563
+EXCENTRICIDADE = math.sqrt(ACHATAMENTO * (2 - ACHATAMENTO))
+
+TIPOS_POLIGONO = ("Polygon", "MultiPolygon", "GeometryCollection")
+
+
+def _q(seno_lat: float) -> float:
+    """Função q da latitude autálica (Snyder, eq. 3-12)"""
+    e = EXCENTRICIDADE
+    es = e * seno_lat
+    return (1 - e * e) * (seno_lat / (1 - es * es) - math.log((1 - es) / (1 + es)) / (2 * e))
+
+
+def projetar(lon: float, lat: float, lon0: float = 0.0) -> Tuple[float, float]:
+    """Projeta (lon, lat) em graus na cilíndrica equivalente (metros)
+
+    A longitude é tomada relativa a `lon0` (e ajustada para -180..180), o
+    que evita problemas com anéis que cruzam o antimeridiano.
+    """
+    delta = (lon - lon0 + 180.0) % 360.0 - 180.0
+    return SEMIEIXO_MAIOR * math.radians(delta), SEMIEIXO_MAIOR * _q(math.sin(math.radians(lat))) / 2
+
+
+def _area_laco(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Área com sinal pela fórmula do laço, relativa ao primeiro vértice"""
+    n = len(xs)
+    if n < 3:
+        return 0.0
+    x0, y0 = xs[0], ys[0]
+    termos = []
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        termos.append((xs[i] - x0) * (ys[j] - y0) - (xs[j] - x0) * (ys[i] - y0))
+    return math.fsum(termos) / 2
+
+
+def area_anel(coordenadas, geografico: bool = False) -> float:
+    """Área (m²) de um anel de vértices (x, y) ou (lon, lat)
+
+    `coordenadas` pode ser uma sequência de pares ou um array NumPy Nx2; o
+    último vértice pode repetir o primeiro (como no GeoJSON).
+    """
+    if len(coordenadas) < 3:
+        return 0.0
+    if np is not None:
+        return float(abs(_areas_aneis_numpy(np.asarray(coordenadas, dtype=np.float64)[:, :2],
+                                            np.array([0]), geografico)[0]))
+    xs = [float(c[0]) for c in coordenadas]
+    ys = [float(c[1]) for c in coordenadas]
+    if geografico and xs:
+        lon0 = xs[0]
+        projetados = [projetar(lon, lat, lon0) for lon, lat in zip(xs, ys)]
+        xs = [p[0] for p in projetados]
+        ys = [p[1] for p in projetados]
+    return abs(_area_laco(xs, ys))
+
+
+def area_poligono(aneis: Sequence, geografico: bool = False) -> float:
+    """Área (m²) de um polígono: anel externo menos os buracos"""
+    if not aneis:
+        return 0.0
+    externa = area_anel(aneis[0], geografico)
+    return externa - sum(area_anel(buraco, geografico) for buraco in aneis[1:])
+
+
+def area_multipoligono(poligonos: Iterable[Sequence], geografico: bool = False) -> float:
+    """Área (m²) de um multipolígono (soma das partes)"""
+    return sum(area_poligono(aneis, geografico) for aneis in poligonos)
+
+
+def _poligonos(geometria: Dict[str, Any]) -> List[Sequence]:
+    """Lista de polígonos (listas de anéis) de uma geometria GeoJSON"""
+    tipo = geometria.get("type")
+    if tipo == "Polygon":
+        return [geometria["coordinates"]]
+    if tipo == "MultiPolygon":
+        return list(geometria["coordinates"])
+    if tipo == "GeometryCollection":
+        return [p for parte in geometria.get("geometries", ())
+                if parte.get("type") in TIPOS_POLIGONO for p in _poligonos(parte)]
+    raise ValueError(f"Geometria sem área: {tipo}")
+
+
+def area_geometria(geometria: Dict[str, Any], geografico: bool = True) -> float:
+    """Área (m²) de uma geometria GeoJSON (Polygon, MultiPolygon ou coleção)
+
+    Pela especificação do GeoJSON as coordenadas são lon/lat em graus; use
+    geografico=False para arquivos em coordenadas projetadas (metros).
+    """
+    return area_multipoligono(_poligonos(geometria), geografico)
+
+
+def _areas_aneis_numpy(vertices, inicios, geografico: bool):
+    """Áreas com sinal de vários anéis concatenados em um array Nx2
+
+    `inicios` contém o índice do primeiro vértice de cada anel. Cada anel é
+    transladado para o seu primeiro vértice antes da fórmula do laço, o que
+    preserva a precisão com coordenadas grandes.
+    """
+    inicios = np.asarray(inicios, dtype=np.intp)
+    total = len(vertices)
+    tamanhos = np.diff(np.append(inicios, total))
+    anel = np.repeat(np.arange(len(inicios)), tamanhos)
+    xs, ys = vertices[:, 0], vertices[:, 1]
+    if geografico:
+        lon0 = xs[inicios][anel]
+        xs = SEMIEIXO_MAIOR * np.radians((xs - lon0 + 180.0) % 360.0 - 180.0)
+        e = EXCENTRICIDADE
+        seno = np.sin(np.radians(ys))
+        es = e * seno
+        ys = SEMIEIXO_MAIOR * (1 - e * e) * (seno / (1 - es * es) - np.log((1 - es) / (1 + es)) / (2 * e)) / 2
+    xs = xs - xs[inicios][anel]
+    ys = ys - ys[inicios][anel]
+    # Próximo vértice de cada vértice, voltando ao início no fim do anel
+    proximo = np.arange(1, total + 1)
+    proximo[np.append(inicios[1:], total) - 1] = inicios
+    termos = xs * ys[proximo] - xs[proximo] * ys
+    return np.add.reduceat(termos, inicios) / 2 if total else np.zeros(len(inicios))
+
+
+def areas_feicoes(feicoes: Sequence[Dict[str, Any]], geografico: bool = True) -> List[float]:
+    """Área (m²) de cada feição GeoJSON, calculando todos os anéis de uma vez
+
+    Feições sem geometria poligonal recebem área 0.
+    """
+    if np is None:
+        areas = []
+        for feicao in feicoes:
+            geometria = feicao.get("geometry")
+            tipo = geometria.get("type") if geometria else None
+            areas.append(area_geometria(geometria, geografico) if tipo in TIPOS_POLIGONO else 0.0)
+        return areas
+
+    coordenadas: List[Sequence] = []
+    inicios = array("q")
+    sinais = array("d")
+    donos = array("q")
+    posicao = 0
+    for indice, feicao in enumerate(feicoes):
+        geometria = feicao.get("geometry")
+        tipo = geometria.get("type") if geometria else None
+        if tipo not in TIPOS_POLIGONO:
+            continue
+        for aneis in _poligonos(geometria):
+            for ordem, anel in enumerate(aneis):
+                if len(anel) < 3:
+                    continue
+                inicios.append(posicao)
+                sinais.append(1.0 if ordem == 0 else -1.0)
+                donos.append(indice)
+                coordenadas.extend(anel)
+                posicao += len(anel)
+    if not posicao:
+        return [0.0] * len(feicoes)
+
+    try:
+        vertices = np.array(coordenadas, dtype=np.float64)[:, :2]
+    except ValueError:  # vértices com e sem altitude misturados
+        vertices = np.array([c[:2] for c in coordenadas], dtype=np.float64)
+    areas = np.abs(_areas_aneis_numpy(vertices, np.frombuffer(inicios, dtype=np.int64), geografico))
+    areas *= np.frombuffer(sinais, dtype=np.float64)
+    return np.bincount(np.frombuffer(donos, dtype=np.int64), weights=areas, minlength=len(feicoes)).tolist()
+
+
+def carregar_geojson(caminho: str) -> List[Dict[str, Any]]:
+    """Lê as feições de um GeoJSON (FeatureCollection, Feature ou geometria)"""
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    tipo = dados.get("type")
+    if tipo == "FeatureCollection":
+        return dados.get("features", [])
+    if tipo == "Feature":
+        return [dados]
+    return [{"type": "Feature", "properties": {}, "geometry": dados}]
+
+
+def _arco_longitudes(intervalos: Iterable[Tuple[float, float]]) -> Tuple[float, float]:
+    """Menor arco (oeste, leste) que cobre os intervalos de longitude, em graus
+
+    Pode cruzar o antimeridiano: nesse caso leste passa de 180 (ex.: 179 a
+    181 em vez de -180 a 180).
+    """
+    normalizados = sorted(((a + 180) % 360 - 180, (a + 180) % 360 - 180 + (b - a)) for a, b in intervalos)
+    fim = normalizados[0][1]
+    maior_vao, inicio, fim_antes = 0.0, None, None
+    for oeste, leste in normalizados[1:]:
+        if oeste - fim > maior_vao:
+            maior_vao, inicio, fim_antes = oeste - fim, oeste, fim
+        fim = max(fim, leste)
+    if inicio is None or normalizados[0][0] + 360 - fim >= maior_vao:
+        if fim - normalizados[0][0] >= 360:
+            return -180.0, 180.0
+        return normalizados[0][0], fim
+    return inicio, max(fim_antes + 360, fim)
+
+
+def caixa_aneis(aneis: Iterable[Sequence], geografico: bool = True) -> Optional[List[float]]:
+    """Caixa [minx, miny, maxx, maxy] dos vértices dos anéis (None se vazios)
+
+    Com coordenadas geográficas as longitudes de cada anel são desdobradas a
+    partir do primeiro vértice (arestas pelo lado mais curto, como no cálculo
+    da área), então um talhão que cruza o antimeridiano ganha uma caixa
+    estreita com maxx acima de 180, e não uma de -180 a 180.
+    """
+    intervalos, ys = [], []
+    for anel in aneis:
+        if not len(anel):
+            continue
+        xs = [float(vertice[0]) for vertice in anel]
+        ys.extend(float(vertice[1]) for vertice in anel)
+        if geografico:
+            lon0 = xs[0]
+            xs = [(x - lon0 + 180.0) % 360.0 - 180.0 + lon0 for x in xs]
+        intervalos.append((min(xs), max(xs)))
+    if not intervalos:
+        return None
+    if geografico:
+        minx, maxx = _arco_longitudes(intervalos)
+    else:
+        minx, maxx = min(i[0] for i in intervalos), max(i[1] for i in intervalos)
+    return [minx, min(ys), maxx, max(ys)]
+
+
+def medir_geojson(caminho: str, geografico: bool = True,
+                  campo_nome: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Mede todos os talhões de um arquivo GeoJSON
+
+    Retorna um registro de plantio por feição poligonal, com tipo
+    "poligono", nome (da propriedade `campo_nome`, se houver), número de
+    vértices, bbox (caixa dos anéis externos, usada pelo índice espacial;
+    ver caixa_aneis), area_m2 e area_ha.
+    """
+    feicoes = carregar_geojson(caminho)
+    registros = []
+    for feicao, area_m2 in zip(feicoes, areas_feicoes(feicoes, geografico)):
+        geometria = feicao.get("geometry")
+        if not geometria or geometria.get("type") not in TIPOS_POLIGONO:
+            continue
+        registro = {"tipo": "poligono"}
+        propriedades = feicao.get("properties") or {}
+        if campo_nome and campo_nome in propriedades:
+            registro["nome"] = propriedades[campo_nome]
+        poligonos = _poligonos(geometria)
+        registro["vertices"] = sum(len(anel) for aneis in poligonos for anel in aneis)
+        caixa = caixa_aneis((aneis[0] for aneis in poligonos if aneis), geografico)
+        if caixa is not None:
+            registro["bbox"] = caixa
+        registro["area_m2"] = area_m2
+        registro["area_ha"] = area_m2 / 10000  # Conversão para hectares
+        registros.append(registro)
+    return registros
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - HTTP Assíncrono
+FarmTech Solutions
+
+Camada HTTP/1.1 mínima sobre asyncio (somente biblioteca padrão):
+
+- ClienteHTTP: cliente com conexões persistentes (keep-alive) reutilizadas
+  por host, limite de conexões simultâneas por host e tempo limite;
+- ler_requisicao / resposta: leitura de requisições e montagem de respostas
+  para servidores feitos com asyncio.start_server (o servidor simulado de
+  clima e a API usam estas funções); inicio_chunked / pedaco enviam corpos
+  em streaming.
+
+Suporta Content-Length e Transfer-Encoding: chunked; não implementa
+pipelining, redirecionamentos nem compressão.
+"""
+
+import asyncio
+import json
+import ssl
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+MOTIVOS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+# Limites de leitura (proteção contra cabeçalhos ou corpos absurdos)
+MAX_CABECALHOS = 100
+MAX_CORPO = 64 * 1024 * 1024
+
+
+class ErroHTTP(Exception):
+    """Resposta ou requisição HTTP malformada"""
+
+
+class RespostaHTTP(NamedTuple):
+    status: int
+    cabecalhos: Dict[str, str]
+    corpo: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.corpo)
+
+
+class RequisicaoHTTP(NamedTuple):
+    metodo: str
+    caminho: str
+    parametros: Dict[str, str]
+    cabecalhos: Dict[str, str]
+    corpo: bytes
+
+    @property
+    def manter_conexao(self) -> bool:
+        return self.cabecalhos.get("connection", "").lower() != "close"
+
+
+async def _ler_cabecalhos(leitor: asyncio.StreamReader) -> Dict[str, str]:
+    """Lê os cabeçalhos até a linha em branco (nomes em minúsculas)"""
+    cabecalhos = {}
+    for _ in range(MAX_CABECALHOS + 1):
+        linha = await leitor.readline()
+        if not linha.endswith(b"\n"):
+            raise asyncio.IncompleteReadError(linha, None)
+        if linha in (b"\r\n", b"\n"):
+            return cabecalhos
+        nome, separador, valor = linha.decode("latin-1").partition(":")
+        if not separador:
+            raise ErroHTTP(f"cabeçalho inválido: {linha[:80]!r}")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    raise ErroHTTP("cabeçalhos demais")
+
+
+async def _ler_corpo(leitor: asyncio.StreamReader, cabecalhos: Dict[str, str], ate_fim: bool = False) -> bytes:
+    """Lê o corpo por Content-Length, chunked ou (respostas) até o fim da conexão"""
+    if "chunked" in cabecalhos.get("transfer-encoding", "").lower():
+        partes = []
+        tamanho_total = 0
+        while True:
+            linha = await leitor.readline()
+            tamanho = int(linha.split(b";", 1)[0].strip() or b"0", 16)
+            if tamanho == 0:
+                await _ler_cabecalhos(leitor)  # trailers
+                return b"".join(partes)
+            tamanho_total += tamanho
+            if tamanho_total > MAX_CORPO:
+                raise ErroHTTP("corpo grande demais")
+            partes.append(await leitor.readexactly(tamanho))
+            await leitor.readexactly(2)
+    comprimento = cabecalhos.get("content-length")
+    if comprimento is not None:
+        tamanho = int(comprimento)
+        if tamanho > MAX_CORPO:
+            raise ErroHTTP("corpo grande demais")
+        return await leitor.readexactly(tamanho) if tamanho else b""
+    return await leitor.read(MAX_CORPO) if ate_fim else b""
+
+
+async def ler_requisicao(leitor: asyncio.StreamReader) -> Optional[RequisicaoHTTP]:
+    """Lê uma requisição; retorna None se o cliente fechou a conexão"""
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    try:
+        metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ErroHTTP(f"linha de requisição inválida: {linha[:80]!r}") from None
+    cabecalhos = await _ler_cabecalhos(leitor)
+    corpo = await _ler_corpo(leitor, cabecalhos)
+    caminho, _, consulta = alvo.partition("?")
+    return RequisicaoHTTP(metodo.upper(), caminho, dict(parse_qsl(consulta)), cabecalhos, corpo)
+
+
+def resposta(status: int, corpo: bytes = b"", tipo: str = "application/json",
+             manter_conexao: bool = True, cabecalhos: Optional[Dict[str, str]] = None) -> bytes:
+    """Monta uma resposta HTTP/1.1 completa (cabeçalhos + corpo)"""
+    linhas = [f"HTTP/1.1 {status} {MOTIVOS.get(status, 'Status')}",
+              f"Content-Type: {tipo}",
+              f"Content-Length: {len(corpo)}"]
+    if not manter_conexao:
+        linhas.append("Connection: close")
+    for nome, valor in (cabecalhos or {}).items():
+        linhas.append(f"{nome}: {valor}")
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo
+
+
+def inicio_chunked(status: int, tipo: str = "application/x-ndjson; charset=utf-8",
+                   manter_conexao: bool = True) -> bytes:
+    """Cabeçalhos de uma resposta com corpo em partes (Transfer-Encoding: chunked)
+
+    Depois deles, cada parte é enviada com pedaco() e o fim com FIM_CHUNKED.
+    """
+    linhas = [f"HTTP/1.1 {status} {MOTIVOS.get(status, 'Status')}",
+              f"Content-Type: {tipo}",
+              "Transfer-Encoding: chunked"]
+    if not manter_conexao:
+        linhas.append("Connection: close")
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1")
+
+
+def pedaco(dados: bytes) -> bytes:
+    """Uma parte de um corpo chunked (não deve ser vazia)"""
+    return b"%x\r\n%b\r\n" % (len(dados), dados)
+
+
+FIM_CHUNKED = b"0\r\n\r\n"
+
+
+def resposta_json(status: int, dados: Any, manter_conexao: bool = True) -> bytes:
+    """Resposta com o corpo em JSON (UTF-8)"""
+    corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return resposta(status, corpo, "application/json; charset=utf-8", manter_conexao)
+
+
+class ClienteHTTP:
+    """Cliente HTTP/1.1 assíncrono com conexões persistentes por host
+
+    Uso:
+        async with ClienteHTTP(conexoes_por_host=20) as cliente:
+            resposta = await cliente.get("http://127.0.0.1:8080/dados", {"id": 1})
+
+    Cada host tem no máximo `conexoes_por_host` conexões abertas; as livres
+    são reaproveitadas pelas próximas requisições. Uma conexão reaproveitada
+    que o servidor já fechou é trocada por uma nova (uma nova tentativa).
+    """
+
+    def __init__(self, conexoes_por_host: int = 20, tempo_limite: float = 10.0,
+                 contexto_ssl: Optional[ssl.SSLContext] = None):
+        self.conexoes_por_host = conexoes_por_host
+        self.tempo_limite = tempo_limite
+        self.contexto_ssl = contexto_ssl
+        self.conexoes_abertas = 0
+        self._livres: Dict[tuple, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._limites: Dict[tuple, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "ClienteHTTP":
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.fechar()
+
+    async def _abrir(self, destino: tuple) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        esquema, host, porta = destino
+        contexto = None
+        if esquema == "https":
+            contexto = self.contexto_ssl or ssl.create_default_context()
+        conexao = await asyncio.open_connection(host, porta, ssl=contexto)
+        self.conexoes_abertas += 1
+        return conexao
+
+    def _descartar(self, conexao: Tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+        conexao[1].close()
+        self.conexoes_abertas -= 1
+
+    async def requisitar(self, metodo: str, url: str, corpo: bytes = b"",
+                         cabecalhos: Optional[Dict[str, str]] = None) -> RespostaHTTP:
+        """Envia uma requisição e retorna a resposta completa"""
+        partes = urlsplit(url)
+        esquema = partes.scheme or "http"
+        if esquema not in ("http", "https"):
+            raise ErroHTTP(f"esquema não suportado: {esquema}")
+        porta = partes.port or (443 if esquema == "https" else 80)
+        destino = (esquema, partes.hostname, porta)
+        alvo = partes.path or "/"
+        if partes.query:
+            alvo += "?" + partes.query
+        linhas = [f"{metodo} {alvo} HTTP/1.1", f"Host: {partes.netloc}", "Accept-Encoding: identity"]
+        if corpo or metodo in ("POST", "PUT"):
+            linhas.append(f"Content-Length: {len(corpo)}")
+        for nome, valor in (cabecalhos or {}).items():
+            linhas.append(f"{nome}: {valor}")
+        mensagem = ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo
+
+        limite = self._limites.get(destino)
+        if limite is None:
+            limite = self._limites[destino] = asyncio.Semaphore(self.conexoes_por_host)
+        async with limite:
+            return await asyncio.wait_for(self._enviar(destino, mensagem), self.tempo_limite)
+
+    async def _enviar(self, destino: tuple, mensagem: bytes) -> RespostaHTTP:
+        livres = self._livres.setdefault(destino, [])
+        while True:
+            reaproveitada = bool(livres)
+            conexao = livres.pop() if reaproveitada else await self._abrir(destino)
+            leitor, escritor = conexao
+            try:
+                escritor.write(mensagem)
+                await escritor.drain()
+                linha = await leitor.readline()
+                if not linha:
+                    raise ConnectionResetError("conexão fechada pelo servidor")
+                versao, _, resto = linha.decode("latin-1").partition(" ")
+                if not versao.startswith("HTTP/"):
+                    raise ErroHTTP(f"linha de status inválida: {linha[:80]!r}")
+                status = int(resto.split(" ", 1)[0])
+                resposta_cabecalhos = await _ler_cabecalhos(leitor)
+                fechar = (resposta_cabecalhos.get("connection", "").lower() == "close"
+                          or versao == "HTTP/1.0")
+                corpo = await _ler_corpo(leitor, resposta_cabecalhos, ate_fim=fechar)
+            except (ConnectionError, asyncio.IncompleteReadError) as erro:
+                self._descartar(conexao)
+                if reaproveitada:
+                    continue  # o servidor fechou a conexão ociosa: tenta com outra
+                raise ConnectionError(f"falha na conexão com {destino[1]}:{destino[2]}: {erro}") from erro
+            except BaseException:
+                self._descartar(conexao)
+                raise
+            if fechar:
+                self._descartar(conexao)
+            else:
+                livres.append(conexao)
+            return RespostaHTTP(status, resposta_cabecalhos, corpo)
+
+    async def get(self, url: str, parametros: Optional[Dict[str, Any]] = None) -> RespostaHTTP:
+        """GET com parâmetros de consulta"""
+        if parametros:
+            url += ("&" if "?" in url else "?") + urlencode(parametros)
+        return await self.requisitar("GET", url)
+
+    async def fechar(self) -> None:
+        """Fecha as conexões livres"""
+        for livres in self._livres.values():
+            while livres:
+                self._descartar(livres.pop())
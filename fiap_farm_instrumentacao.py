@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Instrumentação e Perfil
+FarmTech Solutions
+
+Métricas opcionais dos caminhos principais (cálculos, CRUD, resumo,
+exportação e estatísticas):
+
+- @medido marca métodos de classe; ativar() troca cada um por uma versão
+  que registra chamadas, erros, histograma de latência e bytes escritos, e
+  desativar() devolve o método original. Desativada (o padrão), a
+  instrumentação não custa nada: as classes ficam com os métodos originais;
+- medir(nome) é o equivalente em bloco (with), para funções de módulo;
+- as métricas saem no formato texto do Prometheus ou em JSON.
+
+Variáveis de ambiente (lidas por configurar_ambiente, chamada pelos pontos
+de entrada fiap_farm.py e fiap_farm_api.py):
+
+- FIAP_FARM_METRICAS=<arquivo.prom|arquivo.json>: ativa as métricas e as
+  grava no arquivo ao encerrar (o formato vem da extensão);
+- FIAP_FARM_PERFIL=<arquivo>: grava um perfil da execução inteira. Com
+  FIAP_FARM_PERFIL_MODO=cprofile (padrão) o arquivo é o do cProfile (ler
+  com `python -m pstats`); com "amostragem", uma thread amostra a pilha da
+  thread principal a cada FIAP_FARM_PERFIL_INTERVALO ms (padrão 5) e grava
+  as pilhas no formato "collapsed" (flamegraph.pl, speedscope).
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Limites (segundos) dos baldes do histograma de latência
+LIMITES_LATENCIA = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+MODOS_PERFIL = ("cprofile", "amostragem")
+
+TIPO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrica:
+    """Chamadas, erros, latências (histograma) e bytes de uma operação"""
+
+    __slots__ = ("nome", "chamadas", "erros", "segundos", "bytes", "baldes")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.chamadas = 0
+        self.erros = 0
+        self.segundos = 0.0
+        self.bytes = 0
+        self.baldes = [0] * (len(LIMITES_LATENCIA) + 1)
+
+    def registrar(self, segundos: float, erro: bool = False, escritos: int = 0) -> None:
+        self.chamadas += 1
+        self.erros += erro
+        self.segundos += segundos
+        self.bytes += escritos
+        self.baldes[bisect.bisect_left(LIMITES_LATENCIA, segundos)] += 1
+
+    def percentil(self, p: float) -> float:
+        """Limite superior do balde do percentil p (0-100), em segundos"""
+        alvo, acumulado = p / 100 * self.chamadas, 0
+        for limite, contagem in zip(LIMITES_LATENCIA + (float("inf"),), self.baldes):
+            acumulado += contagem
+            if acumulado >= alvo and acumulado:
+                return limite
+        return float("nan")
+
+    def como_dict(self) -> Dict[str, Any]:
+        acumulado, histograma = 0, {}
+        for limite, contagem in zip(LIMITES_LATENCIA, self.baldes):
+            acumulado += contagem
+            histograma[repr(limite)] = acumulado
+        histograma["+Inf"] = self.chamadas
+        return {"chamadas": self.chamadas, "erros": self.erros, "segundos": self.segundos,
+                "media_ms": self.segundos / self.chamadas * 1000 if self.chamadas else None,
+                "p50_ms": self.percentil(50) * 1000, "p99_ms": self.percentil(99) * 1000,
+                "bytes": self.bytes, "histograma": histograma}
+
+
+class Registro:
+    """Métricas por nome de operação (as threads da API compartilham o mesmo)"""
+
+    def __init__(self):
+        self.metricas: Dict[str, Metrica] = {}
+        self._trava = threading.Lock()
+
+    def metrica(self, nome: str) -> Metrica:
+        """Métrica da operação (criada na primeira vez)"""
+        with self._trava:
+            metrica = self.metricas.get(nome)
+            if metrica is None:
+                metrica = self.metricas[nome] = Metrica(nome)
+            return metrica
+
+    def registrar(self, nome: str, segundos: float, erro: bool = False, escritos: int = 0) -> None:
+        metrica = self.metrica(nome)
+        with self._trava:
+            metrica.registrar(segundos, erro, escritos)
+
+    def limpar(self) -> None:
+        """Zera as métricas (as versões medidas guardam as mesmas instâncias)"""
+        with self._trava:
+            for metrica in self.metricas.values():
+                metrica.__init__(metrica.nome)
+
+    def como_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._trava:
+            return {nome: metrica.como_dict() for nome, metrica in sorted(self.metricas.items()) if metrica.chamadas}
+
+    def prometheus(self) -> str:
+        """Métricas no formato de exposição em texto do Prometheus"""
+        linhas = [
+            "# HELP fiap_farm_duracao_segundos Duração das operações instrumentadas",
+            "# TYPE fiap_farm_duracao_segundos histogram",
+        ]
+        with self._trava:
+            metricas = [(nome, metrica) for nome, metrica in sorted(self.metricas.items()) if metrica.chamadas]
+            for nome, metrica in metricas:
+                rotulo = _rotulo(nome)
+                acumulado = 0
+                for limite, contagem in zip(LIMITES_LATENCIA, metrica.baldes):
+                    acumulado += contagem
+                    linhas.append(f'fiap_farm_duracao_segundos_bucket{{operacao="{rotulo}",le="{limite!r}"}} '
+                                  f"{acumulado}")
+                linhas.append(f'fiap_farm_duracao_segundos_bucket{{operacao="{rotulo}",le="+Inf"}} {metrica.chamadas}')
+                linhas.append(f'fiap_farm_duracao_segundos_sum{{operacao="{rotulo}"}} {metrica.segundos!r}')
+                linhas.append(f'fiap_farm_duracao_segundos_count{{operacao="{rotulo}"}} {metrica.chamadas}')
+            for serie, campo, ajuda in (("fiap_farm_erros_total", "erros", "Chamadas que terminaram em exceção"),
+                                        ("fiap_farm_bytes_escritos_total", "bytes", "Bytes escritos")):
+                linhas.append(f"# HELP {serie} {ajuda}")
+                linhas.append(f"# TYPE {serie} counter")
+                for nome, metrica in metricas:
+                    linhas.append(f'{serie}{{operacao="{_rotulo(nome)}"}} {getattr(metrica, campo)}')
+        return "\n".join(linhas) + "\n"
+
+
+def _rotulo(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRO = Registro()
+
+# (classe, atributo, valor original no __dict__ da classe, função, nome, bytes_escritos)
+_MEDIDOS: List[tuple] = []
+
+_ativo = False
+_configurado = False
+
+
+class _Marca:
+    """Marca deixada por @medido até a classe ser criada (ver __set_name__)"""
+
+    def __init__(self, original, nome: Optional[str], bytes_escritos: Optional[Callable[[Any], int]]):
+        self.original = original
+        self.nome = nome
+        self.bytes_escritos = bytes_escritos
+
+    def __set_name__(self, classe, atributo: str) -> None:
+        funcao = self.original.__func__ if isinstance(self.original, (staticmethod, classmethod)) else self.original
+        nome = self.nome or f"{classe.__name__}.{atributo}"
+        _MEDIDOS.append((classe, atributo, self.original, funcao, nome, self.bytes_escritos))
+        # A classe fica com o método original; ativar() o troca pela versão medida
+        setattr(classe, atributo, self.original)
+        if _ativo:
+            _instalar(*_MEDIDOS[-1])
+
+
+def medido(funcao=None, *, nome: Optional[str] = None, bytes_escritos: Optional[Callable[[Any], int]] = None):
+    """Marca um método para a instrumentação (@medido ou @medido(nome=..., bytes_escritos=...))
+
+    `nome` padrão: "Classe.metodo". `bytes_escritos` extrai do retorno os
+    bytes escritos pela chamada. Funciona acima de @staticmethod e
+    @classmethod; para funções de módulo use medir().
+    """
+    if funcao is None:
+        return lambda original: _Marca(original, nome, bytes_escritos)
+    return _Marca(funcao, nome, bytes_escritos)
+
+
+def _envolver(funcao: Callable, nome: str, bytes_escritos: Optional[Callable[[Any], int]]) -> Callable:
+    relogio = time.perf_counter
+    registrar = REGISTRO.metrica(nome).registrar
+    trava = REGISTRO._trava
+
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        inicio = relogio()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            segundos = relogio() - inicio
+            with trava:
+                registrar(segundos, True)
+            raise
+        segundos = relogio() - inicio
+        escritos = bytes_escritos(resultado) if bytes_escritos else 0
+        with trava:
+            registrar(segundos, False, escritos)
+        return resultado
+
+    return medida
+
+
+def _instalar(classe, atributo, original, funcao, nome, bytes_escritos) -> None:
+    medida = _envolver(funcao, nome, bytes_escritos)
+    if isinstance(original, staticmethod):
+        medida = staticmethod(medida)
+    elif isinstance(original, classmethod):
+        medida = classmethod(medida)
+    setattr(classe, atributo, medida)
+
+
+def ativar() -> None:
+    """Passa a medir os métodos marcados com @medido e os blocos medir()"""
+    global _ativo
+    if not _ativo:
+        _ativo = True
+        for medido_ in _MEDIDOS:
+            _instalar(*medido_)
+
+
+def desativar() -> None:
+    """Devolve os métodos originais (as métricas já coletadas são mantidas)"""
+    global _ativo
+    if _ativo:
+        _ativo = False
+        for classe, atributo, original, *_ in _MEDIDOS:
+            setattr(classe, atributo, original)
+
+
+def ativa() -> bool:
+    return _ativo
+
+
+class _Bloco:
+    """Bloco medido: `bytes` pode ser preenchido dentro do with"""
+
+    __slots__ = ("nome", "bytes", "_inicio")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.bytes = 0
+
+    def __enter__(self) -> "_Bloco":
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *_) -> None:
+        REGISTRO.registrar(self.nome, time.perf_counter() - self._inicio, erro=tipo is not None, escritos=self.bytes)
+
+
+class _BlocoInativo:
+    __slots__ = ("bytes",)
+
+    def __enter__(self) -> "_BlocoInativo":
+        return self
+
+    def __exit__(self, *_) -> None:
+        pass
+
+
+_INATIVO = _BlocoInativo()
+
+
+def medir(nome: str):
+    """Mede um bloco (with medir("exportacao") as bloco: ...; bloco.bytes = n)"""
+    return _Bloco(nome) if _ativo else _INATIVO
+
+
+def gravar_metricas(caminho: str) -> None:
+    """Grava as métricas em JSON (arquivo .json) ou no formato do Prometheus"""
+    if caminho.endswith(".json"):
+        texto = json.dumps(REGISTRO.como_dict(), indent=2, ensure_ascii=False) + "\n"
+    else:
+        texto = REGISTRO.prometheus()
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto)
+    os.replace(temporario, caminho)
+
+
+# ----------------------------------------------------------------------
+# Perfil (cProfile ou amostragem da pilha)
+# ----------------------------------------------------------------------
+
+class PerfilAmostrado:
+    """Amostra a pilha de uma thread a cada `intervalo` segundos
+
+    As pilhas são contadas no formato "collapsed" (quadros da raiz para a
+    folha separados por ";"), lido por flamegraph.pl e speedscope.
+    """
+
+    def __init__(self, intervalo: float = 0.005, thread_id: Optional[int] = None):
+        self.intervalo = intervalo
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.pilhas: Counter = Counter()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._amostrar, name="fiap-farm-perfil", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _amostrar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            if quadro is None:
+                continue
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                quadro = quadro.f_back
+            self.pilhas[";".join(reversed(pilha))] += 1
+
+    def gravar(self, caminho: str) -> None:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, amostras in self.pilhas.most_common():
+                arquivo.write(f"{pilha} {amostras}\n")
+
+
+def iniciar_perfil(caminho: str, modo: str = "cprofile", intervalo: float = 0.005) -> Callable[[], None]:
+    """Começa a perfilar a thread atual; retorna a função que para e grava o perfil"""
+    if modo not in MODOS_PERFIL:
+        raise ValueError(f"Modo de perfil inválido: {modo} (use {', '.join(MODOS_PERFIL)})")
+    if modo == "cprofile":
+        import cProfile
+        perfil = cProfile.Profile()
+        perfil.enable()
+
+        def encerrar() -> None:
+            perfil.disable()
+            perfil.dump_stats(caminho)
+    else:
+        amostrador = PerfilAmostrado(intervalo)
+        amostrador.iniciar()
+
+        def encerrar() -> None:
+            amostrador.parar()
+            amostrador.gravar(caminho)
+    return encerrar
+
+
+def configurar_ambiente(ambiente: Optional[Dict[str, str]] = None) -> None:
+    """Ativa métricas e perfil conforme FIAP_FARM_METRICAS e FIAP_FARM_PERFIL (uma vez por processo)"""
+    global _configurado
+    if _configurado:
+        return
+    _configurado = True
+    ambiente = os.environ if ambiente is None else ambiente
+    metricas = ambiente.get("FIAP_FARM_METRICAS")
+    if metricas:
+        ativar()
+        atexit.register(gravar_metricas, metricas)
+    perfil = ambiente.get("FIAP_FARM_PERFIL")
+    if perfil:
+        intervalo = float(ambiente.get("FIAP_FARM_PERFIL_INTERVALO", "5")) / 1000
+        atexit.register(iniciar_perfil(perfil, ambiente.get("FIAP_FARM_PERFIL_MODO", "cprofile"), intervalo))
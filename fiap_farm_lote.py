@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Processamento em Lote
+FarmTech Solutions
+
+Execução não interativa dos cálculos de área e insumos para listas grandes
+de talhões:
+
+    python fiap_farm.py batch --in talhoes.csv --out resultados.ndjson
+
+A entrada é CSV (com cabeçalho) ou NDJSON, com as colunas:
+
+- tipo: "quadrado", "retangulo" ou "hectares" (deduzido das colunas
+  preenchidas quando ausente);
+- lado (quadrado), largura e altura (retângulo), em metros, ou hectares;
+- quantidade: "minima", "media" (padrão) ou "maxima";
+- id: opcional, copiado para a saída.
+
+Cada linha gera um objeto NDJSON com a área e os insumos no mesmo formato
+dos registros "completo" do menu de insumos. Linhas inválidas geram
+{"linha": n, "erro": "..."} sem interromper o processamento (o código de
+saída é 1 se alguma linha teve erro). As linhas são lidas e escritas em
+blocos, então a memória não cresce com o arquivo.
+
+Com --catalogo as doses vêm do catálogo agronômico (fiap_farm_catalogo);
+se o arquivo mudar durante o processamento, os blocos seguintes usam a
+nova versão e cada bloco é calculado inteiro com uma única versão.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from fiap_farm import CalculadoraArea, CalculadoraInsumos, NIVEIS_QUANTIDADE
+from fiap_farm_catalogo import CatalogoMonitorado
+
+# Linhas calculadas e escritas de uma vez
+TAMANHO_BLOCO = 16_384
+
+FORMATOS_ENTRADA = ("csv", "ndjson")
+
+
+def _numero(linha: Dict[str, Any], campo: str) -> Optional[float]:
+    """Lê um campo numérico positivo (None se vazio ou ausente)"""
+    valor = linha.get(campo)
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+        raise ValueError(f"{campo} deve ser um número")
+    numero = float(valor)
+    if not numero > 0 or math.isinf(numero):
+        raise ValueError(f"{campo} deve ser maior que zero")
+    return numero
+
+
+def _texto(linha: Dict[str, Any], campo: str) -> str:
+    """Lê um campo de texto, sem espaços e em minúsculas ("" se vazio ou ausente)"""
+    valor = linha.get(campo) or ""
+    if not isinstance(valor, str):
+        raise ValueError(f"{campo} deve ser texto")
+    return valor.strip().lower()
+
+
+def calcular_area(linha: Dict[str, Any]) -> Dict[str, Any]:
+    """Calcula a área de uma linha de entrada, como no menu de área
+
+    Retorna um dict com tipo, medidas, area_m2 e area_ha; levanta ValueError
+    para linhas inválidas.
+    """
+    tipo = _texto(linha, "tipo")
+    lado = _numero(linha, "lado")
+    largura, altura = _numero(linha, "largura"), _numero(linha, "altura")
+    hectares = _numero(linha, "hectares")
+    if not tipo:
+        tipo = "quadrado" if lado else "retangulo" if largura or altura else "hectares"
+
+    if tipo == "quadrado":
+        if lado is None:
+            raise ValueError("quadrado sem lado")
+        try:
+            area_m2 = CalculadoraArea.calcular_quadrado(lado)
+        except OverflowError:
+            raise ValueError("área grande demais") from None
+        area = {"tipo": tipo, "lado": lado}
+    elif tipo == "retangulo":
+        if largura is None or altura is None:
+            raise ValueError("retangulo sem largura ou altura")
+        area_m2 = CalculadoraArea.calcular_retangulo(largura, altura)
+        area = {"tipo": tipo, "largura": largura, "altura": altura}
+    elif tipo == "hectares":
+        if hectares is None:
+            raise ValueError("linha sem hectares")
+        area = {"tipo": tipo}
+        area_m2 = hectares * 10000
+    else:
+        raise ValueError(f"tipo desconhecido: {tipo}")
+
+    area["area_m2"] = area_m2
+    area["area_ha"] = hectares if tipo == "hectares" else area_m2 / 10000  # Conversão para hectares
+    if not math.isfinite(area_m2):
+        raise ValueError("área grande demais")
+    return area
+
+
+def ler_linhas(arquivo: TextIO, formato: str) -> Iterator[Dict[str, Any]]:
+    """Lê as linhas de entrada uma a uma (CSV com cabeçalho ou NDJSON)
+
+    Uma linha NDJSON que não é JSON válido é entregue como ValueError, para
+    virar um erro daquela linha no processamento.
+    """
+    if formato == "csv":
+        yield from csv.DictReader(arquivo)
+        return
+    for texto in arquivo:
+        if texto.strip():
+            try:
+                yield json.loads(texto)
+            except json.JSONDecodeError as erro:
+                yield ValueError(f"JSON inválido: {erro.msg}")
+
+
+def _modelo_insumos(calc: CalculadoraInsumos, cultura: Optional[str] = None) -> Tuple[str, List[str]]:
+    """Monta o trecho JSON dos insumos com um %r por coluna do cálculo em lote"""
+    plano = calc.plano(cultura)
+    grupos = {
+        "corretivos": list(plano.doses["corretivos"]),
+        "fertilizantes": list(plano.doses["fertilizantes"]),
+        "defensivos": ["pulverizacoes_ano", "calda_total_litros"],
+    }
+    colunas = [nome for nomes in grupos.values() for nome in nomes]
+    modelo = ",".join(
+        f'"{grupo}":{{' + ",".join(f'"{nome}":%r' for nome in nomes) + "}"
+        for grupo, nomes in grupos.items()
+    )
+    return modelo, colunas
+
+
+def _prefixo_area(area: Dict[str, Any], modelos: Dict[tuple, str]) -> str:
+    """Formata os campos de área; repr de float finito é o mesmo texto do json"""
+    chaves = tuple(area)
+    modelo = modelos.get(chaves)
+    if modelo is None:
+        modelo = modelos[chaves] = ",".join(f'"{chave}":%r' for chave in chaves[1:])
+    return f'"tipo":"{area["tipo"]}",' + modelo % tuple(area.values())[1:]
+
+
+def _erro_linha(numero: int, mensagem: str) -> str:
+    return json.dumps({"linha": numero, "erro": mensagem}, ensure_ascii=False, separators=(",", ":"))
+
+
+def _processar_bloco(calc: CalculadoraInsumos, modelo: Tuple[str, List[str]], bloco: List[Dict[str, Any]],
+                     primeira: int, cultura: Optional[str] = None) -> Tuple[List[str], int]:
+    """Calcula um bloco de linhas e retorna (linhas NDJSON, número de erros)
+
+    Os insumos das linhas válidas são calculados de uma vez com
+    calcular_todos_lote; cada linha é formatada direto no texto NDJSON.
+    Linhas cujos resultados não são finitos (JSON não tem infinito) viram
+    erros da linha.
+    """
+    saida: List[Optional[str]] = [None] * len(bloco)
+    modelos_area: Dict[tuple, str] = {}
+    posicoes, prefixos, hectares, quantidades = [], [], [], []
+    invalidas = 0
+    for posicao, linha in enumerate(bloco):
+        numero = primeira + posicao
+        try:
+            if isinstance(linha, ValueError):
+                raise linha
+            if not isinstance(linha, dict):
+                raise ValueError("linha deve ser um objeto")
+            area = calcular_area(linha)
+            quantidade = _texto(linha, "quantidade") or "media"
+            if quantidade not in NIVEIS_QUANTIDADE:
+                raise ValueError(f"quantidade inválida: {quantidade}")
+        except (ValueError, TypeError, AttributeError, OverflowError) as erro:
+            saida[posicao] = _erro_linha(numero, str(erro))
+            continue
+        identificador = linha.get("id")
+        id_json = "" if identificador in (None, "") else '"id":' + json.dumps(identificador, ensure_ascii=False) + ","
+        posicoes.append(posicao)
+        prefixos.append(f'{{"linha":{numero},{id_json}{_prefixo_area(area, modelos_area)},'
+                        f'"quantidade":"{quantidade}",')
+        hectares.append(area["area_ha"])
+        quantidades.append(quantidade)
+
+    if posicoes:
+        texto, nomes = modelo
+        colunas = calc.calcular_todos_lote(hectares, quantidades, cultura)
+        valores = zip(*(colunas[nome].tolist() for nome in nomes))
+        for posicao, prefixo, linha_valores in zip(posicoes, prefixos, valores):
+            if all(map(math.isfinite, linha_valores)):
+                saida[posicao] = prefixo + texto % linha_valores + "}"
+            else:
+                saida[posicao] = _erro_linha(primeira + posicao, "insumos grandes demais")
+                invalidas += 1
+
+    return saida, len(bloco) - len(posicoes) + invalidas
+
+
+def processar_lote(linhas: Iterable[Dict[str, Any]], saida: TextIO, tamanho_bloco: int = TAMANHO_BLOCO,
+                   cultura: Optional[str] = None, calc: Optional[CalculadoraInsumos] = None,
+                   catalogo=None) -> Tuple[int, int]:
+    """Processa as linhas em blocos e escreve o NDJSON; retorna (linhas, erros)
+
+    `cultura` escolhe as tabelas de dose da cultura (ver CalculadoraInsumos).
+    Com `catalogo` (Catalogo ou CatalogoMonitorado), a versão vigente é lida
+    no início de cada bloco e as doses são recompiladas quando ela muda.
+    """
+    if tamanho_bloco < 1:
+        raise ValueError("tamanho_bloco deve ser maior que zero")
+    calc = calc or CalculadoraInsumos()
+    modelo = _modelo_insumos(calc, cultura)
+    versao = None
+    iterador = iter(linhas)
+    total = erros = 0
+    while True:
+        bloco = list(islice(iterador, tamanho_bloco))
+        if not bloco:
+            return total, erros
+        if catalogo is not None:
+            atual = catalogo.atual
+            if atual is not versao:
+                versao = atual
+                calc = CalculadoraInsumos(catalogo=atual)
+                modelo = _modelo_insumos(calc, cultura)
+        resultado, erros_bloco = _processar_bloco(calc, modelo, bloco, total + 1, cultura)
+        saida.write("\n".join(resultado) + "\n")
+        total += len(bloco)
+        erros += erros_bloco
+
+
+def _formato(caminho: str, formato: Optional[str]) -> str:
+    if formato:
+        return formato
+    return "ndjson" if caminho.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def main_lote(argumentos: Optional[List[str]] = None) -> int:
+    """Ponto de entrada de `python fiap_farm.py batch`"""
+    parser = argparse.ArgumentParser(prog="fiap_farm.py batch",
+                                     description="Cálculo de área e insumos em lote (sem menus)")
+    parser.add_argument("--in", dest="entrada", required=True, help="arquivo CSV/NDJSON ou - para stdin")
+    parser.add_argument("--out", dest="saida", required=True, help="arquivo NDJSON ou - para stdout")
+    parser.add_argument("--formato", choices=FORMATOS_ENTRADA, help="formato da entrada (padrão: pela extensão)")
+    parser.add_argument("--cultura", help="tabelas de dose da cultura (ex.: cana, laranja)")
+    parser.add_argument("--catalogo", help="catálogo agronômico JSON/TOML (recarregado se mudar)")
+    parser.add_argument("--tamanho-bloco", type=int, default=TAMANHO_BLOCO)
+    args = parser.parse_args(argumentos)
+    if args.tamanho_bloco < 1:
+        parser.error("--tamanho-bloco deve ser maior que zero")
+
+    formato = _formato(args.entrada, args.formato)
+    catalogo = None
+    if args.catalogo:
+        try:
+            catalogo = CatalogoMonitorado(args.catalogo)
+        except (OSError, ValueError) as erro:
+            parser.error(f"catálogo inválido {args.catalogo}: {erro}")
+    try:
+        entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8", newline="")
+    except OSError as erro:
+        parser.error(f"não foi possível abrir {args.entrada}: {erro.strerror}")
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", buffering=1 << 20)
+    inicio = time.perf_counter()
+    try:
+        total, erros = processar_lote(ler_linhas(entrada, formato), saida, args.tamanho_bloco, args.cultura,
+                                      catalogo=catalogo)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+    segundos = time.perf_counter() - inicio
+
+    print(f"{total:,} linhas processadas em {segundos:.2f} s "
+          f"({total / segundos if segundos else 0:,.0f} linhas/s), {erros:,} com erro",
+          file=sys.stderr)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_lote())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Dependências Opcionais
+FarmTech Solutions
+
+O NumPy é opcional e custa ~100 ms para importar, mais do que todo o resto
+da inicialização. Os módulos do sistema usam o `np` daqui: None quando o
+NumPy não está instalado e, quando está, um módulo sob demanda que só
+importa o NumPy no primeiro acesso a um atributo (np.asarray, np.ndarray...).
+Os menus, o simulador R e a API só pagam essa importação quando chegam a um
+caminho vetorizado. Para testar se um valor é um array NumPy use
+eh_ndarray, que não força a importação.
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Any, Optional
+
+
+class ModuloSobDemanda(ModuleType):
+    """Importa o módulo real no primeiro acesso a um atributo
+
+    Os atributos do módulo real são então copiados para cá, e os acessos
+    seguintes custam o mesmo que no próprio módulo.
+    """
+
+    def __getattr__(self, atributo: str) -> Any:
+        modulo = importlib.import_module(self.__name__)
+        self.__dict__.update(modulo.__dict__)
+        return getattr(modulo, atributo)
+
+
+def modulo_opcional(nome: str) -> Optional[ModuleType]:
+    """O módulo `nome` sob demanda, ou None se não estiver instalado"""
+    try:
+        if importlib.util.find_spec(nome) is None:
+            return None
+    except (ImportError, ValueError):
+        return None
+    return ModuloSobDemanda(nome)
+
+
+def eh_ndarray(valor: Any) -> bool:
+    """isinstance(valor, np.ndarray) sem importar o NumPy (antes dele, não há arrays)"""
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(valor, numpy.ndarray)
+
+
+np = modulo_opcional("numpy")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Otimização de Doses e Custos
+FarmTech Solutions
+
+Escolhe a dose de cada insumo em cada talhão, dentro das faixas min/max
+das tabelas de CalculadoraInsumos, respeitando um orçamento e o estoque
+total de cada produto:
+
+- todo talhão recebe ao menos a dose mínima (o plano de menor custo); se
+  nem isso cabe no orçamento ou nos estoques, a otimização falha com
+  ValueError;
+- o que sobra do orçamento e dos estoques eleva doses em direção ao teto
+  ("maxima" por padrão). O ganho de elevar a dose de um insumo em um talhão
+  é a fração da faixa coberta x hectares x prioridade do talhão x peso do
+  insumo, e os aumentos entram em ordem de ganho por real gasto
+  (mochila fracionária gulosa).
+
+Nenhum aumento vale mais por real do que os que ficaram de fora, então o
+plano tem o maior ganho possível para o orçamento e, para esse ganho, o
+menor custo. O algoritmo ordena uma vez os n x insumos aumentos possíveis
+e aplica estoques e orçamento com somas acumuladas (NumPy quando
+disponível); 100 mil talhões levam décimos de segundo.
+
+Os preços seguem PRECOS_REFERENCIA (fiap_farm_cenarios): R$ por unidade da
+tabela de doses.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from fiap_farm import CalculadoraInsumos, FazendaData, CODIGOS_NIVEL, NIVEIS_QUANTIDADE
+from fiap_farm_cenarios import GRUPOS_CUSTO, PRECOS_REFERENCIA
+from fiap_farm_instrumentacao import medir
+
+# NumPy é opcional (importado no primeiro uso); sem ele a ordenação é feita em Python
+from fiap_farm_opcional import np
+
+# Folga relativa nas comparações com orçamento e estoques (erro de ponto flutuante)
+TOLERANCIA = 1e-9
+
+
+class PlanoInsumos(NamedTuple):
+    """Resultado da otimização
+
+    `doses[insumo]` tem a dose por hectare de cada talhão (na ordem da
+    entrada) e `ids` os ids dos talhões quando o plano vem de um
+    GerenciadorDados. `cobertura` é o ganho obtido sobre o ganho de levar
+    todos os talhões ao teto (1.0: nada limitou).
+    """
+    insumos: tuple
+    doses: Dict[str, Any]
+    quantidades: Dict[str, float]
+    custos: Dict[str, float]
+    custo_total: float
+    custo_minimo: float
+    orcamento: Optional[float]
+    cobertura: float
+    hectares: Any
+    ids: Optional[List[int]] = None
+
+    def registros(self) -> Iterable[Dict[str, Any]]:
+        """Um dicionário por talhão com hectares e a quantidade de cada insumo"""
+        colunas = [_lista(self.doses[insumo]) for insumo in self.insumos]
+        ids = self.ids or range(1, len(self.hectares) + 1)
+        for id_talhao, h, doses in zip(ids, _lista(self.hectares), zip(*colunas)):
+            yield {"id": id_talhao, "hectares": h,
+                   "insumos": {insumo: dose * h for insumo, dose in zip(self.insumos, doses)}}
+
+
+def _lista(valores: Any) -> list:
+    return valores.tolist() if hasattr(valores, "tolist") else list(valores)
+
+
+def _faixas(calc: CalculadoraInsumos, culturas: Sequence[Optional[str]], teto: str) -> tuple:
+    """Insumos com custo por hectare e, por cultura, a dose mínima e a do teto"""
+    planos = [calc.plano(cultura) for cultura in culturas]
+    insumos = {}
+    for plano in planos:
+        for grupo in GRUPOS_CUSTO:
+            insumos.update(dict.fromkeys(plano.doses[grupo]))
+    nivel = CODIGOS_NIVEL.get(teto, 1)
+    minimos, tetos = [], []
+    for plano in planos:
+        por_insumo = {insumo: por_nivel for grupo in GRUPOS_CUSTO
+                      for insumo, por_nivel in plano.doses[grupo].items()}
+        minimos.append([por_insumo[insumo][0] if insumo in por_insumo else 0.0 for insumo in insumos])
+        tetos.append([por_insumo[insumo][nivel] if insumo in por_insumo else 0.0 for insumo in insumos])
+    return tuple(insumos), minimos, tetos
+
+
+def _codigos_culturas(culturas: Union[None, str, Sequence[Optional[str]]], n: int) -> tuple:
+    """Culturas distintas e o código (posição) da cultura de cada talhão"""
+    if culturas is None or isinstance(culturas, str):
+        return (culturas,), array("l", [0]) * n
+    if len(culturas) != n:
+        raise ValueError("hectares e culturas devem ter o mesmo tamanho")
+    posicoes: Dict[Optional[str], int] = {}
+    codigos = array("l", (posicoes.setdefault(cultura, len(posicoes)) for cultura in culturas))
+    return tuple(posicoes), codigos
+
+
+def _validar_limites(insumos: tuple, precos: Dict[str, float], estoques: Dict[str, float],
+                     orcamento: Optional[float], pesos: Dict[str, float]) -> None:
+    faltando = [insumo for insumo in insumos if insumo not in precos]
+    if faltando:
+        raise ValueError(f"Sem preço para {', '.join(faltando)}")
+    for nome, valores in (("preço", precos), ("estoque", estoques), ("peso", pesos)):
+        for insumo, valor in valores.items():
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not valor >= 0:
+                raise ValueError(f"{nome} inválido para {insumo}: {valor!r}")
+    if orcamento is not None and not orcamento >= 0:
+        raise ValueError(f"Orçamento inválido: {orcamento!r}")
+
+
+def otimizar_insumos(hectares: Sequence[float], orcamento: Optional[float] = None,
+                     estoques: Optional[Dict[str, float]] = None,
+                     precos: Optional[Dict[str, float]] = None,
+                     culturas: Union[None, str, Sequence[Optional[str]]] = None,
+                     prioridades: Optional[Sequence[float]] = None,
+                     pesos: Optional[Dict[str, float]] = None, teto: str = "maxima",
+                     calc: Optional[CalculadoraInsumos] = None) -> PlanoInsumos:
+    """Doses por talhão de menor custo e maior ganho dentro de orçamento e estoques
+
+    `culturas` é uma cultura para todos os talhões ou uma por talhão (None:
+    tabelas gerais); `estoques` limita a quantidade total de cada insumo
+    (na unidade da tabela) e insumos sem estoque informado não têm limite;
+    `prioridades` (não negativas) pondera o ganho de cada talhão e `pesos` o de cada insumo
+    (1.0 por padrão; peso 0 mantém o insumo na dose mínima).
+    """
+    if teto not in NIVEIS_QUANTIDADE:
+        raise ValueError(f"Nível de teto inválido: {teto}")
+    calc = calc or CalculadoraInsumos()
+    precos = {**PRECOS_REFERENCIA, **(precos or {})}
+    estoques = estoques or {}
+    pesos = pesos or {}
+    n = len(hectares)
+    distintas, codigos = _codigos_culturas(culturas, n)
+    insumos, minimos, tetos = _faixas(calc, distintas, teto)
+    _validar_limites(insumos, precos, estoques, orcamento, pesos)
+    if prioridades is not None:
+        if len(prioridades) != n:
+            raise ValueError("hectares e prioridades devem ter o mesmo tamanho")
+        if not all(0 <= prioridade < float("inf") for prioridade in prioridades):
+            raise ValueError("As prioridades devem ser números finitos e não negativos")
+
+    with medir("otimizacao.otimizar_insumos"):
+        if np is not None:
+            return _otimizar_numpy(hectares, orcamento, estoques, precos, codigos, prioridades, pesos,
+                                   insumos, minimos, tetos)
+        return _otimizar_python(hectares, orcamento, estoques, precos, codigos, prioridades, pesos,
+                                insumos, minimos, tetos)
+
+
+def _custo_minimo(insumos: tuple, minimos_totais: Sequence[float], precos: Dict[str, float],
+              estoques: Dict[str, float], orcamento: Optional[float]) -> float:
+    """Custo do plano mínimo; ValueError se ele já estoura orçamento ou estoques"""
+    for insumo, quantidade in zip(insumos, minimos_totais):
+        estoque = estoques.get(insumo)
+        if estoque is not None and quantidade > estoque * (1 + TOLERANCIA):
+            raise ValueError(f"Estoque de {insumo} insuficiente para a dose mínima: "
+                             f"{quantidade:.2f} necessários, {estoque:.2f} disponíveis")
+    custo = math.fsum(quantidade * precos[insumo] for insumo, quantidade in zip(insumos, minimos_totais))
+    if orcamento is not None and custo > orcamento * (1 + TOLERANCIA):
+        raise ValueError(f"Orçamento insuficiente para a dose mínima: R$ {custo:.2f} necessários, "
+                         f"R$ {orcamento:.2f} disponíveis")
+    return custo
+
+
+def _resultado(insumos: tuple, hectares: Any, doses: Dict[str, Any], quantidades: List[float],
+               precos: Dict[str, float], custo_minimo: float, orcamento: Optional[float], ganho: float,
+               ganho_maximo: float) -> PlanoInsumos:
+    quantidades_dict = dict(zip(insumos, quantidades))
+    custos = {insumo: quantidade * precos[insumo] for insumo, quantidade in quantidades_dict.items()}
+    return PlanoInsumos(
+        insumos=insumos, doses=doses, quantidades=quantidades_dict, custos=custos,
+        custo_total=math.fsum(custos.values()), custo_minimo=custo_minimo, orcamento=orcamento,
+        cobertura=ganho / ganho_maximo if ganho_maximo > 0 else 1.0, hectares=hectares,
+    )
+
+
+def _otimizar_numpy(hectares, orcamento, estoques, precos, codigos, prioridades, pesos,
+                    insumos, minimos, tetos) -> PlanoInsumos:
+    h = np.asarray(hectares, dtype=np.float64)
+    if len(h) and not (np.isfinite(h).all() and h.min() >= 0):
+        raise ValueError("As áreas devem ser números finitos e não negativos")
+    n, k = len(h), len(insumos)
+    codigos = np.asarray(codigos).astype(np.intp, copy=False)
+    # Dose mínima e faixa (teto - mínimo) de cada insumo em cada talhão: matrizes k x n
+    minimo = np.asarray(minimos, dtype=np.float64).T[:, codigos]
+    faixa = np.maximum(np.asarray(tetos, dtype=np.float64).T[:, codigos] - minimo, 0.0)
+    preco = np.array([precos[insumo] for insumo in insumos], dtype=np.float64)
+    peso = np.array([pesos.get(insumo, 1.0) for insumo in insumos], dtype=np.float64)
+
+    custo_minimo = _custo_minimo(insumos, (minimo @ h).tolist() if n else [0.0] * k, precos, estoques, orcamento)
+
+    # Cada aumento possível (insumo, talhão): quantidade até o teto e ganho por unidade
+    capacidade = (faixa * h).ravel()
+    prioridade = np.ones(n) if prioridades is None else np.asarray(prioridades, dtype=np.float64)
+    ganho_talhao = h * prioridade
+    ganho_maximo = float((peso[:, None] * (faixa > 0) * ganho_talhao).sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # ganho por real = peso x prioridade / (faixa x preço); preço zero vem primeiro (inf)
+        razao = peso[:, None] * prioridade / (faixa * preco[:, None])
+    razao = np.where(capacidade.reshape(k, n) > 0, razao, -1.0).ravel()
+    ordem = np.argsort(-razao, kind="stable")
+    ordem = ordem[razao[ordem] > 0]
+    quantidade = capacidade[ordem]
+    insumo = ordem // n if n else ordem
+
+    # Estoques: a soma acumulada de cada insumo, na ordem, corta onde o estoque acaba
+    for i, nome in enumerate(insumos):
+        estoque = estoques.get(nome)
+        if estoque is None:
+            continue
+        sobra = estoque - float((minimo[i] * h).sum())
+        posicoes = np.flatnonzero(insumo == i)
+        acumulado = np.cumsum(quantidade[posicoes])
+        quantidade[posicoes] = np.clip(sobra - (acumulado - quantidade[posicoes]), 0.0, quantidade[posicoes])
+
+    # Orçamento: a soma acumulada dos custos, na ordem, corta no primeiro aumento que não cabe
+    if orcamento is not None:
+        custo = quantidade * preco[insumo]
+        acumulado = np.cumsum(custo)
+        sobra = orcamento - custo_minimo
+        corte = int(np.searchsorted(acumulado, sobra, side="right"))
+        if corte < len(quantidade):
+            anterior = acumulado[corte - 1] if corte else 0.0
+            quantidade[corte] = max(sobra - anterior, 0.0) / preco[insumo[corte]]
+            quantidade[corte + 1:] = 0.0
+
+    aumento = np.zeros(k * n)
+    aumento[ordem] = quantidade
+    aumento = aumento.reshape(k, n)
+    doses = minimo + np.divide(aumento, h, out=np.zeros_like(aumento), where=h > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fracao = np.where(faixa > 0, (doses - minimo) / faixa, 0.0)
+    ganho = float((peso[:, None] * fracao * ganho_talhao).sum())
+    quantidades = (doses @ h).tolist() if n else [0.0] * k
+    return _resultado(insumos, h, {nome: doses[i] for i, nome in enumerate(insumos)}, quantidades, precos,
+                      custo_minimo, orcamento, ganho, ganho_maximo)
+
+
+def _otimizar_python(hectares, orcamento, estoques, precos, codigos, prioridades, pesos,
+                     insumos, minimos, tetos) -> PlanoInsumos:
+    h = [float(x) for x in hectares]
+    if not all(0 <= x < float("inf") for x in h):
+        raise ValueError("As áreas devem ser números finitos e não negativos")
+    k = len(insumos)
+    prioridade = [1.0] * len(h) if prioridades is None else [float(p) for p in prioridades]
+    totais_minimos = [math.fsum(minimos[c][i] * x for c, x in zip(codigos, h)) for i in range(k)]
+    custo_minimo = _custo_minimo(insumos, totais_minimos, precos, estoques, orcamento)
+
+    # (ganho por real, insumo, talhão, quantidade até o teto) de cada aumento possível
+    aumentos = []
+    ganho_maximo = 0.0
+    for i, nome in enumerate(insumos):
+        preco, peso = precos[nome], pesos.get(nome, 1.0)
+        for t, (c, x) in enumerate(zip(codigos, h)):
+            faixa = tetos[c][i] - minimos[c][i]
+            if faixa <= 0 or x <= 0:
+                continue
+            ganho_maximo += peso * prioridade[t] * x
+            if peso * prioridade[t] <= 0:
+                continue
+            razao = peso * prioridade[t] / (faixa * preco) if preco > 0 else float("inf")
+            aumentos.append((-razao, i * len(h) + t, faixa * x))
+    aumentos.sort()
+
+    sobra_estoque = [None if estoques.get(nome) is None else estoques[nome] - totais_minimos[i]
+                     for i, nome in enumerate(insumos)]
+    sobra_orcamento = None if orcamento is None else orcamento - custo_minimo
+    doses = [array("d", (minimos[c][i] for c in codigos)) for i in range(k)]
+    ganho = 0.0
+    for _, posicao, quantidade in aumentos:
+        i, t = divmod(posicao, len(h))
+        if sobra_estoque[i] is not None:
+            quantidade = min(quantidade, max(sobra_estoque[i], 0.0))
+            sobra_estoque[i] -= quantidade
+        preco = precos[insumos[i]]
+        if sobra_orcamento is not None and preco > 0:
+            quantidade = min(quantidade, max(sobra_orcamento, 0.0) / preco)
+            sobra_orcamento -= quantidade * preco
+        if quantidade <= 0:
+            continue
+        doses[i][t] += quantidade / h[t]
+        faixa = tetos[codigos[t]][i] - minimos[codigos[t]][i]
+        ganho += pesos.get(insumos[i], 1.0) * prioridade[t] * quantidade / faixa
+    quantidades = [math.fsum(d * x for d, x in zip(doses[i], h)) for i in range(k)]
+    return _resultado(insumos, h, dict(zip(insumos, doses)), quantidades, precos, custo_minimo, orcamento,
+                      ganho, ganho_maximo)
+
+
+def otimizar_gerenciador(gerenciador, orcamento: Optional[float] = None,
+                         estoques: Optional[Dict[str, float]] = None,
+                         fazenda_data: Optional[FazendaData] = None, cultura: Optional[str] = None,
+                         **opcoes) -> PlanoInsumos:
+    """Otimiza as doses de todos os talhões (registros de plantio) do gerenciador
+
+    A cultura de cada talhão vem do campo "cultura" ou do tipo da "fazenda"
+    do registro (via `fazenda_data`), e `cultura` nos demais. Registros
+    sem area_ha numérica ficam de fora. `opcoes` segue otimizar_insumos.
+    """
+    ids, hectares, culturas = [], array("d"), []
+    for registro in gerenciador.iterar_plantio():
+        area = registro.get("area_ha")
+        if isinstance(area, bool) or not isinstance(area, (int, float)) or not area >= 0:
+            continue
+        ids.append(registro["id"])
+        hectares.append(area)
+        if registro.get("cultura"):
+            culturas.append(registro["cultura"])
+        elif registro.get("fazenda") and fazenda_data is not None:
+            culturas.append(fazenda_data.tipo_cultura(registro["fazenda"]) or cultura)
+        else:
+            culturas.append(cultura)
+    plano = otimizar_insumos(hectares, orcamento, estoques, culturas=culturas, **opcoes)
+    return plano._replace(ids=ids)
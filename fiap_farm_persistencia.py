@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Persistência de Dados
+FarmTech Solutions
+
+Duas formas de persistência contínua para o GerenciadorDados:
+
+- DiarioEscrita: diário de operações (write-ahead log) e snapshots
+  compactados. Cada inclusão, atualização ou remoção acrescenta uma linha
+  ao diário (O(1) por operação), entregue na hora ao sistema operacional;
+  o fsync é feito em grupos. De tempos em
+  tempos o estado completo é gravado em um snapshot e o diário recomeça
+  vazio. Ao reabrir, o snapshot mais recente é carregado e só o final do
+  diário é reaplicado.
+- ArmazemSQLite: armazém de registros em um banco SQLite (módulo sqlite3),
+  para volumes que não cabem em memória.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from fiap_farm_armazenamento import Agregados
+from fiap_farm_consulta import TAMANHO_BLOCO, Filtro
+
+ARQUIVO_DIARIO = "diario.log"
+ARQUIVO_SNAPSHOT = "snapshot.ndjson"
+
+# Códigos de operação gravados no diário
+INSERIR = "+"
+ATUALIZAR = "~"
+REMOVER = "-"
+
+COLECOES = ("plantio", "insumos")
+
+_codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=dict).encode
+
+
+def _fsync_diretorio(diretorio: str) -> None:
+    """Garante que renomeações no diretório cheguem ao disco (quando suportado)"""
+    try:
+        descritor = os.open(diretorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descritor)
+    except OSError:
+        pass
+    finally:
+        os.close(descritor)
+
+
+class DiarioEscrita:
+    """Diário de operações (write-ahead log) com snapshots do GerenciadorDados
+
+    Uso:
+        diario = DiarioEscrita("dados_fazenda")
+        diario.abrir(gerenciador)   # recupera o estado e passa a registrar
+        ...
+        diario.fechar()
+
+    Cada operação é entregue ao sistema operacional (flush) ao ser
+    registrada, então uma queda do processo não perde nada. O fsync é feito
+    a cada `tamanho_grupo` operações ou `intervalo_sync` segundos depois da
+    primeira operação pendente (um temporizador cobre o fim de uma rajada);
+    uma queda do sistema pode perder no máximo esse intervalo (use
+    tamanho_grupo=1 para sincronizar toda operação). Um snapshot é gerado a
+    cada `operacoes_por_snapshot` operações registradas.
+    """
+
+    def __init__(self, diretorio: str, tamanho_grupo: int = 32, intervalo_sync: float = 0.2,
+                 operacoes_por_snapshot: int = 100_000):
+        self.diretorio = diretorio
+        self.tamanho_grupo = tamanho_grupo
+        self.intervalo_sync = intervalo_sync
+        self.operacoes_por_snapshot = operacoes_por_snapshot
+        self.caminho_diario = os.path.join(diretorio, ARQUIVO_DIARIO)
+        self.caminho_snapshot = os.path.join(diretorio, ARQUIVO_SNAPSHOT)
+        self._gerenciador = None
+        self._arquivo = None
+        self._sequencia = 0
+        self._pendentes = 0
+        self._ultimo_sync = 0.0
+        self._desde_snapshot = 0
+        self._trava = threading.RLock()
+        self._temporizador: Optional[threading.Timer] = None
+
+    # ------------------------------------------------------------------
+    # Recuperação
+    # ------------------------------------------------------------------
+
+    def abrir(self, gerenciador) -> int:
+        """Carrega o snapshot e o diário no gerenciador e passa a registrar nele
+
+        O gerenciador deve estar vazio. Retorna quantas operações do diário
+        foram reaplicadas.
+        """
+        if self._arquivo is not None:
+            raise RuntimeError("Diário já está aberto")
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._sequencia = self._carregar_snapshot(gerenciador)
+        reaplicadas = self._reaplicar_diario(gerenciador)
+
+        self._gerenciador = gerenciador
+        self._arquivo = open(self.caminho_diario, "ab")
+        self._ultimo_sync = time.monotonic()
+        self._desde_snapshot = reaplicadas
+        gerenciador.diario = self
+        return reaplicadas
+
+    def _carregar_snapshot(self, gerenciador) -> int:
+        """Carrega o snapshot (se houver) e retorna a sequência que ele cobre"""
+        if not os.path.exists(self.caminho_snapshot):
+            return 0
+        with open(self.caminho_snapshot, "r", encoding="utf-8") as arquivo:
+            meta = json.loads(arquivo.readline())
+            for linha in arquivo:
+                entrada = json.loads(linha)
+                getattr(gerenciador, entrada["c"]).inserir_com_id(entrada["d"]["id"], entrada["d"])
+        for colecao, proximo_id in meta["proximo_id"].items():
+            getattr(gerenciador, colecao).avancar_proximo_id(proximo_id)
+        return meta["sequencia"]
+
+    def _reaplicar_diario(self, gerenciador) -> int:
+        """Reaplica as operações posteriores ao snapshot
+
+        Uma linha final incompleta (queda durante a escrita) é descartada e o
+        arquivo é truncado no último registro válido.
+        """
+        if not os.path.exists(self.caminho_diario):
+            return 0
+        reaplicadas = 0
+        valido = 0
+        with open(self.caminho_diario, "rb") as arquivo:
+            for linha in arquivo:
+                try:
+                    if not linha.endswith(b"\n"):
+                        raise ValueError("linha incompleta")
+                    entrada = json.loads(linha)
+                except ValueError:
+                    break
+                valido += len(linha)
+                if entrada["s"] <= self._sequencia:
+                    continue
+                self._aplicar(gerenciador, entrada)
+                self._sequencia = entrada["s"]
+                reaplicadas += 1
+        if valido < os.path.getsize(self.caminho_diario):
+            with open(self.caminho_diario, "r+b") as arquivo:
+                arquivo.truncate(valido)
+        return reaplicadas
+
+    @staticmethod
+    def _aplicar(gerenciador, entrada: Dict[str, Any]) -> None:
+        armazem = getattr(gerenciador, entrada["c"])
+        if entrada["op"] == INSERIR:
+            armazem.inserir_com_id(entrada["id"], entrada["d"])
+        elif entrada["op"] == ATUALIZAR:
+            armazem.atualizar(entrada["id"], entrada["d"])
+        elif entrada["op"] == REMOVER:
+            armazem.remover(entrada["id"])
+        else:
+            raise ValueError(f"Operação desconhecida no diário: {entrada['op']}")
+
+    # ------------------------------------------------------------------
+    # Registro de operações
+    # ------------------------------------------------------------------
+
+    def registrar(self, operacao: str, colecao: str, id_registro: int,
+                  dados: Optional[Dict[str, Any]] = None) -> None:
+        """Acrescenta uma operação ao diário (chamado pelo GerenciadorDados)"""
+        with self._trava:
+            if self._arquivo is None:
+                raise RuntimeError("Diário não está aberto")
+            self._sequencia += 1
+            entrada = {"s": self._sequencia, "op": operacao, "c": colecao, "id": id_registro}
+            if dados is not None:
+                entrada["d"] = dados
+            self._arquivo.write(_codificar(entrada).encode("utf-8") + b"\n")
+            self._arquivo.flush()
+            self._pendentes += 1
+            self._desde_snapshot += 1
+
+            if (self._pendentes >= self.tamanho_grupo
+                    or time.monotonic() - self._ultimo_sync >= self.intervalo_sync):
+                self.sincronizar()
+            elif self._temporizador is None and math.isfinite(self.intervalo_sync):
+                self._temporizador = threading.Timer(self.intervalo_sync, self._sincronizar_pendentes)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+            if self._desde_snapshot >= self.operacoes_por_snapshot:
+                self.gerar_snapshot()
+
+    def sincronizar(self) -> None:
+        """Grava em disco (fsync) as operações pendentes"""
+        with self._trava:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if self._arquivo is None:
+                return
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._pendentes = 0
+            self._ultimo_sync = time.monotonic()
+
+    def _sincronizar_pendentes(self) -> None:
+        """Fsync do fim de uma rajada, chamado pelo temporizador"""
+        with self._trava:
+            self._temporizador = None
+            if self._pendentes:
+                self.sincronizar()
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def gerar_snapshot(self) -> None:
+        """Grava o estado atual em um snapshot e recomeça o diário
+
+        O snapshot é escrito em um arquivo temporário e renomeado; se houver
+        uma queda antes do diário ser truncado, as operações já cobertas
+        pelo snapshot são ignoradas na recuperação pela sequência.
+        """
+        if self._gerenciador is None:
+            raise RuntimeError("Diário não está aberto")
+        with self._trava:
+            self._gerar_snapshot()
+
+    def _gerar_snapshot(self) -> None:
+        self.sincronizar()
+        temporario = self.caminho_snapshot + ".tmp"
+        meta = {
+            "sequencia": self._sequencia,
+            "proximo_id": {c: getattr(self._gerenciador, c).proximo_id for c in COLECOES},
+        }
+        with open(temporario, "w", encoding="utf-8", buffering=1 << 20) as arquivo:
+            arquivo.write(_codificar(meta) + "\n")
+            for colecao in COLECOES:
+                prefixo = '{"c":"' + colecao + '","d":'
+                for registro in getattr(self._gerenciador, colecao):
+                    arquivo.write(prefixo + _codificar(registro) + "}\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho_snapshot)
+        _fsync_diretorio(self.diretorio)
+
+        self._arquivo.close()
+        self._arquivo = open(self.caminho_diario, "wb")
+        os.fsync(self._arquivo.fileno())
+        self._desde_snapshot = 0
+
+    def fechar(self) -> None:
+        """Sincroniza e fecha o diário"""
+        with self._trava:
+            if self._arquivo is None:
+                return
+            self.sincronizar()
+            self._arquivo.close()
+            self._arquivo = None
+        if self._gerenciador is not None and self._gerenciador.diario is self:
+            self._gerenciador.diario = None
+        self._gerenciador = None
+
+
+# ----------------------------------------------------------------------
+# SQLite
+# ----------------------------------------------------------------------
+
+# Campo somado como "hectares" em cada coleção
+CAMPOS_HECTARES = {"plantio": "area_ha", "insumos": "hectares"}
+
+# Registros por executemany nas inclusões em lote
+TAMANHO_LOTE_SQLITE = 10_000
+
+
+def abrir_banco(caminho: str) -> sqlite3.Connection:
+    """Abre (ou cria) o banco SQLite do FIAP Farm em modo WAL"""
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    for colecao in COLECOES:
+        conexao.execute(f"""
+            CREATE TABLE IF NOT EXISTS {colecao} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT,
+                quantidade TEXT,
+                hectares REAL,
+                dados TEXT NOT NULL
+            )""")
+        conexao.execute(f"CREATE INDEX IF NOT EXISTS idx_{colecao}_tipo ON {colecao} (tipo)")
+        conexao.execute(f"CREATE INDEX IF NOT EXISTS idx_{colecao}_hectares ON {colecao} (hectares)")
+    conexao.commit()
+    return conexao
+
+
+class ArmazemSQLite:
+    """Armazém de registros em uma tabela SQLite
+
+    Oferece a mesma interface de ArmazemRegistros. O registro completo fica
+    em JSON na coluna `dados`; tipo, quantidade e hectares também ficam em
+    colunas próprias (tipo e hectares indexados) para as buscas e agregados
+    em SQL. AUTOINCREMENT garante que ids removidos não sejam reutilizados.
+
+    Os agregados do resumo são calculados com GROUP BY no banco a cada
+    consulta, então abrir o armazém não percorre a tabela e os resultados
+    valem mesmo com outros processos escrevendo no banco.
+
+    Uso:
+        conexao = abrir_banco("fiap_farm.db")
+        gerenciador = GerenciadorDados(ArmazemSQLite(conexao, "plantio"),
+                                       ArmazemSQLite(conexao, "insumos"))
+    """
+
+    # Cada operação já é gravada no banco; o diário de operações é dispensado
+    duravel = True
+
+    def __init__(self, conexao: sqlite3.Connection, colecao: str):
+        if colecao not in COLECOES:
+            raise ValueError(f"Coleção inválida: {colecao}")
+        self.conexao = conexao
+        self.colecao = colecao
+        self.campo_hectares = CAMPOS_HECTARES[colecao]
+
+    def _linha(self, id_registro: Optional[int], dados: Dict[str, Any]) -> tuple:
+        """Converte um registro nos valores das colunas da tabela"""
+        corpo = _codificar({k: v for k, v in dados.items() if k != "id"})
+        hectares = dados.get(self.campo_hectares)
+        if isinstance(hectares, bool) or not isinstance(hectares, (int, float)) or not math.isfinite(hectares):
+            hectares = None
+        return (id_registro, dados.get("tipo"), dados.get("quantidade"), hectares, corpo)
+
+    @staticmethod
+    def _registro(id_registro: int, corpo: str) -> Dict[str, Any]:
+        dados = json.loads(corpo)
+        dados['id'] = id_registro
+        return dados
+
+    def __len__(self) -> int:
+        return self.conexao.execute(f"SELECT COUNT(*) FROM {self.colecao}").fetchone()[0]
+
+    def __contains__(self, id_registro: int) -> bool:
+        return self.conexao.execute(
+            f"SELECT 1 FROM {self.colecao} WHERE id = ?", (id_registro,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Percorre os registros em ordem crescente de id, sem carregar a tabela"""
+        cursor = self.conexao.execute(f"SELECT id, dados FROM {self.colecao} ORDER BY id")
+        for id_registro, corpo in cursor:
+            yield self._registro(id_registro, corpo)
+
+    def iterar_desde(self, apos_id: int = 0, decrescente: bool = False) -> Iterator[Dict[str, Any]]:
+        """Percorre os registros a partir do id seguinte a `apos_id` (em blocos por id)"""
+        return self.consultar(Filtro(), "-id" if decrescente else "id", (apos_id,) if apos_id else None)
+
+    def consultar(self, filtro: Filtro, ordem: str = "id", chave: Optional[tuple] = None,
+                  bloco: int = TAMANHO_BLOCO) -> Iterator[Dict[str, Any]]:
+        """Consulta paginada em SQL (ver fiap_farm_consulta.consultar)
+
+        Filtros nas colunas tipo, quantidade e hectares; cada bloco é um
+        SELECT ... WHERE (chave) > (última chave) ORDER BY ... LIMIT, então
+        nenhum cursor do banco fica aberto entre os blocos.
+        """
+        condicoes, valores = [], []
+        for campo, valor in (("tipo", filtro.tipo), ("quantidade", filtro.quantidade)):
+            if valor is not None:
+                condicoes.append(f"{campo} = ?")
+                valores.append(valor)
+        if filtro.hectares_min is not None:
+            condicoes.append("hectares >= ?")
+            valores.append(filtro.hectares_min)
+        if filtro.hectares_max is not None:
+            condicoes.append("hectares <= ?")
+            valores.append(filtro.hectares_max)
+        por_hectares = ordem.endswith("hectares")
+        if por_hectares:
+            condicoes.append("hectares IS NOT NULL")
+        sentido, comparacao = ("DESC", "<") if ordem.startswith("-") else ("ASC", ">")
+        ordenacao = f"hectares {sentido}, id {sentido}" if por_hectares else f"id {sentido}"
+
+        while True:
+            onde, parametros = list(condicoes), list(valores)
+            if chave is not None:
+                if por_hectares:
+                    onde.append(f"(hectares {comparacao} ? OR (hectares = ? AND id {comparacao} ?))")
+                    parametros += [chave[0], chave[0], chave[1]]
+                else:
+                    onde.append(f"id {comparacao} ?")
+                    parametros.append(chave[0])
+            filtro_sql = "WHERE " + " AND ".join(onde) if onde else ""
+            linhas = self.conexao.execute(
+                f"SELECT id, hectares, dados FROM {self.colecao} {filtro_sql} ORDER BY {ordenacao} LIMIT ?",
+                parametros + [bloco]).fetchall()
+            for id_registro, _, corpo in linhas:
+                yield self._registro(id_registro, corpo)
+            if len(linhas) < bloco:
+                return
+            id_registro, hectares, _ = linhas[-1]
+            chave = (hectares, id_registro) if por_hectares else (id_registro,)
+
+    @property
+    def proximo_id(self) -> int:
+        """Id que será atribuído ao próximo registro inserido"""
+        linha = self.conexao.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (self.colecao,)).fetchone()
+        return (linha[0] if linha else 0) + 1
+
+    def inserir(self, dados: Dict[str, Any]) -> int:
+        """Insere um registro e retorna o id atribuído"""
+        with self.conexao:
+            linha = self._linha(None, dados)
+            cursor = self.conexao.execute(f"INSERT INTO {self.colecao} VALUES (?, ?, ?, ?, ?)", linha)
+        dados['id'] = cursor.lastrowid
+        return cursor.lastrowid
+
+    def inserir_lote(self, registros: Iterable[Dict[str, Any]]) -> List[int]:
+        """Insere vários registros com executemany, em uma única transação"""
+        ids: List[int] = []
+        proximo = self.proximo_id
+        lote: List[tuple] = []
+        with self.conexao:
+            for dados in registros:
+                dados['id'] = proximo
+                ids.append(proximo)
+                lote.append(self._linha(proximo, dados))
+                proximo += 1
+                if len(lote) >= TAMANHO_LOTE_SQLITE:
+                    self.conexao.executemany(f"INSERT INTO {self.colecao} VALUES (?, ?, ?, ?, ?)", lote)
+                    lote = []
+            if lote:
+                self.conexao.executemany(f"INSERT INTO {self.colecao} VALUES (?, ?, ?, ?, ?)", lote)
+        return ids
+
+    def inserir_com_id(self, id_registro: int, dados: Dict[str, Any]) -> None:
+        """Insere um registro com id já conhecido (recuperação de dados salvos)"""
+        linha = self._linha(id_registro, dados)
+        try:
+            with self.conexao:
+                self.conexao.execute(f"INSERT INTO {self.colecao} VALUES (?, ?, ?, ?, ?)", linha)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Id já existe: {id_registro}") from None
+        dados['id'] = id_registro
+
+    def avancar_proximo_id(self, proximo_id: int) -> None:
+        """Garante que ids anteriores a `proximo_id` não sejam reutilizados"""
+        if proximo_id <= self.proximo_id:
+            return
+        with self.conexao:
+            atualizado = self.conexao.execute(
+                "UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (proximo_id - 1, self.colecao))
+            if atualizado.rowcount == 0:
+                self.conexao.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (self.colecao, proximo_id - 1))
+
+    def obter(self, id_registro: int) -> Optional[Dict[str, Any]]:
+        """Retorna o registro com o id informado (ou None)"""
+        linha = self.conexao.execute(
+            f"SELECT dados FROM {self.colecao} WHERE id = ?", (id_registro,)).fetchone()
+        return self._registro(id_registro, linha[0]) if linha else None
+
+    def atualizar(self, id_registro: int, dados: Dict[str, Any]) -> bool:
+        """Substitui o registro com o id informado, mantendo o id"""
+        _, tipo, quantidade, hectares, corpo = self._linha(id_registro, dados)
+        with self.conexao:
+            cursor = self.conexao.execute(
+                f"UPDATE {self.colecao} SET tipo = ?, quantidade = ?, hectares = ?, dados = ? WHERE id = ?",
+                (tipo, quantidade, hectares, corpo, id_registro))
+        if cursor.rowcount == 0:
+            return False
+        dados['id'] = id_registro
+        return True
+
+    def remover(self, id_registro: int) -> bool:
+        """Remove o registro com o id informado"""
+        with self.conexao:
+            cursor = self.conexao.execute(f"DELETE FROM {self.colecao} WHERE id = ?", (id_registro,))
+        return cursor.rowcount > 0
+
+    def id_na_posicao(self, posicao: int) -> Optional[int]:
+        """Retorna o id do registro na posição informada"""
+        if posicao < 0:
+            return None
+        linha = self.conexao.execute(
+            f"SELECT id FROM {self.colecao} ORDER BY id LIMIT 1 OFFSET ?", (posicao,)).fetchone()
+        return linha[0] if linha else None
+
+    def ids_por(self, campo: str, valor: Any) -> List[int]:
+        """Retorna os ids dos registros cujo campo (tipo ou quantidade) tem o valor"""
+        if campo not in ("tipo", "quantidade"):
+            raise KeyError(f"Campo não indexado: {campo}")
+        cursor = self.conexao.execute(
+            f"SELECT id FROM {self.colecao} WHERE {campo} = ? ORDER BY id", (valor,))
+        return [linha[0] for linha in cursor]
+
+    def contagem_por(self, campo: str) -> Dict[Any, int]:
+        """Retorna quantos registros existem para cada valor do campo (GROUP BY)"""
+        if campo not in ("tipo", "quantidade"):
+            raise KeyError(f"Campo não indexado: {campo}")
+        cursor = self.conexao.execute(
+            f"SELECT {campo}, COUNT(*) FROM {self.colecao} WHERE {campo} IS NOT NULL GROUP BY {campo}")
+        return dict(cursor.fetchall())
+
+    def agregados_por(self, campo: str = "tipo") -> Dict[Any, tuple]:
+        """Retorna {valor: (registros, soma de hectares)} com GROUP BY no banco"""
+        if campo not in Agregados.CAMPOS:
+            raise KeyError(f"Campo sem agregados: {campo}")
+        filtro = f"WHERE {campo} IS NOT NULL" if campo == "quantidade" else ""
+        cursor = self.conexao.execute(
+            f"SELECT {campo}, COUNT(*), TOTAL(hectares) FROM {self.colecao} {filtro} GROUP BY {campo}")
+        return {valor: (registros, soma) for valor, registros, soma in cursor}
+
+    def bytes_por_registro(self) -> float:
+        """Tamanho do arquivo do banco dividido pelo número de registros"""
+        registros = len(self)
+        if not registros:
+            return 0.0
+        paginas = self.conexao.execute("PRAGMA page_count").fetchone()[0]
+        tamanho = self.conexao.execute("PRAGMA page_size").fetchone()[0]
+        return paginas * tamanho / registros
+
+
+def gerenciador_sqlite(caminho: str):
+    """Cria um GerenciadorDados com plantio e insumos no banco SQLite informado"""
+    from fiap_farm import GerenciadorDados
+
+    conexao = abrir_banco(caminho)
+    return GerenciadorDados(ArmazemSQLite(conexao, "plantio"), ArmazemSQLite(conexao, "insumos"))
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIAP Farm - Séries Temporais Meteorológicas
+FarmTech Solutions
+
+Histórico meteorológico por fazenda, só de acréscimo, em colunas binárias:
+
+    series/<fazenda>/serie.json       metadados (colunas, temperatura base)
+    series/<fazenda>/tempo.u32        instantes (segundos Unix, uint32)
+    series/<fazenda>/temperatura.f32  uma coluna float32 por variável
+    ...
+
+As amostras novas ficam em um bloco em memória e vão para o disco a cada
+TAMANHO_BLOCO amostras (ou em sincronizar()); o que já está no disco é lido
+por mmap, sem carregar o arquivo. Valores ausentes são gravados como NaN.
+
+Cada série mantém janelas deslizantes (24 h e 7 dias por padrão) com
+média/mínima/máxima da temperatura, chuva acumulada e graus-dia, atualizadas
+em O(1) amortizado por amostra (filas monótonas para mínimo e máximo), para
+que decisões de irrigação e pulverização usem o histórico sem reprocessar
+relatórios. agregados(inicio, fim) calcula o mesmo para qualquer período
+a partir das colunas.
+
+Graus-dia: soma de max(0, min(T, teto) - base) x intervalo em dias entre
+amostras consecutivas (intervalos maiores que INTERVALO_MAXIMO, como falhas
+de coleta, contam só até esse limite).
+"""
+
+import json
+import math
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Union
+from urllib.parse import quote, unquote
+
+# NumPy é opcional (importado no primeiro uso); sem ele os agregados de período usam laços
+from fiap_farm_opcional import np
+
+COLUNAS = ("temperatura", "umidade", "pressao", "vento", "chuva")
+
+# Amostras mantidas em memória antes de ir para o disco
+TAMANHO_BLOCO = 4096
+
+JANELAS_PADRAO = {"24h": 24 * 3600, "7d": 7 * 24 * 3600}
+
+TEMPERATURA_BASE = 10.0
+TEMPERATURA_TETO = 30.0
+INTERVALO_MAXIMO = 6 * 3600
+
+ARQUIVO_METADADOS = "serie.json"
+ARQUIVO_TEMPO = "tempo.u32"
+
+_NAN = float("nan")
+
+
+def _uint32(valor: float):
+    return np.uint32(min(max(valor, 0), 2 ** 32 - 1))
+
+
+def graus_dia(temperatura: float, segundos: float, base: float = TEMPERATURA_BASE,
+              teto: float = TEMPERATURA_TETO) -> float:
+    """Graus-dia de um intervalo de `segundos` à temperatura dada"""
+    if temperatura != temperatura:  # NaN
+        return 0.0
+    return max(0.0, min(temperatura, teto) - base) * min(segundos, INTERVALO_MAXIMO) / 86400
+
+
+class JanelaMovel:
+    """Agregados de uma janela de tempo deslizante (O(1) amortizado)
+
+    Guarda as amostras dentro da janela; somas corridas para média, chuva
+    e graus-dia e filas monótonas para mínimo e máximo. As somas são
+    recalculadas de tempos em tempos para não acumular erro de
+    arredondamento.
+    """
+
+    __slots__ = ("duracao", "_amostras", "_minimos", "_maximos", "_soma_temp",
+                 "_n_temp", "_soma_chuva", "_soma_gd", "_remocoes")
+
+    def __init__(self, duracao: float):
+        self.duracao = duracao
+        self._amostras: deque = deque()
+        self._minimos: deque = deque()
+        self._maximos: deque = deque()
+        self._soma_temp = self._soma_chuva = self._soma_gd = 0.0
+        self._n_temp = 0
+        self._remocoes = 0
+
+    def adicionar(self, instante: float, temperatura: float, chuva: float, gd: float) -> None:
+        """Inclui uma amostra (instantes em ordem crescente) e descarta as antigas"""
+        self._amostras.append((instante, temperatura, chuva, gd))
+        if temperatura == temperatura:
+            self._soma_temp += temperatura
+            self._n_temp += 1
+            while self._minimos and self._minimos[-1][1] >= temperatura:
+                self._minimos.pop()
+            self._minimos.append((instante, temperatura))
+            while self._maximos and self._maximos[-1][1] <= temperatura:
+                self._maximos.pop()
+            self._maximos.append((instante, temperatura))
+        if chuva == chuva:
+            self._soma_chuva += chuva
+        self._soma_gd += gd
+        self._expirar(instante)
+
+    def _expirar(self, agora: float) -> None:
+        limite = agora - self.duracao
+        amostras = self._amostras
+        while amostras[0][0] <= limite:
+            _, temperatura, chuva, gd = amostras.popleft()
+            if temperatura == temperatura:
+                self._soma_temp -= temperatura
+                self._n_temp -= 1
+            if chuva == chuva:
+                self._soma_chuva -= chuva
+            self._soma_gd -= gd
+            self._remocoes += 1
+        while self._minimos and self._minimos[0][0] <= limite:
+            self._minimos.popleft()
+        while self._maximos and self._maximos[0][0] <= limite:
+            self._maximos.popleft()
+        if self._remocoes > 4 * len(amostras) + 64:
+            self._recalcular()
+
+    def _recalcular(self) -> None:
+        temperaturas = [a[1] for a in self._amostras if a[1] == a[1]]
+        self._soma_temp = math.fsum(temperaturas)
+        self._n_temp = len(temperaturas)
+        self._soma_chuva = math.fsum(a[2] for a in self._amostras if a[2] == a[2])
+        self._soma_gd = math.fsum(a[3] for a in self._amostras)
+        self._remocoes = 0
+
+    def resultado(self) -> Dict[str, Any]:
+        """Amostras, temperatura média/mínima/máxima, chuva (mm) e graus-dia"""
+        return {
+            "amostras": len(self._amostras),
+            "temperatura_media": self._soma_temp / self._n_temp if self._n_temp else None,
+            "temperatura_min": self._minimos[0][1] if self._minimos else None,
+            "temperatura_max": self._maximos[0][1] if self._maximos else None,
+            "chuva_mm": max(0.0, self._soma_chuva),
+            "graus_dia": max(0.0, self._soma_gd),
+        }
+
+
+def _valor(dados: Dict[str, Any], coluna: str) -> float:
+    valor = dados.get(coluna)
+    if valor is None and coluna == "chuva":
+        valor = dados.get("chuva_1h")  # formato de fiap_farm_clima.normalizar
+    return _NAN if valor is None else float(valor)
+
+
+class SerieFazenda:
+    """Série temporal meteorológica de uma fazenda (diretório próprio)
+
+    Uso:
+        serie = SerieFazenda("series/Barra Grande", temperatura_base=12.0)
+        serie.adicionar(time.time(), {"temperatura": 24.1, "chuva": 0.2})
+        serie.janela("24h")["graus_dia"]
+        serie.fechar()
+    """
+
+    def __init__(self, diretorio: str, temperatura_base: float = TEMPERATURA_BASE,
+                 temperatura_teto: float = TEMPERATURA_TETO, janelas: Optional[Dict[str, float]] = None):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+        caminho_meta = os.path.join(diretorio, ARQUIVO_METADADOS)
+        if os.path.exists(caminho_meta):
+            with open(caminho_meta, encoding="utf-8") as arquivo:
+                meta = json.load(arquivo)
+            if meta.get("ordem") != sys.byteorder:
+                raise ValueError(f"série gravada com ordem de bytes {meta.get('ordem')}")
+            temperatura_base, temperatura_teto = meta["temperatura_base"], meta["temperatura_teto"]
+        else:
+            meta = {"colunas": list(COLUNAS), "ordem": sys.byteorder,
+                    "temperatura_base": temperatura_base, "temperatura_teto": temperatura_teto}
+            with open(caminho_meta, "w", encoding="utf-8") as arquivo:
+                json.dump(meta, arquivo)
+        self.temperatura_base = temperatura_base
+        self.temperatura_teto = temperatura_teto
+
+        caminhos = {"tempo": os.path.join(diretorio, ARQUIVO_TEMPO)}
+        caminhos.update((coluna, os.path.join(diretorio, coluna + ".f32")) for coluna in COLUNAS)
+        self._caminhos = caminhos
+        # Uma gravação interrompida pode deixar colunas com tamanhos diferentes:
+        # vale o menor número de amostras completas
+        tamanhos = [os.path.getsize(c) // 4 if os.path.exists(c) else 0 for c in caminhos.values()]
+        self._n_disco = min(tamanhos)
+        self._arquivos = {}
+        for nome, caminho in caminhos.items():
+            arquivo = open(caminho, "ab")
+            arquivo.truncate(self._n_disco * 4)
+            self._arquivos[nome] = arquivo
+        self._mapas: Dict[str, tuple] = {}
+        self._bloco = {"tempo": array("I")}
+        self._bloco.update((coluna, array("f")) for coluna in COLUNAS)
+        self._ultimo = float(self._coluna_disco("tempo")[-1]) if self._n_disco else None
+
+        self.janelas = {nome: JanelaMovel(duracao) for nome, duracao in (janelas or JANELAS_PADRAO).items()}
+        if self._n_disco and self.janelas:
+            self._reconstruir_janelas()
+
+    def __len__(self) -> int:
+        return self._n_disco + len(self._bloco["tempo"])
+
+    @property
+    def ultimo_instante(self) -> Optional[float]:
+        return self._ultimo
+
+    def _reconstruir_janelas(self) -> None:
+        """Refaz as janelas com as amostras do período mais longo"""
+        tempo = self._coluna_disco("tempo")
+        inicio = bisect_right(tempo, self._ultimo - max(j.duracao for j in self.janelas.values()))
+        anterior = float(tempo[inicio - 1]) if inicio else None
+        temperatura = self._coluna_disco("temperatura")
+        chuva = self._coluna_disco("chuva")
+        for i in range(inicio, self._n_disco):
+            self._atualizar_janelas(float(tempo[i]), float(temperatura[i]), float(chuva[i]), anterior)
+            anterior = float(tempo[i])
+
+    def _atualizar_janelas(self, instante: float, temperatura: float, chuva: float,
+                           anterior: Optional[float]) -> None:
+        gd = 0.0 if anterior is None else graus_dia(temperatura, instante - anterior,
+                                                    self.temperatura_base, self.temperatura_teto)
+        for janela in self.janelas.values():
+            janela.adicionar(instante, temperatura, chuva, gd)
+
+    def adicionar(self, instante: Union[int, float], dados: Dict[str, Any]) -> None:
+        """Acrescenta uma amostra; os instantes devem ser crescentes
+
+        `dados` tem as chaves de COLUNAS (ou o formato de
+        fiap_farm_clima.normalizar, com chuva_1h); ausentes viram NaN.
+        """
+        instante = int(instante)
+        if self._ultimo is not None and instante < self._ultimo:
+            raise ValueError("instante anterior ao último registrado")
+        if not 0 <= instante < 2 ** 32:
+            raise ValueError("instante fora do intervalo de uint32")
+        bloco = self._bloco
+        bloco["tempo"].append(instante)
+        for coluna in COLUNAS:
+            bloco[coluna].append(_valor(dados, coluna))
+        # As janelas usam o valor float32 gravado, o mesmo que será relido
+        if self.janelas:
+            self._atualizar_janelas(instante, bloco["temperatura"][-1], bloco["chuva"][-1], self._ultimo)
+        self._ultimo = instante
+        if len(bloco["tempo"]) >= TAMANHO_BLOCO:
+            self.sincronizar()
+
+    def adicionar_lote(self, instantes: Sequence[Union[int, float]], colunas: Dict[str, Sequence[float]]) -> None:
+        """Acrescenta muitas amostras (uma sequência por coluna)"""
+        n = len(instantes)
+        for coluna, valores in colunas.items():
+            if coluna not in COLUNAS:
+                raise ValueError(f"coluna desconhecida: {coluna}")
+            if len(valores) != n:
+                raise ValueError("instantes e colunas devem ter o mesmo tamanho")
+        vazia = [None] * n
+        series = [colunas.get(coluna, vazia) for coluna in COLUNAS]
+        for i, instante in enumerate(instantes):
+            self.adicionar(instante, {coluna: valores[i] for coluna, valores in zip(COLUNAS, series)})
+
+    def janela(self, nome: str = "24h") -> Dict[str, Any]:
+        """Agregados da janela (terminando na última amostra)"""
+        return self.janelas[nome].resultado()
+
+    def sincronizar(self, fsync: bool = False) -> None:
+        """Grava o bloco em memória no disco"""
+        n = len(self._bloco["tempo"])
+        if not n:
+            return
+        for nome, valores in self._bloco.items():
+            arquivo = self._arquivos[nome]
+            valores.tofile(arquivo)
+            arquivo.flush()
+            if fsync:
+                os.fsync(arquivo.fileno())
+            del valores[:]
+        self._n_disco += n
+
+    def _coluna_disco(self, nome: str):
+        """Coluna gravada no disco, por mmap (memoryview ou array NumPy)"""
+        if not self._n_disco:
+            return np.zeros(0, dtype=np.uint32 if nome == "tempo" else np.float32) if np is not None else \
+                memoryview(array("I" if nome == "tempo" else "f"))
+        guardado = self._mapas.get(nome)
+        if guardado is None or guardado[0] != self._n_disco:
+            with open(self._caminhos[nome], "rb") as arquivo:
+                mapa = mmap.mmap(arquivo.fileno(), self._n_disco * 4, access=mmap.ACCESS_READ)
+            if np is not None:
+                visao = np.frombuffer(mapa, dtype=np.uint32 if nome == "tempo" else np.float32)
+            else:
+                visao = memoryview(mapa).cast("I" if nome == "tempo" else "f")
+            # O mapa anterior é liberado quando ninguém mais usa as visões dele
+            guardado = self._mapas[nome] = (self._n_disco, visao)
+        return guardado[1]
+
+    def _intervalo(self, inicio: Optional[float], fim: Optional[float]) -> tuple:
+        """Posições [i, j) das amostras com inicio <= instante <= fim"""
+        tempo = self._coluna_disco("tempo")
+        bloco = self._bloco["tempo"]
+        n_disco = self._n_disco
+        if np is not None:
+            # Limites convertidos para uint32: com int/float o NumPy converteria a coluna inteira
+            esquerda = lambda valor: int(np.searchsorted(tempo, _uint32(math.ceil(valor)), "left"))
+            direita = lambda valor: int(np.searchsorted(tempo, _uint32(math.floor(valor)), "right"))
+        else:
+            esquerda = lambda valor: bisect_left(tempo, valor)
+            direita = lambda valor: bisect_right(tempo, valor)
+        if inicio is None:
+            i = 0
+        else:
+            i = esquerda(inicio)
+            if i == n_disco:
+                i += bisect_left(bloco, inicio)
+        if fim is None:
+            j = len(self)
+        else:
+            j = direita(fim)
+            if j == n_disco:
+                j += bisect_right(bloco, fim)
+        return i, max(i, j)
+
+    def coluna(self, nome: str, inicio: Optional[float] = None, fim: Optional[float] = None):
+        """Valores de uma coluna ("tempo" ou uma de COLUNAS) no período
+
+        Retorna um array NumPy (ou array da biblioteca padrão sem NumPy).
+        """
+        if nome != "tempo" and nome not in COLUNAS:
+            raise ValueError(f"coluna desconhecida: {nome}")
+        return self._fatia(nome, *self._intervalo(inicio, fim))
+
+    def _fatia(self, nome: str, i: int, j: int):
+        disco = self._coluna_disco(nome)
+        bloco = self._bloco[nome]
+        n_disco = self._n_disco
+        if np is not None:
+            partes = [disco[i:min(j, n_disco)]]
+            if j > n_disco:
+                partes.append(np.frombuffer(bloco, dtype=disco.dtype)[max(i - n_disco, 0):j - n_disco])
+            return np.concatenate(partes) if len(partes) > 1 else partes[0].copy()
+        valores = array(bloco.typecode, disco[i:min(j, n_disco)].tobytes())
+        if j > n_disco:
+            valores.extend(bloco[max(i - n_disco, 0):j - n_disco])
+        return valores
+
+    def agregados(self, inicio: Optional[float] = None, fim: Optional[float] = None) -> Dict[str, Any]:
+        """Os campos das janelas para um período qualquer do histórico
+
+        Os graus-dia do período contam só os intervalos entre amostras do
+        próprio período. A janela também conta o intervalo que chega à sua
+        primeira amostra vindo da amostra anterior (fora dela), então para o
+        mesmo intervalo de tempo os graus-dia daqui podem ser menores que os
+        de janela().
+        """
+        i, j = self._intervalo(inicio, fim)
+        tempo = self._fatia("tempo", i, j)
+        temperatura = self._fatia("temperatura", i, j)
+        chuva = self._fatia("chuva", i, j)
+        if np is not None:
+            validas = temperatura[~np.isnan(temperatura)].astype(np.float64)
+            intervalos = np.minimum(np.diff(tempo.astype(np.float64)), INTERVALO_MAXIMO)
+            efetiva = np.minimum(temperatura[1:].astype(np.float64), self.temperatura_teto) - self.temperatura_base
+            gd = np.where(np.isnan(efetiva), 0.0, np.maximum(efetiva, 0.0)) * intervalos / 86400
+            return {
+                "amostras": int(len(tempo)),
+                "temperatura_media": float(validas.mean()) if len(validas) else None,
+                "temperatura_min": float(validas.min()) if len(validas) else None,
+                "temperatura_max": float(validas.max()) if len(validas) else None,
+                "chuva_mm": float(np.nansum(chuva.astype(np.float64))),
+                "graus_dia": float(math.fsum(gd)),
+            }
+        validas = [t for t in temperatura if t == t]
+        return {
+            "amostras": len(tempo),
+            "temperatura_media": math.fsum(validas) / len(validas) if validas else None,
+            "temperatura_min": min(validas) if validas else None,
+            "temperatura_max": max(validas) if validas else None,
+            "chuva_mm": math.fsum(c for c in chuva if c == c),
+            "graus_dia": math.fsum(graus_dia(temperatura[k], tempo[k] - tempo[k - 1], self.temperatura_base,
+                                             self.temperatura_teto) for k in range(1, len(tempo))),
+        }
+
+    def fechar(self) -> None:
+        """Grava o bloco pendente e fecha os arquivos"""
+        self.sincronizar()
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        self._mapas.clear()
+
+
+class ArmazemSeries:
+    """Séries de todas as fazendas em um diretório (uma subpasta por fazenda)
+
+    `temperaturas_base` define a temperatura base dos graus-dia por fazenda
+    ao criar a série (depois ela fica nos metadados da série).
+    """
+
+    def __init__(self, diretorio: str, temperaturas_base: Optional[Dict[str, float]] = None,
+                 janelas: Optional[Dict[str, float]] = None):
+        self.diretorio = diretorio
+        self.temperaturas_base = temperaturas_base or {}
+        self.janelas = janelas
+        self._series: Dict[str, SerieFazenda] = {}
+        os.makedirs(diretorio, exist_ok=True)
+
+    def fazendas(self) -> List[str]:
+        """Fazendas com série gravada"""
+        return sorted(unquote(nome) for nome in os.listdir(self.diretorio)
+                      if os.path.exists(os.path.join(self.diretorio, nome, ARQUIVO_METADADOS)))
+
+    def serie(self, fazenda: str) -> SerieFazenda:
+        """Série da fazenda (aberta ou criada na primeira consulta)"""
+        serie = self._series.get(fazenda)
+        if serie is None:
+            serie = self._series[fazenda] = SerieFazenda(
+                os.path.join(self.diretorio, quote(fazenda, safe="")),
+                self.temperaturas_base.get(fazenda, TEMPERATURA_BASE), janelas=self.janelas)
+        return serie
+
+    def registrar(self, fazenda: str, instante: Union[int, float], dados: Dict[str, Any]) -> None:
+        self.serie(fazenda).adicionar(instante, dados)
+
+    def registrar_clima(self, resultados: Dict[str, Dict[str, Any]], instante: Optional[float] = None) -> int:
+        """Registra uma coleta de ClienteClima.atualizar_fazendas; retorna quantas
+
+        Fazendas com erro na coleta são ignoradas.
+        """
+        instante = time.time() if instante is None else instante
+        registradas = 0
+        for fazenda, dados in resultados.items():
+            if "erro" not in dados:
+                self.registrar(fazenda, instante, dados)
+                registradas += 1
+        return registradas
+
+    def janelas_por_fazenda(self, nome: str = "24h") -> Dict[str, Dict[str, Any]]:
+        """Agregados de uma janela de todas as séries abertas"""
+        return {fazenda: serie.janela(nome) for fazenda, serie in self._series.items()}
+
+    def sincronizar(self, fsync: bool = False) -> None:
+        for serie in self._series.values():
+            serie.sincronizar(fsync)
+
+    def fechar(self) -> None:
+        for serie in self._series.values():
+            serie.fechar()
+        self._series.clear()
@@ -10,11 +10,14 @@ Implementa as mesmas análises estatísticas e meteorológicas em Python.
 """
 
 import json
-import statistics
 import math
 from datetime import datetime
 import os
 
+from fiap_farm_alertas import REGRAS_RELATORIO, MotorAlertas
+from fiap_farm_estatisticas import AcumuladorEstatistico, calcular_paralelo, estatisticas_paralelas
+from fiap_farm_instrumentacao import medido
+
 class RSimulator:
     """Simulador das funcionalidades R em Python"""
     
@@ -25,34 +28,28 @@ class RSimulator:
             'areas': [12.5, 15.2, 11.8, 16.7, 13.9, 15.8, 10.9, 14.6],
             'temperaturas': [23.5, 25.2, 22.8, 26.1, 24.3, 25.7, 21.9, 24.8]
         }
+        self.motor_alertas = MotorAlertas(REGRAS_RELATORIO)
     
-    def calcular_estatisticas(self, dados):
-        """Calcula estatísticas descritivas (equivalente ao R)"""
-        if not dados or len(dados) == 0:
-            return None
-        
-        n = len(dados)
-        media = statistics.mean(dados)
-        desvio_padrao = statistics.stdev(dados) if n > 1 else 0
-        variancia = statistics.variance(dados) if n > 1 else 0
-        mediana = statistics.median(dados)
-        minimo = min(dados)
-        maximo = max(dados)
-        
-        return {
-            'n': n,
-            'media': round(media, 4),
-            'desvio_padrao': round(desvio_padrao, 4),
-            'variancia': round(variancia, 4),
-            'mediana': round(mediana, 4),
-            'minimo': minimo,
-            'maximo': maximo,
-            'amplitude': maximo - minimo,
-            'coef_variacao': round((desvio_padrao / media) * 100, 2) if media != 0 else 0
-        }
+    @medido
+    def calcular_estatisticas(self, dados, mediana="exata", paralelo=False, processos=None):
+        """Calcula estatísticas descritivas (equivalente ao R)
+
+        `dados` pode ser qualquer iterável, inclusive um gerador: os valores
+        são lidos uma única vez (ver AcumuladorEstatistico). Com
+        mediana="aproximada" a memória usada é constante. Com paralelo=True
+        a série é dividida em partes calculadas em `processos` processos.
+        """
+        if paralelo:
+            return calcular_paralelo(dados, mediana, processos).resultado()
+        acumulador = AcumuladorEstatistico(mediana=mediana).atualizar(dados)
+        return acumulador.resultado()
     
-    def gerar_relatorio_estatistico(self, tipo_dados=None):
-        """Gera relatório estatístico completo"""
+    def gerar_relatorio_estatistico(self, tipo_dados=None, paralelo=False, processos=None):
+        """Gera relatório estatístico completo
+
+        Com paralelo=True as categorias (e as partes de séries grandes) são
+        calculadas ao mesmo tempo em um pool de processos.
+        """
         print("\n" + "="*60)
         print("         FIAP FARM - RELATÓRIO ESTATÍSTICO")
         print("              FarmTech Solutions")
@@ -67,6 +64,11 @@ class RSimulator:
             # Usar todos os dados de exemplo
             dados_para_analise = self.dados_exemplo
         
+        if paralelo:
+            acumuladores = estatisticas_paralelas(
+                {categoria: valores for categoria, valores in dados_para_analise.items() if valores},
+                mediana="exata", processos=processos)
+        
         for categoria, valores in dados_para_analise.items():
             if not valores:
                 continue
@@ -74,7 +76,10 @@ class RSimulator:
             print(f"\n📊 ANÁLISE: {categoria.upper()}")
             print("-" * 40)
             
-            stats = self.calcular_estatisticas(valores)
+            if paralelo:
+                stats = acumuladores[categoria].resultado()
+            else:
+                stats = self.calcular_estatisticas(valores)
             if stats:
                 print(f"Dados analisados: {valores}")
                 print(f"Quantidade de observações (n): {stats['n']}")
@@ -154,24 +159,16 @@ class RSimulator:
         print(f"\n🌱 ANÁLISE PARA AGRICULTURA")
         print("-" * 40)
         
-        if dados['temperatura'] < 15:
-            print("⚠️  Temperatura baixa - Risco para culturas sensíveis ao frio")
-        elif dados['temperatura'] > 35:
-            print("⚠️  Temperatura alta - Necessário irrigação adicional")
-        else:
-            print("✅ Temperatura adequada para a maioria das culturas")
-        
-        if dados['umidade'] < 40:
-            print("⚠️  Umidade baixa - Considerar irrigação")
-        elif dados['umidade'] > 80:
-            print("⚠️  Umidade alta - Monitorar fungos e pragas")
-        else:
-            print("✅ Umidade adequada")
-        
-        if dados['vento'] > 25:
-            print("⚠️  Vento forte - Risco para culturas altas")
-        else:
-            print("✅ Velocidade do vento normal")
+        # Regras e limites em fiap_farm_alertas (REGRAS_RELATORIO, limites gerais)
+        alertas = self.motor_alertas.avaliar_leitura(None, dados)
+        for variavel, normal in (("temperatura", "Temperatura adequada para a maioria das culturas"),
+                                 ("umidade", "Umidade adequada"),
+                                 ("vento", "Velocidade do vento normal")):
+            mensagens = [alerta["mensagem"] for alerta in alertas if alerta["variavel"] == variavel]
+            for mensagem in mensagens:
+                print(f"⚠️  {mensagem}")
+            if not mensagens:
+                print(f"✅ {normal}")
         
         print("\n" + "="*60)
         print("Relatório meteorológico gerado com sucesso!")
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Agregados corridos (resumo O(1)) conferidos com um recálculo completo"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from fiap_farm import GerenciadorDados
+from fiap_farm_armazenamento import ArmazemPlantioColunar, ArmazemRegistros
+from fiap_farm_persistencia import DiarioEscrita, gerenciador_sqlite
+
+OPERACOES = 3000
+
+
+def _plantio(rng):
+    tipo = rng.choice(("quadrado", "retangulo", "poligono"))
+    if tipo == "quadrado":
+        lado = rng.uniform(1.0, 500.0)
+        dados = {"tipo": tipo, "lado": lado, "area_m2": lado * lado}
+    elif tipo == "retangulo":
+        largura, altura = rng.uniform(1.0, 500.0), rng.uniform(1.0, 500.0)
+        dados = {"tipo": tipo, "largura": largura, "altura": altura, "area_m2": largura * altura}
+    else:
+        dados = {"tipo": tipo, "area_m2": rng.uniform(1.0, 1e6)}
+    dados["area_ha"] = dados["area_m2"] / 10000
+    if rng.random() < 0.3:
+        dados["quantidade"] = rng.choice(("minima", "media", "maxima"))
+    return dados
+
+
+def _insumos(rng):
+    return {"tipo": rng.choice(("corretivos", "fertilizantes", "defensivos", "completo")),
+            "hectares": rng.uniform(0.1, 1000.0), "quantidade": rng.choice(("minima", "media", "maxima"))}
+
+
+def _movimentar(gerenciador, rng, operacoes=OPERACOES, conferir=None):
+    """Inclusões (uma a uma e em lote), atualizações e remoções aleatórias"""
+    for numero in range(operacoes):
+        if conferir is not None and numero % 500 == 0:
+            conferir(gerenciador)
+        sorteio = rng.random()
+        ids = [registro["id"] for registro in gerenciador.iterar_plantio()]
+        if sorteio < 0.4 or not ids:
+            gerenciador.adicionar_plantio(_plantio(rng))
+            gerenciador.adicionar_insumos(_insumos(rng))
+        elif sorteio < 0.5:
+            gerenciador.adicionar_plantio_lote([_plantio(rng) for _ in range(5)])
+            gerenciador.adicionar_insumos_lote([_insumos(rng) for _ in range(5)])
+        elif sorteio < 0.8:
+            gerenciador.atualizar_plantio_por_id(rng.choice(ids), _plantio(rng))
+            ids_insumos = [registro["id"] for registro in gerenciador.iterar_insumos()]
+            gerenciador.atualizar_insumos_por_id(rng.choice(ids_insumos), _insumos(rng))
+        else:
+            gerenciador.deletar_plantio_por_id(rng.choice(ids))
+            ids_insumos = [registro["id"] for registro in gerenciador.iterar_insumos()]
+            gerenciador.deletar_insumos_por_id(rng.choice(ids_insumos))
+
+
+class TestAgregados(unittest.TestCase):
+
+    def _conferir(self, gerenciador):
+        self.assertTrue(gerenciador.verificar_agregados())
+
+    def test_divergencia_detectada(self):
+        gerenciador = GerenciadorDados()
+        gerenciador.adicionar_insumos({"tipo": "corretivos", "hectares": 10.0, "quantidade": "media"})
+        gerenciador.insumos._agregados.adicionar("corretivos", "media", 1.0)
+        self.assertFalse(gerenciador.verificar_agregados())
+
+    def test_armazem_registros(self):
+        gerenciador = GerenciadorDados()
+        self.assertIsInstance(gerenciador.plantio, ArmazemRegistros)
+        _movimentar(gerenciador, random.Random(1), conferir=self._conferir)
+        self._conferir(gerenciador)
+
+    def test_armazem_colunar(self):
+        gerenciador = GerenciadorDados(armazem_plantio=ArmazemPlantioColunar())
+        _movimentar(gerenciador, random.Random(2), conferir=self._conferir)
+        self._conferir(gerenciador)
+
+    def test_armazem_sqlite(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            gerenciador = gerenciador_sqlite(os.path.join(diretorio, "fiap_farm.db"))
+            try:
+                _movimentar(gerenciador, random.Random(3), operacoes=1000, conferir=self._conferir)
+                self._conferir(gerenciador)
+            finally:
+                gerenciador.plantio.conexao.close()
+
+    def test_recuperacao_do_diario(self):
+        """Snapshot + final do diário reaplicados batem com o recálculo"""
+        for armazem in (ArmazemRegistros, ArmazemPlantioColunar):
+            with self.subTest(armazem=armazem.__name__), tempfile.TemporaryDirectory() as diretorio:
+                gerenciador = GerenciadorDados()
+                diario = DiarioEscrita(diretorio, operacoes_por_snapshot=700)
+                diario.abrir(gerenciador)
+                _movimentar(gerenciador, random.Random(4))
+                diario.fechar()
+
+                plantio = ArmazemPlantioColunar() if armazem is ArmazemPlantioColunar else None
+                recuperado = GerenciadorDados(armazem_plantio=plantio)
+                recuperacao = DiarioEscrita(diretorio)
+                self.assertGreater(recuperacao.abrir(recuperado), 0)
+                recuperacao.fechar()
+                self._conferir(recuperado)
+                for campo in ("tipo", "quantidade"):
+                    self.assertEqual(recuperado.resumo_insumos(campo), gerenciador.resumo_insumos(campo))
+                    esperado = gerenciador.resumo_plantio(campo)
+                    self.assertEqual(recuperado.resumo_plantio(campo).keys(), esperado.keys())
+                    for valor, (registros, hectares) in recuperado.resumo_plantio(campo).items():
+                        self.assertEqual(registros, esperado[valor][0])
+                        self.assertAlmostEqual(hectares, esperado[valor][1], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
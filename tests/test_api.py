@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Erros de entrada (400) e de servidor (500) da API HTTP"""
+
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+
+from fiap_farm import FiapFarmSystem
+from fiap_farm_api import ServidorAPI
+from fiap_farm_http import ClienteHTTP
+
+
+async def requisitar(servidor, cliente, metodo, caminho, dados=None):
+    corpo = b"" if dados is None else json.dumps(dados).encode()
+    resposta = await cliente.requisitar(metodo, servidor.url + caminho, corpo)
+    return resposta.status, resposta.json() if resposta.corpo else None
+
+
+class TestErrosAPI(unittest.TestCase):
+
+    def executar(self, pedidos, preparar=None):
+        async def cenario():
+            async with ServidorAPI(FiapFarmSystem()) as servidor, ClienteHTTP() as cliente:
+                if preparar is not None:
+                    preparar(servidor)
+                return [await requisitar(servidor, cliente, *pedido) for pedido in pedidos]
+        return asyncio.run(cenario())
+
+    def test_insumos_hectares_invalidos(self):
+        casos = [{"quantidade": "media"}, {"hectares": True}, {"hectares": "5"}, {"hectares": 0},
+                 {"hectares": [1]}, {"hectares": 5, "cultura": ["cana"]}]
+        respostas = self.executar([("POST", "/calculo/insumos", caso) for caso in casos])
+        for caso, (status, corpo) in zip(casos, respostas):
+            with self.subTest(caso=caso):
+                self.assertEqual(status, 400)
+                campo = "cultura" if "cultura" in caso else "hectares"
+                self.assertIn(campo, corpo["erro"])
+        [(status, corpo)] = self.executar([("POST", "/calculo/insumos", {"hectares": 5, "quantidade": "maxima"})])
+        self.assertEqual((status, corpo["hectares"]), (200, 5.0))
+
+    def test_area_entradas_invalidas(self):
+        casos = [{"lado": True}, {"lado": [3]}, {"geometria": {"type": "Polygon"}},
+                 {"geometria": {"type": "Polygon", "coordinates": [[None, None, None]]}}, {"geometria": 5}, [1]]
+        for caso, (status, corpo) in zip(casos, self.executar([("POST", "/calculo/area", caso) for caso in casos])):
+            with self.subTest(caso=caso):
+                self.assertEqual(status, 400)
+                self.assertTrue(corpo["erro"])
+
+    def test_falha_do_handler_vira_500(self):
+        def preparar(servidor):
+            def resumo(**_):
+                return 200, {}["inexistente"]
+            servidor.rotas[("resumo",)]["GET"] = resumo
+
+        with contextlib.redirect_stderr(io.StringIO()) as erros:
+            [(status, corpo)] = self.executar([("GET", "/resumo")], preparar)
+        self.assertEqual((status, corpo), (500, {"erro": "erro interno"}))
+        self.assertIn("KeyError", erros.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""ClienteClima contra o ServidorClimaSimulado (e respostas defeituosas)"""
+
+import asyncio
+import time
+import unittest
+
+from fiap_farm_clima import CAMINHO_API, ClienteClima, ErroClima, LimitadorTaxa, ServidorClimaSimulado
+from fiap_farm_http import ler_requisicao, resposta
+
+
+class Relogio:
+    """Relógio controlado pelo teste (para o TTL do cache)"""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+class ServidorFixo:
+    """Responde sempre os mesmos bytes a qualquer requisição"""
+
+    def __init__(self, dados: bytes):
+        self.dados = dados
+        self.requisicoes = 0
+        self._servidor = None
+
+    @property
+    def url(self) -> str:
+        porta = self._servidor.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{porta}{CAMINHO_API}"
+
+    async def __aenter__(self) -> "ServidorFixo":
+        self._servidor = await asyncio.start_server(self._atender, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        self._servidor.close()
+        await self._servidor.wait_closed()
+
+    async def _atender(self, leitor, escritor) -> None:
+        try:
+            if await ler_requisicao(leitor) is not None:
+                self.requisicoes += 1
+                escritor.write(self.dados)
+                await escritor.drain()
+        finally:
+            escritor.close()
+
+
+def executar(corotina):
+    return asyncio.run(corotina)
+
+
+class TestClienteClima(unittest.TestCase):
+
+    def test_cache_e_expiracao(self):
+        async def cenario():
+            relogio = Relogio()
+            async with ServidorClimaSimulado() as servidor:
+                async with ClienteClima(url=servidor.url, ttl=60.0, requisicoes_por_segundo=None,
+                                        relogio=relogio) as cliente:
+                    primeiro = await cliente.obter(-23.55, -46.63)
+                    # mesma chave depois do arredondamento em 2 casas
+                    self.assertEqual(await cliente.obter(-23.551, -46.634), primeiro)
+                    self.assertEqual(servidor.requisicoes, 1)
+                    self.assertEqual(cliente.estatisticas["cache"], 1)
+
+                    relogio.agora = 59.0
+                    await cliente.obter(-23.55, -46.63)
+                    self.assertEqual(servidor.requisicoes, 1)
+
+                    relogio.agora = 60.0
+                    self.assertEqual(cliente.limpar_expirados(), 1)
+                    await cliente.obter(-23.55, -46.63)
+                    self.assertEqual(servidor.requisicoes, 2)
+                    self.assertEqual(cliente.estatisticas, {"requisicoes": 2, "cache": 2, "coalescidas": 0, "erros": 0})
+        executar(cenario())
+
+    def test_pedidos_simultaneos_coalescidos(self):
+        async def cenario():
+            async with ServidorClimaSimulado(latencia=0.05) as servidor:
+                async with ClienteClima(url=servidor.url, requisicoes_por_segundo=None) as cliente:
+                    resultados = await cliente.obter_varios([(-22.9, -43.2)] * 10 + [(-15.8, -47.9)] * 5)
+                    self.assertEqual(servidor.requisicoes, 2)
+                    self.assertEqual(cliente.estatisticas["coalescidas"], 13)
+                    self.assertTrue(all(r is resultados[0] for r in resultados[:10]))
+                    self.assertEqual(resultados[10]["temperatura"],
+                                     ServidorClimaSimulado.dados_local(-15.8, -47.9)["main"]["temp"])
+        executar(cenario())
+
+    def test_limite_de_taxa(self):
+        async def cenario():
+            async with ServidorClimaSimulado() as servidor:
+                async with ClienteClima(url=servidor.url, requisicoes_por_segundo=10) as cliente:
+                    inicio = time.perf_counter()
+                    locais = [(float(lat), 0.0) for lat in range(13)]
+                    resultados = await cliente.obter_varios(locais)
+                    decorrido = time.perf_counter() - inicio
+            self.assertFalse([r for r in resultados if isinstance(r, BaseException)])
+            # rajada de 10, as 3 restantes a 10/s
+            self.assertGreaterEqual(decorrido, 0.25)
+        executar(cenario())
+
+    def test_balde_de_fichas(self):
+        async def cenario():
+            limitador = LimitadorTaxa(20, rajada=2)
+            inicio = time.perf_counter()
+            await limitador.aguardar()
+            await limitador.aguardar()
+            self.assertLess(time.perf_counter() - inicio, 0.04)
+            for _ in range(4):
+                await limitador.aguardar()
+            self.assertGreaterEqual(time.perf_counter() - inicio, 0.18)
+        executar(cenario())
+        with self.assertRaises(ValueError):
+            LimitadorTaxa(0)
+
+    def test_chave_invalida(self):
+        async def cenario():
+            async with ServidorClimaSimulado() as servidor:
+                async with ClienteClima(url=servidor.url, chave_api="invalida",
+                                        requisicoes_por_segundo=None) as cliente:
+                    with self.assertRaisesRegex(ErroClima, "API key inválida"):
+                        await cliente.obter(0.0, 0.0)
+                    fazendas = await cliente.atualizar_fazendas({"Sede": {"lat": 0.0, "lon": 0.0}, "Sem local": {}})
+                    self.assertEqual(fazendas, {"Sede": {"erro": "API key inválida"}})
+                    self.assertEqual(cliente.estatisticas["erros"], 2)
+        executar(cenario())
+
+    def test_respostas_defeituosas(self):
+        casos = [
+            ("erro na requisição: 503", resposta(503, b'{"message":"unavailable"}')),
+            ("erro na requisição: 500", resposta(500, b"")),
+            ("resposta inválida", resposta(200, b"\xff\xfe nao e json")),
+            ("resposta inválida", resposta(200, b'{"main": "quente"}')),
+            ("resposta inválida", resposta(200, b'{"wind": {"speed": "forte"}}')),
+            ("resposta inválida", resposta(200, b"[1]")),
+        ]
+
+        async def cenario(esperado, dados):
+            async with ServidorFixo(dados) as servidor:
+                async with ClienteClima(url=servidor.url, requisicoes_por_segundo=None) as cliente:
+                    with self.assertRaisesRegex(ErroClima, esperado):
+                        await cliente.obter(1.0, 2.0)
+                    # o erro não fica no cache: o próximo pedido tenta de novo
+                    with self.assertRaises(ErroClima):
+                        await cliente.obter(1.0, 2.0)
+                    self.assertEqual(servidor.requisicoes, 2)
+                    self.assertEqual(cliente.estatisticas["erros"], 2)
+
+        for esperado, dados in casos:
+            with self.subTest(esperado=esperado, dados=dados[-30:]):
+                executar(cenario(esperado, dados))
+
+    def test_servidor_fora_do_ar(self):
+        async def cenario():
+            async with ServidorClimaSimulado() as servidor:
+                url = servidor.url
+            async with ClienteClima(url=url, requisicoes_por_segundo=None, tempo_limite=2.0) as cliente:
+                with self.assertRaisesRegex(ErroClima, "erro ao conectar"):
+                    await cliente.obter(0.0, 0.0)
+        executar(cenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
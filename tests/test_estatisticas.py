@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Resultados do AcumuladorEstatistico no formato do statistics/R"""
+
+import statistics
+import unittest
+
+from r_simulator import RSimulator
+
+
+class TestMediaInteira(unittest.TestCase):
+
+    def test_media_como_statistics_mean(self):
+        simulador = RSimulator()
+        for valores in ([10, 20, 30, 40, 50], simulador.dados_exemplo["custos"], [1, 2], [1, 2.0, 3],
+                        simulador.dados_exemplo["areas"]):
+            esperado = statistics.mean(valores)
+            for opcoes in ({}, {"paralelo": True, "processos": 2}, {"mediana": "aproximada"}):
+                with self.subTest(valores=valores, **opcoes):
+                    media = simulador.calcular_estatisticas(valores, **opcoes)["media"]
+                    self.assertEqual(media, round(esperado, 4))
+                    self.assertIs(type(media), type(esperado))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Caixas de talhões lon/lat, inclusive no antimeridiano"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from fiap_farm_espacial import IndiceEspacial
+from fiap_farm_geometria import caixa_aneis, medir_geojson
+
+
+def quadrado(oeste, sul, lado=1.0):
+    return [[oeste, sul], [oeste + lado, sul], [oeste + lado, sul + lado], [oeste, sul + lado], [oeste, sul]]
+
+
+class TestCaixas(unittest.TestCase):
+
+    def test_caixa_comum(self):
+        self.assertEqual(caixa_aneis([quadrado(-47.0, -23.0)]), [-47.0, -23.0, -46.0, -22.0])
+
+    def test_antimeridiano(self):
+        anel = [[179.5, -17.0], [-179.5, -17.0], [-179.5, -16.0], [179.5, -16.0], [179.5, -17.0]]
+        self.assertEqual(caixa_aneis([anel]), [179.5, -17.0, 180.5, -16.0])
+        self.assertEqual(caixa_aneis([anel[::-1]]), [179.5, -17.0, 180.5, -16.0])
+        # dividido no antimeridiano, como recomenda o GeoJSON (RFC 7946)
+        partes = [quadrado(179.0, 0.0), quadrado(-180.0, 0.0)]
+        self.assertEqual(caixa_aneis(partes), [179.0, 0.0, 181.0, 1.0])
+        # coordenadas projetadas não são desdobradas
+        self.assertEqual(caixa_aneis([anel], geografico=False), [-179.5, -17.0, 179.5, -16.0])
+
+    def test_indice_sem_falsos_candidatos(self):
+        feicoes = {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": {"nome": "Taveuni"},
+             "geometry": {"type": "Polygon", "coordinates": [
+                 [[179.8, -16.9], [-179.8, -16.9], [-179.8, -16.7], [179.8, -16.7], [179.8, -16.9]]]}},
+            {"type": "Feature", "properties": {"nome": "Sede"},
+             "geometry": {"type": "Polygon", "coordinates": [quadrado(-47.0, -16.9, 0.2)]}},
+        ]}
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "talhoes.geojson")
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                json.dump(feicoes, arquivo)
+            registros = medir_geojson(caminho, campo_nome="nome")
+        indice = IndiceEspacial()
+        indice.carregar((numero, registro["bbox"]) for numero, registro in enumerate(registros, start=1))
+        self.assertEqual(indice.consultar_ponto(-46.9, -16.8), [2])
+        self.assertEqual(indice.consultar_ponto(179.9, -16.8), [1])
+        self.assertEqual(indice.consultar_ponto(-179.9 + 360, -16.8), [1])
+        self.assertEqual(indice.consultar_ponto(0.0, -16.8), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Visões de leitura do GerenciadorDados"""
+
+import unittest
+
+from fiap_farm import GerenciadorDados
+from fiap_farm_armazenamento import ArmazemRegistros
+
+
+class TestGerenciadorDados(unittest.TestCase):
+
+    def test_dados_somente_leitura(self):
+        gerenciador = GerenciadorDados()
+        gerenciador.adicionar_plantio({"tipo": "quadrado", "lado": 100.0, "area_m2": 10000.0, "area_ha": 1.0})
+        gerenciador.adicionar_insumos({"tipo": "corretivos", "hectares": 1.0, "quantidade": "media"})
+        for dados in (gerenciador.dados_plantio, gerenciador.dados_insumos):
+            self.assertIsInstance(dados, tuple)
+            with self.assertRaises(AttributeError):
+                dados.append({})
+        self.assertEqual([registro["id"] for registro in gerenciador.dados_plantio], [1])
+
+
+class TestOrdemDeId(unittest.TestCase):
+
+    def test_inserir_com_id_menor(self):
+        """Um id que volta (reaplicação do diário) aparece na sua posição de id"""
+        armazem = ArmazemRegistros()
+        for lado in (10, 20, 30, 40):
+            armazem.inserir({"tipo": "quadrado", "hectares": lado})
+        armazem.remover(2)
+        armazem.remover(3)
+        armazem.inserir_com_id(3, {"tipo": "quadrado", "hectares": 5})
+        self.assertEqual([registro["id"] for registro in armazem], [1, 3, 4])
+        self.assertEqual([registro["id"] for registro in armazem.iterar_desde()], [1, 3, 4])
+        self.assertEqual(armazem.id_na_posicao(1), 3)
+        self.assertEqual(armazem.ids_por("tipo", "quadrado"), [1, 3, 4])
+        armazem.inserir_com_id(2, {"tipo": "quadrado", "hectares": 7})
+        self.assertEqual([registro["id"] for registro in armazem], [1, 2, 3, 4])
+        self.assertEqual(armazem.inserir({"tipo": "retangulo", "hectares": 1}), 5)
+        self.assertEqual([registro["id"] for registro in armazem], [1, 2, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Orçamento de inicialização e importações preguiçosas (NumPy)"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+from benchmark_fiap_farm import MODULOS_ENTRADA, _ambiente_limpo, bench_inicializacao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestInicializacao(unittest.TestCase):
+
+    def test_numpy_nao_importado(self):
+        """Importar os pontos de entrada não carrega o NumPy (é importado sob demanda)"""
+        for modulo in MODULOS_ENTRADA:
+            with self.subTest(modulo=modulo):
+                saida = subprocess.run(
+                    [sys.executable, "-c", f"import sys, {modulo}; print('numpy' in sys.modules)"],
+                    cwd=RAIZ, env=_ambiente_limpo(), stdout=subprocess.PIPE, text=True, check=True).stdout
+                self.assertEqual(saida.strip(), "False")
+
+    def test_dentro_do_orcamento(self):
+        with contextlib.redirect_stdout(io.StringIO()) as relatorio:
+            estourados = bench_inicializacao(repeticoes=3, orcamento=True)
+        self.assertEqual(estourados, [], relatorio.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
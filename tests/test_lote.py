@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Erros por linha do processamento em lote"""
+
+import io
+import json
+import unittest
+
+from fiap_farm_lote import ler_linhas, processar_lote
+
+
+def processar(texto: str, tamanho_bloco: int = 2):
+    saida = io.StringIO()
+    total, erros = processar_lote(ler_linhas(io.StringIO(texto), "ndjson"), saida, tamanho_bloco)
+    return total, erros, [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+
+class TestLote(unittest.TestCase):
+
+    def test_linhas_invalidas(self):
+        casos = [
+            ("[1]", "linha deve ser um objeto"),
+            ("null", "linha deve ser um objeto"),
+            ("{", "JSON inválido"),
+            ('{"lado": true}', "lado deve ser um número"),
+            ('{"lado": -1}', "lado deve ser maior que zero"),
+            ('{"tipo": 5, "lado": 3}', "tipo deve ser texto"),
+            ('{"lado": 3, "quantidade": "muita"}', "quantidade inválida: muita"),
+            ('{"lado": 1e200}', "área grande demais"),
+        ]
+        total, erros, resultado = processar("\n".join(texto for texto, _ in casos) + '\n{"lado": 100}\n')
+        self.assertEqual((total, erros), (len(casos) + 1, len(casos)))
+        for numero, ((_, mensagem), linha) in enumerate(zip(casos, resultado), start=1):
+            self.assertEqual(linha["linha"], numero)
+            self.assertIn(mensagem, linha["erro"])
+        self.assertEqual(resultado[-1]["area_ha"], 1.0)
+
+    def test_tamanho_bloco(self):
+        with self.assertRaises(ValueError):
+            processar('{"lado": 100}\n', tamanho_bloco=0)
+
+
+if __name__ == "__main__":
+    unittest.main()